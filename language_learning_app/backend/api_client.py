@@ -5,15 +5,10 @@ Handles text generation, TTS, and STT operations
 import json
 import random
 import time
-import threading
-import base64
 import io
 import struct
 import re
-import signal
 import asyncio
-import concurrent.futures
-from functools import wraps
 import google.generativeai as genai
 from google.cloud import speech
 try:
@@ -25,6 +20,10 @@ except ImportError:
     print("Warning: google.genai not available, falling back to google.cloud.texttospeech")
 from google.cloud import texttospeech
 from . import config
+from . import llm_gateway
+from . import tts_cache
+from . import audio_store
+from . import vocab_matcher
 from .prompting import render_template
 
 # Initialize Gemini API
@@ -61,6 +60,9 @@ GEMINI_25_FLASH_NATIVE_AUDIO_OUTPUT_AUDIO_PRICE_PER_1M = 12.00  # Audio output f
 GEMINI_API_TIMEOUT = 60  # 60 seconds timeout for API calls
 TTS_TIMEOUT = 30  # 30 seconds timeout for TTS generation
 
+# Audio up to this size is sent inline with the prompt (requests are capped at 20MB)
+GEMINI_INLINE_AUDIO_MAX_BYTES = 15 * 1024 * 1024
+
 # Language-specific writing guidelines (3 general rules for rubric)
 WRITING_GUIDELINES = {
     'kannada': [
@@ -115,45 +117,6 @@ def get_script_requirement(language):
     """Get the script requirement text for a specific language"""
     return SCRIPT_REQUIREMENTS.get(language.lower(), SCRIPT_REQUIREMENTS['english'])
 
-class TimeoutError(Exception):
-    """Custom timeout error"""
-    pass
-
-def timeout_handler(signum, frame):
-    """Signal handler for timeout"""
-    raise TimeoutError("Operation timed out")
-
-def with_timeout(timeout_seconds):
-    """Decorator to add timeout to function calls"""
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Use threading for timeout (works on all platforms)
-            result = [None]
-            exception = [None]
-            
-            def target():
-                try:
-                    result[0] = func(*args, **kwargs)
-                except Exception as e:
-                    exception[0] = e
-            
-            thread = threading.Thread(target=target)
-            thread.daemon = True
-            thread.start()
-            thread.join(timeout_seconds)
-            
-            if thread.is_alive():
-                # Thread is still running - timeout occurred
-                raise TimeoutError(f"Operation timed out after {timeout_seconds} seconds")
-            
-            if exception[0]:
-                raise exception[0]
-            
-            return result[0]
-        return wrapper
-    return decorator
-
 def calculate_token_costs(token_info: dict, model_name: str = None) -> dict:
     """Calculate costs from token usage info
     
@@ -190,9 +153,12 @@ def calculate_token_costs(token_info: dict, model_name: str = None) -> dict:
     
     return token_info_with_costs
 
-def generate_text_with_gemini(prompt: str, model_name: str = None) -> tuple:
+async def generate_text_with_gemini_async(prompt: str, model_name: str = None) -> tuple:
     """Generate text using Gemini API
     
+    The call goes through the shared LLM gateway ('text' lane), so it reuses
+    the process-wide client, waits for a free slot and is cancelled on timeout.
+    
     Returns:
         tuple: (response_text, response_time, token_info, is_truncated, debug_info)
     """
@@ -209,36 +175,35 @@ def generate_text_with_gemini(prompt: str, model_name: str = None) -> tuple:
     if not config.GEMINI_API_KEY:
         debug_info['error'] = 'GEMINI_API_KEY not set'
         raise Exception("GEMINI_API_KEY not set")
+    if not HAS_GOOGLE_GENAI:
+        debug_info['error'] = 'google.genai not available'
+        raise Exception("google.genai not available")
     
     try:
-        debug_info['status'] = 'initializing_model'
-        model = genai.GenerativeModel(model_name)
         start_time = time.time()
         
         debug_info['status'] = 'calling_api'
         debug_info['call_start_time'] = start_time
         
-        # Wrap API call with timeout
         # Use longer timeout for reading activities (they generate longer stories)
         timeout_seconds = GEMINI_API_TIMEOUT
         if len(prompt) > 5000:  # Reading activities typically have longer prompts
             timeout_seconds = 120  # 2 minutes for reading activities
         
-        @with_timeout(timeout_seconds)
-        def call_api():
-            return model.generate_content(
+        try:
+            response = await llm_gateway.get_gateway().generate_content(
+                'text',
+                model_name,
                 prompt,
-                generation_config={
-                    "temperature": 0.7,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 8192,
-                }
+                types.GenerateContentConfig(
+                    temperature=0.7,
+                    top_p=0.95,
+                    top_k=40,
+                    max_output_tokens=8192,
+                ),
+                timeout=timeout_seconds
             )
-        
-        try:
-            response = call_api()
-        except TimeoutError as e:
+        except llm_gateway.LLMTimeoutError:
             debug_info['error'] = f'API call timed out after {timeout_seconds} seconds'
             debug_info['error_type'] = 'TimeoutError'
             raise Exception(f"Gemini API call timed out after {timeout_seconds} seconds. Please try again.")
@@ -249,11 +214,11 @@ def generate_text_with_gemini(prompt: str, model_name: str = None) -> tuple:
         
         # Extract token usage info if available
         token_info = {}
-        if hasattr(response, 'usage_metadata'):
+        if getattr(response, 'usage_metadata', None):
             token_info = {
-                'prompt_tokens': getattr(response.usage_metadata, 'prompt_token_count', 0),
-                'completion_tokens': getattr(response.usage_metadata, 'candidates_token_count', 0),
-                'total_tokens': getattr(response.usage_metadata, 'total_token_count', 0),
+                'prompt_tokens': getattr(response.usage_metadata, 'prompt_token_count', 0) or 0,
+                'completion_tokens': getattr(response.usage_metadata, 'candidates_token_count', 0) or 0,
+                'total_tokens': getattr(response.usage_metadata, 'total_token_count', 0) or 0,
             }
             # Calculate costs
             token_info = calculate_token_costs(token_info, model_name)
@@ -264,7 +229,7 @@ def generate_text_with_gemini(prompt: str, model_name: str = None) -> tuple:
         if hasattr(response, 'candidates') and response.candidates:
             finish_reason = getattr(response.candidates[0], 'finish_reason', None)
             is_truncated = finish_reason == 'MAX_TOKENS' or finish_reason == 'OTHER'
-            debug_info['finish_reason'] = finish_reason
+            debug_info['finish_reason'] = str(finish_reason)
             debug_info['is_truncated'] = is_truncated
         
         # Check if response.text exists and is not empty
@@ -566,8 +531,8 @@ def generate_tts_style_instruction(passage_text: str, passage_name: str = '', se
     return combined_style
 
 
-def generate_tts(text: str, language: str = 'kn-IN', voice: str = None, style_instruction: str = None) -> tuple:
-    """Generate TTS audio using Gemini 2.5 Flash TTS via google.genai API
+async def _generate_tts(text: str, language: str = 'kn-IN', voice: str = None, style_instruction: str = None) -> tuple:
+    """Generate TTS audio using Gemini 2.5 Flash TTS via the shared LLM gateway ('tts' lane)
     
     Args:
         text: Text to convert to speech (in Kannada script)
@@ -577,7 +542,7 @@ def generate_tts(text: str, language: str = 'kn-IN', voice: str = None, style_in
     
     Returns:
         tuple: (audio_data_dict, voice_used, cost_info)
-        audio_data_dict: dict with 'audio_base64' (base64 encoded WAV), 'text', 'voice', 'language', 'response_time'
+        audio_data_dict: dict with 'audio_id' / 'audio_url' (stored WAV), 'text', 'voice', 'language', 'response_time'
         cost_info: dict with 'input_characters', 'cost_per_1k_chars', 'total_cost', 'voice_used', 'model', 'response_time'
     """
     if not config.GEMINI_API_KEY:
@@ -621,91 +586,106 @@ def generate_tts(text: str, language: str = 'kn-IN', voice: str = None, style_in
                 else:
                     text_with_style = text
                 
-                # Initialize the genai client
-                client = google_genai.Client(api_key=config.GEMINI_API_KEY)
+                # Audio format: PCM 24kHz, 16-bit, mono
+                sample_rate = 24000
+                channels = 1
+                sample_width = 2  # 16-bit
                 
                 # Track TTS response time
                 tts_start_time = time.time()
                 
-                # Generate audio using Gemini TTS (following the example pattern)
-                print(f"[TTS] Calling generate_content with model={GEMINI_TTS_MODEL}, voice={voice}")
-                response = client.models.generate_content(
-                    model=GEMINI_TTS_MODEL,
-                    contents=text_with_style,
-                    config=types.GenerateContentConfig(
-                        response_modalities=["AUDIO"],
-                        speech_config=types.SpeechConfig(
-                            voice_config=types.VoiceConfig(
-                                prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                    voice_name=voice,
+                # Reuse audio synthesized before for the same model, voice, style and text
+                audio_cache_key = tts_cache.cache_key(GEMINI_TTS_MODEL, voice, style_instruction, text)
+                cached = await asyncio.to_thread(tts_cache.get, audio_cache_key)
+                cache_hit = cached is not None
+                if cache_hit:
+                    # The cache points at the audio store blob saved on the first synthesis
+                    audio_id, audio_bytes = cached
+                    tts_response_time = time.time() - tts_start_time
+                    print(f"[TTS] Cache hit ({audio_bytes} bytes, key {audio_cache_key[:12]})")
+                else:
+                    # Generate audio using Gemini TTS (following the example pattern)
+                    print(f"[TTS] Calling generate_content with model={GEMINI_TTS_MODEL}, voice={voice}")
+                    response = await llm_gateway.get_gateway().generate_content(
+                        'tts',
+                        GEMINI_TTS_MODEL,
+                        text_with_style,
+                        types.GenerateContentConfig(
+                            response_modalities=["AUDIO"],
+                            speech_config=types.SpeechConfig(
+                                voice_config=types.VoiceConfig(
+                                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                                        voice_name=voice,
+                                    )
                                 )
-                            )
+                            ),
                         ),
+                        timeout=TTS_TIMEOUT
                     )
-                )
-                
-                tts_response_time = time.time() - tts_start_time
-                print(f"[TTS] Response received in {tts_response_time:.2f}s, checking candidates...")
-                
-                # Extract audio data from response (following the example)
-                if not response.candidates:
-                    print(f"[TTS] Error: No candidates in response")
-                    raise Exception("No candidates in TTS response")
                 
-                if not hasattr(response.candidates[0], 'content') or response.candidates[0].content is None:
-                    print(f"[TTS] Error: No content in response candidate")
-                    raise Exception("No content in TTS response candidate")
+                    tts_response_time = time.time() - tts_start_time
+                    print(f"[TTS] Response received in {tts_response_time:.2f}s, checking candidates...")
                 
-                if not hasattr(response.candidates[0].content, 'parts') or not response.candidates[0].content.parts:
-                    print(f"[TTS] Error: No parts in response content")
-                    raise Exception("No audio content in response")
+                    # Extract audio data from response (following the example)
+                    if not response.candidates:
+                        print(f"[TTS] Error: No candidates in response")
+                        raise Exception("No candidates in TTS response")
                 
-                audio_part = response.candidates[0].content.parts[0]
-                if not hasattr(audio_part, 'inline_data') or not audio_part.inline_data:
-                    raise Exception("No inline_data in audio part")
+                    if not hasattr(response.candidates[0], 'content') or response.candidates[0].content is None:
+                        print(f"[TTS] Error: No content in response candidate")
+                        raise Exception("No content in TTS response candidate")
                 
-                # Audio data is PCM format (raw audio bytes) - 24kHz, 16-bit, mono
-                pcm_data = audio_part.inline_data.data
-                audio_size = len(pcm_data)
+                    if not hasattr(response.candidates[0].content, 'parts') or not response.candidates[0].content.parts:
+                        print(f"[TTS] Error: No parts in response content")
+                        raise Exception("No audio content in response")
                 
-                print(f"TTS Response received: audio size={audio_size} bytes (PCM format)")
+                    audio_part = response.candidates[0].content.parts[0]
+                    if not hasattr(audio_part, 'inline_data') or not audio_part.inline_data:
+                        raise Exception("No inline_data in audio part")
                 
-                if not pcm_data or audio_size < 1000:  # At least 1KB for valid audio
-                    raise Exception(f"Generated audio is too short: {audio_size} bytes (expected at least 1000)")
+                    # Audio data is PCM format (raw audio bytes) - 24kHz, 16-bit, mono
+                    pcm_data = audio_part.inline_data.data
+                    audio_size = len(pcm_data)
                 
-                # Convert PCM to WAV format for better browser compatibility
-                # WAV header: 44 bytes
-                sample_rate = 24000
-                channels = 1
-                sample_width = 2  # 16-bit
-                
-                # Create WAV file in memory
-                wav_buffer = io.BytesIO()
-                # WAV header
-                wav_buffer.write(b'RIFF')
-                wav_buffer.write(struct.pack('<I', 36 + audio_size))  # File size - 8
-                wav_buffer.write(b'WAVE')
-                wav_buffer.write(b'fmt ')
-                wav_buffer.write(struct.pack('<I', 16))  # fmt chunk size
-                wav_buffer.write(struct.pack('<H', 1))  # Audio format (1 = PCM)
-                wav_buffer.write(struct.pack('<H', channels))  # Number of channels
-                wav_buffer.write(struct.pack('<I', sample_rate))  # Sample rate
-                wav_buffer.write(struct.pack('<I', sample_rate * channels * sample_width))  # Byte rate
-                wav_buffer.write(struct.pack('<H', channels * sample_width))  # Block align
-                wav_buffer.write(struct.pack('<H', sample_width * 8))  # Bits per sample
-                wav_buffer.write(b'data')
-                wav_buffer.write(struct.pack('<I', audio_size))  # Data chunk size
-                wav_buffer.write(pcm_data)  # Audio data
+                    print(f"TTS Response received: audio size={audio_size} bytes (PCM format)")
                 
-                wav_data = wav_buffer.getvalue()
+                    if not pcm_data or audio_size < 1000:  # At least 1KB for valid audio
+                        raise Exception(f"Generated audio is too short: {audio_size} bytes (expected at least 1000)")
                 
-                # Encode WAV data as base64 for transmission
-                audio_base64 = base64.b64encode(wav_data).decode('utf-8')
+                    # Convert PCM to WAV format for better browser compatibility
+                    # WAV header: 44 bytes
+                    # Create WAV file in memory
+                    wav_buffer = io.BytesIO()
+                    # WAV header
+                    wav_buffer.write(b'RIFF')
+                    wav_buffer.write(struct.pack('<I', 36 + audio_size))  # File size - 8
+                    wav_buffer.write(b'WAVE')
+                    wav_buffer.write(b'fmt ')
+                    wav_buffer.write(struct.pack('<I', 16))  # fmt chunk size
+                    wav_buffer.write(struct.pack('<H', 1))  # Audio format (1 = PCM)
+                    wav_buffer.write(struct.pack('<H', channels))  # Number of channels
+                    wav_buffer.write(struct.pack('<I', sample_rate))  # Sample rate
+                    wav_buffer.write(struct.pack('<I', sample_rate * channels * sample_width))  # Byte rate
+                    wav_buffer.write(struct.pack('<H', channels * sample_width))  # Block align
+                    wav_buffer.write(struct.pack('<H', sample_width * 8))  # Bits per sample
+                    wav_buffer.write(b'data')
+                    wav_buffer.write(struct.pack('<I', audio_size))  # Data chunk size
+                    wav_buffer.write(pcm_data)  # Audio data
                 
-                print(f"✓ Audio converted to WAV and encoded to base64: {len(audio_base64)} chars from {len(wav_data)} bytes")
+                    wav_data = wav_buffer.getvalue()
+                    audio_bytes = len(wav_data)
+                    
+                    # Store the WAV and reference it by ID (served raw by GET /api/audio/{audio_id})
+                    # rather than embedding base64 in activity JSON
+                    audio_id = await asyncio.to_thread(audio_store.save, wav_data, 'audio/wav')
+                    await asyncio.to_thread(
+                        tts_cache.put, audio_cache_key, audio_id, audio_bytes,
+                        GEMINI_TTS_MODEL, voice, style_instruction
+                    )
                 
                 audio_data = {
-                    'audio_base64': audio_base64,
+                    'audio_id': audio_id,
+                    'audio_url': audio_store.audio_url(audio_id),
                     'text': text,
                     'voice': voice,
                     'language': language,
@@ -721,10 +701,16 @@ def generate_tts(text: str, language: str = 'kn-IN', voice: str = None, style_in
                 
                 cost_info['response_time'] = tts_response_time
                 cost_info['style_instruction'] = style_instruction
-                cost_info['audio_size_bytes'] = len(wav_data)
-                cost_info['audio_base64_length'] = len(audio_base64)
+                cost_info['audio_size_bytes'] = audio_bytes
+                cost_info['cache_hit'] = cache_hit
+                if cache_hit:
+                    # Nothing was synthesized, so nothing was billed
+                    cost_info['cost_saved'] = cost_info['total_cost']
+                    cost_info['total_cost'] = 0.0
+                    cost_info['bytes_saved'] = audio_bytes
+                cost_info['cache_stats'] = tts_cache.stats()  # hits, misses, hit_rate, bytes_saved
                 
-                print(f"✓ Generated TTS audio using {GEMINI_TTS_MODEL}: {len(audio_base64)} base64 chars, {len(wav_data)} bytes, time: {tts_response_time:.2f}s")
+                print(f"✓ Generated TTS audio using {GEMINI_TTS_MODEL}: {audio_bytes} bytes, audio_id {audio_id[:12]}, time: {tts_response_time:.2f}s")
                 return audio_data, voice, cost_info
                 
             except Exception as tts_error:
@@ -769,7 +755,7 @@ def generate_tts(text: str, language: str = 'kn-IN', voice: str = None, style_in
 
 
 async def generate_tts_async(text: str, language: str = 'kn-IN', voice: str = None, style_instruction: str = None, paragraph_index: int = 0) -> tuple:
-    """Async wrapper for generate_tts to enable parallel TTS generation
+    """Async TTS generation, to await from handlers or run paragraphs in parallel
     
     Args:
         text: Text to convert to speech
@@ -781,18 +767,18 @@ async def generate_tts_async(text: str, language: str = 'kn-IN', voice: str = No
     Returns:
         tuple: (paragraph_index, audio_data_dict, voice_used, cost_info)
     """
-    loop = asyncio.get_event_loop()
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        audio_data, voice_used, cost_info = await loop.run_in_executor(
-            executor,
-            lambda: generate_tts(text, language, voice, style_instruction)
-        )
+    audio_data, voice_used, cost_info = await _generate_tts(text, language, voice, style_instruction)
     return paragraph_index, audio_data, voice_used, cost_info
 
 
 async def generate_all_tts_parallel(paragraphs: list, language: str = 'kn-IN', voice: str = None, style_instruction: str = None, progress_callback=None) -> list:
     """Generate TTS for all paragraphs in parallel using asyncio
     
+    Each paragraph is reported to progress_callback as soon as its own audio is
+    ready, not when the whole batch finishes, so the first paragraph can be
+    played while later ones are still being synthesized. Paragraphs are started
+    in order, so when the TTS lane is saturated the first ones get slots first.
+    
     Args:
         paragraphs: List of text paragraphs to convert
         language: Language code
@@ -803,41 +789,32 @@ async def generate_all_tts_parallel(paragraphs: list, language: str = 'kn-IN', v
     Returns:
         list: List of tuples (audio_data_dict, voice_used, cost_info) in same order as input paragraphs
     """
-    # Create tasks for all paragraphs
-    tasks = [
-        generate_tts_async(para, language, voice, style_instruction, idx)
-        for idx, para in enumerate(paragraphs)
-    ]
+    async def generate_paragraph(idx: int, para: str) -> tuple:
+        try:
+            _, audio_data, voice_used, cost_info = await generate_tts_async(para, language, voice, style_instruction, idx)
+        except Exception as e:
+            # Handle error for this paragraph
+            print(f"[TTS Parallel] Error for paragraph {idx}: {str(e)}")
+            if progress_callback:
+                progress_callback(idx, 'error', str(e))
+            return (None, None, None)
+        if progress_callback:
+            # text_only means synthesis failed and there is nothing to play
+            status = 'complete' if audio_data and audio_data.get('audio_id') else 'error'
+            progress_callback(idx, status, audio_data)
+            print(f"[TTS Parallel] Called progress_callback for paragraph {idx}: {status}")
+        return (audio_data, voice_used, cost_info)
     
     # Mark all paragraphs as in_progress at start
     if progress_callback:
         print(f"[TTS Parallel] Marking all {len(paragraphs)} paragraphs as 'in_progress'")
         for idx in range(len(paragraphs)):
             progress_callback(idx, 'in_progress', None)
-            print(f"[TTS Parallel] Called progress_callback for paragraph {idx}: in_progress")
     
-    # Execute all tasks in parallel and gather results
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Sort results by paragraph index and extract data
-    output = []
-    for idx in range(len(paragraphs)):
-        result = results[idx]
-        if isinstance(result, Exception):
-            # Handle error for this paragraph
-            print(f"[TTS Parallel] Error for paragraph {idx}: {str(result)}")
-            if progress_callback:
-                progress_callback(idx, 'error', str(result))
-                print(f"[TTS Parallel] Called progress_callback for paragraph {idx}: error")
-            output.append((None, None, None))
-        else:
-            para_idx, audio_data, voice_used, cost_info = result
-            if progress_callback:
-                progress_callback(para_idx, 'complete', audio_data)
-                print(f"[TTS Parallel] Called progress_callback for paragraph {para_idx}: complete")
-            output.append((audio_data, voice_used, cost_info))
-    
-    return output
+    # gather keeps results in paragraph order; callbacks fire in completion order
+    return list(await asyncio.gather(*(
+        generate_paragraph(idx, para) for idx, para in enumerate(paragraphs)
+    )))
 
 
 def transcribe_audio(audio_data: bytes, language_code: str = 'kn-IN', audio_format: str = None) -> str:
@@ -1163,7 +1140,7 @@ def parse_json_response(response_text: str, is_truncated: bool = False) -> dict:
             return {"_parse_error": str(e2), "_raw_response": response_text}
 
 
-def generate_speaker_profile(region: str, formality: str, voice: str, language: str = 'kannada') -> dict:
+async def generate_speaker_profile(region: str, formality: str, voice: str, language: str = 'kannada') -> dict:
     """Generate a speaker profile using Gemini API based on region, formality, voice, and language
     
     Args:
@@ -1310,7 +1287,7 @@ def generate_speaker_profile(region: str, formality: str, voice: str, language:
         )
         
         # Call Gemini API
-        response_text, response_time, token_info, is_truncated, _ = generate_text_with_gemini(prompt)
+        response_text, response_time, token_info, is_truncated, _ = await generate_text_with_gemini_async(prompt)
         
         # Parse JSON response
         result = parse_json_response(response_text, is_truncated)
@@ -1374,41 +1351,14 @@ def generate_speaker_profile(region: str, formality: str, voice: str, language:
         }
 
 
-def extract_words_from_text(text: str, word_bank: list) -> list:
-    """Extract vocabulary words from text"""
+def extract_words_from_text(text: str, language: str) -> list:
+    """Extract vocabulary words from text (see vocab_matcher)"""
     if not text:
         return []
-    
-    # Extract Kannada words
-    kannada_words = re.findall(r'[\u0C80-\u0CFF]+', text)
-    unique_words = list(set(kannada_words))
-    unique_words.sort(key=len, reverse=True)  # Longer words first
-    
-    matched_words = []
-    matched_ids = set()
-    
-    for kannada_word in unique_words[:100]:  # Limit to 100
-        for word_entry in word_bank:
-            if word_entry.get('id') in matched_ids:
-                continue
-            
-            translation = word_entry.get('translation', '').strip()
-            variants = translation.split(' /')
-            
-            for variant in variants:
-                variant = variant.strip()
-                if kannada_word == variant or kannada_word in variant or variant in kannada_word:
-                    matched_words.append(word_entry)
-                    matched_ids.add(word_entry.get('id'))
-                    break
-            
-            if word_entry.get('id') in matched_ids:
-                break
-    
-    return matched_words
+    return vocab_matcher.extract_words(language, text)
 
 
-def generate_reading_activity(word_bank: list, learned_words: list, language: str, required_learning_words: list = None, user_cefr_level: str = 'A1', custom_topic: str = None, user_interests: list = None) -> dict:
+async def generate_reading_activity(word_bank: list, learned_words: list, language: str, required_learning_words: list = None, user_cefr_level: str = 'A1', custom_topic: str = None, user_interests: list = None) -> dict:
     """Generate a reading activity with story and questions
     
     Args:
@@ -1532,7 +1482,7 @@ def generate_reading_activity(word_bank: list, learned_words: list, language: st
         
         for attempt in range(max_retries):
             try:
-                response_text, response_time, token_info, is_truncated, _ = generate_text_with_gemini(prompt)
+                response_text, response_time, token_info, is_truncated, _ = await generate_text_with_gemini_async(prompt)
                 
                 # Parse JSON
                 result = parse_json_response(response_text, is_truncated)
@@ -1546,7 +1496,7 @@ def generate_reading_activity(word_bank: list, learned_words: list, language: st
                         print(f"Retrying with a new request...")
                         # Add a small delay before retry
                         import time
-                        time.sleep(1)
+                        await asyncio.sleep(1)
                     else:
                         # Last attempt failed, return error
                         print(f"All {max_retries} attempts failed to parse JSON")
@@ -1563,7 +1513,7 @@ def generate_reading_activity(word_bank: list, learned_words: list, language: st
                 print(f"Attempt {attempt + 1}/{max_retries}: Error generating reading activity: {str(e)}")
                 if attempt < max_retries - 1:
                     import time
-                    time.sleep(1)
+                    await asyncio.sleep(1)
                 else:
                     import traceback
                     traceback.print_exc()
@@ -1601,7 +1551,7 @@ def generate_reading_activity(word_bank: list, learned_words: list, language: st
         
         # Combine all text for word extraction
         all_text = story_text + ' ' + story_name + ' ' + questions_text
-        words_used = extract_words_from_text(all_text, word_bank)
+        words_used = extract_words_from_text(all_text, language)
         
         # Add debug info
         result['_prompt'] = prompt
@@ -1623,7 +1573,7 @@ def generate_reading_activity(word_bank: list, learned_words: list, language: st
         return None
 
 
-def generate_listening_activity(word_bank: list, language: str, required_learning_words: list = None, user_cefr_level: str = 'A1', session_id: str = None, progress_store: dict = None, custom_topic: str = None, user_interests: list = None) -> dict:
+async def generate_listening_activity(word_bank: list, language: str, required_learning_words: list = None, user_cefr_level: str = 'A1', session_id: str = None, progress_store: dict = None, custom_topic: str = None, user_interests: list = None) -> dict:
     """Generate a listening activity with paragraphs and TTS audio
     
     Args:
@@ -1828,7 +1778,7 @@ def generate_listening_activity(word_bank: list, language: str, required_learnin
         
         try:
             debug_steps.append({'step': 'calling_gemini_api', 'status': 'in_progress'})
-            response_text, response_time, token_info, is_truncated, api_debug_info = generate_text_with_gemini(prompt)
+            response_text, response_time, token_info, is_truncated, api_debug_info = await generate_text_with_gemini_async(prompt)
             debug_steps.append({'step': 'gemini_api_response', 'status': 'success', 'details': api_debug_info})
         except Exception as gen_error:
             error_msg = f"Error calling Gemini API: {str(gen_error)}"
@@ -1913,6 +1863,19 @@ def generate_listening_activity(word_bank: list, language: str, required_learnin
         
         debug_steps.append({'step': 'extracting_passage', 'status': 'success', 'paragraph_count': len(paragraphs), 'passage_length': len(passage_text)})
         
+        # Get the existing progress tracker for this session
+        progress_tracker = None
+        if session_id and progress_store is not None:
+            progress_tracker = progress_store.get(session_id)
+            if progress_tracker:
+                print(f"[TTS Progress] Using tracker for session {session_id} with {len(paragraphs)} paragraphs")
+            else:
+                print(f"[TTS Progress] Warning: No tracker found for session {session_id}")
+        
+        # Send the text to SSE clients now; each paragraph's audio follows as soon as it's synthesized
+        if progress_tracker and paragraphs:
+            progress_tracker.set_paragraphs(paragraphs, result.get('passage_name'))
+        
         if not paragraphs:
             debug_steps.append({'step': 'paragraph_validation', 'status': 'error', 'error': 'No paragraphs found'})
             result['_error'] = "No paragraphs found in passage"
@@ -1925,7 +1888,7 @@ def generate_listening_activity(word_bank: list, language: str, required_learnin
         speaker_profile = result.get('speaker_profile')
         if not speaker_profile:
             # Fallback: Generate speaker profile if not in response
-            speaker_profile = generate_speaker_profile(selected_region, formality_choice, None, language)
+            speaker_profile = await generate_speaker_profile(selected_region, formality_choice, None, language)
         
         # Select voice based on speaker profile gender
         # Gender should now be in English ("male" or "female") for language-agnostic support
@@ -1984,33 +1947,6 @@ def generate_listening_activity(word_bank: list, language: str, required_learnin
         
         debug_steps.append({'step': 'tts_generation', 'status': 'in_progress', 'paragraph_count': len(paragraphs), 'selected_voice': selected_voice})
         
-        # Get the existing progress tracker for this session
-        if session_id and progress_store is not None:
-            progress_tracker = progress_store.get(session_id)
-            if progress_tracker:
-                # Update the tracker if the actual paragraph count differs from the initial estimate
-                actual_paragraph_count = len(paragraphs)
-                if progress_tracker.total_paragraphs != actual_paragraph_count:
-                    print(f"[TTS Progress] Updating tracker from {progress_tracker.total_paragraphs} to {actual_paragraph_count} paragraphs")
-                    progress_tracker.total_paragraphs = actual_paragraph_count
-                    progress_tracker.progress = {i: 'pending' for i in range(actual_paragraph_count)}
-                    # Notify all connected SSE clients about the updated paragraph count
-                    for queue in progress_tracker.queues:
-                        try:
-                            queue.put_nowait({
-                                'type': 'update_count',
-                                'total_paragraphs': actual_paragraph_count,
-                                'progress': progress_tracker.progress.copy()
-                            })
-                        except:
-                            pass
-                print(f"[TTS Progress] Using tracker for session {session_id} with {actual_paragraph_count} paragraphs")
-            else:
-                print(f"[TTS Progress] Warning: No tracker found for session {session_id}")
-                progress_tracker = None
-        else:
-            progress_tracker = None
-        
         # Generate TTS for all paragraphs in parallel using asyncio
         print(f"Starting parallel TTS generation for {len(paragraphs)} paragraphs...")
         tts_start_time = time.time()
@@ -2024,7 +1960,7 @@ def generate_listening_activity(word_bank: list, language: str, required_learnin
             # Update progress tracker for SSE clients
             if progress_tracker:
                 print(f"[TTS Progress] Updating tracker for session {session_id}, paragraph {idx}: {status}")
-                progress_tracker.update(idx, status)
+                progress_tracker.update(idx, status, result if isinstance(result, dict) else None)
                 print(f"[TTS Progress] Tracker updated. Current progress: {progress_tracker.progress}")
             else:
                 print(f"[TTS Progress] WARNING: No progress_tracker available for updates")
@@ -2047,13 +1983,13 @@ def generate_listening_activity(word_bank: list, language: str, required_learnin
             language_code = language_code_map.get(language.lower(), 'kn-IN')
             print(f"[Language] Using language code: {language_code} for language: {language}")
             
-            tts_results = asyncio.run(generate_all_tts_parallel(
+            tts_results = await generate_all_tts_parallel(
                 paragraphs,
                 language=language_code,
                 voice=selected_voice,
                 style_instruction=style_instruction,
                 progress_callback=progress_callback
-            ))
+            )
         except Exception as parallel_error:
             print(f"[TTS Parallel] Error in parallel generation: {str(parallel_error)}")
             # Fallback to sequential if parallel fails
@@ -2074,12 +2010,14 @@ def generate_listening_activity(word_bank: list, language: str, required_learnin
             tts_results = []
             for idx, para in enumerate(paragraphs):
                 try:
-                    audio_data, voice_used, cost_info = generate_tts(para, language=language_code, voice=selected_voice, style_instruction=style_instruction)
+                    audio_data, voice_used, cost_info = await _generate_tts(para, language=language_code, voice=selected_voice, style_instruction=style_instruction)
                     tts_results.append((audio_data, voice_used, cost_info))
                 except Exception as e:
                     tts_results.append((None, None, None))
         
         total_tts_time = time.time() - tts_start_time
+        if progress_tracker and progress_tracker.time_to_first_audio_ms is not None:
+            result['_time_to_first_audio_ms'] = progress_tracker.time_to_first_audio_ms
         print(f"✓ Parallel TTS generation completed in {total_tts_time:.2f}s (vs ~{sum([r[2].get('response_time', 0) if r[2] else 0 for r in tts_results]):.2f}s sequential)")
         
         # Process results
@@ -2116,7 +2054,7 @@ def generate_listening_activity(word_bank: list, language: str, required_learnin
                 para_debug['tts_result'] = {
                     'has_audio_data': audio_data is not None,
                     'format': audio_data.get('format') if audio_data else None,
-                    'audio_base64_length': len(audio_data.get('audio_base64', '')) if audio_data else 0,
+                    'audio_id': audio_data.get('audio_id') if audio_data else None,
                     'audio_size_bytes': cost_info.get('audio_size_bytes', 0),
                     'sample_rate': audio_data.get('sample_rate') if audio_data else None,
                     'channels': audio_data.get('channels') if audio_data else None,
@@ -2179,6 +2117,13 @@ def generate_listening_activity(word_bank: list, language: str, required_learnin
             result['_debug_steps'] = debug_steps
             return result
         
+        # Extract words from the (possibly trimmed) passage and its title; the
+        # matcher may load the vocabulary on first use, so keep it off the loop
+        all_text = (result.get('passage') or '') + ' ' + (result.get('passage_name') or '')
+        words_used = await asyncio.to_thread(extract_words_from_text, all_text, language)
+        result['_words'] = [w.get('english_word') for w in words_used]
+        result['_words_used_data'] = words_used
+        
         debug_steps.append({'step': 'activity_complete', 'status': 'success'})
         result['_debug_steps'] = debug_steps
         
@@ -2205,7 +2150,7 @@ def generate_listening_activity(word_bank: list, language: str, required_learnin
         }
 
 
-def generate_writing_activity(word_bank: list, language: str, required_learning_words: list = None, user_cefr_level: str = 'A1', custom_topic: str = None, user_interests: list = None) -> dict:
+async def generate_writing_activity(word_bank: list, language: str, required_learning_words: list = None, user_cefr_level: str = 'A1', custom_topic: str = None, user_interests: list = None) -> dict:
     """Generate a writing activity with detailed prompt and criteria"""
     if not config.GEMINI_API_KEY:
         return {
@@ -2327,7 +2272,7 @@ def generate_writing_activity(word_bank: list, language: str, required_learning_
         
         try:
             debug_steps.append({'step': 'calling_gemini_api', 'status': 'in_progress'})
-            response_text, response_time, token_info, is_truncated, api_debug_info = generate_text_with_gemini(prompt)
+            response_text, response_time, token_info, is_truncated, api_debug_info = await generate_text_with_gemini_async(prompt)
             debug_steps.append({'step': 'gemini_api_response', 'status': 'success', 'details': api_debug_info})
         except Exception as gen_error:
             error_msg = f"Error calling Gemini API: {str(gen_error)}"
@@ -2403,7 +2348,7 @@ def generate_writing_activity(word_bank: list, language: str, required_learning_
         }
 
 
-def generate_speaking_activity(word_bank: list, language: str, required_learning_words: list = None, user_cefr_level: str = 'A1', custom_topic: str = None, user_interests: list = None) -> dict:
+async def generate_speaking_activity(word_bank: list, language: str, required_learning_words: list = None, user_cefr_level: str = 'A1', custom_topic: str = None, user_interests: list = None) -> dict:
     """Generate a speaking activity with topic and instructions"""
     if not config.GEMINI_API_KEY:
         return {
@@ -2498,7 +2443,7 @@ def generate_speaking_activity(word_bank: list, language: str, required_learning
         
         try:
             debug_steps.append({'step': 'calling_gemini_api', 'status': 'in_progress'})
-            response_text, response_time, token_info, is_truncated, api_debug_info = generate_text_with_gemini(prompt)
+            response_text, response_time, token_info, is_truncated, api_debug_info = await generate_text_with_gemini_async(prompt)
             debug_steps.append({'step': 'gemini_api_response', 'status': 'success', 'details': api_debug_info})
         except Exception as gen_error:
             error_msg = f"Error calling Gemini API: {str(gen_error)}"
@@ -2603,7 +2548,7 @@ def generate_speaking_activity(word_bank: list, language: str, required_learning
         }
 
 
-def generate_translation_activity(
+async def generate_translation_activity(
     target_language: str,
     target_level: str,
     source_languages: list,
@@ -2689,7 +2634,7 @@ def generate_translation_activity(
         
         # Call Gemini API
         try:
-            response_text, response_time, token_info, is_truncated, api_debug_info = generate_text_with_gemini(prompt)
+            response_text, response_time, token_info, is_truncated, api_debug_info = await generate_text_with_gemini_async(prompt)
         except Exception as gen_error:
             error_msg = f"Error calling Gemini API: {str(gen_error)}"
             print(error_msg)
@@ -2795,7 +2740,7 @@ def generate_translation_activity(
         }
 
 
-def grade_writing_activity(user_text: str, writing_prompt: str, required_words: list, evaluation_criteria: str, language: str, learned_words: list = None, learning_words: list = None, user_cefr_level: str = 'A1') -> dict:
+async def grade_writing_activity(user_text: str, writing_prompt: str, required_words: list, evaluation_criteria: str, language: str, learned_words: list = None, learning_words: list = None, user_cefr_level: str = 'A1') -> dict:
     """Grade a writing activity using Gemini 2.5 Flash"""
     if not config.GEMINI_API_KEY:
         return None
@@ -2824,7 +2769,7 @@ def grade_writing_activity(user_text: str, writing_prompt: str, required_words:
             evaluation_criteria=evaluation_criteria
         )
 
-        response_text, response_time, token_info, is_truncated, _ = generate_text_with_gemini(prompt)
+        response_text, response_time, token_info, is_truncated, _ = await generate_text_with_gemini_async(prompt)
         
         # Validate response_text
         if response_text is None:
@@ -2883,7 +2828,7 @@ def grade_writing_activity(user_text: str, writing_prompt: str, required_words:
         }
 
 
-def grade_translation_activity(translations: list, target_language: str, user_cefr_level: str = 'A1') -> dict:
+async def grade_translation_activity(translations: list, target_language: str, user_cefr_level: str = 'A1') -> dict:
     """Grade a translation activity using Gemini 2.5 Flash"""
     if not config.GEMINI_API_KEY:
         return None
@@ -2910,7 +2855,7 @@ def grade_translation_activity(translations: list, target_language: str, user_ce
         )
         
         # Call Gemini API
-        response_text, response_time, token_info, is_truncated, api_debug_info = generate_text_with_gemini(prompt)
+        response_text, response_time, token_info, is_truncated, api_debug_info = await generate_text_with_gemini_async(prompt)
         
         # Parse JSON response
         result = parse_json_response(response_text, is_truncated)
@@ -2947,7 +2892,7 @@ def grade_translation_activity(translations: list, target_language: str, user_ce
         }
 
 
-def grade_speaking_activity(user_transcript: str, speaking_topic: str, tasks: list, required_words: list, language: str, learned_words: list = None, learning_words: list = None, user_cefr_level: str = 'A1') -> dict:
+async def grade_speaking_activity(user_transcript: str, speaking_topic: str, tasks: list, required_words: list, language: str, learned_words: list = None, learning_words: list = None, user_cefr_level: str = 'A1') -> dict:
     """Grade a speaking activity using Gemini 2.5 Flash"""
     if not config.GEMINI_API_KEY:
         return None
@@ -2979,7 +2924,7 @@ def grade_speaking_activity(user_transcript: str, speaking_topic: str, tasks: li
             learning_context=learning_context
         )
 
-        response_text, response_time, token_info, is_truncated, _ = generate_text_with_gemini(prompt)
+        response_text, response_time, token_info, is_truncated, _ = await generate_text_with_gemini_async(prompt)
         
         # Validate response_text
         if response_text is None:
@@ -3062,7 +3007,11 @@ def grade_speaking_activity(user_transcript: str, speaking_topic: str, tasks: li
 
 
 def grade_speaking_activity_with_audio(audio_data: bytes, audio_format: str, speaking_topic: str, tasks: list, required_words: list, language: str, learned_words: list = None, learning_words: list = None, user_cefr_level: str = 'A1') -> dict:
-    """Grade a speaking activity using Gemini 2.5 Flash with direct audio input"""
+    """Grade a speaking activity using Gemini 2.5 Flash with direct audio input
+
+    Blocking: the call goes through the LLM gateway's 'text' lane with
+    generate_content_sync, so call it from a worker thread.
+    """
     import tempfile
     import os
     
@@ -3097,91 +3046,105 @@ def grade_speaking_activity_with_audio(audio_data: bytes, audio_format: str, spe
             learning_context=learning_context
         )
         
-        # Save audio to temporary file
+        # Explicit audio mime type, so Gemini doesn't try to process it as video
         file_extension = audio_format if audio_format else 'webm'
-        with tempfile.NamedTemporaryFile(suffix=f'.{file_extension}', delete=False) as temp_audio:
-            temp_audio.write(audio_data)
-            temp_audio_path = temp_audio.name
+        mime_type_map = {
+            'webm': 'audio/webm',
+            'wav': 'audio/wav',
+            'mp3': 'audio/mpeg',
+            'ogg': 'audio/ogg',
+            'flac': 'audio/flac',
+            'm4a': 'audio/mp4',
+        }
+        mime_type = mime_type_map.get(file_extension.lower(), 'audio/webm')
         
+        if not HAS_GOOGLE_GENAI:
+            raise Exception("google.genai not available")
+        gateway = llm_gateway.get_gateway()
+        uploaded_file = None
         try:
-            # Upload audio file to Gemini with explicit audio mime type
-            # This prevents Gemini from trying to process it as video
-            mime_type_map = {
-                'webm': 'audio/webm',
-                'wav': 'audio/wav',
-                'mp3': 'audio/mpeg',
-                'ogg': 'audio/ogg',
-                'flac': 'audio/flac',
-                'm4a': 'audio/mp4',
-            }
-            mime_type = mime_type_map.get(file_extension.lower(), 'audio/webm')
-            
-            print(f"Uploading audio file ({len(audio_data)} bytes) for grading...")
-            print(f"File extension: {file_extension}, MIME type: {mime_type}")
-            uploaded_file = genai.upload_file(temp_audio_path, mime_type=mime_type)
-            print(f"Audio uploaded: {uploaded_file.name}")
-            
-            # Wait for file to be processed
-            import time
-            max_wait = 60  # 60 seconds max wait
-            wait_time = 0
-            while uploaded_file.state.name == "PROCESSING" and wait_time < max_wait:
-                print(f"Waiting for audio processing... ({wait_time}s)")
-                time.sleep(2)
-                wait_time += 2
-                uploaded_file = genai.get_file(uploaded_file.name)
-            
-            print(f"Audio file state after processing: {uploaded_file.state.name}")
-            
-            if uploaded_file.state.name == "FAILED":
-                error_detail = getattr(uploaded_file, 'error', 'Unknown error')
-                print(f"Audio file processing failed with error: {error_detail}")
-                return {
-                    "_error": f"Audio file processing failed: {error_detail}",
-                    "_error_type": "FileProcessingError",
-                    "_prompt": prompt,
-                }
-            
-            # Generate content with audio + text prompt
-            model = genai.GenerativeModel(GEMINI_MODEL)
+            if len(audio_data) <= GEMINI_INLINE_AUDIO_MAX_BYTES:
+                # Recordings are small: send them inline with the prompt
+                print(f"Sending audio inline ({len(audio_data)} bytes, {mime_type}) for grading...")
+                audio_part = types.Part.from_bytes(data=audio_data, mime_type=mime_type)
+            else:
+                # Too large for an inline request: go through the Files API
+                with tempfile.NamedTemporaryFile(suffix=f'.{file_extension}', delete=False) as temp_audio:
+                    temp_audio.write(audio_data)
+                    temp_audio_path = temp_audio.name
+                try:
+                    print(f"Uploading audio file ({len(audio_data)} bytes, {mime_type}) for grading...")
+                    uploaded_file = gateway.client.files.upload(
+                        file=temp_audio_path,
+                        config=types.UploadFileConfig(mime_type=mime_type)
+                    )
+                finally:
+                    if os.path.exists(temp_audio_path):
+                        os.unlink(temp_audio_path)
+                print(f"Audio uploaded: {uploaded_file.name}")
+                
+                # Wait for file to be processed
+                max_wait = 60  # 60 seconds max wait
+                wait_time = 0
+                while uploaded_file.state == types.FileState.PROCESSING and wait_time < max_wait:
+                    print(f"Waiting for audio processing... ({wait_time}s)")
+                    time.sleep(2)
+                    wait_time += 2
+                    uploaded_file = gateway.client.files.get(name=uploaded_file.name)
+                
+                if uploaded_file.state == types.FileState.FAILED:
+                    error_detail = getattr(uploaded_file, 'error', None) or 'Unknown error'
+                    print(f"Audio file processing failed with error: {error_detail}")
+                    return {
+                        "_error": f"Audio file processing failed: {error_detail}",
+                        "_error_type": "FileProcessingError",
+                        "_prompt": prompt,
+                    }
+                audio_part = uploaded_file
             
+            # Generate content with audio + text prompt; this runs in the
+            # endpoint's worker thread, so block on the gateway's 'text' lane
             start_time = time.time()
-            response = model.generate_content(
-                [uploaded_file, prompt],
-                generation_config=genai.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=8192,  # Increased from 4096 to handle longer transcripts and feedback
+            try:
+                response = gateway.generate_content_sync(
+                    'text',
+                    GEMINI_MODEL,
+                    [audio_part, prompt],
+                    types.GenerateContentConfig(
+                        temperature=0.7,
+                        max_output_tokens=8192,  # Increased from 4096 to handle longer transcripts and feedback
+                    ),
+                    timeout=GEMINI_API_TIMEOUT
                 )
-            )
+            except llm_gateway.LLMTimeoutError:
+                raise Exception(f"Gemini API call timed out after {GEMINI_API_TIMEOUT} seconds. Please try again.")
             response_time = time.time() - start_time
-            
-            # Get token usage
-            token_info = {}
-            if hasattr(response, 'usage_metadata'):
-                usage = response.usage_metadata
-                token_info = {
-                    'prompt_tokens': usage.prompt_token_count,
-                    'output_tokens': usage.candidates_token_count,
-                    'total_tokens': usage.total_token_count,
-                    'input_cost': (usage.prompt_token_count / 1_000_000) * 0.00015,  # $0.15 per 1M input tokens
-                    'output_cost': (usage.candidates_token_count / 1_000_000) * 0.0006,  # $0.60 per 1M output tokens
-                    'total_cost': ((usage.prompt_token_count / 1_000_000) * 0.00015) + ((usage.candidates_token_count / 1_000_000) * 0.0006),
-                }
-            
-            response_text = response.text
-            is_truncated = False
-            
-            # Clean up uploaded file
-            try:
-                genai.delete_file(uploaded_file.name)
-                print(f"Deleted uploaded file: {uploaded_file.name}")
-            except:
-                pass
-            
         finally:
-            # Clean up temporary file
-            if os.path.exists(temp_audio_path):
-                os.unlink(temp_audio_path)
+            # Clean up uploaded file
+            if uploaded_file is not None:
+                try:
+                    gateway.client.files.delete(name=uploaded_file.name)
+                    print(f"Deleted uploaded file: {uploaded_file.name}")
+                except Exception:
+                    pass
+        
+        # Get token usage
+        token_info = {}
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            prompt_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+            output_tokens = getattr(usage, 'candidates_token_count', 0) or 0
+            token_info = {
+                'prompt_tokens': prompt_tokens,
+                'output_tokens': output_tokens,
+                'total_tokens': getattr(usage, 'total_token_count', 0) or 0,
+                'input_cost': (prompt_tokens / 1_000_000) * 0.00015,  # $0.15 per 1M input tokens
+                'output_cost': (output_tokens / 1_000_000) * 0.0006,  # $0.60 per 1M output tokens
+                'total_cost': ((prompt_tokens / 1_000_000) * 0.00015) + ((output_tokens / 1_000_000) * 0.0006),
+            }
+        
+        response_text = response.text
+        is_truncated = False
         
         # Validate response_text
         if response_text is None:
@@ -3275,7 +3238,7 @@ def grade_speaking_activity_with_audio(audio_data: bytes, audio_format: str, spe
         }
 
 
-def generate_conversation_activity(words: list, language: str, user_cefr_level: str = 'A1', custom_topic: str = None, user_interests: list = None) -> dict:
+async def generate_conversation_activity(words: list, language: str, user_cefr_level: str = 'A1', custom_topic: str = None, user_interests: list = None) -> dict:
     """Generate a conversation activity with topic and tasks
     
     Args:
@@ -3391,7 +3354,7 @@ def generate_conversation_activity(words: list, language: str, user_cefr_level:
             words_context=words_context
         )
 
-        response_text, response_time, token_info, is_truncated, _ = generate_text_with_gemini(prompt)
+        response_text, response_time, token_info, is_truncated, _ = await generate_text_with_gemini_async(prompt)
         
         # Parse JSON
         result = parse_json_response(response_text, is_truncated)
@@ -3407,7 +3370,7 @@ def generate_conversation_activity(words: list, language: str, user_cefr_level:
         speaker_profile = result.get('speaker_profile')
         if not speaker_profile:
             # Fallback: Generate speaker profile if not in response
-            speaker_profile = generate_speaker_profile(selected_region, formality_choice, None, language)
+            speaker_profile = await generate_speaker_profile(selected_region, formality_choice, None, language)
         
         # Select voice based on speaker profile gender (for future TTS if needed)
         # For Gemini Live API, voice will be handled by the model directly
@@ -3452,7 +3415,7 @@ def generate_conversation_activity(words: list, language: str, user_cefr_level:
         }
 
 
-def generate_conversation_response(message: str, words: list, language: str, user_cefr_level: str = 'A1', voice: str = None, conversation_history: list = None, tasks: list = None, topic: str = None, speaker_profile: dict = None, selected_region: str = None, formality_choice: str = None) -> dict:
+async def generate_conversation_response(message: str, words: list, language: str, user_cefr_level: str = 'A1', voice: str = None, conversation_history: list = None, tasks: list = None, topic: str = None, speaker_profile: dict = None, selected_region: str = None, formality_choice: str = None) -> dict:
     """Generate a conversation response using vocabulary words
     
     Args:
@@ -3558,7 +3521,7 @@ def generate_conversation_response(message: str, words: list, language: str, use
                     voice_gender_for_profile = "female"
                 elif any(x in voice_lower for x in ['charon', 'fenrir', 'puck', 'male', 'man', 'boy', 'm']):
                     voice_gender_for_profile = "male"
-            speaker_profile = generate_speaker_profile(selected_region, formality_choice, voice_gender_for_profile, language)
+            speaker_profile = await generate_speaker_profile(selected_region, formality_choice, voice_gender_for_profile, language)
         
         # Select voice based on speaker profile gender (if voice not already provided)
         if voice is None:
@@ -3636,7 +3599,7 @@ def generate_conversation_response(message: str, words: list, language: str, use
         )
 
         try:
-            response_text, response_time, token_info, is_truncated, _ = generate_text_with_gemini(prompt)
+            response_text, response_time, token_info, is_truncated, _ = await generate_text_with_gemini_async(prompt)
         except Exception as e:
             # Handle API errors gracefully
             error_msg = str(e)
@@ -3707,28 +3670,26 @@ def generate_conversation_response(message: str, words: list, language: str, use
                     }
                     language_code = language_code_map.get(language.lower(), 'kn-IN')
                     
-                    @with_timeout(TTS_TIMEOUT)
-                    def generate_tts_with_timeout():
-                        return generate_tts(
+                    # The gateway cancels the TTS call after TTS_TIMEOUT; _generate_tts
+                    # reports that (like any TTS error) as a text_only result, retried below
+                    audio_data, voice_used, tts_cost_info = await _generate_tts(
+                        response_text_clean,
+                        language=language_code,
+                        voice=voice,
+                        style_instruction=generate_tts_style_instruction(
                             response_text_clean,
-                            language=language_code,
-                            voice=voice,
-                            style_instruction=generate_tts_style_instruction(
-                                response_text_clean,
-                                '',
-                                selected_region=selected_region,
-                                formality_choice=formality_choice
-                            )
+                            '',
+                            selected_region=selected_region,
+                            formality_choice=formality_choice
                         )
-                    
-                    audio_data, voice_used, tts_cost_info = generate_tts_with_timeout()
+                    )
                     
                     # Check if audio_data has format='text_only' (quota exceeded or other error)
                     if audio_data is None:
                         print(f"[WARNING] TTS generation returned None (no audio data) on attempt {attempt + 1}")
                         if attempt < max_retries - 1:
                             print(f"[TTS] Retrying in {retry_delay}s...")
-                            time.sleep(retry_delay)
+                            await asyncio.sleep(retry_delay)
                             continue
                         tts_error_message = "TTS generation returned None after all retries"
                     elif audio_data.get('format') == 'text_only':
@@ -3745,16 +3706,16 @@ def generate_conversation_response(message: str, words: list, language: str, use
                             # Retry on other errors
                             if attempt < max_retries - 1:
                                 print(f"[TTS] Retrying in {retry_delay}s...")
-                                time.sleep(retry_delay)
+                                await asyncio.sleep(retry_delay)
                                 continue
                             tts_error_message = f"TTS API error - audio generation unavailable after all retries. Error: {error_detail[:200]}"
                             audio_data = None
-                    elif not audio_data.get('audio_base64'):
-                        # Audio data exists but no base64 audio
-                        print(f"[WARNING] TTS returned audio_data but no audio_base64 on attempt {attempt + 1}")
+                    elif not audio_data.get('audio_id'):
+                        # Audio data exists but no stored audio
+                        print(f"[WARNING] TTS returned audio_data but no audio_id on attempt {attempt + 1}")
                         if attempt < max_retries - 1:
                             print(f"[TTS] Retrying in {retry_delay}s...")
-                            time.sleep(retry_delay)
+                            await asyncio.sleep(retry_delay)
                             continue
                         tts_error_message = "TTS returned invalid audio data after all retries"
                         audio_data = None
@@ -3763,19 +3724,6 @@ def generate_conversation_response(message: str, words: list, language: str, use
                         print(f"[TTS] ✓ Successfully generated audio on attempt {attempt + 1}")
                         break
                         
-                except TimeoutError as timeout_err:
-                    # TTS timeout - retry if not last attempt
-                    print(f"[ERROR] TTS generation timed out after {TTS_TIMEOUT}s on attempt {attempt + 1}")
-                    if attempt < max_retries - 1:
-                        print(f"[TTS] Retrying in {retry_delay}s...")
-                        time.sleep(retry_delay)
-                        continue
-                    tts_error_message = f"TTS generation timed out after {TTS_TIMEOUT}s after all retries: {str(timeout_err)}"
-                    print(f"[ERROR] {tts_error_message}")
-                    import traceback
-                    traceback.print_exc()
-                    audio_data = None
-                    tts_cost_info = {}
                 except Exception as tts_error:
                     # TTS failure - retry if not last attempt
                     error_str = str(tts_error)
@@ -3796,7 +3744,7 @@ def generate_conversation_response(message: str, words: list, language: str, use
                         print(f"[TTS] Retrying in {retry_delay}s...")
                         import traceback
                         traceback.print_exc()
-                        time.sleep(retry_delay)
+                        await asyncio.sleep(retry_delay)
                         continue
                     
                     # Last attempt failed
@@ -3850,7 +3798,7 @@ def generate_conversation_response(message: str, words: list, language: str, use
         }
 
 
-def rate_conversation_performance(conversation_transcript: str, tasks: list, topic: str, words: list, language: str, learned_words: list = None, learning_words: list = None, user_cefr_level: str = 'A1') -> dict:
+async def rate_conversation_performance(conversation_transcript: str, tasks: list, topic: str, words: list, language: str, learned_words: list = None, learning_words: list = None, user_cefr_level: str = 'A1') -> dict:
     """Rate conversation performance based on transcript and tasks completion
     
     Args:
@@ -3896,7 +3844,7 @@ def rate_conversation_performance(conversation_transcript: str, tasks: list, top
             learning_context=learning_context
         )
 
-        response_text, response_time, token_info, is_truncated, _ = generate_text_with_gemini(prompt)
+        response_text, response_time, token_info, is_truncated, _ = await generate_text_with_gemini_async(prompt)
         
         # Validate response_text
         if response_text is None or not response_text.strip():
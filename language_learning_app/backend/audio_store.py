@@ -0,0 +1,295 @@
+"""
+Content-addressed store for audio blobs (synthesized speech, recordings).
+
+Activities reference audio by ID instead of embedding base64 in their JSON:
+the bytes are written once under config.AUDIO_STORE_DIR and served raw by
+GET /api/audio/{audio_id} (with HTTP Range support). The ID is the sha256 of
+the bytes, so saving the same audio twice stores it once, and the URL never
+changes meaning (safe to cache forever).
+
+The audio_blobs table records each blob's MIME type and size. Blobs that
+activity history points at are kept for good. The TTS cache (tts_cache.py)
+keeps no audio of its own: it points at blobs here and deletes the ones only
+it references when it evicts. Blobs nothing references at all (e.g. from a
+live conversation that was never saved) are removed by
+prune_unreferenced(), run at startup.
+"""
+import base64
+import hashlib
+import io
+import os
+import re
+import threading
+import wave
+from typing import Optional, Tuple
+
+from . import config
+from .db_pool import get_connection
+
+
+AUDIO_ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+# How activity_data (json.dumps output) references a blob
+AUDIO_ID_REFERENCE = re.compile(r'"audio_id":\s*"([0-9a-f]{64})"')
+
+_EXTENSIONS = {
+    'audio/wav': 'wav',
+    'audio/mpeg': 'mp3',
+    'audio/ogg': 'ogg',
+    'audio/webm': 'webm',
+    'audio/mp4': 'm4a',
+}
+
+
+def sniff_mime_type(data: bytes) -> str:
+    """MIME type of audio bytes from their magic number"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        return 'audio/wav'
+    if data[:4] == b'OggS':
+        return 'audio/ogg'
+    if data[:4] == b'\x1aE\xdf\xa3':
+        return 'audio/webm'
+    if data[4:8] == b'ftyp':
+        return 'audio/mp4'
+    if data[:3] == b'ID3' or data[:2] in (b'\xff\xfb', b'\xff\xf3', b'\xff\xf2'):
+        return 'audio/mpeg'
+    return 'application/octet-stream'
+
+
+def _file_path(audio_id: str, mime_type: str) -> str:
+    extension = _EXTENSIONS.get(mime_type, 'bin')
+    return os.path.join(config.AUDIO_STORE_DIR, audio_id[:2], f"{audio_id}.{extension}")
+
+
+def audio_url(audio_id: str) -> str:
+    return f"/api/audio/{audio_id}"
+
+
+def pcm_to_wav(pcm_data: bytes, sample_rate: int = 24000, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Wrap raw little-endian PCM (e.g. Gemini speech) in a WAV header so it can be played directly"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(sample_width)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm_data)
+    return buffer.getvalue()
+
+
+def save(data: bytes, mime_type: Optional[str] = None, cursor=None) -> str:
+    """Store audio bytes and return their audio_id
+
+    Args:
+        data: Raw audio bytes
+        mime_type: MIME type (sniffed from the bytes if omitted)
+        cursor: Cursor of an open transaction to record the blob in (does not
+            commit); by default a pooled connection is used and committed
+    """
+    audio_id = hashlib.sha256(data).hexdigest()
+    mime_type = mime_type or sniff_mime_type(data)
+    path = _file_path(audio_id, mime_type)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    sql = '''
+        INSERT OR IGNORE INTO audio_blobs (audio_id, mime_type, size_bytes)
+        VALUES (?, ?, ?)
+    '''
+    if cursor is not None:
+        cursor.execute(sql, (audio_id, mime_type, len(data)))
+    else:
+        conn = get_connection()
+        conn.execute(sql, (audio_id, mime_type, len(data)))
+        conn.commit()
+        conn.close()
+    return audio_id
+
+
+def get_blob(audio_id: str) -> Optional[Tuple[str, str, int]]:
+    """(file path, mime_type, size_bytes) of a stored blob, or None if unknown/missing"""
+    if not AUDIO_ID_PATTERN.match(audio_id or ''):
+        return None
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT mime_type, size_bytes FROM audio_blobs WHERE audio_id = ?', (audio_id,))
+    row = cursor.fetchone()
+    conn.close()
+    if not row:
+        return None
+    path = _file_path(audio_id, row[0])
+    if not os.path.exists(path):
+        return None
+    return path, row[0], row[1]
+
+
+def referenced_ids(cursor) -> set:
+    """audio_ids referenced from any activity_history row's activity_data"""
+    cursor.execute('''SELECT activity_data FROM activity_history WHERE activity_data LIKE '%"audio_id"%' ''')
+    referenced = set()
+    for (activity_data,) in cursor.fetchall():
+        referenced.update(AUDIO_ID_REFERENCE.findall(activity_data or ''))
+    return referenced
+
+
+def delete(audio_id: str, cursor) -> int:
+    """Remove a blob (row and file) in the cursor's transaction; returns the bytes freed
+
+    The caller must know nothing references it any more.
+    """
+    cursor.execute('SELECT mime_type, size_bytes FROM audio_blobs WHERE audio_id = ?', (audio_id,))
+    row = cursor.fetchone()
+    if not row:
+        return 0
+    cursor.execute('DELETE FROM audio_blobs WHERE audio_id = ?', (audio_id,))
+    try:
+        os.remove(_file_path(audio_id, row[0]))
+    except OSError:
+        pass
+    return row[1] or 0
+
+
+def prune_unreferenced(min_age_s: int = None) -> Tuple[int, int]:
+    """Delete blobs neither activity history nor the TTS cache references
+
+    Blobs younger than min_age_s (default config.AUDIO_STORE_ORPHAN_MIN_AGE_S)
+    are kept: they may belong to an activity still being generated or a live
+    conversation not saved yet.
+
+    Returns:
+        (blobs deleted, bytes freed)
+    """
+    if min_age_s is None:
+        min_age_s = config.AUDIO_STORE_ORPHAN_MIN_AGE_S
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT audio_id FROM audio_blobs
+            WHERE created_at < datetime('now', ?)
+              AND audio_id NOT IN (SELECT audio_id FROM tts_cache WHERE audio_id IS NOT NULL)
+        ''', (f'-{int(min_age_s)} seconds',))
+        candidates = [row[0] for row in cursor.fetchall()]
+        if not candidates:
+            return 0, 0
+        orphans = set(candidates) - referenced_ids(cursor)
+        freed = sum(delete(audio_id, cursor) for audio_id in orphans)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"[AudioStore] Error pruning unreferenced blobs: {str(e)}")
+        return 0, 0
+    finally:
+        conn.close()
+    if orphans:
+        print(f"[AudioStore] Pruned {len(orphans)} unreferenced blobs ({freed} bytes)")
+    return len(orphans), freed
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive byte range for a `Range: bytes=...` header
+
+    Returns None when there is no usable single range (serve the whole file).
+    Raises ValueError when the range can't be satisfied (416).
+    """
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    start_text, separator, end_text = range_header[len('bytes='):].strip().partition('-')
+    if not separator or not all(part == '' or part.isdigit() for part in (start_text, end_text)):
+        return None  # Malformed ranges are ignored
+    if start_text == '':
+        # Suffix range: the last N bytes
+        if not end_text:
+            return None
+        length = int(end_text)
+        if length == 0:
+            raise ValueError(f"Range {range_header} is empty")
+        return max(0, size - length), size - 1
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Range {range_header} not satisfiable for {size} bytes")
+    return start, min(end, size - 1)
+
+
+def _externalize_entry(entry: dict, cursor=None) -> int:
+    """Replace one TTS audio dict's audio_base64 with audio_id/audio_url"""
+    encoded = entry.get('audio_base64')
+    if not isinstance(encoded, str) or not encoded:
+        return 0
+    try:
+        audio_bytes = base64.b64decode(encoded)
+    except (ValueError, TypeError) as e:
+        print(f"[AudioStore] Skipping undecodable audio_base64: {str(e)}")
+        return 0
+    mime_type = 'audio/wav' if entry.get('format') == 'wav' else None
+    audio_id = save(audio_bytes, mime_type, cursor=cursor)
+    entry['audio_id'] = audio_id
+    entry['audio_url'] = audio_url(audio_id)
+    del entry['audio_base64']
+    return 1
+
+
+def externalize_audio(data, cursor=None) -> Tuple[object, int]:
+    """Move embedded base64 TTS audio out of activity data into the store
+
+    TTS audio lives under '_audio_data' keys: a list of per-paragraph dicts in
+    listening activities, one dict per message in conversations. Each of those
+    with an 'audio_base64' string gets 'audio_id' and 'audio_url' instead.
+    Nested dicts/lists are walked and modified in place. (Speaking submission
+    recordings are left inline.)
+
+    Args:
+        data: Parsed activity_data
+        cursor: Optional cursor of an open transaction (see save())
+
+    Returns:
+        (data, number of blobs moved out)
+    """
+    moved = 0
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == '_audio_data':
+                entries = value if isinstance(value, list) else [value]
+                for entry in entries:
+                    if isinstance(entry, dict):
+                        moved += _externalize_entry(entry, cursor)
+            else:
+                moved += externalize_audio(value, cursor)[1]
+    elif isinstance(data, list):
+        for item in data:
+            moved += externalize_audio(item, cursor)[1]
+    return data, moved
+
+
+def externalize_live_messages(messages: list, sample_rate: int = 24000, cursor=None) -> int:
+    """Move live conversation audio out of transcript messages into the store
+
+    Live sessions used to keep each AI turn's raw PCM, base64-encoded, under
+    the message's 'audio_data' key. That is replaced with 'audio_id' and
+    'audio_url' of a WAV blob. Messages are modified in place.
+
+    Returns:
+        Number of blobs moved out
+    """
+    moved = 0
+    for message in messages:
+        if not isinstance(message, dict):
+            continue
+        encoded = message.get('audio_data')
+        if not isinstance(encoded, str):
+            continue
+        try:
+            pcm_data = base64.b64decode(encoded)
+        except (ValueError, TypeError) as e:
+            print(f"[AudioStore] Skipping undecodable live audio: {str(e)}")
+            continue
+        del message['audio_data']
+        if pcm_data:
+            audio_id = save(pcm_to_wav(pcm_data, sample_rate), 'audio/wav', cursor=cursor)
+            message['audio_id'] = audio_id
+            message['audio_url'] = audio_url(audio_id)
+            moved += 1
+    return moved
@@ -8,6 +8,15 @@ from datetime import timezone, timedelta
 DB_NAME = 'fluo.db'
 DB_PATH = os.path.join(os.path.dirname(__file__), 'data', DB_NAME)
 
+# Connection pool / SQLite tuning (see db_pool.py)
+DB_POOL_ENABLED = os.getenv('FLUO_DB_POOL', '1') != '0'
+DB_POOL_MAX_IDLE_PER_THREAD = 4      # Idle connections kept per worker thread
+DB_JOURNAL_MODE = 'WAL'              # Readers don't block the writer
+DB_BUSY_TIMEOUT_MS = 10000           # Wait up to 10s for a lock instead of failing
+DB_SYNCHRONOUS = 'NORMAL'            # Safe with WAL, far fewer fsyncs than FULL
+DB_CACHE_SIZE_KB = 20000             # ~20MB page cache per connection
+DB_MMAP_SIZE_BYTES = 128 * 1024 * 1024
+
 # Timezone Configuration
 # Set your timezone here (PST/PDT is UTC-8 or UTC-7)
 # For automatic daylight saving time handling, we'll use a simple offset
@@ -24,6 +33,30 @@ APP_TIMEZONE = timezone(timedelta(hours=TIMEZONE_OFFSET_HOURS))
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 GOOGLE_APPLICATION_CREDENTIALS = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', '')
 
+# LLM gateway (see llm_gateway.py): max concurrent Gemini calls per model lane;
+# further calls queue for a slot
+LLM_TEXT_CONCURRENCY = int(os.getenv('FLUO_LLM_TEXT_CONCURRENCY', '4'))
+LLM_TTS_CONCURRENCY = int(os.getenv('FLUO_LLM_TTS_CONCURRENCY', '8'))    # Listening runs one TTS call per paragraph
+LLM_LIVE_CONCURRENCY = int(os.getenv('FLUO_LLM_LIVE_CONCURRENCY', '4'))  # Concurrent Gemini Live sessions
+
+# Live conversation relay (see live_relay.py): bounded buffers between the
+# client WebSocket and Gemini Live
+LIVE_MIC_QUEUE_CHUNKS = int(os.getenv('FLUO_LIVE_MIC_QUEUE_CHUNKS', '50'))
+LIVE_MIC_MAX_AGE_MS = int(os.getenv('FLUO_LIVE_MIC_MAX_AGE_MS', '1500'))        # Older mic audio is dropped as stale
+LIVE_MIC_OVERFLOW_POLICY = os.getenv('FLUO_LIVE_MIC_OVERFLOW', 'coalesce')     # 'coalesce' or 'drop_oldest'
+LIVE_MIC_COALESCE_MAX_BYTES = 32000                                              # 1s of 16kHz 16-bit mono
+LIVE_CLIENT_QUEUE_FRAMES = int(os.getenv('FLUO_LIVE_CLIENT_QUEUE_FRAMES', '500'))  # ~20s of 40ms speech chunks
+LIVE_FAKE_GEMINI = os.getenv('FLUO_LIVE_FAKE_GEMINI', '0') == '1'               # Use fake_gemini_live.py (local testing)
+
+# Pre-connected Gemini Live sessions per (language, voice) (see live_pool.py).
+# Idle sessions hold a LLM_LIVE_CONCURRENCY slot, so keep the totals small.
+LIVE_POOL_ENABLED = os.getenv('FLUO_LIVE_POOL', '1') != '0'
+LIVE_POOL_MAX_IDLE_PER_KEY = 3
+LIVE_POOL_MAX_IDLE_TOTAL = int(os.getenv('FLUO_LIVE_POOL_MAX_IDLE', '2'))
+LIVE_POOL_IDLE_TTL_S = 120               # Idle sessions older than this are closed
+LIVE_POOL_RATE_WINDOW_S = 600            # Checkout rate is measured over this window
+LIVE_POOL_MAINTENANCE_INTERVAL_S = 5
+
 # Server Configuration
 SERVER_HOST = '0.0.0.0'
 SERVER_PORT = 5001
@@ -40,6 +73,42 @@ URDU_VOCAB_FILE = os.path.join(VOCAB_DIR, 'urdu-oxford-5000.csv')
 if not os.path.exists(URDU_VOCAB_FILE):
     URDU_VOCAB_FILE = os.path.join(VOCAB_DIR, 'vocab_pipeline', 'urdu-oxford-5000.csv')
 
+# TTS audio cache (see tts_cache.py); cached audio lives in the audio store.
+# TTS_CACHE_MAX_BYTES bounds the audio only the cache keeps (clips no activity
+# references). TTS_CACHE_DIR is where older versions kept their own WAV copies
+# (moved by migration 013)
+TTS_CACHE_ENABLED = os.getenv('FLUO_TTS_CACHE', '1') != '0'
+TTS_CACHE_MAX_BYTES = int(os.getenv('FLUO_TTS_CACHE_MAX_MB', '500')) * 1024 * 1024
+TTS_CACHE_DIR = os.path.join(os.path.dirname(__file__), 'data', 'tts_cache')
+
+# Audio blobs referenced by activities (see audio_store.py), served by /api/audio/{audio_id}
+AUDIO_STORE_DIR = os.path.join(os.path.dirname(__file__), 'data', 'audio')
+AUDIO_STORE_ORPHAN_MIN_AGE_S = 3600   # Unreferenced audio younger than this may still be about to be saved
+
+# Transliteration word cache (see transliteration.py): words kept in memory, and
+# whether results are also stored in the transliteration_cache table
+TRANSLITERATION_CACHE_SIZE = 50000
+TRANSLITERATION_CACHE_PERSIST = os.getenv('FLUO_TRANSLITERATION_CACHE', '1') != '0'
+TRANSLITERATION_BATCH_MAX_TEXTS = 500   # POST /api/transliterate/batch
+
+# Per-language lemma indexes (see lemma_index.py; scripts/build_lemma_index.py builds them)
+LEMMA_INDEX_DIR = os.path.join(os.path.dirname(__file__), 'data', 'lemma_index')
+
+# Vocabulary import from free text (see vocab_import.py): words per
+# lemmatization/translation call, calls in flight per import, texts whose
+# LLM results are cached, and how long finished jobs stay retrievable
+VOCAB_IMPORT_BATCH_SIZE = 10
+VOCAB_IMPORT_CONCURRENCY = int(os.getenv('FLUO_VOCAB_IMPORT_CONCURRENCY', '4'))
+VOCAB_IMPORT_CACHE_SIZE = 200
+VOCAB_IMPORT_JOB_TTL_S = 600
+
+# Vocabulary search engine:
+#   'memory' - in-memory trigram index with Python scoring (vocab_search.py)
+#   'fts5'   - SQLite FTS5 table, matching/ranking/paging in SQL (vocab_fts.py)
+#   'legacy' - LIKE candidates + Python scoring
+VOCAB_SEARCH_ENGINE = os.getenv('FLUO_VOCAB_SEARCH_ENGINE', 'memory')
+VOCAB_SEARCH_FUZZY_MIN_LENGTH = 4    # Shorter queries get no typo tolerance
+
 # ============================================================================
 # SRS (Spaced Repetition System) Configuration
 # ============================================================================
@@ -49,6 +118,29 @@ DEFAULT_NEW_CARDS_PER_DAY = 3    # New words introduced per day
 DEFAULT_REVIEWS_PER_DAY = 30     # Review sessions per day
 MIN_REVIEWS_MULTIPLIER = 10      # reviews_per_day must be >= new_cards_per_day * this
 
+# Flashcard review queue, materialized per (user, language) and day (see
+# get_words_for_review in db.py); 0 ranks every due card on each request
+REVIEW_QUEUE_ENABLED = os.getenv('FLUO_REVIEW_QUEUE', '1') != '0'
+REVIEW_QUEUE_NEW_DEPTH = 100     # New cards queued ahead (topped up when a request needs more)
+
+# Batched flashcard reviews (POST /api/flashcard/batch)
+FLASHCARD_BATCH_MAX_REVIEWS = 500
+FLASHCARD_RECEIPT_RETENTION_DAYS = 30   # Idempotency keys are remembered this long
+
+# SRS workload forecast (GET /api/srs/forecast/{language})
+SRS_FORECAST_MIN_DAYS = 30
+SRS_FORECAST_MAX_DAYS = 365
+SRS_FORECAST_RUNS = 1              # Monte-Carlo runs averaged per forecast
+SRS_FORECAST_HISTORY_DAYS = 90     # Recent reviews the rating shares are estimated from
+SRS_FORECAST_CACHE_SIZE = 32       # Forecasts kept (keyed on settings + card state version)
+
+# User level summaries (see calculate_user_level in db.py) are recomputed from
+# scratch on startup and then this often, repairing any drift; 0 disables
+LEVEL_SUMMARY_CHECK_INTERVAL_S = int(os.getenv('FLUO_LEVEL_SUMMARY_CHECK_INTERVAL_S', '86400'))
+
+# Home screen aggregate (GET /api/home), cached per home_data_version and day
+HOME_CACHE_SIZE = 16
+
 # SRS algorithm parameters
 DEFAULT_EASE_FACTOR = 2.5
 MIN_EASE_FACTOR = 1.3
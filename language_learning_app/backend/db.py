@@ -3,12 +3,19 @@ Database operations for Fluo
 Handles SQLite database interactions, SRS logic, and vocabulary management
 """
 import sqlite3
+import unicodedata
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import csv
 import random
 import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
 from . import config
+from . import srs_engine
+from .db_pool import get_connection
+from .migrations import run_migrations
 
 # ============================================================================
 # Utility Functions
@@ -49,7 +56,7 @@ def ensure_lesson_words_table():
     (older schema) by dropping and recreating it — the table is just a cache
     and can be safely rebuilt.
     """
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
 
     # Check whether the table already exists and has the lesson_id column
@@ -81,7 +88,7 @@ def ensure_lesson_words_table():
 
 def init_db():
     """Initialize the database with all required tables"""
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     # User profile table
@@ -96,17 +103,6 @@ def init_db():
         )
     ''')
     
-    # Add new columns if they don't exist (for existing databases)
-    try:
-        cursor.execute('ALTER TABLE user_profile ADD COLUMN name TEXT DEFAULT "Language Learner"')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    try:
-        cursor.execute('ALTER TABLE user_profile ADD COLUMN profile_picture_url TEXT')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
     # User settings table (for SRS and other preferences, per-language)
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS user_settings (
@@ -120,13 +116,6 @@ def init_db():
         )
     ''')
     
-    # Add language column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute('ALTER TABLE user_settings ADD COLUMN language TEXT DEFAULT "kannada"')
-        # Migrate existing settings to have language = 'kannada'
-        cursor.execute('UPDATE user_settings SET language = "kannada" WHERE language IS NULL')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
     
     # Language goals table (per-language, per-activity goals) - DEPRECATED
     cursor.execute('''
@@ -212,24 +201,6 @@ def init_db():
         ON review_history(word_id, user_id, reviewed_at DESC)
     ''')
     
-    # Add introduced_date column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute('ALTER TABLE word_states ADD COLUMN introduced_date TEXT')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    # Add interval_days column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute('ALTER TABLE word_states ADD COLUMN interval_days REAL')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    # Add origin column to vocabulary table if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("ALTER TABLE vocabulary ADD COLUMN origin TEXT DEFAULT 'default'")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
     # Add UNIQUE constraint if table exists but constraint doesn't (for existing databases)
     try:
         cursor.execute('''
@@ -354,11 +325,6 @@ def init_db():
         ON lessons(language, level)
     ''')
     
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_lessons_unit 
-        ON lessons(unit_id, lesson_number)
-    ''')
-    
     cursor.execute('''
         CREATE INDEX IF NOT EXISTS idx_units_language 
         ON units(language, unit_number)
@@ -395,6 +361,9 @@ def init_db():
     
     conn.commit()
     
+    # Bring older databases up to date (columns, indexes)
+    run_migrations(conn)
+    
     # Initialize default user if not exists
     cursor.execute('SELECT COUNT(*) FROM user_profile')
     if cursor.fetchone()[0] == 0:
@@ -420,7 +389,7 @@ def init_db():
 def init_db_schema():
     """Initialize only the database schema without loading vocabulary.
     This is safe to call on every server startup without losing data."""
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     # User profile table
@@ -435,17 +404,6 @@ def init_db_schema():
         )
     ''')
     
-    # Add new columns if they don't exist (for existing databases)
-    try:
-        cursor.execute('ALTER TABLE user_profile ADD COLUMN name TEXT DEFAULT "Language Learner"')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    try:
-        cursor.execute('ALTER TABLE user_profile ADD COLUMN profile_picture_url TEXT')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
     # User settings table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS user_settings (
@@ -543,17 +501,6 @@ def init_db_schema():
         ON review_history(word_id, user_id, reviewed_at DESC)
     ''')
     
-    # Add columns that might not exist in older databases
-    try:
-        cursor.execute('ALTER TABLE word_states ADD COLUMN introduced_date TEXT')
-    except sqlite3.OperationalError:
-        pass
-    
-    try:
-        cursor.execute('ALTER TABLE word_states ADD COLUMN interval_days REAL')
-    except sqlite3.OperationalError:
-        pass
-    
     # SRS settings table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS srs_settings (
@@ -595,18 +542,6 @@ def init_db_schema():
         )
     ''')
 
-    # Migrate user_preferences: add key/value columns if missing (old schema only had 'interests')
-    for col, coldef in [
-        ('key', 'TEXT'),
-        ('value', 'TEXT'),
-        ('created_at', "TEXT DEFAULT CURRENT_TIMESTAMP"),
-        ('updated_at', "TEXT DEFAULT CURRENT_TIMESTAMP"),
-    ]:
-        try:
-            cursor.execute(f'ALTER TABLE user_preferences ADD COLUMN {col} {coldef}')
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-
     # Activity history table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS activity_history (
@@ -620,13 +555,6 @@ def init_db_schema():
         )
     ''')
 
-    # Migrate activity_history: add columns that may be missing in older DBs
-    for col, coldef in [('activity_data', 'TEXT'), ('score', 'REAL')]:
-        try:
-            cursor.execute(f'ALTER TABLE activity_history ADD COLUMN {col} {coldef}')
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-
     # Lessons table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS lessons (
@@ -643,17 +571,6 @@ def init_db_schema():
         )
     ''')
     
-    # Add new columns to lessons table if they don't exist
-    try:
-        cursor.execute('ALTER TABLE lessons ADD COLUMN unit_id TEXT')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    try:
-        cursor.execute('ALTER TABLE lessons ADD COLUMN lesson_number INTEGER')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
     # Units table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS units (
@@ -707,11 +624,6 @@ def init_db_schema():
         ON lessons(language, level)
     ''')
     
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_lessons_unit 
-        ON lessons(unit_id, lesson_number)
-    ''')
-    
     cursor.execute('''
         CREATE INDEX IF NOT EXISTS idx_units_language 
         ON units(language, unit_number)
@@ -746,6 +658,153 @@ def init_db_schema():
         )
     ''')
     
+    # Hashes of the source files (vocab CSVs, lesson JSON) last synced into the
+    # database, so startup can skip files that haven't changed
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_manifest (
+            source TEXT NOT NULL,
+            path TEXT NOT NULL,
+            mtime REAL,
+            size INTEGER,
+            content_hash TEXT NOT NULL,
+            entity_id TEXT,
+            synced_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (source, path)
+        )
+    ''')
+    
+    # TTS audio cache (tts_cache.py): synthesis inputs -> audio store blob
+    # (audio_id, added by migration 013)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tts_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            voice TEXT,
+            style_instruction TEXT,
+            size_bytes INTEGER NOT NULL,
+            hit_count INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            last_accessed_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tts_cache_lru ON tts_cache(last_accessed_at)')
+    
+    # Audio blobs referenced from activity data by audio_id (audio_store.py);
+    # the bytes live in config.AUDIO_STORE_DIR
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS audio_blobs (
+            audio_id TEXT PRIMARY KEY,
+            mime_type TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Idempotency keys of applied batched flashcard reviews, so an offline
+    # client can replay a batch without reviewing a card twice
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS flashcard_review_receipts (
+            user_id INTEGER DEFAULT 1,
+            idempotency_key TEXT NOT NULL,
+            word_id INTEGER NOT NULL,
+            result TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, idempotency_key)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_flashcard_review_receipts_created ON flashcard_review_receipts(created_at)')
+    
+    # Materialized flashcard queue per (user, language): today's due reviews
+    # (kind 0, sort_key = -priority) and the next new cards (kind 1, sort_key =
+    # CEFR level order). review_queue_state records the day it was built for.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS review_queue (
+            user_id INTEGER NOT NULL,
+            language TEXT NOT NULL,
+            word_id INTEGER NOT NULL,
+            kind INTEGER NOT NULL,
+            sort_key REAL NOT NULL,
+            PRIMARY KEY (user_id, language, word_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_review_queue_order
+        ON review_queue(user_id, language, kind, sort_key, word_id)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS review_queue_state (
+            user_id INTEGER NOT NULL,
+            language TEXT NOT NULL,
+            queue_date TEXT NOT NULL,
+            new_depth INTEGER NOT NULL,
+            new_exhausted INTEGER DEFAULT 0,
+            built_at TEXT,
+            PRIMARY KEY (user_id, language)
+        )
+    ''')
+    
+    # Bumped on every change to a language's card states (see
+    # _bump_srs_state_version); cached SRS forecasts are keyed on it
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS srs_state_versions (
+            language TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    # Per-card memory model state as of the last fit_srs_memory_model
+    # (stability in days, last review as a julianday number)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS srs_memory_states (
+            user_id INTEGER NOT NULL,
+            language TEXT NOT NULL,
+            word_id INTEGER NOT NULL,
+            stability REAL NOT NULL,
+            last_review_day INTEGER NOT NULL,
+            PRIMARY KEY (user_id, language, word_id)
+        )
+    ''')
+    
+    # Word totals and mastered counts per (user, language, CEFR level) behind
+    # calculate_user_level; level is LOWER(vocabulary.level), '' for none
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_level_summary (
+            user_id INTEGER NOT NULL,
+            language TEXT NOT NULL,
+            level TEXT NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            mastered INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, language, level)
+        )
+    ''')
+    
+    # Goal-based streak state (see calculate_goal_based_streak): one row per day
+    # with week-specific goals, whether they were all met and the run of met
+    # goal days ending there; streak_dirty_days is filled by triggers
+    # (migrations._m010_streak_dirty_days) with days a write may have changed
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS streak_days (
+            date TEXT PRIMARY KEY,
+            met INTEGER NOT NULL,
+            run INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS streak_dirty_days (
+            date TEXT PRIMARY KEY
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS streak_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            longest_run INTEGER NOT NULL,
+            rebuilt_at TEXT
+        )
+    ''')
+
+    # Per-word transliteration results (transliteration_cache, see
+    # transliteration.py) are created by migration 015
+    
     # Lesson words table (if it exists in init_db)
     try:
         cursor.execute('''
@@ -765,6 +824,17 @@ def init_db_schema():
     
     conn.commit()
     
+    # Bring older databases up to date (columns, indexes)
+    run_migrations(conn)
+    
+    # Search keys for vocabulary rows written without them (scripts writing to
+    # the table directly); a no-op once every row is keyed
+    try:
+        if fill_vocabulary_search_keys(cursor):
+            conn.commit()
+    except sqlite3.OperationalError as e:
+        print(f"Error filling vocabulary search keys: {e}")
+    
     # Initialize default user if not exists
     cursor.execute('SELECT COUNT(*) FROM user_profile')
     if cursor.fetchone()[0] == 0:
@@ -777,164 +847,311 @@ def init_db_schema():
     conn.close()
 
 
-def sync_lessons_from_files():
-    """Sync lessons from the filesystem into the database on every startup.
-    
-    - Reads all lesson JSON files from backend/lessons/<lang>/unit_*/
-    - Deletes ALL existing lessons and units from the DB
-    - Re-inserts everything fresh from the filesystem
-    - This ensures the DB always matches the files on disk
-    """
+def _lesson_source_files(lessons_dir: str) -> List[Dict]:
+    """Every unit metadata and lesson JSON file under backend/lessons/<lang>/unit_*/"""
     import os
-    lessons_dir = os.path.join(os.path.dirname(__file__), 'lessons')
-    if not os.path.exists(lessons_dir):
-        print("[LessonSync] No lessons directory found, skipping")
-        return
-
-    conn = sqlite3.connect(config.DB_PATH)
-    cursor = conn.cursor()
-    now = datetime.now().isoformat()
-
-    # Clear ALL existing lessons and units (we rebuild from files)
-    cursor.execute('DELETE FROM lessons')
-    cursor.execute('DELETE FROM units')
-    conn.commit()
-    print("[LessonSync] Cleared existing lessons and units from database")
-
-    total_lessons = 0
-    total_units = 0
-
-    # Walk the lessons directory
+    files = []
     for lang_code in sorted(os.listdir(lessons_dir)):
         lang_path = os.path.join(lessons_dir, lang_code)
         if not os.path.isdir(lang_path):
             continue
-
-        # Look for unit directories
         for unit_dir_name in sorted(os.listdir(lang_path)):
             unit_path = os.path.join(lang_path, unit_dir_name)
             if not os.path.isdir(unit_path):
                 continue
-
-            # Load unit metadata
+            unit_key = os.path.join(lang_code, unit_dir_name)
             meta_path = os.path.join(unit_path, '_unit_metadata.json')
-            unit_meta = None
             if os.path.exists(meta_path):
-                try:
-                    with open(meta_path, 'r', encoding='utf-8') as f:
-                        unit_meta = json.load(f)
-                    # Insert unit
+                files.append({
+                    'kind': 'unit', 'lang_code': lang_code, 'unit_key': unit_key,
+                    'name': unit_dir_name, 'full_path': meta_path,
+                    'path': os.path.join(unit_key, '_unit_metadata.json'),
+                })
+            for filename in sorted(os.listdir(unit_path)):
+                if filename.endswith('.json') and not filename.startswith('_'):
+                    files.append({
+                        'kind': 'lesson', 'lang_code': lang_code, 'unit_key': unit_key,
+                        'name': filename, 'full_path': os.path.join(unit_path, filename),
+                        'path': os.path.join(unit_key, filename),
+                    })
+    return files
+
+
+def sync_lessons_from_files(force: bool = False, check: bool = False) -> dict:
+    """Sync lessons and units from backend/lessons/<lang>/unit_*/ into the database.
+    
+    Every file's mtime, size and content hash is kept in sync_manifest
+    (source 'lessons'), so on startup:
+    - Files whose mtime and size are unchanged are skipped without reading
+    - Files that were touched but whose content hash still matches only get
+      their manifest entry refreshed
+    - New or changed files are parsed and upserted (a changed unit metadata
+      file re-parses the lessons in its unit too)
+    - Units/lessons whose file was removed are deleted
+    All writes happen in one transaction. The first sync of a database (no
+    lesson manifest yet) clears lessons and units first, like the old full
+    reload, so the DB ends up matching the files on disk.
+    
+    Args:
+        force: Re-parse and upsert every file, even unchanged ones
+        check: Only report drift between the files and the database; nothing is written
+    
+    Returns:
+        Summary dict with 'added', 'changed' and 'removed' file paths and
+        'unchanged' count (plus 'units' and 'lessons' totals after a sync)
+    """
+    import os
+    import hashlib
+    summary = {'added': [], 'changed': [], 'removed': [], 'unchanged': 0}
+    lessons_dir = os.path.join(os.path.dirname(__file__), 'lessons')
+    if not os.path.exists(lessons_dir):
+        print("[LessonSync] No lessons directory found, skipping")
+        return summary
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    manifest = get_manifest(cursor, 'lessons')
+    files = _lesson_source_files(lessons_dir)
+
+    # Work out what changed: stat first, hash only when mtime/size moved
+    to_parse, touched = [], []
+    for source in files:
+        entry = manifest.get(source['path'])
+        stat = os.stat(source['full_path'])
+        if not force and entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+            summary['unchanged'] += 1
+            continue
+        with open(source['full_path'], 'rb') as f:
+            source['content'] = f.read()
+        source['content_hash'] = hashlib.sha256(source['content']).hexdigest()
+        if not force and entry and entry['content_hash'] == source['content_hash']:
+            summary['unchanged'] += 1
+            touched.append(source)
+            continue
+        summary['changed' if entry else 'added'].append(source['path'])
+        to_parse.append(source)
+
+    # Lessons store their unit's unit_id, so a changed unit re-parses its lessons
+    changed_units = {source['unit_key'] for source in to_parse if source['kind'] == 'unit'}
+    for source in files:
+        if source['kind'] == 'lesson' and source['unit_key'] in changed_units and source not in to_parse:
+            if 'content' not in source:
+                with open(source['full_path'], 'rb') as f:
+                    source['content'] = f.read()
+                source['content_hash'] = hashlib.sha256(source['content']).hexdigest()
+            if source in touched:
+                touched.remove(source)
+            to_parse.append(source)
+
+    current_paths = {source['path'] for source in files}
+    summary['removed'] = sorted(path for path in manifest if path not in current_paths)
+
+    if check:
+        conn.close()
+        return summary
+
+    if not to_parse and not touched and not summary['removed'] and manifest:
+        conn.close()
+        print(f"[LessonSync] ✅ Up to date ({summary['unchanged']} files unchanged)")
+        return summary
+
+    now = datetime.now().isoformat()
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        if not manifest:
+            # First sync: nothing tells us which rows came from files, so rebuild
+            cursor.execute('DELETE FROM lessons')
+            cursor.execute('DELETE FROM units')
+            print("[LessonSync] Cleared existing lessons and units from database")
+
+        for path in summary['removed']:
+            entity_id = manifest[path].get('entity_id')
+            if entity_id:
+                if path.endswith('_unit_metadata.json'):
+                    cursor.execute('DELETE FROM units WHERE unit_id = ?', (entity_id,))
+                else:
+                    cursor.execute('DELETE FROM lessons WHERE lesson_id = ?', (entity_id,))
+            cursor.execute('DELETE FROM sync_manifest WHERE source = ? AND path = ?', ('lessons', path))
+            print(f"  [Removed] {path}")
+
+        # unit_id per unit directory, for lessons (from this run or the manifest)
+        unit_ids = {}
+        for source in files:
+            if source['kind'] == 'unit':
+                unit_ids[source['unit_key']] = (manifest.get(source['path']) or {}).get('entity_id')
+
+        for source in sorted(to_parse, key=lambda s: s['kind'] != 'unit'):
+            old_entity_id = (manifest.get(source['path']) or {}).get('entity_id')
+            try:
+                data = json.loads(source['content'].decode('utf-8'))
+                if source['kind'] == 'unit':
+                    entity_id = data['unit_id']
                     cursor.execute('''
-                        INSERT OR REPLACE INTO units 
-                        (unit_id, unit_number, language, title, subtitle, description, 
+                        INSERT INTO units
+                        (unit_id, unit_number, language, title, subtitle, description,
                          estimated_minutes, lesson_count, metadata_json, created_at, updated_at)
                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(unit_id) DO UPDATE SET
+                            unit_number = excluded.unit_number,
+                            language = excluded.language,
+                            title = excluded.title,
+                            subtitle = excluded.subtitle,
+                            description = excluded.description,
+                            estimated_minutes = excluded.estimated_minutes,
+                            lesson_count = excluded.lesson_count,
+                            metadata_json = excluded.metadata_json,
+                            updated_at = excluded.updated_at
                     ''', (
-                        unit_meta['unit_id'],
-                        unit_meta.get('unit_number', 1),
-                        unit_meta.get('language', lang_code),
-                        unit_meta.get('title', unit_dir_name),
-                        unit_meta.get('subtitle', ''),
-                        unit_meta.get('description', ''),
-                        unit_meta.get('estimated_minutes', 0),
-                        unit_meta.get('lesson_count', 0),
-                        json.dumps(unit_meta),
+                        entity_id,
+                        data.get('unit_number', 1),
+                        data.get('language', source['lang_code']),
+                        data.get('title', source['name']),
+                        data.get('subtitle', ''),
+                        data.get('description', ''),
+                        data.get('estimated_minutes', 0),
+                        data.get('lesson_count', 0),
+                        json.dumps(data),
                         now, now
                     ))
-                    total_units += 1
-                    print(f"  [Unit] {unit_meta.get('title', unit_dir_name)} ({lang_code})")
-                except Exception as e:
-                    print(f"  [Error] Loading unit metadata {meta_path}: {e}")
-
-            # Load all lesson JSON files in this unit
-            lesson_files = sorted([
-                f for f in os.listdir(unit_path) 
-                if f.endswith('.json') and not f.startswith('_')
-            ])
-
-            for filename in lesson_files:
-                filepath = os.path.join(unit_path, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        lesson_data = json.load(f)
-
+                    unit_ids[source['unit_key']] = entity_id
+                    if old_entity_id and old_entity_id != entity_id:
+                        cursor.execute('DELETE FROM units WHERE unit_id = ?', (old_entity_id,))
+                    print(f"  [Unit] {data.get('title', source['name'])} ({source['lang_code']})")
+                else:
+                    entity_id = data['lesson_id']
                     # Extract lesson number from filename (e.g., "01_..." -> 1)
                     try:
-                        lesson_number = int(filename.split('_')[0])
+                        lesson_number = int(source['name'].split('_')[0])
                     except ValueError:
                         lesson_number = 0
-
                     cursor.execute('''
-                        INSERT OR REPLACE INTO lessons 
+                        INSERT INTO lessons
                         (lesson_id, title, language, level, unit_id, lesson_number, steps_json, created_at, updated_at)
                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(lesson_id) DO UPDATE SET
+                            title = excluded.title,
+                            language = excluded.language,
+                            level = excluded.level,
+                            unit_id = excluded.unit_id,
+                            lesson_number = excluded.lesson_number,
+                            steps_json = excluded.steps_json,
+                            updated_at = excluded.updated_at
                     ''', (
-                        lesson_data['lesson_id'],
-                        lesson_data.get('title', filename),
-                        lesson_data.get('language', lang_code),
-                        lesson_data.get('cefr_level', 'A0'),
-                        unit_meta['unit_id'] if unit_meta else None,
+                        entity_id,
+                        data.get('title', source['name']),
+                        data.get('language', source['lang_code']),
+                        data.get('cefr_level', 'A0'),
+                        unit_ids.get(source['unit_key']),
                         lesson_number,
-                        json.dumps(lesson_data.get('steps', [])),
+                        json.dumps(data.get('steps', [])),
                         now, now
                     ))
-                    total_lessons += 1
-                except Exception as e:
-                    print(f"  [Error] Loading lesson {filepath}: {e}")
+                    if old_entity_id and old_entity_id != entity_id:
+                        cursor.execute('DELETE FROM lessons WHERE lesson_id = ?', (old_entity_id,))
+                record_manifest(
+                    cursor, 'lessons', source['path'], source['content_hash'],
+                    full_path=source['full_path'], entity_id=entity_id
+                )
+            except Exception as e:
+                # Not recorded in the manifest, so it is retried on the next sync
+                print(f"  [Error] Loading {source['kind']} {source['full_path']}: {e}")
+
+        for source in touched:
+            entry = manifest[source['path']]
+            record_manifest(
+                cursor, 'lessons', source['path'], source['content_hash'],
+                full_path=source['full_path'], entity_id=entry.get('entity_id')
+            )
 
-    conn.commit()
+        cursor.execute('SELECT COUNT(*) FROM units')
+        summary['units'] = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM lessons')
+        summary['lessons'] = cursor.fetchone()[0]
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        conn.close()
+        print(f"[LessonSync] Error syncing lessons: {str(e)}")
+        raise
     conn.close()
-    print(f"[LessonSync] ✅ Loaded {total_units} units, {total_lessons} lessons from filesystem")
+    print(f"[LessonSync] ✅ {len(summary['added'])} added, {len(summary['changed'])} changed, "
+          f"{len(summary['removed'])} removed, {summary['unchanged']} unchanged "
+          f"({summary['units']} units, {summary['lessons']} lessons)")
+    return summary
 
 
-def sync_vocab_from_csvs(force: bool = False) -> dict:
-    """Sync vocabulary for all supported languages from their CSVs.
+# ----------------------------------------------------------------------------
+# Source file manifest (sync_manifest table)
+# ----------------------------------------------------------------------------
+def file_sha256(path: str) -> str:
+    """SHA-256 hex digest of a file's contents"""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_manifest(cursor, source: str) -> Dict[str, Dict]:
+    """Manifest entries for a source ('vocab', 'lessons'), keyed by path"""
+    cursor.execute(
+        'SELECT path, mtime, size, content_hash, entity_id FROM sync_manifest WHERE source = ?',
+        (source,)
+    )
+    return {
+        row[0]: {'mtime': row[1], 'size': row[2], 'content_hash': row[3], 'entity_id': row[4]}
+        for row in cursor.fetchall()
+    }
 
-    For each language:
-    - Counts rows in the CSV (excluding header).
-    - Compares against the DB row count.
-    - If they differ (or force=True), deletes the existing rows and reloads from the CSV.
 
-    Returns a summary dict: {language: {'csv_rows': int, 'db_rows': int, 'action': str}}
+def record_manifest(
+    cursor,
+    source: str,
+    path: str,
+    content_hash: str,
+    full_path: Optional[str] = None,
+    entity_id: Optional[str] = None
+):
+    """Upsert the manifest entry for a synced file (does not commit)
+    
+    Args:
+        entity_id: ID of the row the file was loaded into (e.g. lesson_id), so
+            the row can be deleted when the file is removed
     """
-    import os, csv as csv_module
-
-    SUPPORTED_LANGUAGES = ['kannada', 'tamil', 'telugu', 'malayalam', 'hindi', 'urdu']
-    summary = {}
-
-    for language in SUPPORTED_LANGUAGES:
-        csv_path = os.path.join(config.VOCAB_DIR, f'{language}-oxford-5000.csv')
-        if not os.path.exists(csv_path):
-            print(f"[VocabSync] {language}: CSV not found at {csv_path}, skipping")
-            summary[language] = {'csv_rows': 0, 'db_rows': 0, 'action': 'skipped_no_csv'}
-            continue
-
-        # Count rows in CSV (subtract 1 for header)
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            csv_row_count = sum(1 for _ in f) - 1
+    import os
+    stat = os.stat(full_path or path)
+    cursor.execute('''
+        INSERT INTO sync_manifest (source, path, mtime, size, content_hash, entity_id, synced_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(source, path) DO UPDATE SET
+            mtime = excluded.mtime,
+            size = excluded.size,
+            content_hash = excluded.content_hash,
+            entity_id = excluded.entity_id,
+            synced_at = excluded.synced_at
+    ''', (source, path, stat.st_mtime, stat.st_size, content_hash, entity_id))
 
-        # Count rows in DB
-        conn = sqlite3.connect(config.DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM vocabulary WHERE language = ?', (language,))
-        db_row_count = cursor.fetchone()[0]
-        conn.close()
 
-        if not force and db_row_count == csv_row_count and db_row_count > 0:
-            print(f"[VocabSync] {language}: up-to-date ({db_row_count} rows), skipping")
-            summary[language] = {'csv_rows': csv_row_count, 'db_rows': db_row_count, 'action': 'up_to_date'}
-            continue
+# ----------------------------------------------------------------------------
+# Vocabulary CSV sync
+# ----------------------------------------------------------------------------
+SUPPORTED_VOCAB_LANGUAGES = ['kannada', 'tamil', 'telugu', 'malayalam', 'hindi', 'urdu']
 
-        action = 'force_reload' if force else ('initial_load' if db_row_count == 0 else 'mismatch_reload')
-        print(f"[VocabSync] {language}: {action} (csv={csv_row_count}, db={db_row_count})")
-        load_vocabulary_from_csv(language)
-        summary[language] = {'csv_rows': csv_row_count, 'db_rows': csv_row_count, 'action': action}
+# Translation column names seen in the vocab CSVs, in order of preference
+_TRANSLATION_COLUMNS = [
+    'translation', 'kannada_translation', 'hindi_translation', 'urdu_translation',
+    'tamil_translation', 'telugu_translation', 'malayalam_translation',
+]
 
-    return summary
+# Mixed into every row's source_hash. Bump it when the way a CSV row becomes a
+# vocabulary row changes (e.g. clean_iast output), so the next sync rewrites
+# every row instead of skipping them as unchanged.
+VOCAB_ROW_FORMAT_VERSION = 1
 
 
-def load_vocabulary_from_csv(language: str = 'kannada', origin: str = 'default'):
-    """Load vocabulary from CSV file into database"""
+def get_vocab_csv_path(language: str) -> Optional[str]:
+    """Path of the main vocabulary CSV for a language (None if there isn't one)"""
     import os
     # Map language codes to configured CSV paths
     vocab_file = None
@@ -946,150 +1163,333 @@ def load_vocabulary_from_csv(language: str = 'kannada', origin: str = 'default')
         vocab_file = getattr(config, 'URDU_VOCAB_FILE', None)
     else:
         # Try to find a csv in the vocab directory matching the language code
-        candidate = os.path.join(config.VOCAB_DIR, f"{language}-oxford-5000.csv")
-        if os.path.exists(candidate):
-            vocab_file = candidate
-
+        vocab_file = os.path.join(config.VOCAB_DIR, f"{language}-oxford-5000.csv")
     if not vocab_file or not os.path.exists(vocab_file):
-        print(f"Vocabulary file not found for {language} -> {vocab_file}")
-        return
-    
-    conn = sqlite3.connect(config.DB_PATH)
-    cursor = conn.cursor()
-    
-    # Check if vocabulary already loaded
-    cursor.execute('SELECT COUNT(*) FROM vocabulary WHERE language = ?', (language,))
-    existing_count = cursor.fetchone()[0]
-    if existing_count > 0:
-        # If entries already exist for this language, remove them and reload.
-        # This handles previous runs where CSV headers (e.g. with BOM) caused empty
-        # or malformed imports. Safer to replace than to leave incomplete rows.
-        print(f"Existing vocabulary for {language} detected ({existing_count} rows) - deleting and reloading...")
-        cursor.execute('DELETE FROM vocabulary WHERE language = ?', (language,))
-        conn.commit()
-    
-    print(f"Loading vocabulary from {vocab_file}...")
-    from . import transliteration
-    with open(vocab_file, 'r', encoding='utf-8') as f:
+        return None
+    return vocab_file
+
+
+def _vocab_source_files(language: str) -> List[str]:
+    """Main CSV plus the user vocab CSV (if present) that make up a language's vocabulary"""
+    import os
+    files = []
+    vocab_file = get_vocab_csv_path(language)
+    if vocab_file:
+        files.append(vocab_file)
+    user_vocab_file = os.path.join(config.VOCAB_DIR, f"{language}-user-vocab.csv")
+    if os.path.exists(user_vocab_file):
+        files.append(user_vocab_file)
+    return files
+
+
+def _manifest_path(path: str) -> str:
+    """Manifest key for a vocab file: relative to VOCAB_DIR so it survives moving the checkout"""
+    import os
+    return os.path.relpath(path, config.VOCAB_DIR)
+
+
+def _vocab_files_changed(cursor, language: str) -> bool:
+    """True if a language's CSVs differ from what was last synced"""
+    manifest = get_manifest(cursor, 'vocab')
+    files = {_manifest_path(path): path for path in _vocab_source_files(language)}
+    for key, path in files.items():
+        entry = manifest.get(key)
+        if not entry or entry['content_hash'] != file_sha256(path):
+            return True
+    # A user vocab CSV that was synced before and has since been deleted
+    prefix = f"{language}-"
+    return any(key.startswith(prefix) and key not in files for key in manifest)
+
+
+def _read_vocab_csv(path: str, origin: str) -> List[Dict]:
+    """Parse a vocab CSV into raw row dicts (transliteration not yet cleaned)"""
+    import hashlib
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         # Normalize fieldnames to remove BOM or stray whitespace (some CSVs have '\ufeff' in header)
         if reader.fieldnames:
-            normalized_fieldnames = [fn.replace('\ufeff', '').strip() if fn else fn for fn in reader.fieldnames]
-            reader.fieldnames = normalized_fieldnames
-        count = 0
+            reader.fieldnames = [fn.replace('\ufeff', '').strip() if fn else fn for fn in reader.fieldnames]
         for row in reader:
-            # Normalize transliteration to ensure consistency (ṃ vs ṁ, visarga handling, etc.)
-            raw_transliteration = row.get('transliteration', '')
-            normalized_transliteration = ''
-            if raw_transliteration:
-                # Use the clean_iast function to standardize transliteration format
-                normalized_transliteration = transliteration.clean_iast(raw_transliteration)
-            
             # Support flexible CSV column names for the translation column
             translation_col = None
-            for candidate_col in ['translation', 'kannada_translation', 'hindi_translation', 'urdu_translation', 'tamil_translation', 'telugu_translation', 'malayalam_translation']:
-                if candidate_col in row and row.get(candidate_col, '').strip() != '':
+            for candidate_col in _TRANSLATION_COLUMNS:
+                if candidate_col in row and (row.get(candidate_col) or '').strip() != '':
                     translation_col = candidate_col
                     break
+            record = {
+                'english_word': row.get('english_word') or '',
+                'translation': (row.get(translation_col) if translation_col else row.get('translation')) or '',
+                'raw_transliteration': row.get('transliteration') or '',
+                'word_class': row.get('word_class') or '',
+                'level': row.get('level') or '',
+                'verb_transitivity': row.get('verb_transitivity') or '',
+                'origin': origin,
+            }
+            record['source_hash'] = hashlib.sha1('\x1f'.join([
+                str(VOCAB_ROW_FORMAT_VERSION), record['english_word'], record['translation'],
+                record['raw_transliteration'], record['word_class'], record['level'],
+                record['verb_transitivity'], origin,
+            ]).encode('utf-8')).hexdigest()
+            rows.append(record)
+    return rows
 
-            translation_value = row.get(translation_col, '') if translation_col else row.get('translation', '')
 
-            cursor.execute('''
-                INSERT INTO vocabulary 
-                (language, english_word, translation, transliteration, word_class, level, verb_transitivity, origin)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                language,
-                row.get('english_word', ''),
-                translation_value,
-                normalized_transliteration,
-                row.get('word_class', ''),
-                row.get('level', ''),
-                row.get('verb_transitivity', ''),
-                origin
-            ))
-            count += 1
-    
-    conn.commit()
-    print(f"  Loaded {count} words from {vocab_file} (origin={origin})")
-    
-    # Also load user vocab CSV if it exists
-    user_vocab_file = os.path.join(config.VOCAB_DIR, f"{language}-user-vocab.csv")
-    if os.path.exists(user_vocab_file):
-        print(f"  Loading user vocabulary from {user_vocab_file}...")
-        user_count = 0
-        with open(user_vocab_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            if reader.fieldnames:
-                reader.fieldnames = [fn.replace('\ufeff', '').strip() if fn else fn for fn in reader.fieldnames]
-            for row in reader:
-                raw_translit = row.get('transliteration', '')
-                norm_translit = transliteration.clean_iast(raw_translit) if raw_translit else ''
-                
-                trans_col = None
-                for cc in ['translation', 'kannada_translation', 'hindi_translation', 'urdu_translation', 'tamil_translation', 'telugu_translation', 'malayalam_translation']:
-                    if cc in row and row.get(cc, '').strip() != '':
-                        trans_col = cc
-                        break
-                trans_val = row.get(trans_col, '') if trans_col else row.get('translation', '')
-                
-                # Skip if this word already exists (from default CSV)
-                cursor.execute(
-                    'SELECT id FROM vocabulary WHERE language = ? AND english_word = ? AND translation = ?',
-                    (language, row.get('english_word', ''), trans_val)
-                )
-                if cursor.fetchone():
-                    continue
-                
-                cursor.execute('''
-                    INSERT INTO vocabulary 
-                    (language, english_word, translation, transliteration, word_class, level, verb_transitivity, origin)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    language,
-                    row.get('english_word', ''),
-                    trans_val,
-                    norm_translit,
-                    row.get('word_class', ''),
-                    row.get('level', ''),
-                    row.get('verb_transitivity', ''),
-                    'user'
-                ))
-                user_count += 1
-        conn.commit()
-        print(f"  Loaded {user_count} user words from {user_vocab_file}")
-    
-    conn.close()
+def sync_vocab_from_csvs(force: bool = False) -> dict:
+    """Sync vocabulary for all supported languages from their CSVs.
 
-    # Ensure lesson words cache table exists (with migration for old schemas)
-    ensure_lesson_words_table()
+    For each language, the CSV (and user vocab CSV) content hashes are compared
+    with the sync_manifest. Unchanged languages are skipped without parsing
+    anything; changed ones get an incremental load_vocabulary_from_csv(), which
+    keeps word IDs (and so SRS progress) for rows that are still there.
 
+    Args:
+        force: Diff every language against its CSV even if the hashes match
 
-# ----------------------------------------------------------------------------
-# Utility: lesson words cache table
-# ----------------------------------------------------------------------------
-def ensure_lesson_words_table():
-    """Create the lesson_words cache table if it doesn't exist.
-    
-    Also migrates any existing table that is missing the lesson_id column
-    (older schema) by dropping and recreating it — the table is just a cache
-    and can be safely rebuilt.
+    Returns a summary dict: {language: {'csv_rows': int, 'db_rows': int, 'action': str, ...}}
     """
-    conn = sqlite3.connect(config.DB_PATH)
-    cursor = conn.cursor()
-
-    # Check whether the table already exists and has the lesson_id column
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='lesson_words'")
-    table_exists = cursor.fetchone() is not None
+    summary = {}
 
-    if table_exists:
-        cursor.execute("PRAGMA table_info(lesson_words)")
-        columns = {row[1] for row in cursor.fetchall()}
-        if 'lesson_id' not in columns:
-            print("[DB] lesson_words table missing lesson_id column — dropping and recreating")
-            cursor.execute('DROP TABLE IF EXISTS lesson_words')
-            cursor.execute('DROP INDEX IF EXISTS idx_lesson_words_unique')
-            conn.commit()
+    for language in SUPPORTED_VOCAB_LANGUAGES:
+        csv_path = get_vocab_csv_path(language)
+        if not csv_path:
+            print(f"[VocabSync] {language}: CSV not found, skipping")
+            summary[language] = {'csv_rows': 0, 'db_rows': 0, 'action': 'skipped_no_csv'}
+            continue
+
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM vocabulary WHERE language = ?', (language,))
+        db_row_count = cursor.fetchone()[0]
+        changed = _vocab_files_changed(cursor, language)
+        conn.close()
+
+        if not force and not changed and db_row_count > 0:
+            print(f"[VocabSync] {language}: up-to-date ({db_row_count} rows), skipping")
+            summary[language] = {'csv_rows': None, 'db_rows': db_row_count, 'action': 'up_to_date'}
+            continue
+
+        action = 'force_sync' if force else ('initial_load' if db_row_count == 0 else 'incremental_sync')
+        print(f"[VocabSync] {language}: {action} (db={db_row_count})")
+        result = load_vocabulary_from_csv(language)
+        summary[language] = {'action': action, **result}
+
+    return summary
+
+
+def load_vocabulary_from_csv(language: str = 'kannada', origin: str = 'default') -> dict:
+    """Sync a language's vocabulary rows with its CSV (and user vocab CSV)
+
+    CSV rows are matched to existing vocabulary rows by (english_word,
+    translation, word_class). Matching rows keep their ID and are only
+    rewritten if their source fields changed; new rows are inserted; rows of
+    this origin that are no longer in the CSV are deleted along with their
+    word_states. Words added through the app (origin 'user' but not in the
+    user vocab CSV) are never deleted. Everything happens in one transaction
+    and the sync_manifest is updated with the CSV hashes.
+
+    Returns:
+        Dict with csv_rows, db_rows, inserted, updated, deleted, unchanged
+    """
+    import os
+    result = {'csv_rows': 0, 'db_rows': 0, 'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+    vocab_file = get_vocab_csv_path(language)
+    if not vocab_file:
+        print(f"Vocabulary file not found for {language}")
+        return result
+
+    # Desired rows by stable key; user vocab rows don't override CSV words
+    desired = {}
+    for record in _read_vocab_csv(vocab_file, origin):
+        key = (record['english_word'], record['translation'], record['word_class'])
+        if key in desired:
+            print(f"  [VocabSync] {language}: duplicate row {key} in {vocab_file}, keeping the first")
+            continue
+        desired[key] = record
+    user_vocab_file = os.path.join(config.VOCAB_DIR, f"{language}-user-vocab.csv")
+    if os.path.exists(user_vocab_file):
+        default_pairs = {(r['english_word'], r['translation']) for r in desired.values()}
+        for record in _read_vocab_csv(user_vocab_file, 'user'):
+            key = (record['english_word'], record['translation'], record['word_class'])
+            if (record['english_word'], record['translation']) in default_pairs or key in desired:
+                continue
+            desired[key] = record
+    result['csv_rows'] = len(desired)
+
+    from . import transliteration
+    clean_cache = {}
+
+    def clean(raw: str) -> str:
+        # Normalize transliteration to ensure consistency (ṃ vs ṁ, visarga handling, etc.)
+        if not raw:
+            return ''
+        if raw not in clean_cache:
+            clean_cache[raw] = transliteration.clean_iast(raw)
+        return clean_cache[raw]
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # Hold the write lock for the whole diff so nothing changes under it
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute('''
+            SELECT id, english_word, translation, word_class, origin, source_hash, level
+            FROM vocabulary
+            WHERE language = ?
+            ORDER BY id
+        ''', (language,))
+        existing = {}
+        stale_ids = []
+        levels = {}  # word id -> level key, for the user level summaries
+        for word_id, english_word, translation, word_class, row_origin, source_hash, level in cursor.fetchall():
+            levels[word_id] = _level_key(level)
+            key = (english_word, translation, word_class)
+            if key in existing:
+                # Leftover duplicate from an old reload; the lowest id wins
+                if (row_origin or 'default') == origin:
+                    stale_ids.append(word_id)
+                continue
+            existing[key] = (word_id, row_origin or 'default', source_hash)
+
+        inserts, updates = [], []
+        total_deltas = {}
+        moved = {}  # word id -> new level key, for updates that change a word's level
+        for key, record in desired.items():
+            current = existing.get(key)
+            if current and current[2] == record['source_hash']:
+                result['unchanged'] += 1
+                continue
+            values = (
+                record['english_word'], record['translation'], clean(record['raw_transliteration']),
+                record['word_class'], record['level'], record['verb_transitivity'],
+                record['origin'], record['source_hash'],
+            )
+            level = _level_key(record['level'])
+            if current:
+                updates.append(values + (current[0],))
+                if levels[current[0]] != level:
+                    moved[current[0]] = level
+            else:
+                inserts.append((language,) + values)
+                total_deltas[level] = total_deltas.get(level, 0) + 1
+
+        for key, (word_id, row_origin, _) in existing.items():
+            if key not in desired and row_origin == origin:
+                stale_ids.append(word_id)
+
+        # Level summary deltas: word counts move with inserts, level changes and
+        # deletions, and so do the mastered counts of users who mastered those words
+        mastered_deltas = {}
+        for word_id, level in moved.items():
+            total_deltas[levels[word_id]] = total_deltas.get(levels[word_id], 0) - 1
+            total_deltas[level] = total_deltas.get(level, 0) + 1
+        for word_id in stale_ids:
+            total_deltas[levels[word_id]] = total_deltas.get(levels[word_id], 0) - 1
+        changed_ids = list(moved) + stale_ids
+        for i in range(0, len(changed_ids), 500):
+            chunk = changed_ids[i:i + 500]
+            cursor.execute(f'''
+                SELECT word_id, user_id FROM word_states
+                WHERE mastery_level = 'mastered' AND word_id IN ({",".join("?" * len(chunk))})
+            ''', chunk)
+            for word_id, user_id in cursor.fetchall():
+                key = (user_id, levels[word_id])
+                mastered_deltas[key] = mastered_deltas.get(key, 0) - 1
+                if word_id in moved:
+                    key = (user_id, moved[word_id])
+                    mastered_deltas[key] = mastered_deltas.get(key, 0) + 1
+
+        if inserts:
+            cursor.executemany('''
+                INSERT INTO vocabulary
+                (language, english_word, translation, transliteration, word_class, level,
+                 verb_transitivity, origin, source_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', inserts)
+        if updates:
+            cursor.executemany('''
+                UPDATE vocabulary
+                SET english_word = ?, translation = ?, transliteration = ?, word_class = ?,
+                    level = ?, verb_transitivity = ?, origin = ?, source_hash = ?
+                WHERE id = ?
+            ''', updates)
+        if stale_ids:
+            stale_params = [(word_id,) for word_id in stale_ids]
+            # Drop SRS state with the word so no word_states row points at nothing
+            cursor.executemany('DELETE FROM word_states WHERE word_id = ?', stale_params)
+            cursor.executemany('DELETE FROM vocabulary WHERE id = ?', stale_params)
+        if inserts or updates:
+            # Updates dropped their rows' keys (trigger), so this rekeys them too
+            fill_vocabulary_search_keys(cursor, language)
+
+        for path in _vocab_source_files(language):
+            record_manifest(cursor, 'vocab', _manifest_path(path), file_sha256(path), full_path=path)
+        # Forget a user vocab CSV that has been removed
+        if not os.path.exists(user_vocab_file):
+            cursor.execute(
+                'DELETE FROM sync_manifest WHERE source = ? AND path = ?',
+                ('vocab', _manifest_path(user_vocab_file))
+            )
+
+        if inserts or updates or stale_ids:
+            _apply_level_summary_deltas(cursor, language, total_deltas, mastered_deltas)
+            invalidate_review_queue(cursor, language)
+
+        cursor.execute('SELECT COUNT(*) FROM vocabulary WHERE language = ?', (language,))
+        result['db_rows'] = cursor.fetchone()[0]
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error syncing vocabulary for {language}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        conn.close()
+        return result
+    conn.close()
+
+    result['inserted'], result['updated'], result['deleted'] = len(inserts), len(updates), len(stale_ids)
+    print(f"  [VocabSync] {language}: {result['inserted']} inserted, {result['updated']} updated, "
+          f"{result['deleted']} deleted, {result['unchanged']} unchanged")
+
+    if inserts or updates or stale_ids:
+        # Rebuild the search index, words-used matcher and lemma index if already built for this language
+        from . import vocab_search, vocab_matcher, lemma_index
+        vocab_search.refresh(language)
+        vocab_matcher.refresh(language)
+        lemma_index.refresh(language)
+
+    # Ensure lesson words cache table exists (with migration for old schemas)
+    ensure_lesson_words_table()
+
+    return result
+
+
+# ----------------------------------------------------------------------------
+# Utility: lesson words cache table
+# ----------------------------------------------------------------------------
+def ensure_lesson_words_table():
+    """Create the lesson_words cache table if it doesn't exist.
+    
+    Also migrates any existing table that is missing the lesson_id column
+    (older schema) by dropping and recreating it — the table is just a cache
+    and can be safely rebuilt.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # Check whether the table already exists and has the lesson_id column
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='lesson_words'")
+    table_exists = cursor.fetchone() is not None
+
+    if table_exists:
+        cursor.execute("PRAGMA table_info(lesson_words)")
+        columns = {row[1] for row in cursor.fetchall()}
+        if 'lesson_id' not in columns:
+            print("[DB] lesson_words table missing lesson_id column — dropping and recreating")
+            cursor.execute('DROP TABLE IF EXISTS lesson_words')
+            cursor.execute('DROP INDEX IF EXISTS idx_lesson_words_unique')
+            conn.commit()
 
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS lesson_words (
@@ -1112,7 +1512,7 @@ def ensure_lesson_words_table():
 def get_user_profile() -> Dict:
     """Get user profile with streak"""
     try:
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -1126,6 +1526,223 @@ def get_user_profile() -> Dict:
         return {'streak': 0}
 
 
+# Goal-based streak state. A goal day is a day with week-specific weekly_goals
+# rows (the 'default' template doesn't count); it is met when every goal has at
+# least target_count activities of its language and type scored above 0 that
+# day. streak_days keeps each goal day's result and the run of consecutive met
+# goal days ending there, so reading the streak is two index seeks. Triggers
+# mark the days an activity_history or weekly_goals write touches in
+# streak_dirty_days; writers call _refresh_streak_days in their transaction,
+# which re-evaluates those days and carries the runs forward until they stop
+# changing. rebuild_streak_state recomputes everything from history.
+
+_DAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def _streak_day_results(cursor, week_starts: Optional[List[str]] = None) -> Dict[str, bool]:
+    """Goal day (YYYY-MM-DD) -> all goals met, for the weeks in `week_starts` (None: all)"""
+    query = '''
+        SELECT week_start_date, day_of_week, language, activity_type, target_count
+        FROM weekly_goals
+        WHERE week_start_date != 'default'
+    '''
+    goal_rows = []
+    if week_starts is None:
+        cursor.execute(query)
+        goal_rows = cursor.fetchall()
+    for i in range(0, len(week_starts or []), 500):
+        chunk = week_starts[i:i + 500]
+        cursor.execute(query + f' AND week_start_date IN ({",".join("?" * len(chunk))})', chunk)
+        goal_rows += cursor.fetchall()
+    
+    goals = {}  # day -> [(language, activity_type, target_count)]
+    for week_start, day_of_week, language, activity_type, target_count in goal_rows:
+        try:
+            monday = datetime.strptime(week_start, '%Y-%m-%d')
+            day = monday + timedelta(days=_DAY_NAMES.index(day_of_week))
+        except (TypeError, ValueError):
+            continue
+        if monday.weekday() == 0:
+            goals.setdefault(day.strftime('%Y-%m-%d'), []).append((language, activity_type, target_count))
+    if not goals:
+        return {}
+    
+    query = '''
+        SELECT completed_date, language, activity_type, COUNT(*)
+        FROM activity_history
+        WHERE score > 0
+    '''
+    group_by = ' GROUP BY completed_date, language, activity_type'
+    if week_starts is None:
+        cursor.execute(query + group_by)
+        count_rows = cursor.fetchall()
+    else:
+        days = sorted(goals)
+        count_rows = []
+        for i in range(0, len(days), 500):
+            chunk = days[i:i + 500]
+            cursor.execute(query + f' AND completed_date IN ({",".join("?" * len(chunk))})' + group_by, chunk)
+            count_rows += cursor.fetchall()
+    counts = {(row[0], row[1], row[2]): row[3] for row in count_rows}
+    
+    return {
+        day: all(counts.get((day, language, activity_type), 0) >= target_count
+                 for language, activity_type, target_count in day_goals)
+        for day, day_goals in goals.items()
+    }
+
+
+def _carry_streak_runs(cursor, first_day: str, last_day: str, longest_run: int, rescan: bool = False):
+    """Recompute runs from `first_day` on, after the goal days up to `last_day` changed
+
+    `rescan` forces a MAX(run) recount (e.g. a day holding the longest run was deleted).
+    """
+    previous_longest = longest_run
+    cursor.execute('SELECT run FROM streak_days WHERE date < ? ORDER BY date DESC LIMIT 1', (first_day,))
+    row = cursor.fetchone()
+    run = row[0] if row else 0
+    cursor.execute('SELECT date, met, run FROM streak_days WHERE date >= ? ORDER BY date', (first_day,))
+    updates = []
+    for day, met, stored_run in cursor.fetchall():
+        run = run + 1 if met else 0
+        if run == stored_run:
+            if day > last_day:
+                # Every later run follows from this one, so nothing else changes
+                break
+            continue
+        updates.append((run, day))
+        longest_run = max(longest_run, run)
+        rescan = rescan or (run < stored_run and stored_run >= previous_longest)
+    cursor.executemany('UPDATE streak_days SET run = ? WHERE date = ?', updates)
+    if rescan:
+        # The longest run was shortened
+        cursor.execute('SELECT COALESCE(MAX(run), 0) FROM streak_days')
+        longest_run = cursor.fetchone()[0]
+    cursor.execute('UPDATE streak_state SET longest_run = ? WHERE id = 1', (longest_run,))
+
+
+def _refresh_streak_days(cursor):
+    """Re-evaluate the days in streak_dirty_days (call in the writing transaction)"""
+    cursor.execute('SELECT date FROM streak_dirty_days WHERE date IS NOT NULL ORDER BY date')
+    dirty = [row[0] for row in cursor.fetchall()]
+    cursor.execute('SELECT longest_run FROM streak_state WHERE id = 1')
+    state = cursor.fetchone()
+    if state is None:
+        # Not built yet: the first read rebuilds from history
+        return
+    cursor.execute('DELETE FROM streak_dirty_days')
+    if not dirty:
+        return
+    
+    week_starts = set()
+    for day in dirty:
+        try:
+            week_starts.add(get_week_start(datetime.strptime(day, '%Y-%m-%d')).strftime('%Y-%m-%d'))
+        except ValueError:
+            continue
+    results = _streak_day_results(cursor, sorted(week_starts))
+    rescan = False
+    for day in dirty:
+        if day in results:
+            cursor.execute('''
+                INSERT INTO streak_days (date, met, run) VALUES (?, ?, 0)
+                ON CONFLICT(date) DO UPDATE SET met = excluded.met
+            ''', (day, int(results[day])))
+        else:
+            cursor.execute('DELETE FROM streak_days WHERE date = ? RETURNING run', (day,))
+            row = cursor.fetchone()
+            rescan = rescan or (row is not None and row[0] >= state[0])
+    _carry_streak_runs(cursor, dirty[0], dirty[-1], state[0], rescan)
+
+
+def _rebuild_streak_state(cursor) -> int:
+    """Recompute streak_days and streak_state from history; returns the number of days that changed"""
+    cursor.execute('SELECT date, met, run FROM streak_days')
+    before = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    results = _streak_day_results(cursor)
+    rows = []
+    run = longest_run = 0
+    for day in sorted(results):
+        run = run + 1 if results[day] else 0
+        longest_run = max(longest_run, run)
+        rows.append((day, int(results[day]), run))
+    cursor.execute('DELETE FROM streak_days')
+    cursor.execute('DELETE FROM streak_dirty_days')
+    cursor.executemany('INSERT INTO streak_days (date, met, run) VALUES (?, ?, ?)', rows)
+    cursor.execute('''
+        INSERT OR REPLACE INTO streak_state (id, longest_run, rebuilt_at)
+        VALUES (1, ?, ?)
+    ''', (longest_run, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+    after = {day: (met, run) for day, met, run in rows}
+    return sum(before.get(day) != after.get(day) for day in set(before) | set(after))
+
+
+def rebuild_streak_state() -> Dict:
+    """Backfill / repair the streak state from the full goal and activity history
+
+    Returns the number of goal days, how many of them changed and the longest run.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        changed = _rebuild_streak_state(cursor)
+        cursor.execute('SELECT COUNT(*) FROM streak_days')
+        days = cursor.fetchone()[0]
+        cursor.execute('SELECT longest_run FROM streak_state WHERE id = 1')
+        longest_run = cursor.fetchone()[0]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    print(f"[Streak] Rebuilt from history: {days} goal days ({changed} changed), longest run {longest_run}")
+    return {'goal_days': days, 'changed_days': changed, 'longest_run': longest_run}
+
+
+def _ensure_streak_state(conn):
+    """Build the streak state on first use and apply days left dirty by writes outside db.py"""
+    cursor = conn.cursor()
+    cursor.execute('SELECT EXISTS(SELECT 1 FROM streak_state), EXISTS(SELECT 1 FROM streak_dirty_days)')
+    built, dirty = cursor.fetchone()
+    if built and not dirty:
+        return
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute('SELECT 1 FROM streak_state')
+        if cursor.fetchone():
+            _refresh_streak_days(cursor)
+        else:
+            _rebuild_streak_state(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _read_streak(cursor) -> Dict:
+    """The streak as of today from streak_days / streak_state (see _ensure_streak_state)"""
+    today = config.get_current_time().strftime('%Y-%m-%d')
+    cursor.execute('SELECT met, run FROM streak_days WHERE date = ?', (today,))
+    row = cursor.fetchone()
+    if row and row[0]:
+        current_streak, today_complete = row[1], True
+    else:
+        # Today unmet so far (or no goals today): the run up to the last goal day before it
+        today_complete = row is None  # No goals = automatically complete
+        cursor.execute('SELECT run FROM streak_days WHERE date < ? ORDER BY date DESC LIMIT 1', (today,))
+        row = cursor.fetchone()
+        current_streak = row[0] if row else 0
+    cursor.execute('SELECT longest_run FROM streak_state WHERE id = 1')
+    row = cursor.fetchone()
+    return {
+        'current_streak': current_streak,
+        'longest_streak': max(row[0] if row else 0, current_streak),
+        'today_complete': today_complete
+    }
+
+
 def calculate_goal_based_streak(user_id: int = 1) -> Dict[str, int]:
     """Calculate streak based on goal completion
     
@@ -1139,87 +1756,11 @@ def calculate_goal_based_streak(user_id: int = 1) -> Dict[str, int]:
         }
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        today = config.get_current_time().date()
-        
-        # Get the last 365 days of data to calculate streak
-        # We'll check backwards from today to find consecutive days where ALL goals were met
-        current_streak = 0
-        longest_streak = 0
-        temp_streak = 0
-        today_complete = False
-        
-        # Check each day backwards from today
-        for days_ago in range(365):  # Check up to a year back
-            check_date = today - timedelta(days=days_ago)
-            date_str = check_date.strftime('%Y-%m-%d')
-            
-            # Get all goals for this day
-            cursor.execute('''
-                SELECT language, activity_type, target_count
-                FROM weekly_goals
-                WHERE week_start_date = ? AND day_of_week = ?
-            ''', (get_week_start(check_date).strftime('%Y-%m-%d'), check_date.strftime('%A').lower()))
-            
-            goals = cursor.fetchall()
-            
-            # If no goals set for this day, skip it (don't break streak)
-            if not goals:
-                if days_ago == 0:
-                    today_complete = True  # No goals = automatically complete
-                continue
-            
-            # Get progress for this day (count completed activities)
-            all_goals_met = True
-            for goal in goals:
-                cursor.execute('''
-                    SELECT COUNT(*) as count
-                    FROM activity_history
-                    WHERE language = ? 
-                    AND activity_type = ?
-                    AND DATE(completed_at) = ?
-                    AND score > 0
-                ''', (goal['language'], goal['activity_type'], date_str))
-                
-                progress_row = cursor.fetchone()
-                progress_count = progress_row['count'] if progress_row else 0
-                
-                if progress_count < goal['target_count']:
-                    all_goals_met = False
-                    break
-            
-            if all_goals_met:
-                temp_streak += 1
-                if days_ago == 0:
-                    today_complete = True
-                    current_streak = temp_streak
-            else:
-                # Streak broken
-                if days_ago == 0:
-                    today_complete = False
-                    current_streak = 0
-                    temp_streak = 0
-                else:
-                    # We've found the end of the current streak
-                    if temp_streak > current_streak:
-                        current_streak = temp_streak
-                    break
-            
-            # Track longest streak
-            if temp_streak > longest_streak:
-                longest_streak = temp_streak
-        
+        conn = get_connection()
+        _ensure_streak_state(conn)
+        streak = _read_streak(conn.cursor())
         conn.close()
-        
-        return {
-            'current_streak': current_streak,
-            'longest_streak': max(longest_streak, current_streak),
-            'today_complete': today_complete
-        }
-        
+        return streak
     except Exception as e:
         print(f"Error calculating goal-based streak: {str(e)}")
         import traceback
@@ -1232,19 +1773,24 @@ def calculate_goal_based_streak(user_id: int = 1) -> Dict[str, int]:
 
 
 def update_streak():
-    """Legacy function - now replaced by calculate_goal_based_streak()
-    
-    This function is kept for backward compatibility but should not be used.
-    Use calculate_goal_based_streak() instead which calculates streak based on goal completion.
+    """Apply pending streak changes (days marked dirty by activity and goal writes)
+
+    Writers in this module do this in their own transaction; call it after
+    writing activity_history or weekly_goals directly. The streak itself is
+    read with calculate_goal_based_streak().
     """
-    # This function is now deprecated - streak is calculated on-demand from goals
-    pass
+    try:
+        conn = get_connection()
+        _ensure_streak_state(conn)
+        conn.close()
+    except Exception as e:
+        print(f"Error updating streak: {str(e)}")
 
 
 def update_user_profile(name: Optional[str] = None, username: Optional[str] = None, profile_picture_url: Optional[str] = None) -> bool:
     """Update user profile name, username, and/or profile picture"""
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         updates = []
@@ -1282,7 +1828,7 @@ def update_user_profile(name: Optional[str] = None, username: Optional[str] = No
 def get_user_settings(language: str = 'kannada') -> Dict[str, str]:
     """Get all user settings for a specific language"""
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -1307,7 +1853,7 @@ def get_user_settings(language: str = 'kannada') -> Dict[str, str]:
 def update_user_setting(setting_key: str, setting_value: str, language: str = 'kannada') -> bool:
     """Update or insert a user setting for a specific language"""
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -1339,7 +1885,7 @@ def get_srs_settings_for_language(language: str) -> Dict[str, float]:
 def get_language_for_word(word_id: int) -> str:
     """Get the language for a word_id"""
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute('SELECT language FROM vocabulary WHERE id = ?', (word_id,))
@@ -1356,157 +1902,352 @@ def get_language_for_word(word_id: int) -> str:
 # Vocabulary Operations
 # ============================================================================
 
+# Review queue: the day's due reviews (by priority) and the next new cards
+# (by CEFR level), materialized per (user, language) so /api/flashcards and
+# /api/words-for-review are an indexed range read instead of ranking every due
+# card on each call. review_queue_state.queue_date is the day the queue was
+# built for; the first read on a new day rebuilds it. Card updates keep it
+# current through _sync_review_queue_entry.
+
+QUEUE_KIND_REVIEW = 0
+QUEUE_KIND_NEW = 1
+
+CEFR_LEVEL_ORDER = {'a1': 1, 'a2': 2, 'b1': 3, 'b2': 4, 'c1': 5, 'c2': 6}
+
+_REVIEW_COLUMNS = '''
+    v.*,
+    ws.mastery_level as mastery_level,
+    ws.next_review_date as next_review_date,
+    ws.review_count as review_count,
+    ws.ease_factor as ease_factor,
+    ws.last_reviewed as last_reviewed,
+    ws.introduced_date as introduced_date
+'''
+
+_NEW_CARD_COLUMNS = '''
+    v.*,
+    COALESCE(ws.mastery_level, 'new') as mastery_level,
+    COALESCE(ws.next_review_date, '') as next_review_date,
+    COALESCE(ws.review_count, 0) as review_count,
+    COALESCE(ws.ease_factor, ?) as ease_factor,
+    COALESCE(ws.last_reviewed, '') as last_reviewed,
+    COALESCE(ws.introduced_date, '') as introduced_date,
+    CASE v.level
+        WHEN 'a1' THEN 1
+        WHEN 'a2' THEN 2
+        WHEN 'b1' THEN 3
+        WHEN 'b2' THEN 4
+        WHEN 'c1' THEN 5
+        WHEN 'c2' THEN 6
+        ELSE 7
+    END as level_order
+'''
+
+
+def _parse_date(date_str: str):
+    if not date_str:
+        return None
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').date()
+    except Exception:
+        return None
+
+
+def _review_priority(level: str, mastery_level: str, ease_factor, next_review_date: str,
+                     last_reviewed: str, today) -> float:
+    """Priority of a due review card (higher is reviewed first)"""
+    next_review_dt = _parse_date(next_review_date or '')
+    last_review_dt = _parse_date(last_reviewed or '')
+
+    # Priority components
+    overdue_days = 0
+    if next_review_dt and next_review_dt < today:
+        overdue_days = (today - next_review_dt).days
+
+    mastery_boost = {
+        'learning': 4,
+        'review': 3,
+        'mastered': 1,
+    }.get(mastery_level or 'review', 2)
+
+    ease_factor = ease_factor or config.DEFAULT_EASE_FACTOR
+    # Lower ease_factor => higher priority (harder cards)
+    difficulty_boost = max(0.0, 3.5 - float(ease_factor)) * 2
+
+    recency_penalty = 0
+    if last_review_dt and (today - last_review_dt).days < 1:
+        recency_penalty = 1  # slight de-prioritize if reviewed today
+
+    # CEFR level ordering (prefer lower levels: A1 > A2 > B1 > B2 > C1 > C2)
+    # This ensures foundational vocabulary is prioritized when priority is similar
+    level_order = CEFR_LEVEL_ORDER.get((level or '').lower(), 7)
+
+    return (
+        overdue_days * 5          # Most important: overdue reviews
+        + difficulty_boost        # Second: difficult words (low ease factor)
+        + mastery_boost          # Third: learning > review > mastered
+        - level_order * 0.5      # Fourth: prefer lower CEFR levels (A1 > C2)
+        - recency_penalty        # Fifth: slight penalty for same-day reviews
+    )
+
+
+def _fetch_due_reviews(cursor, language: str, user_id: int, today_str: str):
+    # Due reviews, including cards marked for "again" (same day review)
+    cursor.execute(f'''
+        SELECT {_REVIEW_COLUMNS}
+        FROM vocabulary v
+        JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
+        WHERE v.language = ?
+          AND ws.mastery_level != 'new'
+          AND ws.next_review_date IS NOT NULL
+          AND ws.next_review_date <= ?
+    ''', (user_id, language, today_str))
+    return cursor.fetchall()
+
+
+def _fetch_new_cards(cursor, language: str, user_id: int, limit: int):
+    # Order by level first (easiest to hardest), then by ID (insertion order)
+    # Level ordering: a1 < a2 < b1 < b2 < c1 < c2
+    cursor.execute(f'''
+        SELECT {_NEW_CARD_COLUMNS}
+        FROM vocabulary v
+        LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
+        WHERE v.language = ?
+          AND (ws.id IS NULL OR ws.mastery_level = 'new')
+          AND (ws.introduced_date IS NULL OR ws.introduced_date = '')
+        ORDER BY level_order ASC, v.id ASC
+        LIMIT ?
+    ''', (config.DEFAULT_EASE_FACTOR, user_id, language, limit))
+    return cursor.fetchall()
+
+
+def _build_review_queue(cursor, language: str, user_id: int, today, new_depth: int):
+    """(Re)build the queue for `today`: every due review plus the next `new_depth` new cards"""
+    today_str = today.strftime('%Y-%m-%d')
+    entries = []
+    for row in _fetch_due_reviews(cursor, language, user_id, today_str):
+        priority = _review_priority(row['level'], row['mastery_level'], row['ease_factor'],
+                                    row['next_review_date'], row['last_reviewed'], today)
+        entries.append((user_id, language, row['id'], QUEUE_KIND_REVIEW, -priority))
+    new_rows = _fetch_new_cards(cursor, language, user_id, new_depth)
+    for row in new_rows:
+        entries.append((user_id, language, row['id'], QUEUE_KIND_NEW, row['level_order']))
+
+    cursor.execute('DELETE FROM review_queue WHERE user_id = ? AND language = ?', (user_id, language))
+    cursor.executemany('''
+        INSERT INTO review_queue (user_id, language, word_id, kind, sort_key)
+        VALUES (?, ?, ?, ?, ?)
+    ''', entries)
+    cursor.execute('''
+        INSERT INTO review_queue_state (user_id, language, queue_date, new_depth, new_exhausted, built_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(user_id, language) DO UPDATE SET
+            queue_date = excluded.queue_date,
+            new_depth = excluded.new_depth,
+            new_exhausted = excluded.new_exhausted,
+            built_at = excluded.built_at
+    ''', (user_id, language, today_str, new_depth, 1 if len(new_rows) < new_depth else 0))
+    print(f"[ReviewQueue] Built {language} queue for {today_str}: "
+          f"{len(entries) - len(new_rows)} due reviews, {len(new_rows)} new cards")
+
+
+def _ensure_review_queue(conn, language: str, user_id: int, today, new_needed: int = 0):
+    """Make sure the queue is built for `today` and holds at least `new_needed` new cards
+    (or all that are left)"""
+    today_str = today.strftime('%Y-%m-%d')
+    cursor = conn.cursor()
+
+    def usable_state():
+        cursor.execute('''
+            SELECT queue_date, new_exhausted FROM review_queue_state
+            WHERE user_id = ? AND language = ?
+        ''', (user_id, language))
+        state = cursor.fetchone()
+        if not state or state[0] != today_str:
+            return False
+        if state[1] or not new_needed:
+            return True
+        # New cards leave the queue as they are introduced; top up when too few are left
+        cursor.execute('''
+            SELECT COUNT(*) FROM review_queue
+            WHERE user_id = ? AND language = ? AND kind = ?
+        ''', (user_id, language, QUEUE_KIND_NEW))
+        return cursor.fetchone()[0] >= new_needed
+
+    if usable_state():
+        return
+    try:
+        # Re-check under the write lock: a concurrent request may have built it
+        cursor.execute('BEGIN IMMEDIATE')
+        if not usable_state():
+            _build_review_queue(cursor, language, user_id, today,
+                                max(config.REVIEW_QUEUE_NEW_DEPTH, new_needed * 2))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _sync_review_queue_entry(cursor, word_id: int, user_id: int, language: str):
+    """Bring one card's queue entry in line with its word_states row (call after changing it)
+
+    Only touches a queue built for today; an older one is rebuilt on its next read anyway.
+    """
+    _bump_srs_state_version(cursor, language)
+    today = config.get_current_time().date()
+    today_str = today.strftime('%Y-%m-%d')
+    cursor.execute(
+        'SELECT queue_date FROM review_queue_state WHERE user_id = ? AND language = ?',
+        (user_id, language)
+    )
+    state = cursor.fetchone()
+    if not state or state[0] != today_str:
+        return
+
+    cursor.execute('''
+        SELECT v.level, ws.mastery_level, ws.ease_factor, ws.next_review_date, ws.last_reviewed
+        FROM vocabulary v
+        LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
+        WHERE v.id = ?
+    ''', (user_id, word_id))
+    row = cursor.fetchone()
+    if row and row[1] and row[1] != 'new' and row[3] and row[3] <= today_str:
+        priority = _review_priority(row[0], row[1], row[2], row[3], row[4], today)
+        cursor.execute('''
+            INSERT INTO review_queue (user_id, language, word_id, kind, sort_key)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, language, word_id) DO UPDATE SET
+                kind = excluded.kind,
+                sort_key = excluded.sort_key
+        ''', (user_id, language, word_id, QUEUE_KIND_REVIEW, -priority))
+    elif row and (row[1] is None or row[1] == 'new'):
+        # Still a new card: it keeps its place among the new cards
+        return
+    else:
+        cursor.execute(
+            'DELETE FROM review_queue WHERE user_id = ? AND language = ? AND word_id = ?',
+            (user_id, language, word_id)
+        )
+
+
+def invalidate_review_queue(cursor, language: str):
+    """Have the review queues of `language` rebuilt on next read (after bulk changes)"""
+    _bump_srs_state_version(cursor, language)
+    cursor.execute('DELETE FROM review_queue_state WHERE language = ?', (language,))
+
+
+def _bump_srs_state_version(cursor, language: str):
+    """Mark the card states of `language` as changed
+
+    Every word_states change goes through _sync_review_queue_entry or
+    invalidate_review_queue, which call this.
+    """
+    cursor.execute('''
+        INSERT INTO srs_state_versions (language, version) VALUES (?, 1)
+        ON CONFLICT(language) DO UPDATE SET version = version + 1
+    ''', (language,))
+
+
+def get_srs_state_version(language: str) -> int:
+    """Counter that changes whenever a card state of `language` changes"""
+    conn = get_connection()
+    try:
+        row = conn.execute('SELECT version FROM srs_state_versions WHERE language = ?', (language,)).fetchone()
+        return row[0] if row else 0
+    finally:
+        conn.close()
+
+
+def _read_review_queue(cursor, language: str, user_id: int, kind: int, limit: int) -> List[Dict]:
+    if limit <= 0:
+        return []
+    columns = _REVIEW_COLUMNS if kind == QUEUE_KIND_REVIEW else _NEW_CARD_COLUMNS
+    params = (user_id, user_id, language, kind, limit)
+    if kind == QUEUE_KIND_NEW:
+        params = (config.DEFAULT_EASE_FACTOR,) + params
+    cursor.execute(f'''
+        SELECT {columns}
+        FROM review_queue q
+        JOIN vocabulary v ON v.id = q.word_id
+        LEFT JOIN word_states ws ON ws.word_id = q.word_id AND ws.user_id = ?
+        WHERE q.user_id = ? AND q.language = ? AND q.kind = ?
+        ORDER BY q.sort_key ASC, q.word_id ASC
+        LIMIT ?
+    ''', params)
+    return [dict(row) for row in cursor.fetchall()]
+
+
 def get_words_for_review(language: str, limit: int = 10, user_id: int = 1) -> List[Dict]:
     """Get words for flashcard review based on SRS algorithm and daily quota.
-    
+
     Returns:
     - Due reviews (next_review_date <= today) - unlimited, prioritized by overdue
     - New cards - loads generously to ensure continuous learning
-    
+
     Strategy:
     - Prioritize overdue reviews (critical for retention)
     - Include new cards (not overly restricted by quota to keep learning flowing)
     - Return enough cards for sustained practice
-    """
-    conn = sqlite3.connect(config.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
 
+    With REVIEW_QUEUE_ENABLED this reads the materialized review queue;
+    otherwise every due card is ranked on the spot.
+    """
     today = config.get_current_time().date()
     today_str = today.strftime('%Y-%m-%d')
-    
+
     # Get today's quota to track progress (but don't strictly limit)
     quota = get_daily_quota(language, today_str, user_id)
     new_cards_completed = quota['new_cards_completed']
     new_cards_quota = quota['new_cards_quota']
-    
+
     # Calculate how many new cards to include in this batch
     # IMPORTANT: Frontend creates 2 flashcards per word (bidirectional testing)
     # So if quota is 10, we need at least 10 words to make 20 cards
     # Be generous: allow 3x quota to ensure continuous learning with bidirectional cards
     new_cards_remaining = max(10, (new_cards_quota * 3) - new_cards_completed)
-    
-    # Fetch DUE reviews (including cards marked for "again" - same day review)
-    cursor.execute('''
-        SELECT v.*, 
-               ws.mastery_level as mastery_level,
-               ws.next_review_date as next_review_date,
-               ws.review_count as review_count,
-               ws.ease_factor as ease_factor,
-               ws.last_reviewed as last_reviewed,
-               ws.introduced_date as introduced_date
-        FROM vocabulary v
-        JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
-        WHERE v.language = ?
-          AND ws.mastery_level != 'new'
-          AND ws.next_review_date IS NOT NULL
-          AND ws.next_review_date <= ?
-    ''', (user_id, language, today_str))
 
-    review_rows = cursor.fetchall()
-    
-    # Fetch NEW cards (not yet introduced) if we have quota remaining
-    new_rows = []
-    if new_cards_remaining > 0:
-        # Order by level first (easiest to hardest), then by ID (insertion order)
-        # Level ordering: a1 < a2 < b1 < b2 < c1 < c2
-        cursor.execute('''
-            SELECT v.*, 
-                   COALESCE(ws.mastery_level, 'new') as mastery_level,
-                   COALESCE(ws.next_review_date, '') as next_review_date,
-                   COALESCE(ws.review_count, 0) as review_count,
-                   COALESCE(ws.ease_factor, ?) as ease_factor,
-                   COALESCE(ws.last_reviewed, '') as last_reviewed,
-                   COALESCE(ws.introduced_date, '') as introduced_date,
-                   CASE v.level
-                       WHEN 'a1' THEN 1
-                       WHEN 'a2' THEN 2
-                       WHEN 'b1' THEN 3
-                       WHEN 'b2' THEN 4
-                       WHEN 'c1' THEN 5
-                       WHEN 'c2' THEN 6
-                       ELSE 7
-                   END as level_order
-            FROM vocabulary v
-            LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
-            WHERE v.language = ?
-              AND (ws.id IS NULL OR ws.mastery_level = 'new')
-              AND (ws.introduced_date IS NULL OR ws.introduced_date = '')
-            ORDER BY level_order ASC, v.id ASC
-            LIMIT ?
-        ''', (config.DEFAULT_EASE_FACTOR, user_id, language, new_cards_remaining))
-        
-        new_rows = cursor.fetchall()
-    
-    conn.close()
-
-    def parse_date(date_str: str):
-        if not date_str:
-            return None
-        try:
-            return datetime.strptime(date_str, '%Y-%m-%d').date()
-        except Exception:
-            return None
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    try:
+        if config.REVIEW_QUEUE_ENABLED:
+            _ensure_review_queue(conn, language, user_id, today, min(new_cards_remaining, limit))
+            reviews = _read_review_queue(cursor, language, user_id, QUEUE_KIND_REVIEW, limit)
+            new_cards = _read_review_queue(cursor, language, user_id, QUEUE_KIND_NEW,
+                                           min(new_cards_remaining, limit - len(reviews)))
+            return reviews + new_cards
+
+        review_rows = _fetch_due_reviews(cursor, language, user_id, today_str)
+        # Fetch NEW cards (not yet introduced) if we have quota remaining
+        new_rows = _fetch_new_cards(cursor, language, user_id, new_cards_remaining) if new_cards_remaining > 0 else []
+    finally:
+        conn.close()
 
     # Prioritize review cards
     review_candidates = []
     for row in review_rows:
         row_dict = dict(row)
-        next_review_dt = parse_date(row_dict.get('next_review_date') or '')
-        last_review_dt = parse_date(row_dict.get('last_reviewed') or '')
-
-        # Priority components
-        overdue_days = 0
-        if next_review_dt and next_review_dt < today:
-            overdue_days = (today - next_review_dt).days
-
-        mastery_level = row_dict.get('mastery_level', 'review')
-        mastery_boost = {
-            'learning': 4,
-            'review': 3,
-            'mastered': 1,
-        }.get(mastery_level, 2)
-
-        ease_factor = row_dict.get('ease_factor') or config.DEFAULT_EASE_FACTOR
-        # Lower ease_factor => higher priority (harder cards)
-        difficulty_boost = max(0.0, 3.5 - float(ease_factor)) * 2
-
-        recency_penalty = 0
-        if last_review_dt and (today - last_review_dt).days < 1:
-            recency_penalty = 1  # slight de-prioritize if reviewed today
-
-        # CEFR level ordering (prefer lower levels: A1 > A2 > B1 > B2 > C1 > C2)
-        # This ensures foundational vocabulary is prioritized when priority is similar
-        level_order = {
-            'a1': 1, 'a2': 2, 'b1': 3, 'b2': 4, 'c1': 5, 'c2': 6
-        }.get((row_dict.get('level') or '').lower(), 7)
-
-        priority = (
-            overdue_days * 5          # Most important: overdue reviews
-            + difficulty_boost        # Second: difficult words (low ease factor)
-            + mastery_boost          # Third: learning > review > mastered
-            - level_order * 0.5      # Fourth: prefer lower CEFR levels (A1 > C2)
-            - recency_penalty        # Fifth: slight penalty for same-day reviews
-        )
-
+        priority = _review_priority(row_dict.get('level'), row_dict.get('mastery_level'),
+                                    row_dict.get('ease_factor'), row_dict.get('next_review_date'),
+                                    row_dict.get('last_reviewed'), today)
         review_candidates.append((priority, row_dict))
 
     # Sort reviews by priority descending (highest priority first)
     review_candidates.sort(key=lambda x: x[0], reverse=True)
-    
+
     # Combine: prioritized reviews + new cards
     prioritized = [c[1] for c in review_candidates]
-    
+
     # Add new cards (already limited by quota)
     for row in new_rows:
         prioritized.append(dict(row))
-    
+
     return prioritized[:limit]
 
 
 def get_words_for_review_only(language: str, limit: int = 50, user_id: int = 1) -> List[Dict]:
     """Get only DUE review words (no new words). Used when user selects 'Reviews' mode."""
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
@@ -1538,39 +2279,16 @@ def get_words_for_review_only(language: str, limit: int = 50, user_id: int = 1)
 
 def get_new_words_only(language: str, limit: int = 50, user_id: int = 1) -> List[Dict]:
     """Get only NEW words (not yet introduced). Used when user selects 'New Words' mode."""
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT v.*, 
-               COALESCE(ws.mastery_level, 'new') as mastery_level,
-               COALESCE(ws.next_review_date, '') as next_review_date,
-               COALESCE(ws.review_count, 0) as review_count,
-               COALESCE(ws.ease_factor, ?) as ease_factor,
-               COALESCE(ws.last_reviewed, '') as last_reviewed,
-               COALESCE(ws.introduced_date, '') as introduced_date,
-               CASE v.level
-                   WHEN 'a1' THEN 1
-                   WHEN 'a2' THEN 2
-                   WHEN 'b1' THEN 3
-                   WHEN 'b2' THEN 4
-                   WHEN 'c1' THEN 5
-                   WHEN 'c2' THEN 6
-                   ELSE 7
-               END as level_order
-        FROM vocabulary v
-        LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
-        WHERE v.language = ?
-          AND (ws.id IS NULL OR ws.mastery_level = 'new')
-          AND (ws.introduced_date IS NULL OR ws.introduced_date = '')
-        ORDER BY level_order ASC, v.id ASC
-        LIMIT ?
-    ''', (config.DEFAULT_EASE_FACTOR, user_id, language, limit))
-
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    try:
+        if config.REVIEW_QUEUE_ENABLED:
+            _ensure_review_queue(conn, language, user_id, config.get_current_time().date(), limit)
+            return _read_review_queue(cursor, language, user_id, QUEUE_KIND_NEW, limit)
+        return [dict(row) for row in _fetch_new_cards(cursor, language, user_id, limit)]
+    finally:
+        conn.close()
 
 
 # ============================================================================
@@ -1580,7 +2298,7 @@ def get_new_words_only(language: str, limit: int = 50, user_id: int = 1) -> List
 def get_srs_settings(language: str, user_id: int = 1) -> Dict:
     """Get SRS settings for a language (or defaults if not set)"""
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -1632,7 +2350,7 @@ def update_srs_settings(language: str, new_cards_per_day: int, reviews_per_day:
         if reviews_per_day < min_reviews:
             return False
         
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Update or insert settings
@@ -1667,7 +2385,7 @@ def _recalculate_daily_quotas(language: str, user_id: int = 1):
         today = config.get_current_time().date()
         
         # Calculate quotas for next 7 days
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         for i in range(7):
@@ -1734,7 +2452,7 @@ def sync_srs_quotas_from_weekly_goals(language: str, week_start_date: str = None
         else:
             week_start = datetime.strptime(week_start_date, '%Y-%m-%d')
         
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         day_names = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
@@ -1812,13 +2530,23 @@ def sync_all_languages_srs_quotas(week_start_date: str = None, user_id: int = 1)
         return False
 
 
+def _daily_quota_from_row(row) -> Dict:
+    return {
+        'date': row['date'],
+        'new_cards_quota': row['new_cards_quota'],
+        'new_cards_completed': row['new_cards_completed'],
+        'reviews_quota': row['reviews_quota'],
+        'reviews_completed': row['reviews_completed'],
+    }
+
+
 def get_daily_quota(language: str, date: str = None, user_id: int = 1) -> Dict:
     """Get daily quota for a specific date (defaults to today)"""
     try:
         if date is None:
             date = config.get_current_date_str()
         
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -1831,13 +2559,7 @@ def get_daily_quota(language: str, date: str = None, user_id: int = 1) -> Dict:
         conn.close()
         
         if row:
-            return {
-                'date': row['date'],
-                'new_cards_quota': row['new_cards_quota'],
-                'new_cards_completed': row['new_cards_completed'],
-                'reviews_quota': row['reviews_quota'],
-                'reviews_completed': row['reviews_completed'],
-            }
+            return _daily_quota_from_row(row)
         else:
             # Create quota for this date
             _recalculate_daily_quotas(language, user_id)
@@ -1860,7 +2582,7 @@ def increment_daily_quota(language: str, is_new_card: bool, user_id: int = 1):
     try:
         date = config.get_current_date_str()
         
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         if is_new_card:
@@ -1882,74 +2604,78 @@ def increment_daily_quota(language: str, is_new_card: bool, user_id: int = 1):
         print(f"Error incrementing daily quota: {str(e)}")
 
 
+def _get_srs_stats(cursor, language: str, user_id: int, quota: Dict) -> Dict:
+    """get_srs_stats on an open cursor (row_factory sqlite3.Row), given today's quota"""
+    today = config.get_current_date_str()
+    
+    # Count words by mastery level
+    cursor.execute('''
+        SELECT 
+            COALESCE(ws.mastery_level, 'new') as mastery_level,
+            COUNT(*) as count
+        FROM vocabulary v
+        LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
+        WHERE v.language = ?
+        GROUP BY COALESCE(ws.mastery_level, 'new')
+    ''', (user_id, language))
+    
+    mastery_counts = {row['mastery_level']: row['count'] for row in cursor.fetchall()}
+    
+    # Count due reviews (next_review_date <= today)
+    cursor.execute('''
+        SELECT COUNT(*) as count
+        FROM vocabulary v
+        JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
+        WHERE v.language = ?
+          AND ws.next_review_date IS NOT NULL
+          AND ws.next_review_date <= ?
+          AND ws.mastery_level != 'new'
+    ''', (user_id, language, today))
+    
+    due_count = cursor.fetchone()['count']
+    
+    # Count new cards available (not yet introduced)
+    cursor.execute('''
+        SELECT COUNT(*) as count
+        FROM vocabulary v
+        LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
+        WHERE v.language = ?
+          AND (ws.id IS NULL OR ws.mastery_level = 'new')
+          AND (ws.introduced_date IS NULL OR ws.introduced_date = '')
+    ''', (user_id, language))
+    
+    total_new = cursor.fetchone()['count']
+    
+    # Calculate new cards available today
+    new_available_today = max(0, quota['new_cards_quota'] - quota['new_cards_completed'])
+    new_available_today = min(new_available_today, total_new)
+    
+    return {
+        'due_count': due_count,
+        'new_count': new_available_today,
+        'total_new': total_new,
+        'total_learning': mastery_counts.get('learning', 0),
+        'total_review': mastery_counts.get('review', 0),
+        'total_mastered': mastery_counts.get('mastered', 0),
+        'today_new_completed': quota['new_cards_completed'],
+        'today_reviews_completed': quota['reviews_completed'],
+        'today_new_quota': quota['new_cards_quota'],
+        'today_reviews_quota': quota['reviews_quota'],
+    }
+
+
 def get_srs_stats(language: str, user_id: int = 1) -> Dict:
     """Get comprehensive SRS stats for a language"""
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        # Today's quota (created on first use, so before the read)
+        quota = get_daily_quota(language, config.get_current_date_str(), user_id)
+        
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
-        
-        today = config.get_current_date_str()
-        
-        # Count words by mastery level
-        cursor.execute('''
-            SELECT 
-                COALESCE(ws.mastery_level, 'new') as mastery_level,
-                COUNT(*) as count
-            FROM vocabulary v
-            LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
-            WHERE v.language = ?
-            GROUP BY COALESCE(ws.mastery_level, 'new')
-        ''', (user_id, language))
-        
-        mastery_counts = {row['mastery_level']: row['count'] for row in cursor.fetchall()}
-        
-        # Count due reviews (next_review_date <= today)
-        cursor.execute('''
-            SELECT COUNT(*) as count
-            FROM vocabulary v
-            JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
-            WHERE v.language = ?
-              AND ws.next_review_date IS NOT NULL
-              AND ws.next_review_date <= ?
-              AND ws.mastery_level != 'new'
-        ''', (user_id, language, today))
-        
-        due_count = cursor.fetchone()['count']
-        
-        # Get today's quota
-        quota = get_daily_quota(language, today, user_id)
-        
-        # Count new cards available (not yet introduced)
-        cursor.execute('''
-            SELECT COUNT(*) as count
-            FROM vocabulary v
-            LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
-            WHERE v.language = ?
-              AND (ws.id IS NULL OR ws.mastery_level = 'new')
-              AND (ws.introduced_date IS NULL OR ws.introduced_date = '')
-        ''', (user_id, language))
-        
-        total_new = cursor.fetchone()['count']
-        
+        stats = _get_srs_stats(cursor, language, user_id, quota)
         conn.close()
-        
-        # Calculate new cards available today
-        new_available_today = max(0, quota['new_cards_quota'] - quota['new_cards_completed'])
-        new_available_today = min(new_available_today, total_new)
-        
-        return {
-            'due_count': due_count,
-            'new_count': new_available_today,
-            'total_new': total_new,
-            'total_learning': mastery_counts.get('learning', 0),
-            'total_review': mastery_counts.get('review', 0),
-            'total_mastered': mastery_counts.get('mastered', 0),
-            'today_new_completed': quota['new_cards_completed'],
-            'today_reviews_completed': quota['reviews_completed'],
-            'today_new_quota': quota['new_cards_quota'],
-            'today_reviews_quota': quota['reviews_quota'],
-        }
+        return stats
     except Exception as e:
         print(f"Error getting SRS stats: {str(e)}")
         import traceback
@@ -1979,7 +2705,7 @@ def check_and_log_flashcard_completion(language: str, user_id: int = 1) -> bool:
     try:
         from datetime import datetime, timedelta
         
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -2047,6 +2773,7 @@ def check_and_log_flashcard_completion(language: str, user_id: int = 1) -> bool:
             VALUES (?, ?, 'flashcards', ?, 1)
         ''', (user_id, language, today))
         
+        _refresh_streak_days(cursor)
         conn.commit()
         conn.close()
         
@@ -2070,7 +2797,7 @@ def get_words_for_activity(language: str, limit: int = 10, learned_limit: int =
         learning_limit: Number of learning/review words to randomly select
     """
     import random
-    conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+    conn = get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -2138,6 +2865,40 @@ def get_words_for_activity(language: str, limit: int = 10, learned_limit: int =
         return []
 
 
+def levenshtein_within(s1: str, s2: str, max_dist: int) -> int:
+    """Levenshtein distance between two strings, bounded by max_dist
+    
+    Returns the exact distance if it is <= max_dist, otherwise max_dist + 1.
+    Gives up as soon as every cell in a row exceeds the bound, so comparing
+    very different strings is cheap.
+    """
+    if s1 == s2:
+        return 0
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if len(s1) - len(s2) > max_dist:
+        return max_dist + 1
+    if not s2:
+        return len(s1)
+    
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        row_min = i + 1
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            cell = min(insertions, deletions, substitutions)
+            current_row.append(cell)
+            if cell < row_min:
+                row_min = cell
+        if row_min > max_dist:
+            return max_dist + 1
+        previous_row = current_row
+    return previous_row[-1] if previous_row[-1] <= max_dist else max_dist + 1
+
+
 def calculate_similarity_score(search: str, word: str, field_type: str = 'transliteration') -> float:
     """Calculate similarity score between search query and word
     Returns a score from 0.0 to 1.0, where 1.0 is a perfect match
@@ -2205,44 +2966,47 @@ def calculate_similarity_score(search: str, word: str, field_type: str = 'transl
             best_score = max(best_score, score)
             continue
         
-        # Calculate edit distance (Levenshtein) for fuzzy matching
-        # Simple Levenshtein distance implementation
-        def levenshtein_distance(s1: str, s2: str) -> int:
-            if len(s1) < len(s2):
-                return levenshtein_distance(s2, s1)
-            if len(s2) == 0:
-                return len(s1)
-            
-            previous_row = range(len(s2) + 1)
-            for i, c1 in enumerate(s1):
-                current_row = [i + 1]
-                for j, c2 in enumerate(s2):
-                    insertions = previous_row[j + 1] + 1
-                    deletions = current_row[j] + 1
-                    substitutions = previous_row[j] + (c1 != c2)
-                    current_row.append(min(insertions, deletions, substitutions))
-                previous_row = current_row
-            return previous_row[-1]
-        
-        # Normalize edit distance to similarity score
+        # Edit distance (Levenshtein) for fuzzy matching. Anything more than
+        # 50% different used to get a 0.3x penalty that always pushed it below
+        # the 0.2 floor, so distances past max_len // 2 don't need computing.
         max_len = max(len(search_lower), len(word_lower))
         if max_len > 0:
-            edit_dist = levenshtein_distance(search_lower, word_lower)
-            # Convert distance to similarity (0 = identical, max_len = completely different)
-            similarity = 1.0 - (edit_dist / max_len)
-            
-            # Apply penalty for longer distances relative to word length
-            # Shorter words should match more strictly
-            if edit_dist > max_len * 0.5:  # More than 50% different
-                similarity *= 0.3  # Heavy penalty
-            
-            # Cap minimum similarity for very different words
-            if similarity >= 0.2:
+            max_dist = max_len // 2
+            edit_dist = levenshtein_within(search_lower, word_lower, max_dist)
+            if edit_dist <= max_dist:
+                # Convert distance to similarity (0 = identical, max_len = completely different)
+                similarity = 1.0 - (edit_dist / max_len)
                 best_score = max(best_score, similarity)
     
     return best_score
 
 
+# IAST diacritics and their base forms, used by normalize_iast_diacritics()
+# (and by the vocabulary_fts triggers, see vocab_fts.py)
+IAST_DIACRITIC_MAP = {
+    # Long vowels
+    'ā': 'a', 'ē': 'e', 'ī': 'i', 'ō': 'o', 'ū': 'u',
+    # R and L variants
+    'ṛ': 'r', 'ṝ': 'r', 'ḷ': 'l', 'ḹ': 'l',
+    # M variants
+    'ṃ': 'm', 'ṁ': 'm',  # Both map to 'm' for normalization
+    # Consonants with diacritics
+    'ṇ': 'n', 'ṭ': 't', 'ḍ': 'd', 'ṣ': 's', 'ś': 's',
+    # Visarga
+    'ḥ': '',
+}
+
+# Common romanization digraphs (double vowels → single), applied after the
+# diacritics so "aa" matches "ā" (which becomes "a" after normalization)
+ROMANIZATION_DIGRAPHS = {
+    'aa': 'a',
+    'ee': 'e',
+    'ii': 'i',
+    'oo': 'o',
+    'uu': 'u',
+}
+
+
 def normalize_iast_diacritics(text: str) -> str:
     """Remove IAST diacritics for fuzzy search
     Converts: ā, ē, ī, ō, ū → a, e, i, o, u
@@ -2258,101 +3022,133 @@ def normalize_iast_diacritics(text: str) -> str:
     if not text:
         return text
     
-    # Map of diacritic characters to their base forms
-    diacritic_map = {
-        # Long vowels
-        'ā': 'a', 'ē': 'e', 'ī': 'i', 'ō': 'o', 'ū': 'u',
-        # R and L variants
-        'ṛ': 'r', 'ṝ': 'r', 'ḷ': 'l', 'ḹ': 'l',
-        # M variants
-        'ṃ': 'm', 'ṁ': 'm',  # Both map to 'm' for normalization
-        # Consonants with diacritics
-        'ṇ': 'n', 'ṭ': 't', 'ḍ': 'd', 'ṣ': 's', 'ś': 's',
-        # Visarga
-        'ḥ': '',
-    }
-    
     normalized = text.lower()
     
     # First, normalize IAST diacritics to base forms
-    for diacritic, base in diacritic_map.items():
+    for diacritic, base in IAST_DIACRITIC_MAP.items():
         normalized = normalized.replace(diacritic, base)
     
-    # Then, handle common romanization digraphs (double vowels → single)
-    # This allows "aa" to match "ā" (which becomes "a" after normalization)
-    # Order matters: replace longer patterns first
-    romanization_map = {
-        'aa': 'a',
-        'ee': 'e', 
-        'ii': 'i',
-        'oo': 'o',
-        'uu': 'u',
-    }
-    
-    for romanized, normalized_form in romanization_map.items():
+    # Then, collapse romanization digraphs
+    for romanized, normalized_form in ROMANIZATION_DIGRAPHS.items():
         normalized = normalized.replace(romanized, normalized_form)
     
     return normalized
 
 
-def get_vocabulary(
-    language: str, 
-    search: str = '', 
-    mastery_filter: str = '',
-    word_class_filter: str = '',
-    level_filter: str = '',
-    limit: int = 50,
-    offset: int = 0
-) -> tuple:
-    """Get vocabulary with optional search and filters, returns words and total count"""
-    conn = sqlite3.connect(config.DB_PATH)
-    conn.row_factory = sqlite3.Row
+# ============================================================================
+# Vocabulary search keys
+# ============================================================================
+# vocabulary_search_keys (migrations._m011_vocabulary_search_keys) holds one
+# row per " /"-separated variant of english_word, translation and
+# transliteration, normalized by search_key(), so equality and prefix lookups
+# are served by its (language, field, key) primary key instead of
+# LOWER(...) LIKE scans plus re-normalizing every candidate in Python.
+# Triggers drop a word's keys when it is deleted or its text changes;
+# fill_vocabulary_search_keys() writes keys for rows that have none.
+
+SEARCH_KEY_FIELDS = ('english', 'translation', 'transliteration')
+
+
+def search_key(field: str, text: str) -> str:
+    """Normalized form of one variant of a vocabulary field, as stored in vocabulary_search_keys
+
+    english: lowercased, accents stripped (café -> cafe)
+    translation: NFC, lowercased
+    transliteration: normalize_iast_diacritics (rāsāyana -> rasayana)
+    """
+    text = unicodedata.normalize('NFC', (text or '').strip())
+    if field == 'transliteration':
+        return normalize_iast_diacritics(text)
+    if field == 'english':
+        decomposed = unicodedata.normalize('NFKD', text.lower())
+        return ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return text.lower()
+
+
+def search_keys(field: str, text: str) -> List[str]:
+    """Distinct non-empty keys of the " /"-separated variants of a field"""
+    keys = []
+    for variant in (text or '').split(' /'):
+        key = search_key(field, variant)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def _write_vocabulary_search_keys(cursor, rows) -> int:
+    """Insert the search keys of (id, language, english_word, translation, transliteration) rows"""
+    values = []
+    for word_id, language, english_word, translation, transliteration in rows:
+        for field, text in zip(SEARCH_KEY_FIELDS, (english_word, translation, transliteration)):
+            values.extend((language, field, key, word_id) for key in search_keys(field, text))
+    cursor.executemany('''
+        INSERT OR IGNORE INTO vocabulary_search_keys (language, field, key, word_id)
+        VALUES (?, ?, ?, ?)
+    ''', values)
+    return len(values)
+
+
+def fill_vocabulary_search_keys(cursor, language: Optional[str] = None) -> int:
+    """Write search keys for vocabulary rows (of one language, or all) that have none
+
+    Covers rows inserted or updated by the CSV sync and by scripts that write
+    to vocabulary directly; returns the number of rows keyed.
+    """
+    query = '''
+        SELECT v.id, v.language, v.english_word, v.translation, v.transliteration
+        FROM vocabulary v
+        WHERE v.id NOT IN (SELECT word_id FROM vocabulary_search_keys)
+    '''
+    params = []
+    if language:
+        query += ' AND v.language = ?'
+        params.append(language)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    if rows:
+        _write_vocabulary_search_keys(cursor, rows)
+    return len(rows)
+
+
+def find_word_ids_by_key(language: str, field: str, text: str, prefix: bool = False) -> List[int]:
+    """Ids of the words with a `field` variant equal to (or, with prefix, starting with) `text`
+
+    Both sides are compared as search_key()s, so the lookup is a range scan of
+    the vocabulary_search_keys primary key.
+    """
+    key = search_key(field, text)
+    if not key:
+        return []
+    conn = get_connection()
     cursor = conn.cursor()
+    if prefix:
+        # Every key starting with `key` sorts between it and key + U+10FFFF
+        cursor.execute('''
+            SELECT DISTINCT word_id FROM vocabulary_search_keys
+            WHERE language = ? AND field = ? AND key >= ? AND key < ?
+            ORDER BY word_id
+        ''', (language, field, key, key + '\U0010ffff'))
+    else:
+        cursor.execute('''
+            SELECT word_id FROM vocabulary_search_keys
+            WHERE language = ? AND field = ? AND key = ?
+            ORDER BY word_id
+        ''', (language, field, key))
+    word_ids = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return word_ids
+
+
+def _vocabulary_filter_clause(mastery_filter: str, word_class_filter: str, level_filter: str) -> tuple:
+    """Build the mastery / word class / level part of a vocabulary WHERE clause
     
-    # Base WHERE clause
-    where_clause = 'WHERE v.language = ?'
-    params = [language]
+    Expects the query to alias vocabulary as v and the user's word_states as ws.
     
-    if search:
-        # Normalize search query (remove diacritics for fuzzy matching)
-        try:
-            normalized_search = normalize_iast_diacritics(search)
-            normalized_search_term = f'%{normalized_search}%'
-        except Exception as e:
-            print(f"Error normalizing search '{search}': {e}")
-            normalized_search = search
-            normalized_search_term = f'%{search}%'
-        
-        # Search is case-insensitive and works with:
-        # 1. English word (exact match)
-        # 2. Kannada text (exact match)
-        # 3. Transliteration (exact match)
-        # 4. Normalized transliteration (fuzzy match - ignores diacritics)
-        # For fuzzy matching, we fetch a broader set of candidates based on:
-        # - Exact matches in English, Kannada, or transliteration
-        # - Matches in transliteration that might match after normalization
-        # Then we filter in Python by normalizing transliterations
-        search_term = f'%{search}%'
-        normalized_search_term = f'%{normalized_search}%'
-        
-        # Broader query: check if search appears in any field
-        # We'll do fuzzy matching in Python after fetching candidates
-        # For SQL, fetch candidates that might match after normalization
-        # Check both original search and normalized search, and also check for significant substrings
-        # Extract significant parts (3+ chars) from search for substring matching
-        significant_parts = [search[i:i+3] for i in range(len(search)-2)] if len(search) >= 3 else [search]
-        part_conditions = ' OR '.join(['LOWER(v.transliteration) LIKE LOWER(?)' for _ in significant_parts])
-        part_params = [f'%{part}%' for part in significant_parts]
-        
-        where_clause += f''' AND (
-            LOWER(v.english_word) LIKE LOWER(?) 
-            OR v.translation LIKE ? 
-            OR LOWER(v.transliteration) LIKE LOWER(?)
-            OR LOWER(v.english_word) LIKE LOWER(?)
-            OR {part_conditions}
-        )'''
-        # Use search term and normalized search, plus significant parts
-        params.extend([search_term, search_term, search_term, search_term] + part_params)
+    Returns:
+        Tuple of (' AND ...' SQL fragment, list of parameters)
+    """
+    clause = ''
+    params = []
     
     if mastery_filter:
         # Handle multiple mastery filters (comma-separated or multiple values)
@@ -2363,32 +3159,142 @@ def get_vocabulary(
                 mastery_values = [v for v in mastery_values if v != 'due']
                 if mastery_values:
                     # Both 'due' and other values
-                    where_clause += ' AND ((ws.next_review_date IS NOT NULL AND ws.next_review_date <= ?) OR COALESCE(ws.mastery_level, "new") IN (' + ','.join(['?' for _ in mastery_values]) + '))'
+                    clause += ' AND ((ws.next_review_date IS NOT NULL AND ws.next_review_date <= ?) OR COALESCE(ws.mastery_level, "new") IN (' + ','.join(['?' for _ in mastery_values]) + '))'
                     params.append(datetime.now().strftime('%Y-%m-%d'))
                     params.extend(mastery_values)
                 else:
                     # Only 'due' - words that have been reviewed and are due today or earlier
-                    where_clause += ' AND ws.next_review_date IS NOT NULL AND ws.next_review_date <= ?'
+                    clause += ' AND ws.next_review_date IS NOT NULL AND ws.next_review_date <= ?'
                     params.append(datetime.now().strftime('%Y-%m-%d'))
             else:
                 # Only specific mastery levels
-                where_clause += ' AND COALESCE(ws.mastery_level, "new") IN (' + ','.join(['?' for _ in mastery_values]) + ')'
+                clause += ' AND COALESCE(ws.mastery_level, "new") IN (' + ','.join(['?' for _ in mastery_values]) + ')'
                 params.extend(mastery_values)
     
     if word_class_filter:
         # Handle multiple word class filters (comma-separated)
         word_class_values = [f.strip() for f in word_class_filter.split(',') if f.strip()]
         if word_class_values:
-            where_clause += ' AND LOWER(v.word_class) IN (' + ','.join(['LOWER(?)' for _ in word_class_values]) + ')'
+            clause += ' AND LOWER(v.word_class) IN (' + ','.join(['LOWER(?)' for _ in word_class_values]) + ')'
             params.extend(word_class_values)
     
     if level_filter:
         # Handle multiple level filters (comma-separated)
         level_values = [f.strip().lower() for f in level_filter.split(',') if f.strip()]
         if level_values:
-            where_clause += ' AND v.level IN (' + ','.join(['?' for _ in level_values]) + ')'
+            clause += ' AND v.level IN (' + ','.join(['?' for _ in level_values]) + ')'
             params.extend(level_values)
     
+    return clause, params
+
+
+# Match tiers of _search_key_matches, best first
+MATCH_EXACT, MATCH_PREFIX, MATCH_CONTAINS = 0, 1, 2
+
+
+def _search_key_matches(cursor, language: str, search: str) -> Dict[int, int]:
+    """The `language` words matching a get_vocabulary search, from vocabulary_search_keys
+    
+    Compares the query's search keys with the stored ones instead of running
+    LOWER(...) LIKE over every row and re-normalizing candidates in Python.
+    A word matches if:
+    1. its English word contains the query
+    2. a translation variant contains the query
+    3. a transliteration variant contains the query, diacritics ignored
+       ("rasayana" matches "rāsāyana")
+    4. a transliteration variant is a prefix of the query (indexed equality
+       on the query's prefixes) or, if 3+ characters, appears in it
+    
+    Equal and prefix keys (MATCH_EXACT, MATCH_PREFIX) of every field are
+    served by the (language, field, key) primary key; only the remaining
+    substring matches (MATCH_CONTAINS) need a scan of the language's keys.
+    
+    Returns:
+        {word_id: best match tier}
+    """
+    keys = {field: search_key(field, search) for field in SEARCH_KEY_FIELDS}
+    prefixes = [keys['transliteration'][:i] for i in range(1, len(keys['transliteration']) + 1)]
+    indexed = []
+    params = []
+    for field in SEARCH_KEY_FIELDS:
+        # Every key starting with the query sorts between it and key + U+10FFFF
+        indexed.append(f'''
+            SELECT word_id, CASE WHEN key = ? THEN {MATCH_EXACT} ELSE {MATCH_PREFIX} END AS tier
+            FROM vocabulary_search_keys
+            WHERE language = ? AND field = '{field}' AND key >= ? AND key < ?
+        ''')
+        params += [keys[field], language, keys[field], keys[field] + '\U0010ffff']
+    cursor.execute(f'''
+        SELECT word_id, MIN(tier) FROM (
+            {' UNION ALL '.join(indexed)}
+            UNION ALL
+            SELECT word_id, {MATCH_CONTAINS} FROM vocabulary_search_keys
+            WHERE language = ? AND field = 'english' AND instr(key, ?) > 1
+            UNION ALL
+            SELECT word_id, {MATCH_CONTAINS} FROM vocabulary_search_keys
+            WHERE language = ? AND field = 'translation' AND instr(key, ?) > 1
+            UNION ALL
+            SELECT word_id, {MATCH_CONTAINS} FROM vocabulary_search_keys
+            WHERE language = ? AND field = 'transliteration'
+              AND (instr(key, ?) > 1 OR (length(key) >= 3 AND instr(?, key) > 0))
+            UNION ALL
+            SELECT word_id, {MATCH_CONTAINS} FROM vocabulary_search_keys
+            WHERE language = ? AND field = 'transliteration' AND key IN ({','.join('?' * len(prefixes))})
+        )
+        GROUP BY word_id
+    ''', params + [
+        language, keys['english'],
+        language, keys['translation'],
+        language, keys['transliteration'], keys['transliteration'],
+        language, *prefixes,
+    ])
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def get_vocabulary(
+    language: str, 
+    search: str = '', 
+    mastery_filter: str = '',
+    word_class_filter: str = '',
+    level_filter: str = '',
+    limit: int = 50,
+    offset: int = 0
+) -> tuple:
+    """Get vocabulary with optional search and filters, returns words and total count"""
+    if search and search.strip():
+        if config.VOCAB_SEARCH_ENGINE == 'fts5':
+            from . import vocab_fts
+            result = vocab_fts.search_vocabulary(
+                language, search, mastery_filter, word_class_filter, level_filter, limit, offset
+            )
+            if result is not None:
+                return result
+        from . import vocab_search
+        index = vocab_search.get_index(language)
+        if index is not None:
+            return _search_vocabulary_indexed(
+                index, search, mastery_filter, word_class_filter, level_filter, limit, offset
+            )
+    
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    
+    # Base WHERE clause
+    where_clause = 'WHERE v.language = ?'
+    params = [language]
+    
+    if search:
+        # Matched once against the stored search keys, then passed to the count
+        # and data queries as a JSON object of id -> match tier
+        matches = json.dumps(_search_key_matches(cursor, language, search))
+        where_clause += ' AND v.id IN (SELECT CAST(key AS INTEGER) FROM json_each(?))'
+        params.append(matches)
+    
+    filter_clause, filter_params = _vocabulary_filter_clause(mastery_filter, word_class_filter, level_filter)
+    where_clause += filter_clause
+    params.extend(filter_params)
+    
     # Count query
     count_query = f'''
         SELECT COUNT(*) as total
@@ -2406,21 +3312,23 @@ def get_vocabulary(
         total_count = cursor.fetchone()['total']
     
     # Data query - fetch more results if searching (we'll sort and paginate in Python)
-    # For search queries, we need to fetch all candidates, sort by relevance, then paginate
+    # For search queries, we need to fetch all matches, sort by relevance, then paginate
     # For non-search queries, we can use SQL pagination
     if search:
-        # Fetch more candidates for search (we'll filter and sort in Python)
-        # No ORDER BY in SQL - we'll sort purely by similarity metrics in Python
-        fetch_limit = min(limit * 10, 1000)  # Fetch up to 10x the limit or 1000, whichever is smaller
+        # Fetch the best matches (exact, then prefix, then substring matches, so
+        # the window never drops a better tier for a worse one) and rank them
+        # by similarity in Python
+        fetch_limit = max(min(limit * 10, 1000), offset + limit)
         data_query = f'''
             SELECT v.*, COALESCE(ws.mastery_level, 'new') as mastery_level,
                    COALESCE(ws.next_review_date, '') as next_review_date
             FROM vocabulary v
             LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = 1
             {where_clause}
+            ORDER BY json_extract(?, '$."' || v.id || '"'), v.english_word
             LIMIT ?
         '''
-        params.append(fetch_limit)
+        params.extend([matches, fetch_limit])
     else:
         # Non-search: use SQL pagination
         data_query = f'''
@@ -2458,61 +3366,7 @@ def get_vocabulary(
     
     words = [dict(row) for row in cursor.fetchall()]
     
-    # If search was provided, filter by normalized transliteration for fuzzy matching
-    # This ensures diacritic-agnostic search works correctly
     if search:
-        normalized_search_lower = normalized_search.lower()
-        filtered_words = []
-        for word in words:
-            word_translit = word.get('transliteration', '').lower()
-            word_english = word.get('english_word', '').lower()
-            word_kannada = word.get('translation', '')
-            
-            # Check English word
-            english_match = search.lower() in word_english
-            
-            # Check Kannada - split by " /" and check each variant (same as transliterations)
-            kannada_match = False
-            if word_kannada:
-                kannada_variants = word_kannada.split(' /')
-                for variant in kannada_variants:
-                    variant = variant.strip()
-                    if search in variant:
-                        kannada_match = True
-                        break
-            
-            # Check transliteration - split by " /" and check each variant
-            translit_match = False
-            if word_translit:
-                translit_variants = word_translit.split(' /')
-                for variant in translit_variants:
-                    variant = variant.strip().lower()
-                    if search.lower() in variant:
-                        translit_match = True
-                        break
-            
-            # Check exact matches first
-            if english_match or kannada_match or translit_match:
-                filtered_words.append(word)
-            else:
-                # Check normalized transliteration for fuzzy matching
-                # Split transliteration by " /" and check each variant
-                if word_translit:
-                    translit_variants = word_translit.split(' /')
-                    for variant in translit_variants:
-                        variant = variant.strip().lower()
-                        normalized_translit = normalize_iast_diacritics(variant)
-                        # Check if normalized search is in normalized transliteration OR vice versa
-                        # This handles cases like "rasayana" matching "rāsāyana"
-                        if (normalized_search_lower in normalized_translit or 
-                            normalized_translit in normalized_search_lower or
-                            normalized_translit.startswith(normalized_search_lower) or
-                            normalized_search_lower.startswith(normalized_translit)):
-                            filtered_words.append(word)
-                            break
-        
-        words = filtered_words
-        
         # Calculate similarity scores and sort by relevance
         search_lower = search.lower().strip()
         for word in words:
@@ -2550,15 +3404,81 @@ def get_vocabulary(
             w.get('english_word', '').lower()   # Secondary: alphabetical (ascending)
         ))
         
-        # Apply pagination after sorting (for search queries)
-        if search:
-            total_filtered = len(words)
-            # Update total_count to reflect filtered results before pagination
-            total_count = total_filtered
-            words = words[offset:offset + limit]
-        
-        # For search queries, total_count is already set above from filtered results
-        # For non-search queries, total_count was set from SQL count query earlier
+        # Apply pagination after sorting (for search queries). The key match is
+        # exact, so total_count from the SQL count query needs no correction
+        words = words[offset:offset + limit]
+    
+    conn.close()
+    return words, total_count
+
+
+def _search_vocabulary_indexed(
+    index,
+    search: str,
+    mastery_filter: str,
+    word_class_filter: str,
+    level_filter: str,
+    limit: int,
+    offset: int
+) -> tuple:
+    """get_vocabulary search path backed by the in-memory vocab_search index
+    
+    Matching and ranking happen in the index; SQL is only used for mastery
+    filtering of the matched ids and to load the rows for the requested page.
+    """
+    word_class_values = [f.strip().lower() for f in word_class_filter.split(',') if f.strip()] if word_class_filter else []
+    level_values = [f.strip().lower() for f in level_filter.split(',') if f.strip()] if level_filter else []
+    ranked = index.search(search, word_class_values or None, level_values or None)
+    
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    
+    mastery_values = [f.strip() for f in mastery_filter.split(',') if f.strip()] if mastery_filter else []
+    if mastery_values and ranked:
+        include_due = 'due' in mastery_values
+        mastery_values = [v for v in mastery_values if v != 'due']
+        today_str = datetime.now().strftime('%Y-%m-%d')
+        
+        states = {}
+        ranked_ids = [word_id for word_id, _ in ranked]
+        for i in range(0, len(ranked_ids), 900):
+            chunk = ranked_ids[i:i + 900]
+            cursor.execute(f'''
+                SELECT word_id, mastery_level, next_review_date
+                FROM word_states
+                WHERE user_id = 1 AND word_id IN ({','.join('?' * len(chunk))})
+            ''', chunk)
+            for row in cursor.fetchall():
+                states[row['word_id']] = (row['mastery_level'], row['next_review_date'])
+        
+        def keep(word_id):
+            mastery_level, next_review_date = states.get(word_id, (None, None))
+            if include_due and next_review_date is not None and next_review_date <= today_str:
+                return True
+            return (mastery_level or 'new') in mastery_values
+        
+        ranked = [(word_id, score) for word_id, score in ranked if keep(word_id)]
+    
+    total_count = len(ranked)
+    page = ranked[offset:offset + limit]
+    
+    words = []
+    if page:
+        page_ids = [word_id for word_id, _ in page]
+        cursor.execute(f'''
+            SELECT v.*, COALESCE(ws.mastery_level, 'new') as mastery_level,
+                   COALESCE(ws.next_review_date, '') as next_review_date
+            FROM vocabulary v
+            LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = 1
+            WHERE v.id IN ({','.join('?' * len(page_ids))})
+        ''', page_ids)
+        rows_by_id = {row['id']: dict(row) for row in cursor.fetchall()}
+        for word_id, score in page:
+            word = rows_by_id.get(word_id)
+            if word:
+                word['_similarity_score'] = score
+                words.append(word)
     
     conn.close()
     return words, total_count
@@ -2596,7 +3516,7 @@ def generate_lesson_words(language: str, lesson_id: str, allowed_chars: List[str
     merged: List[Dict] = []
 
     # Fetch vocabulary
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     cursor.execute('''
@@ -2652,7 +3572,7 @@ def generate_lesson_words(language: str, lesson_id: str, allowed_chars: List[str
             break
 
     # Cache for this lesson_id
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     cursor.execute('DELETE FROM lesson_words WHERE language = ? AND lesson_id = ?', (language, lesson_id))
     conn.commit()
@@ -2663,33 +3583,229 @@ def generate_lesson_words(language: str, lesson_id: str, allowed_chars: List[str
     conn.commit()
     conn.close()
 
-    return capped
+    return capped
+
+
+def get_lesson_words(language: str, lesson_id: str, allowed_chars: List[str], target_count: int = 50, max_count: int = 60) -> List[Dict]:
+    """Retrieve lesson words from cache; if missing or insufficient, regenerate."""
+    ensure_lesson_words_table()
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute('SELECT text, gloss FROM lesson_words WHERE language = ? AND lesson_id = ? LIMIT ?', (language, lesson_id, max_count))
+    rows = cursor.fetchall()
+    conn.close()
+
+    if len(rows) >= target_count:
+        return [{'id': f'c-{idx}', 'text': row['text'], 'gloss': row['gloss'] or ''} for idx, row in enumerate(rows)]
+
+    # Regenerate
+    return generate_lesson_words(language, lesson_id, allowed_chars, target_count, max_count)
+
+
+def _cefr_to_numeric(cefr_level: str) -> int:
+    """Convert CEFR level to numeric value for comparison"""
+    levels = {'A1': 1, 'A2': 2, 'B1': 3, 'B2': 4, 'C1': 5, 'C2': 6}
+    return levels.get(cefr_level.upper(), 1)
+
+
+# User level summary: word totals and mastered counts per (user, language,
+# CEFR level), so calculate_user_level is a primary-key range read instead of
+# three aggregates over vocabulary and word_states. Single-card mastery
+# changes apply deltas (_record_mastery_change), vocabulary sync and inserts
+# adjust totals (_apply_level_summary_deltas) and bulk level changes rebuild
+# the user's rows. A (user, language) without rows is built on its first read;
+# check_level_summaries recomputes every summary from scratch and repairs drift
+# (e.g. from scripts that write word_states directly).
+
+def _level_key(level: Optional[str]) -> str:
+    """user_level_summary key for a vocabulary level (matches COALESCE(LOWER(level), ''))"""
+    return (level or '').lower()
+
+
+def _compute_level_summary(cursor, language: str, user_id: int) -> Dict[str, Tuple[int, int]]:
+    """level -> (total words, mastered words), from vocabulary and word_states"""
+    cursor.execute('''
+        SELECT COALESCE(LOWER(v.level), ''), COUNT(*),
+               SUM(CASE WHEN ws.mastery_level = 'mastered' THEN 1 ELSE 0 END)
+        FROM vocabulary v
+        LEFT JOIN word_states ws ON ws.word_id = v.id AND ws.user_id = ?
+        WHERE v.language = ?
+        GROUP BY 1
+    ''', (user_id, language))
+    return {row[0]: (row[1], row[2] or 0) for row in cursor.fetchall()}
+
+
+def _read_level_summary(cursor, language: str, user_id: int) -> Dict[str, Tuple[int, int]]:
+    cursor.execute(
+        'SELECT level, total, mastered FROM user_level_summary WHERE user_id = ? AND language = ?',
+        (user_id, language)
+    )
+    return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+
+def _rebuild_level_summary(cursor, language: str, user_id: int) -> Dict[str, Tuple[int, int]]:
+    """Recompute a user's summary rows for `language` (run inside a write transaction)"""
+    summary = _compute_level_summary(cursor, language, user_id)
+    cursor.execute('DELETE FROM user_level_summary WHERE user_id = ? AND language = ?', (user_id, language))
+    cursor.executemany('''
+        INSERT INTO user_level_summary (user_id, language, level, total, mastered)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(user_id, language, level, total, mastered) for level, (total, mastered) in summary.items()])
+    return summary
+
+
+def _record_mastery_change(cursor, word_id: int, user_id: int, mastery_before: Optional[str], mastery_after: str):
+    """Keep the level summary in step with one card's mastery change (call with the word_states write)"""
+    delta = (mastery_after == 'mastered') - (mastery_before == 'mastered')
+    if delta:
+        cursor.execute('''
+            UPDATE user_level_summary SET mastered = mastered + ?
+            WHERE user_id = ?
+              AND (language, level) = (SELECT language, COALESCE(LOWER(level), '') FROM vocabulary WHERE id = ?)
+        ''', (delta, user_id, word_id))
+
 
+def _apply_level_summary_deltas(cursor, language: str, total_deltas: Dict[str, int],
+                                mastered_deltas: Dict[Tuple[int, str], int]):
+    """Apply vocabulary changes to every built summary of `language`
 
-def get_lesson_words(language: str, lesson_id: str, allowed_chars: List[str], target_count: int = 50, max_count: int = 60) -> List[Dict]:
-    """Retrieve lesson words from cache; if missing or insufficient, regenerate."""
-    ensure_lesson_words_table()
-    conn = sqlite3.connect(config.DB_PATH)
-    conn.row_factory = sqlite3.Row
+    total_deltas: level -> change in word count (all users);
+    mastered_deltas: (user_id, level) -> change in mastered words.
+    Levels are LOWER(level), '' for none.
+    """
+    for level, delta in total_deltas.items():
+        if delta:
+            cursor.execute('''
+                INSERT INTO user_level_summary (user_id, language, level, total, mastered)
+                SELECT DISTINCT user_id, language, ?, ?, 0 FROM user_level_summary WHERE language = ?
+                ON CONFLICT(user_id, language, level) DO UPDATE SET total = total + excluded.total
+            ''', (level, delta, language))
+    cursor.executemany('''
+        UPDATE user_level_summary SET mastered = mastered + ?
+        WHERE user_id = ? AND language = ? AND level = ?
+    ''', [(delta, user_id, language, level) for (user_id, level), delta in mastered_deltas.items() if delta])
+
+
+def check_level_summaries(repair: bool = True) -> Dict:
+    """Recompute every built level summary from scratch and compare
+
+    Mismatched summaries are logged and, with repair, rebuilt. Returns the
+    number of summaries checked and the mismatches found.
+    """
+    conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT text, gloss FROM lesson_words WHERE language = ? AND lesson_id = ? LIMIT ?', (language, lesson_id, max_count))
-    rows = cursor.fetchall()
-    conn.close()
+    mismatches = []
+    try:
+        cursor.execute('SELECT DISTINCT user_id, language FROM user_level_summary')
+        summaries = cursor.fetchall()
+        for user_id, language in summaries:
+            cursor.execute('BEGIN IMMEDIATE')
+            stored = {level: counts for level, counts in _read_level_summary(cursor, language, user_id).items()
+                      if counts != (0, 0)}
+            fresh = _compute_level_summary(cursor, language, user_id)
+            if stored != fresh:
+                mismatches.append({'user_id': user_id, 'language': language, 'stored': stored, 'actual': fresh})
+                print(f"[LevelSummary] {language} (user {user_id}) out of step: stored {stored}, actual {fresh}")
+                if repair:
+                    _rebuild_level_summary(cursor, language, user_id)
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    print(f"[LevelSummary] Checked {len(summaries)} summaries, {len(mismatches)} out of step")
+    return {'checked': len(summaries), 'mismatches': mismatches}
 
-    if len(rows) >= target_count:
-        return [{'id': f'c-{idx}', 'text': row['text'], 'gloss': row['gloss'] or ''} for idx, row in enumerate(rows)]
 
-    # Regenerate
-    return generate_lesson_words(language, lesson_id, allowed_chars, target_count, max_count)
+def run_level_summary_checks(interval_s: int):
+    """Run check_level_summaries now and then every `interval_s` seconds (background thread)"""
+    while True:
+        try:
+            check_level_summaries()
+        except Exception as e:
+            print(f"[LevelSummary] Consistency check failed: {e}")
+        if interval_s <= 0:
+            return
+        time.sleep(interval_s)
 
 
-def _cefr_to_numeric(cefr_level: str) -> int:
-    """Convert CEFR level to numeric value for comparison"""
-    levels = {'A1': 1, 'A2': 2, 'B1': 3, 'B2': 4, 'C1': 5, 'C2': 6}
-    return levels.get(cefr_level.upper(), 1)
+def _user_level_from_summary(summary: Dict[str, Tuple[int, int]]) -> Dict:
+    """calculate_user_level's result from a level summary (level -> (total, mastered))"""
+    # Words available and mastered at each level for this language
+    total_by_level = {level: total for level, (total, _) in summary.items() if level and total > 0}
+    mastered_by_level = {level: mastered for level, (_, mastered) in summary.items() if level}
+    
+    # Total mastered words (any level)
+    total_mastered = sum(mastered for _, mastered in summary.values())
+    
+    # Check if this language has all words at a single level (simplified level system)
+    if len(total_by_level) == 1:
+        # Single-level system: user is currently at that level
+        single_level = list(total_by_level.keys())[0]
+        total_words = total_by_level[single_level]
+        mastered_words = mastered_by_level.get(single_level, 0)
+        progress = (mastered_words / total_words * 100) if total_words > 0 else 0
+        
+        return {
+            'level': single_level.upper(),
+            'progress': round(progress, 1),
+            'total_mastered': total_mastered,
+            'next_level': single_level.upper(),
+            'total_words': total_words
+        }
+    
+    # Multi-level system: traditional progression through levels
+    levels_order = ['a1', 'a2', 'b1', 'b2', 'c1', 'c2']
+    current_level = 'A0'  # Starting level
+    progress = 0
+    next_level = 'A1'
+    
+    for i, level in enumerate(levels_order):
+        total_words = total_by_level.get(level, 0)
+        mastered_words = mastered_by_level.get(level, 0)
+        
+        if total_words == 0:
+            # Skip levels with no words
+            continue
+        
+        if mastered_words >= total_words:
+            # User has completed this level
+            current_level = level.upper()
+            # Calculate progress towards next level
+            if i + 1 < len(levels_order):
+                next_level_key = levels_order[i + 1]
+                next_total = total_by_level.get(next_level_key, 0)
+                next_mastered = mastered_by_level.get(next_level_key, 0)
+                if next_total > 0:
+                    progress = (next_mastered / next_total) * 100
+                    next_level = next_level_key.upper()
+                else:
+                    progress = 100
+                    next_level = current_level
+            else:
+                # C2 completed
+                progress = 100
+                next_level = 'C2'
+        else:
+            # User is still working on this level
+            if current_level == 'A0':
+                current_level = 'A0'  # Before completing A1
+            progress = (mastered_words / total_words) * 100
+            next_level = level.upper()
+            break
+    
+    return {
+        'level': current_level,
+        'progress': round(progress, 1),
+        'total_mastered': total_mastered,
+        'next_level': next_level,
+        'total_words': sum(total_by_level.values())
+    }
 
 
-def calculate_user_level(language: str) -> Dict:
+def calculate_user_level(language: str, user_id: int = 1) -> Dict:
     """Calculate user's level based on the primary level of words in the vocabulary
     
     For languages where all words are at a single level (e.g., all Tamil at A1),
@@ -2705,111 +3821,20 @@ def calculate_user_level(language: str) -> Dict:
     - C2: All A1 + A2 + B1 + B2 + C1 + C2 words mastered
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         cursor = conn.cursor()
         
-        # Get total words available at each level for this language
-        cursor.execute('''
-            SELECT level, COUNT(*) as total
-            FROM vocabulary
-            WHERE language = ? AND level IS NOT NULL AND level != ''
-            GROUP BY level
-        ''', (language,))
-        
-        total_by_level = {row[0].lower(): row[1] for row in cursor.fetchall()}
-        
-        # Get mastered words count by level
-        cursor.execute('''
-            SELECT v.level, COUNT(*) as count
-            FROM word_states ws
-            JOIN vocabulary v ON ws.word_id = v.id
-            WHERE ws.user_id = 1 
-            AND ws.mastery_level = 'mastered'
-            AND v.language = ?
-            AND v.level IS NOT NULL AND v.level != ''
-            GROUP BY v.level
-        ''', (language,))
-        
-        mastered_by_level = {row[0].lower(): row[1] for row in cursor.fetchall()}
-        
-        # Get total mastered words (any level)
-        cursor.execute('''
-            SELECT COUNT(*) as count
-            FROM word_states ws
-            JOIN vocabulary v ON ws.word_id = v.id
-            WHERE ws.user_id = 1 
-            AND ws.mastery_level = 'mastered'
-            AND v.language = ?
-        ''', (language,))
-        
-        total_mastered = cursor.fetchone()[0] or 0
-        
-        # Check if this language has all words at a single level (simplified level system)
-        if len(total_by_level) == 1:
-            # Single-level system: user is currently at that level
-            single_level = list(total_by_level.keys())[0]
-            total_words = total_by_level[single_level]
-            mastered_words = mastered_by_level.get(single_level, 0)
-            progress = (mastered_words / total_words * 100) if total_words > 0 else 0
-            
-            conn.close()
-            return {
-                'level': single_level.upper(),
-                'progress': round(progress, 1),
-                'total_mastered': total_mastered,
-                'next_level': single_level.upper(),
-                'total_words': total_words
-            }
-        
-        # Multi-level system: traditional progression through levels
-        levels_order = ['a1', 'a2', 'b1', 'b2', 'c1', 'c2']
-        current_level = 'A0'  # Starting level
-        progress = 0
-        next_level = 'A1'
-        
-        for i, level in enumerate(levels_order):
-            total_words = total_by_level.get(level, 0)
-            mastered_words = mastered_by_level.get(level, 0)
-            
-            if total_words == 0:
-                # Skip levels with no words
-                continue
-            
-            if mastered_words >= total_words:
-                # User has completed this level
-                current_level = level.upper()
-                # Calculate progress towards next level
-                if i + 1 < len(levels_order):
-                    next_level_key = levels_order[i + 1]
-                    next_total = total_by_level.get(next_level_key, 0)
-                    next_mastered = mastered_by_level.get(next_level_key, 0)
-                    if next_total > 0:
-                        progress = (next_mastered / next_total) * 100
-                        next_level = next_level_key.upper()
-                    else:
-                        progress = 100
-                        next_level = current_level
-                else:
-                    # C2 completed
-                    progress = 100
-                    next_level = 'C2'
-            else:
-                # User is still working on this level
-                if current_level == 'A0':
-                    current_level = 'A0'  # Before completing A1
-                progress = (mastered_words / total_words) * 100
-                next_level = level.upper()
-                break
+        summary = _read_level_summary(cursor, language, user_id)
+        if not summary:
+            # First read for this user and language: build it under the write lock,
+            # so no delta lands between the count and the insert
+            cursor.execute('BEGIN IMMEDIATE')
+            summary = _read_level_summary(cursor, language, user_id) or \
+                _rebuild_level_summary(cursor, language, user_id)
+            conn.commit()
         
         conn.close()
-        
-        return {
-            'level': current_level,
-            'progress': round(progress, 1),
-            'total_mastered': total_mastered,
-            'next_level': next_level,
-            'total_words': sum(total_by_level.values())
-        }
+        return _user_level_from_summary(summary)
     except Exception as e:
         print(f"Error in calculate_user_level: {str(e)}")
         import traceback
@@ -2830,7 +3855,7 @@ def calculate_user_level(language: str) -> Dict:
 
 def bulk_update_word_states_by_level(language: str, level: str, mastery_level: str, user_id: int = 1):
     """Bulk update word states for all words of a specific level"""
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     # Get all word IDs for the specified level
@@ -2888,6 +3913,8 @@ def bulk_update_word_states_by_level(language: str, level: str, mastery_level: s
             ))
         updated_count += 1
     
+    _rebuild_level_summary(cursor, language, user_id)
+    invalidate_review_queue(cursor, language)
     conn.commit()
     conn.close()
     return {"updated": updated_count}
@@ -2899,7 +3926,7 @@ def update_word_state(word_id: int, user_id: int, correct: bool, activity_type:
     language = get_language_for_word(word_id)
     srs_settings = get_srs_settings_for_language(language)
     
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     # Get current state
@@ -2925,31 +3952,16 @@ def update_word_state(word_id: int, user_id: int, correct: bool, activity_type:
     today = datetime.now().date()
     
     # Update based on performance
+    mastery_level, ease_factor, interval_days = srs_engine.schedule_activity(
+        mastery_level, review_count, ease_factor, correct, srs_settings
+    )
+    next_review = today + timedelta(days=interval_days)
     if correct:
-        if mastery_level == 'new':
-            mastery_level = 'learning'
-            next_review = datetime.now() + timedelta(days=1)
-        elif mastery_level == 'learning':
-            mastery_level = 'review'
-            next_review = datetime.now() + timedelta(days=3)
-        elif mastery_level == 'review':
-            if review_count >= 3:
-                mastery_level = 'mastered'
-            next_review = datetime.now() + timedelta(days=int(ease_factor * 2))
-        else:
-            next_review = datetime.now() + timedelta(days=int(ease_factor * 2))
-        
-        ease_factor = min(srs_settings['max_ease_factor'], ease_factor + srs_settings['ease_factor_increment'])
         review_count += 1
         rating = 'good'  # For review history
     else:
-        mastery_level = 'learning'
-        ease_factor = max(srs_settings['min_ease_factor'], ease_factor - srs_settings['ease_factor_decrement'])
-        next_review = datetime.now() + timedelta(days=1)
         rating = 'again'  # For review history
     
-    interval_days = (next_review.date() - today).days if next_review else 0
-    
     # Upsert word state
     cursor.execute('''
         INSERT INTO word_states (word_id, user_id, mastery_level, next_review_date, 
@@ -2964,7 +3976,7 @@ def update_word_state(word_id: int, user_id: int, correct: bool, activity_type:
             interval_days = excluded.interval_days
     ''', (
         word_id, user_id, mastery_level,
-        next_review.strftime('%Y-%m-%d') if next_review else None,
+        next_review.strftime('%Y-%m-%d'),
         review_count, ease_factor, datetime.now().strftime('%Y-%m-%d'),
         interval_days
     ))
@@ -2986,6 +3998,9 @@ def update_word_state(word_id: int, user_id: int, correct: bool, activity_type:
         mastery_level
     ))
     
+    _record_mastery_change(cursor, word_id, user_id, result[0] if result else None, mastery_level)
+    _sync_review_queue_entry(cursor, word_id, user_id, language)
+    
     conn.commit()
     conn.close()
     
@@ -3000,7 +4015,7 @@ def preview_word_intervals(word_id: int, user_id: int = 1) -> Dict:
     interval_days and next_review date for each response option.
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3028,58 +4043,21 @@ def preview_word_intervals(word_id: int, user_id: int = 1) -> Dict:
             mastery_level = row['mastery_level']
             review_count = row['review_count']
             ease_factor = row['ease_factor']
-            is_new = not row['introduced_date'] or row['introduced_date'] == '' or mastery_level == 'new'
         else:
             # New card
             mastery_level = 'new'
             review_count = 0
             ease_factor = srs_settings['default_ease_factor']
-            is_new = True
         
         conn.close()
         
-        from datetime import timedelta
-        
-        def calculate_interval(response_type: str) -> tuple:
-            """Calculate interval for a given response type"""
-            nonlocal ease_factor, review_count, mastery_level
-            
-            temp_ease = ease_factor
-            temp_review_count = review_count + 1
-            
-            if response_type == 'again':
-                # Failed: reset to 1 day
-                temp_ease = max(srs_settings['min_ease_factor'], ease_factor - (srs_settings['ease_factor_decrement'] * 2))
-                interval_days = 1
-            elif response_type == 'hard':
-                # Hard: 1 day, moderate ease decrease
-                temp_ease = max(srs_settings['min_ease_factor'], ease_factor - srs_settings['ease_factor_decrement'])
-                interval_days = 1
-            elif response_type == 'good':
-                # Good: standard SRS progression
-                if is_new or mastery_level == 'learning':
-                    interval_days = max(1, int(temp_review_count * temp_ease * 0.5))
-                else:
-                    interval_days = max(1, int(temp_review_count * temp_ease))
-                temp_ease = min(srs_settings['max_ease_factor'], ease_factor + srs_settings['ease_factor_increment'] * 0.5)
-            else:  # easy
-                # Easy: longer interval, bigger ease increase
-                if is_new or mastery_level == 'learning':
-                    interval_days = max(1, int(temp_review_count * temp_ease * 1.2))
-                else:
-                    interval_days = max(1, int(temp_review_count * temp_ease * 1.3))
-                temp_ease = min(srs_settings['max_ease_factor'], ease_factor + srs_settings['ease_factor_increment'])
-            
-            next_review = today + timedelta(days=interval_days)
-            return interval_days, next_review.strftime('%Y-%m-%d')
-        
-        # Calculate for all response types
+        # Same schedule a flashcard review would apply
         results = {}
-        for response in ['again', 'hard', 'good', 'easy']:
-            interval_days, next_review_date = calculate_interval(response)
+        for response, (_, _, interval_days) in srs_engine.preview_flashcard(
+                mastery_level, review_count, ease_factor, srs_settings).items():
             results[response] = {
                 'interval_days': interval_days,
-                'next_review': next_review_date
+                'next_review': (today + timedelta(days=interval_days)).strftime('%Y-%m-%d')
             }
         
         return results
@@ -3091,6 +4069,106 @@ def preview_word_intervals(word_id: int, user_id: int = 1) -> Dict:
         return {}
 
 
+def _apply_flashcard_review(cursor, word_id: int, user_id: int, comfort_level: str,
+                            srs_settings: Dict, today, reviewed_at: str) -> Tuple[Dict, bool]:
+    """Apply one flashcard review on `cursor`: upsert word_states and log review_history
+    
+    `today` is the date the review counts for and `reviewed_at` the timestamp
+    logged in review_history. The caller commits.
+    
+    Returns (updated word state, whether the card was new). The schedule
+    comes from srs_engine.schedule_flashcard.
+    """
+    # Get current state
+    cursor.execute('''
+        SELECT * FROM word_states
+        WHERE word_id = ? AND user_id = ?
+    ''', (word_id, user_id))
+    
+    row = cursor.fetchone()
+    today_str = today.strftime('%Y-%m-%d')
+    
+    # Track if this is a new card
+    is_new_card = False
+    mastery_level_before = None
+    
+    if row:
+        mastery_level = row['mastery_level']
+        mastery_level_before = mastery_level  # Store for review history
+        review_count = row['review_count'] + 1
+        ease_factor = row['ease_factor']
+        introduced_date = row['introduced_date'] or today_str
+        
+        # Check if this was a new card
+        if not row['introduced_date'] or row['introduced_date'] == '' or mastery_level == 'new':
+            is_new_card = True
+            introduced_date = today_str
+    else:
+        # Create new state
+        mastery_level = 'new'
+        mastery_level_before = 'new'  # Store for review history
+        review_count = 1
+        ease_factor = srs_settings['default_ease_factor']
+        is_new_card = True
+        introduced_date = today_str
+    
+    mastery_level, ease_factor, interval_days = srs_engine.schedule_flashcard(
+        mastery_level, review_count, ease_factor, comfort_level, srs_settings
+    )
+    next_review = today + timedelta(days=interval_days)
+    
+    # Upsert word state
+    cursor.execute('''
+        INSERT INTO word_states (word_id, user_id, mastery_level, next_review_date, 
+                                review_count, ease_factor, last_reviewed, introduced_date, interval_days)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(word_id, user_id) DO UPDATE SET
+            mastery_level = excluded.mastery_level,
+            next_review_date = excluded.next_review_date,
+            review_count = excluded.review_count,
+            ease_factor = excluded.ease_factor,
+            last_reviewed = excluded.last_reviewed,
+            introduced_date = COALESCE(word_states.introduced_date, excluded.introduced_date),
+            interval_days = excluded.interval_days
+    ''', (
+        word_id, user_id, mastery_level,
+        next_review.strftime('%Y-%m-%d'),
+        review_count, ease_factor, today_str, introduced_date,
+        (next_review - today).days
+    ))
+    
+    # Log this review to review_history table
+    cursor.execute('''
+        INSERT INTO review_history (
+            word_id, user_id, reviewed_at, rating, activity_type,
+            interval_days, ease_factor, mastery_level_before, mastery_level_after
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        word_id, user_id, 
+        reviewed_at,
+        comfort_level,  # 'easy', 'good', 'hard', 'again'
+        'flashcard',
+        (next_review - today).days,
+        ease_factor,
+        mastery_level_before,
+        mastery_level
+    ))
+    
+    _record_mastery_change(cursor, word_id, user_id, row['mastery_level'] if row else None, mastery_level)
+    
+    print(f"[SRS] Updated word {word_id}: {mastery_level}, ease={ease_factor:.2f}, next={next_review}, new={is_new_card}")
+    print(f"[SRS] Logged review: {mastery_level_before} -> {mastery_level}, rating={comfort_level}")
+    
+    return {
+        'word_id': word_id,
+        'mastery_level': mastery_level,
+        'next_review': next_review.strftime('%Y-%m-%d'),
+        'review_count': review_count,
+        'ease_factor': ease_factor,
+        'interval_days': (next_review - today).days,
+    }, is_new_card
+
+
 def update_word_state_from_flashcard(word_id: int, user_id: int, comfort_level: str) -> Dict:
     """Update word state based on flashcard performance (corner-based feedback)
     
@@ -3102,15 +4180,12 @@ def update_word_state_from_flashcard(word_id: int, user_id: int, comfort_level:
     Returns:
         Dict with updated word state (mastery_level, next_review, review_count, ease_factor)
     
-    SRS Algorithm:
-    - Easy: Largest increase in ease factor, longest interval
-    - Good: Standard SRS progression, moderate ease increase
-    - Hard: Shorter interval, moderate ease decrease
-    - Again: Reset to beginning, significant ease decrease
+    See _apply_flashcard_review for the SRS algorithm, and
+    apply_flashcard_review_batch for many reviews in one transaction.
     """
     try:
         # Get current word state (or initialize new one)
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3125,144 +4200,460 @@ def update_word_state_from_flashcard(word_id: int, user_id: int, comfort_level:
         # Get SRS settings for this language
         srs_settings = get_srs_settings_for_language(language)
         
-        # Get current state
-        cursor.execute('''
-            SELECT * FROM word_states
-            WHERE word_id = ? AND user_id = ?
-        ''', (word_id, user_id))
+        result, is_new_card = _apply_flashcard_review(
+            cursor, word_id, user_id, comfort_level, srs_settings,
+            config.get_current_time().date(), datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
+        _sync_review_queue_entry(cursor, word_id, user_id, language)
         
-        row = cursor.fetchone()
-        today = config.get_current_time().date()
-        today_str = today.strftime('%Y-%m-%d')
+        conn.commit()
+        conn.close()
         
-        # Track if this is a new card
-        is_new_card = False
-        mastery_level_before = None
+        # Update daily quota
+        increment_daily_quota(language, is_new_card, user_id)
         
-        if row:
-            mastery_level = row['mastery_level']
-            mastery_level_before = mastery_level  # Store for review history
-            review_count = row['review_count'] + 1
-            ease_factor = row['ease_factor']
-            introduced_date = row['introduced_date'] or today_str
-            
-            # Check if this was a new card
-            if not row['introduced_date'] or row['introduced_date'] == '' or mastery_level == 'new':
-                is_new_card = True
-                introduced_date = today_str
-        else:
-            # Create new state
-            mastery_level = 'new'
-            mastery_level_before = 'new'  # Store for review history
-            review_count = 1
-            ease_factor = srs_settings['default_ease_factor']
-            is_new_card = True
-            introduced_date = today_str
+        # Check if daily flashcard goal is met and log if complete
+        check_and_log_flashcard_completion(language, user_id)
         
-        # Update based on comfort level
-        if comfort_level == 'again':
-            # Failed: schedule for immediate review (same day), decrease ease_factor significantly
-            mastery_level = 'learning'
-            ease_factor = max(srs_settings['min_ease_factor'], ease_factor - (srs_settings['ease_factor_decrement'] * 2))
-            next_review = today  # Same day = immediate review in same session
-        elif comfort_level == 'hard':
-            # Hard: shorter interval (1 day), moderate ease decrease
-            mastery_level = 'learning'
-            ease_factor = max(srs_settings['min_ease_factor'], ease_factor - srs_settings['ease_factor_decrement'])
-            next_review = today + timedelta(days=1)
-        elif comfort_level == 'good':
-            # Good: standard SRS progression, moderate ease increase
-            if mastery_level == 'new' or mastery_level == 'learning':
-                mastery_level = 'learning'
-                next_review = today + timedelta(days=max(1, int(review_count * ease_factor * 0.5)))
-            elif mastery_level == 'review':
-                if review_count >= 3:
-                    mastery_level = 'mastered'
-                next_review = today + timedelta(days=int(review_count * ease_factor))
-            else:
-                next_review = today + timedelta(days=int(review_count * ease_factor))
+        return result
+    except Exception as e:
+        print(f"Error updating word state from flashcard: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return {}
+
+
+def _parse_review_time(value: Optional[str]) -> datetime:
+    """Client review timestamp (ISO 8601) in the app timezone; naive times are taken as app time,
+    missing or future ones become now"""
+    now = config.get_current_time()
+    if not value:
+        return now
+    reviewed = datetime.fromisoformat(value)
+    if reviewed.tzinfo is None:
+        reviewed = reviewed.replace(tzinfo=config.APP_TIMEZONE)
+    reviewed = reviewed.astimezone(config.APP_TIMEZONE)
+    return min(reviewed, now)
+
+
+def apply_flashcard_review_batch(reviews: List[Dict], user_id: int = 1) -> Dict:
+    """Apply an ordered list of flashcard reviews in one transaction
+    
+    Args:
+        reviews: Dicts with word_id, comfort_level, and optionally reviewed_at
+            (ISO 8601, when the card was reviewed - offline clients send these
+            late) and idempotency_key
+        user_id: The user's ID
+    
+    Each review is scheduled as of its own reviewed_at date, in list order (so
+    the same card can appear more than once). A review whose idempotency_key
+    was already applied is not applied again; its stored result is returned
+    with status 'duplicate'. Unknown words, ratings other than 'again' / 'hard' /
+    'good' / 'easy' and unparseable timestamps fail only their own card. Quota counters are counted on each review's own date (the
+    row is created for days that have none); the daily flashcard goal is
+    checked once per language after the batch commits; on a database error nothing is
+    applied and the exception propagates, so the client can replay the batch.
+    
+    Returns:
+        Dict with 'results' (one per review, in order: index, word_id,
+        idempotency_key, status 'applied' / 'duplicate' / 'error', word or
+        error) and applied / duplicate / error counts
+    """
+    word_ids = sorted({review['word_id'] for review in reviews})
+    keys = [review['idempotency_key'] for review in reviews if review.get('idempotency_key')]
+    
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    try:
+        languages = {}
+        for i in range(0, len(word_ids), 500):
+            chunk = word_ids[i:i + 500]
+            cursor.execute(
+                f'SELECT id, language FROM vocabulary WHERE id IN ({",".join("?" * len(chunk))})', chunk
+            )
+            languages.update((row['id'], row['language']) for row in cursor.fetchall())
+        
+        # Settings and today's quota row, once per language (outside the write lock)
+        srs_settings = {}
+        for language in set(languages.values()):
+            srs_settings[language] = get_srs_settings_for_language(language)
+            get_daily_quota(language, user_id=user_id)
+        
+        # Hold the write lock so a concurrent replay of the same batch waits and sees our receipts
+        cursor.execute('BEGIN IMMEDIATE')
+        receipts = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            cursor.execute(f'''
+                SELECT idempotency_key, result FROM flashcard_review_receipts
+                WHERE user_id = ? AND idempotency_key IN ({",".join("?" * len(chunk))})
+            ''', [user_id] + chunk)
+            receipts.update((row['idempotency_key'], json.loads(row['result'])) for row in cursor.fetchall())
+        
+        results = []
+        new_receipts = []
+        quota_increments = {}  # (language, date) -> [new cards, reviews]
+        for index, review in enumerate(reviews):
+            word_id = review['word_id']
+            key = review.get('idempotency_key')
+            entry = {'index': index, 'word_id': word_id, 'idempotency_key': key}
+            results.append(entry)
             
-            ease_factor = min(srs_settings['max_ease_factor'], ease_factor + srs_settings['ease_factor_increment'] * 0.5)
-        elif comfort_level == 'easy':
-            # Easy: longer interval, larger ease increase
-            if mastery_level == 'new' or mastery_level == 'learning':
-                mastery_level = 'learning'
-                next_review = today + timedelta(days=max(1, int(review_count * ease_factor * 1.2)))
-            elif mastery_level == 'review':
-                if review_count >= 3:
-                    mastery_level = 'mastered'
-                next_review = today + timedelta(days=int(review_count * ease_factor * 1.3))
-            else:
-                next_review = today + timedelta(days=int(review_count * ease_factor * 1.3))
+            if key and key in receipts:
+                entry.update(status='duplicate', word=receipts[key])
+                continue
+            language = languages.get(word_id)
+            if language is None:
+                entry.update(status='error', error='Unknown word_id')
+                continue
+            if review['comfort_level'] not in srs_engine.RATINGS:
+                entry.update(status='error', error=f"Invalid comfort_level: {review['comfort_level']}")
+                continue
+            try:
+                reviewed = _parse_review_time(review.get('reviewed_at'))
+            except (TypeError, ValueError):
+                entry.update(status='error', error=f"Invalid reviewed_at: {review.get('reviewed_at')}")
+                continue
             
-            ease_factor = min(srs_settings['max_ease_factor'], ease_factor + srs_settings['ease_factor_increment'])
-        else:
-            # Default to good if unknown comfort level
-            mastery_level = 'learning'
-            next_review = today + timedelta(days=1)
-        
-        # Upsert word state
+            word, is_new_card = _apply_flashcard_review(
+                cursor, word_id, user_id, review['comfort_level'], srs_settings[language],
+                reviewed.date(), reviewed.strftime('%Y-%m-%d %H:%M:%S')
+            )
+            _sync_review_queue_entry(cursor, word_id, user_id, language)
+            entry.update(status='applied', word=word)
+            counts = quota_increments.setdefault((language, reviewed.strftime('%Y-%m-%d')), [0, 0])
+            counts[0 if is_new_card else 1] += 1
+            if key:
+                receipts[key] = word
+                new_receipts.append((user_id, key, word_id, json.dumps(word)))
+        
+        if quota_increments:
+            # Offline reviews can be dated before today, whose quota row may not exist
+            cursor.executemany('''
+                INSERT INTO srs_daily_quota (user_id, language, date, new_cards_completed, reviews_completed)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(user_id, language, date) DO UPDATE SET
+                    new_cards_completed = new_cards_completed + excluded.new_cards_completed,
+                    reviews_completed = reviews_completed + excluded.reviews_completed
+            ''', [(user_id, language, date, new_cards, review_cards)
+                  for (language, date), (new_cards, review_cards) in quota_increments.items()])
+        if new_receipts:
+            cursor.executemany('''
+                INSERT INTO flashcard_review_receipts (user_id, idempotency_key, word_id, result)
+                VALUES (?, ?, ?, ?)
+            ''', new_receipts)
+        cursor.execute(
+            "DELETE FROM flashcard_review_receipts WHERE created_at < datetime('now', ?)",
+            (f'-{config.FLASHCARD_RECEIPT_RETENTION_DAYS} days',)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    
+    # Check if daily flashcard goals are met and log if complete
+    for language in {language for language, _ in quota_increments}:
+        check_and_log_flashcard_completion(language, user_id)
+    
+    counts = {'applied': 0, 'duplicate': 0, 'error': 0}
+    for entry in results:
+        counts[entry['status']] += 1
+    print(f"[SRS] Batch of {len(reviews)} reviews: {counts['applied']} applied, "
+          f"{counts['duplicate']} duplicate, {counts['error']} failed")
+    return {
+        'results': results,
+        'applied': counts['applied'],
+        'duplicates': counts['duplicate'],
+        'errors': counts['error'],
+    }
+
+
+def reschedule_language(language: str, user_id: int = 1) -> int:
+    """Bring every reviewed card of a language within the current ease bounds
+
+    Run after min/max ease factor change: cards outside the new bounds get the
+    clamped ease factor and an interval scaled to match, counted from their
+    last review (srs_engine.reschedule). Returns the number of cards changed.
+    """
+    srs_settings = get_srs_settings_for_language(language)
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT ws.word_id, ws.ease_factor, COALESCE(ws.interval_days, 0), ws.last_reviewed, ws.next_review_date
+            FROM word_states ws
+            JOIN vocabulary v ON v.id = ws.word_id
+            WHERE ws.user_id = ? AND v.language = ? AND ws.mastery_level != 'new'
+              AND ws.ease_factor IS NOT NULL
+        ''', (user_id, language))
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+
+        ease_factors, intervals, changed = srs_engine.reschedule(
+            [row[1] for row in rows], [int(row[2]) for row in rows], srs_settings
+        )
+        updates = []
+        for row, ease_factor, interval_days, is_changed in zip(rows, ease_factors, intervals, changed):
+            if not is_changed:
+                continue
+            last_reviewed = _parse_date((row[3] or '')[:10])
+            next_review = (last_reviewed + timedelta(days=int(interval_days))).strftime('%Y-%m-%d') \
+                if last_reviewed and interval_days > 0 else row[4]
+            updates.append((float(ease_factor), int(interval_days), next_review, row[0], user_id))
+
+        if updates:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.executemany('''
+                UPDATE word_states
+                SET ease_factor = ?, interval_days = ?, next_review_date = ?
+                WHERE word_id = ? AND user_id = ?
+            ''', updates)
+            invalidate_review_queue(cursor, language)
+            conn.commit()
+        print(f"[SRS] Rescheduled {len(updates)} of {len(rows)} {language} cards into ease "
+              f"{srs_settings['min_ease_factor']}-{srs_settings['max_ease_factor']}")
+        return len(updates)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _load_review_days(language: str, user_id: int = 1, after_id: int = 0) -> Tuple[List[int], List[int], List[int], int]:
+    """(word ids, day numbers, rating codes, last review_history id) of a language's rated reviews
+
+    Only reviews with an id above `after_id`, in the order they were logged.
+    Day numbers are CAST(julianday(date) AS INTEGER).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT rh.id, rh.word_id, CAST(julianday(substr(rh.reviewed_at, 1, 10)) AS INTEGER), rh.rating
+            FROM review_history rh
+            JOIN vocabulary v ON v.id = rh.word_id
+            WHERE rh.user_id = ? AND v.language = ? AND rh.id > ?
+              AND rh.rating IN ('again', 'hard', 'good', 'easy')
+            ORDER BY rh.id
+        ''', (user_id, language, after_id))
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+    return ([row[1] for row in rows], [row[2] for row in rows],
+            [srs_engine.RATING_CODES[row[3]] for row in rows], rows[-1][0] if rows else after_id)
+
+
+def fit_srs_memory_model(language: str, user_id: int = 1) -> Dict:
+    """Fit the memory model (srs_engine.fit_memory_model) to a language's review history and save it
+
+    The fitted parameters are stored as the 'srs_memory_model' setting, and
+    each card's resulting stability in srs_memory_states. Returns the fit's
+    parameters, log loss, review count and timing.
+    """
+    word_ids, days, ratings, last_review_id = _load_review_days(language, user_id)
+    previous = get_srs_memory_model(language)
+    result = srs_engine.fit_memory_model(
+        word_ids, days, ratings,
+        initial_params=srs_engine.memory_params(previous['params']) if previous else None,
+    )
+    result['fitted_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    result['last_review_id'] = last_review_id
+    if result['reviews']:
+        card_ids, stability, last_day = srs_engine.memory_states(word_ids, days, ratings, result['params'])
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('DELETE FROM srs_memory_states WHERE user_id = ? AND language = ?', (user_id, language))
+            cursor.executemany('''
+                INSERT INTO srs_memory_states (user_id, language, word_id, stability, last_review_day)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(user_id, language, int(w), float(st), int(d)) for w, st, d in zip(card_ids, stability, last_day)])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        update_user_setting('srs_memory_model', json.dumps(result), language)
+    print(f"[SRS] Fitted {language} memory model on {result['reviews']} reviews of {result['cards']} cards "
+          f"in {result['seconds']}s: log loss {result['baseline_log_loss']} -> {result['log_loss']}")
+    return result
+
+
+def _current_memory_states(language: str, user_id: int, model: Dict) -> Dict[int, Tuple[float, int]]:
+    """word_id -> (stability, last review day): the states saved by the last fit,
+    advanced through the reviews logged since"""
+    conn = get_connection()
+    try:
+        saved = conn.execute('''
+            SELECT word_id, stability, last_review_day FROM srs_memory_states
+            WHERE user_id = ? AND language = ?
+        ''', (user_id, language)).fetchall()
+    finally:
+        conn.close()
+    states = {row[0]: (row[1], row[2]) for row in saved}
+    word_ids, days, ratings, _ = _load_review_days(language, user_id, model.get('last_review_id', 0))
+    if word_ids:
+        prior = ([row[0] for row in saved], [row[1] for row in saved], [row[2] for row in saved])
+        card_ids, stability, last_day = srs_engine.memory_states(word_ids, days, ratings, model['params'], prior)
+        states.update({int(w): (float(st), int(d)) for w, st, d in zip(card_ids, stability, last_day)})
+    return states
+
+
+def get_srs_memory_model(language: str) -> Optional[Dict]:
+    """The last fit_srs_memory_model result for a language, or None"""
+    value = get_user_settings(language).get('srs_memory_model')
+    return json.loads(value) if value else None
+
+
+# Workload forecasts are cached on everything they depend on: the proposed
+# quotas, the ease settings, the fitted memory model and the language's card
+# state version (so any review or bulk change makes a fresh forecast).
+_forecast_cache: 'OrderedDict[tuple, Dict]' = OrderedDict()
+_forecast_cache_lock = threading.Lock()
+
+# Weight of srs_engine.DEFAULT_RATING_PROBS against observed reviews, in reviews
+RATING_PRIOR_WEIGHT = 20
+
+
+def _rating_probs(cursor, language: str, user_id: int, since: str) -> List[List[float]]:
+    """Share of each rating by mastery level in recent flashcard reviews, smoothed toward the defaults"""
+    cursor.execute('''
+        SELECT rh.mastery_level_before, rh.rating, COUNT(*)
+        FROM review_history rh
+        JOIN vocabulary v ON v.id = rh.word_id
+        WHERE rh.user_id = ? AND v.language = ? AND rh.activity_type = 'flashcard' AND rh.reviewed_at >= ?
+        GROUP BY rh.mastery_level_before, rh.rating
+    ''', (user_id, language, since))
+    probs = [[p * RATING_PRIOR_WEIGHT for p in row] for row in srs_engine.DEFAULT_RATING_PROBS]
+    for mastery_level, rating, count in cursor.fetchall():
+        level = srs_engine.MASTERY_CODES.get(mastery_level)
+        code = srs_engine.RATING_CODES.get(rating)
+        if level is not None and code is not None:
+            probs[level][code] += count
+    return [[p / sum(row) for p in row] for row in probs]
+
+
+def forecast_srs_workload(language: str, days: int, new_cards_per_day: Optional[int] = None,
+                          reviews_per_day: Optional[int] = None, user_id: int = 1) -> Dict:
+    """Forecast daily flashcard load for the next `days` days under the given quotas
+
+    Quotas default to the language's current SRS settings. Simulates the
+    language's reviewed cards plus new cards at new_cards_per_day
+    (srs_engine.simulate_workload): ratings follow the user's recent rating
+    shares per mastery level, and with a fitted memory model the chance of
+    forgetting follows each card's stability.
+
+    Returns per-day lists (dates, reviews, new_cards, lapses, backlog) and a
+    summary; 'cached' says whether it came from the forecast cache.
+    """
+    current = get_srs_settings(language, user_id)
+    if new_cards_per_day is None:
+        new_cards_per_day = current['new_cards_per_day']
+    if reviews_per_day is None:
+        reviews_per_day = current['reviews_per_day']
+    srs_settings = get_srs_settings_for_language(language)
+    model = get_srs_memory_model(language)
+    key = (
+        user_id, language, days, new_cards_per_day, reviews_per_day,
+        tuple(sorted(srs_settings.items())), model['fitted_at'] if model else None,
+        get_srs_state_version(language), config.get_current_time().date(),
+    )
+    with _forecast_cache_lock:
+        if key in _forecast_cache:
+            _forecast_cache.move_to_end(key)
+            return {**_forecast_cache[key], 'cached': True}
+
+    today = config.get_current_time().date()
+    today_str = today.strftime('%Y-%m-%d')
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
         cursor.execute('''
-            INSERT INTO word_states (word_id, user_id, mastery_level, next_review_date, 
-                                    review_count, ease_factor, last_reviewed, introduced_date, interval_days)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(word_id, user_id) DO UPDATE SET
-                mastery_level = excluded.mastery_level,
-                next_review_date = excluded.next_review_date,
-                review_count = excluded.review_count,
-                ease_factor = excluded.ease_factor,
-                last_reviewed = excluded.last_reviewed,
-                introduced_date = COALESCE(word_states.introduced_date, excluded.introduced_date),
-                interval_days = excluded.interval_days
-        ''', (
-            word_id, user_id, mastery_level,
-            next_review.strftime('%Y-%m-%d'),
-            review_count, ease_factor, today_str, introduced_date,
-            (next_review - today).days
-        ))
-        
-        # Log this review to review_history table
+            SELECT ws.word_id, ws.mastery_level, ws.review_count, ws.ease_factor,
+                   CAST(julianday(ws.next_review_date) - julianday(?) AS INTEGER),
+                   COALESCE(ws.interval_days, 0),
+                   CAST(julianday(?) - julianday(substr(ws.last_reviewed, 1, 10)) AS INTEGER)
+            FROM word_states ws
+            JOIN vocabulary v ON v.id = ws.word_id
+            WHERE ws.user_id = ? AND v.language = ? AND ws.mastery_level != 'new'
+              AND ws.next_review_date IS NOT NULL
+        ''', (today_str, today_str, user_id, language))
+        cards = cursor.fetchall()
         cursor.execute('''
-            INSERT INTO review_history (
-                word_id, user_id, reviewed_at, rating, activity_type,
-                interval_days, ease_factor, mastery_level_before, mastery_level_after
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            word_id, user_id, 
-            datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            comfort_level,  # 'easy', 'good', 'hard', 'again'
-            'flashcard',
-            (next_review - today).days,
-            ease_factor,
-            mastery_level_before,
-            mastery_level
-        ))
-        
-        conn.commit()
+            SELECT COUNT(*)
+            FROM vocabulary v
+            LEFT JOIN word_states ws ON ws.word_id = v.id AND ws.user_id = ?
+            WHERE v.language = ? AND (ws.word_id IS NULL OR ws.mastery_level = 'new')
+        ''', (user_id, language))
+        new_available = cursor.fetchone()[0]
+        since = (today - timedelta(days=config.SRS_FORECAST_HISTORY_DAYS)).strftime('%Y-%m-%d')
+        rating_probs = _rating_probs(cursor, language, user_id, since)
+    finally:
         conn.close()
-        
-        # Update daily quota
-        increment_daily_quota(language, is_new_card, user_id)
-        
-        # Check if daily flashcard goal is met and log if complete
-        check_and_log_flashcard_completion(language, user_id)
-        
-        print(f"[SRS] Updated word {word_id}: {mastery_level}, ease={ease_factor:.2f}, next={next_review}, new={is_new_card}")
-        print(f"[SRS] Logged review: {mastery_level_before} -> {mastery_level}, rating={comfort_level}")
-        
-        return {
-            'word_id': word_id,
-            'mastery_level': mastery_level,
-            'next_review': next_review.strftime('%Y-%m-%d'),
-            'review_count': review_count,
-            'ease_factor': ease_factor,
-            'interval_days': (next_review - today).days,
-        }
-    except Exception as e:
-        print(f"Error updating word state from flashcard: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {}
+
+    stability = elapsed_days = None
+    if model and cards:
+        # Cards without model state (e.g. marked known in bulk) get their current
+        # interval, the point where the app expects 90% recall
+        history = _current_memory_states(language, user_id, model)
+        # CAST(julianday(today) AS INTEGER), the day numbers of srs_memory_states
+        today_day = today.toordinal() + 1721424
+        stability, elapsed_days = [], []
+        for card in cards:
+            if card[0] in history:
+                card_stability, last_day = history[card[0]]
+                stability.append(card_stability)
+                elapsed_days.append(today_day - last_day)
+            else:
+                stability.append(max(1.0, float(card[5])))
+                elapsed_days.append(card[6] or 0)
+
+    forecast = srs_engine.simulate_workload(
+        [card[4] if card[4] is not None else 0 for card in cards],
+        [srs_engine.MASTERY_CODES.get(card[1], srs_engine.LEARNING) for card in cards],
+        [card[2] or 0 for card in cards],
+        [card[3] or srs_settings['default_ease_factor'] for card in cards],
+        srs_settings, days=days, new_cards_available=new_available,
+        new_cards_per_day=new_cards_per_day, reviews_per_day=reviews_per_day,
+        rating_probs=rating_probs,
+        stability=stability, elapsed_days=elapsed_days,
+        params=model['params'] if model else None,
+        runs=config.SRS_FORECAST_RUNS, seed=0,
+    )
+
+    reviews = forecast['reviews']
+    peak = max(range(days), key=lambda d: reviews[d]) if days else 0
+    result = {
+        'language': language,
+        'days': days,
+        'new_cards_per_day': new_cards_per_day,
+        'reviews_per_day': reviews_per_day,
+        'cards': len(cards),
+        'new_cards_available': new_available,
+        'memory_model': bool(model),
+        'dates': [(today + timedelta(days=d)).strftime('%Y-%m-%d') for d in range(days)],
+        **forecast,
+        'summary': {
+            'average_reviews': round(sum(reviews) / days, 1) if days else 0,
+            'first_week_average_reviews': round(sum(reviews[:7]) / min(7, days), 1) if days else 0,
+            'peak_reviews': reviews[peak] if days else 0,
+            'peak_date': (today + timedelta(days=peak)).strftime('%Y-%m-%d'),
+            'days_over_quota': sum(1 for b in forecast['backlog'] if b > 0),
+            'final_backlog': forecast['backlog'][-1] if days else 0,
+        },
+    }
+    with _forecast_cache_lock:
+        _forecast_cache[key] = result
+        while len(_forecast_cache) > config.SRS_FORECAST_CACHE_SIZE:
+            _forecast_cache.popitem(last=False)
+    return {**result, 'cached': False}
 
 
 # ============================================================================
@@ -3281,7 +4672,7 @@ def get_daily_stats(language: str = None, days: int = 365) -> Dict:
     """
     from datetime import datetime, timedelta
     
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -3290,7 +4681,7 @@ def get_daily_stats(language: str = None, days: int = 365) -> Dict:
     
     # Get daily activity counts
     activity_query = '''
-        SELECT DATE(completed_at) as date, COUNT(*) as count
+        SELECT completed_date as date, COUNT(*) as count
         FROM activity_history
         WHERE user_id = 1 AND completed_at IS NOT NULL
     '''
@@ -3300,7 +4691,7 @@ def get_daily_stats(language: str = None, days: int = 365) -> Dict:
         activity_query += ' AND language = ?'
         activity_params.append(language)
     
-    activity_query += ' AND DATE(completed_at) >= ? GROUP BY DATE(completed_at)'
+    activity_query += ' AND completed_date >= ? GROUP BY completed_date'
     activity_params.append(start_date)
     
     cursor.execute(activity_query, activity_params)
@@ -3358,7 +4749,7 @@ def get_user_learning_languages() -> List[str]:
     have not yet set explicit preferences.
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Prefer the most-recently written selected_languages preference row
@@ -3400,7 +4791,7 @@ def get_user_learning_languages() -> List[str]:
 
 def get_language_stats(language: str) -> Dict:
     """Get comprehensive stats for a specific language"""
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -3457,7 +4848,7 @@ def get_language_stats(language: str) -> Dict:
 def log_activity(language: str, activity_type: str, score: float = 0.0, activity_data: str = '') -> int:
     """Log an activity completion. Returns the new row's id."""
     try:
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         cursor = conn.cursor()
         
         today = datetime.now().strftime('%Y-%m-%d')
@@ -3491,6 +4882,7 @@ def log_activity(language: str, activity_type: str, score: float = 0.0, activity
                 count = count + 1
         ''', (language, activity_type, today))
         
+        _refresh_streak_days(cursor)
         conn.commit()
         conn.close()
         
@@ -3510,7 +4902,7 @@ def update_activity_score(language: str, activity_type: str, score: float, activ
     """Update the score of the most recent activity for this language and type, or a specific activity by ID"""
     try:
         import json
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # If activity_id is provided, use that specific activity
@@ -3686,7 +5078,7 @@ def update_conversation_messages(conversation_id: int, messages: list):
         messages: List of message dicts with user_message, ai_response, timestamp
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Get existing activity_data
@@ -3719,44 +5111,48 @@ def update_conversation_messages(conversation_id: int, messages: list):
         traceback.print_exc()
 
 
+def _get_daily_progress(cursor, language: str, date: str) -> Dict:
+    """get_daily_progress on an open cursor (row_factory sqlite3.Row)"""
+    cursor.execute('''
+        SELECT activity_type, COALESCE(SUM(count), 0) as count
+        FROM daily_progress
+        WHERE user_id = 1 AND language = ? AND date = ?
+        GROUP BY activity_type
+    ''', (language, date))
+    
+    progress = {row['activity_type']: row['count'] for row in cursor.fetchall()}
+    
+    # Get goals
+    cursor.execute('''
+        SELECT activity_type, daily_target
+        FROM language_goals
+        WHERE language = ?
+    ''', (language,))
+    
+    goals = {row['activity_type']: row['daily_target'] for row in cursor.fetchall()}
+    
+    # Combine progress and goals
+    result = {}
+    for activity in ['reading', 'listening', 'writing', 'speaking', 'conversation']:
+        result[activity] = {
+            'completed': progress.get(activity, 0),
+            'target': goals.get(activity, 0)
+        }
+    
+    return result
+
+
 def get_daily_progress(language: str, date: Optional[str] = None) -> Dict:
     """Get daily progress for a language"""
     try:
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
         
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT activity_type, COALESCE(SUM(count), 0) as count
-            FROM daily_progress
-            WHERE user_id = 1 AND language = ? AND date = ?
-            GROUP BY activity_type
-        ''', (language, date))
-        
-        progress = {row['activity_type']: row['count'] for row in cursor.fetchall()}
-        
-        # Get goals
-        cursor.execute('''
-            SELECT activity_type, daily_target
-            FROM language_goals
-            WHERE language = ?
-        ''', (language,))
-        
-        goals = {row['activity_type']: row['daily_target'] for row in cursor.fetchall()}
-        
+        result = _get_daily_progress(cursor, language, date)
         conn.close()
-        
-        # Combine progress and goals
-        result = {}
-        for activity in ['reading', 'listening', 'writing', 'speaking', 'conversation']:
-            result[activity] = {
-                'completed': progress.get(activity, 0),
-                'target': goals.get(activity, 0)
-            }
-        
         return result
     except Exception as e:
         print(f"Error in get_daily_progress: {str(e)}")
@@ -3779,7 +5175,7 @@ def get_daily_progress(language: str, date: Optional[str] = None) -> Dict:
 def get_language_goals(language: str) -> Dict:
     """Get goals for a language"""
     try:
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3799,7 +5195,7 @@ def get_language_goals(language: str) -> Dict:
 
 def update_language_goals(language: str, goals: Dict):
     """Update goals for a language"""
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     for activity_type, target in goals.items():
@@ -3840,7 +5236,7 @@ def get_weekly_goals(language: str, week_start_date: str = None) -> Dict:
             today = datetime.now()
             week_start_date = (today - timedelta(days=today.weekday())).strftime('%Y-%m-%d')
         
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3899,7 +5295,7 @@ def update_weekly_goals(language: str, weekly_goals: Dict, week_start_date: str
         if week_start_date is None:
             week_start_date = 'default'
         
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Clear existing goals for this language and week/template
@@ -3917,6 +5313,7 @@ def update_weekly_goals(language: str, weekly_goals: Dict, week_start_date: str
                         VALUES (?, ?, ?, ?, ?)
                     ''', (language, activity_type, day, week_start_date, target_count))
         
+        _refresh_streak_days(cursor)
         conn.commit()
         conn.close()
         
@@ -3934,6 +5331,31 @@ def update_weekly_goals(language: str, weekly_goals: Dict, week_start_date: str
         return False
 
 
+def _today_week_day() -> Tuple[str, str]:
+    """(current week's Monday as YYYY-MM-DD, today's day name) for the weekly_goals lookups"""
+    today = datetime.now()
+    day_index = today.weekday()
+    day_names = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+    current_monday = today - timedelta(days=day_index)
+    return current_monday.strftime('%Y-%m-%d'), day_names[day_index]
+
+
+def _get_all_languages_today_goals(cursor) -> Dict:
+    """get_all_languages_today_goals on an open cursor (row_factory sqlite3.Row)"""
+    week_start_date, today_name = _today_week_day()
+    cursor.execute('''
+        SELECT language, activity_type, target_count
+        FROM weekly_goals
+        WHERE day_of_week = ? AND week_start_date = ?
+    ''', (today_name, week_start_date))
+    
+    # Organize by language -> activity -> count
+    all_goals = {}
+    for row in cursor.fetchall():
+        all_goals.setdefault(row['language'], {})[row['activity_type']] = row['target_count']
+    return all_goals
+
+
 def get_today_goals(language: str) -> Dict:
     """Get today's goals for a language based on current week's weekly goals
     
@@ -3941,19 +5363,9 @@ def get_today_goals(language: str) -> Dict:
     Example: {'reading': 2, 'listening': 1}
     """
     try:
-        from datetime import datetime, timedelta
-        
-        # Get current day of week and date
-        today = datetime.now()
-        day_index = today.weekday()
-        day_names = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        today_name = day_names[day_index]
-        
-        # Calculate current week's Monday
-        current_monday = today - timedelta(days=day_index)
-        week_start_date = current_monday.strftime('%Y-%m-%d')
+        week_start_date, today_name = _today_week_day()
         
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3979,38 +5391,10 @@ def get_all_languages_today_goals() -> Dict:
     Example: {'kannada': {'reading': 2}, 'hindi': {'listening': 1}}
     """
     try:
-        from datetime import datetime, timedelta
-        
-        today = datetime.now()
-        day_index = today.weekday()
-        day_names = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        today_name = day_names[day_index]
-        
-        # Calculate current week's Monday
-        current_monday = today - timedelta(days=day_index)
-        week_start_date = current_monday.strftime('%Y-%m-%d')
-        
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT language, activity_type, target_count
-            FROM weekly_goals
-            WHERE day_of_week = ? AND week_start_date = ?
-        ''', (today_name, week_start_date))
-        
-        # Organize by language -> activity -> count
-        all_goals = {}
-        for row in cursor.fetchall():
-            lang = row['language']
-            activity = row['activity_type']
-            count = row['target_count']
-            
-            if lang not in all_goals:
-                all_goals[lang] = {}
-            all_goals[lang][activity] = count
-        
+        all_goals = _get_all_languages_today_goals(cursor)
         conn.close()
         return all_goals
     except Exception as e:
@@ -4018,6 +5402,42 @@ def get_all_languages_today_goals() -> Dict:
         return {}
 
 
+def _get_week_goals_all_languages(cursor, week_offset: int) -> Dict:
+    """get_week_goals_all_languages on an open cursor (row_factory sqlite3.Row)"""
+    # Calculate week start date for the target week
+    today = datetime.now()
+    current_monday = today - timedelta(days=today.weekday())
+    target_monday = current_monday + timedelta(weeks=week_offset)
+    week_start_date = target_monday.strftime('%Y-%m-%d')
+    
+    cursor.execute('''
+        SELECT day_of_week, language, activity_type, target_count
+        FROM weekly_goals
+        WHERE week_start_date = ?
+    ''', (week_start_date,))
+    
+    # Organize by day -> language -> activity -> count
+    week_goals = {}
+    day_names = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+    
+    for day in day_names:
+        week_goals[day] = {}
+    
+    for row in cursor.fetchall():
+        day = row['day_of_week']
+        lang = row['language']
+        activity = row['activity_type']
+        count = row['target_count']
+        
+        if day not in week_goals:
+            week_goals[day] = {}
+        if lang not in week_goals[day]:
+            week_goals[day][lang] = {}
+        week_goals[day][lang][activity] = count
+    
+    return week_goals
+
+
 def get_week_goals_all_languages(week_offset: int = 0) -> Dict:
     """Get goals for all languages for a specific week
     
@@ -4028,43 +5448,10 @@ def get_week_goals_all_languages(week_offset: int = 0) -> Dict:
         Dict mapping day -> language -> {activity -> count}
     """
     try:
-        from datetime import datetime, timedelta
-        
-        # Calculate week start date for the target week
-        today = datetime.now()
-        current_monday = today - timedelta(days=today.weekday())
-        target_monday = current_monday + timedelta(weeks=week_offset)
-        week_start_date = target_monday.strftime('%Y-%m-%d')
-        
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT day_of_week, language, activity_type, target_count
-            FROM weekly_goals
-            WHERE week_start_date = ?
-        ''', (week_start_date,))
-        
-        # Organize by day -> language -> activity -> count
-        week_goals = {}
-        day_names = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        
-        for day in day_names:
-            week_goals[day] = {}
-        
-        for row in cursor.fetchall():
-            day = row['day_of_week']
-            lang = row['language']
-            activity = row['activity_type']
-            count = row['target_count']
-            
-            if day not in week_goals:
-                week_goals[day] = {}
-            if lang not in week_goals[day]:
-                week_goals[day][lang] = {}
-            week_goals[day][lang][activity] = count
-        
+        week_goals = _get_week_goals_all_languages(cursor, week_offset)
         conn.close()
         return week_goals
     except Exception as e:
@@ -4072,6 +5459,40 @@ def get_week_goals_all_languages(week_offset: int = 0) -> Dict:
         return {}
 
 
+def _get_week_progress(cursor, week_offset: int) -> Dict:
+    """get_week_progress on an open cursor (row_factory sqlite3.Row)"""
+    # Calculate the Monday of the target week
+    today = datetime.now()
+    current_monday = today - timedelta(days=today.weekday())
+    target_monday = current_monday + timedelta(weeks=week_offset)
+    
+    # Get all 7 days of the week
+    week_dates = [(target_monday + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
+    
+    # Get progress for all dates in the week
+    placeholders = ','.join(['?' for _ in week_dates])
+    cursor.execute(f'''
+        SELECT date, language, activity_type, count
+        FROM daily_progress
+        WHERE date IN ({placeholders})
+    ''', week_dates)
+    
+    # Organize by date -> language -> activity -> count
+    week_progress = {date: {} for date in week_dates}
+    
+    for row in cursor.fetchall():
+        date = row['date']
+        lang = row['language']
+        activity = row['activity_type']
+        count = row['count']
+        
+        if lang not in week_progress[date]:
+            week_progress[date][lang] = {}
+        week_progress[date][lang][activity] = count
+    
+    return week_progress
+
+
 def get_week_progress(week_offset: int = 0) -> Dict:
     """Get actual progress for a specific week across all languages
     
@@ -4082,41 +5503,10 @@ def get_week_progress(week_offset: int = 0) -> Dict:
         Dict mapping date -> language -> {activity -> count}
     """
     try:
-        from datetime import datetime, timedelta
-        
-        # Calculate the Monday of the target week
-        today = datetime.now()
-        current_monday = today - timedelta(days=today.weekday())
-        target_monday = current_monday + timedelta(weeks=week_offset)
-        
-        # Get all 7 days of the week
-        week_dates = [(target_monday + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
-        
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
-        
-        # Get progress for all dates in the week
-        placeholders = ','.join(['?' for _ in week_dates])
-        cursor.execute(f'''
-            SELECT date, language, activity_type, count
-            FROM daily_progress
-            WHERE date IN ({placeholders})
-        ''', week_dates)
-        
-        # Organize by date -> language -> activity -> count
-        week_progress = {date: {} for date in week_dates}
-        
-        for row in cursor.fetchall():
-            date = row['date']
-            lang = row['language']
-            activity = row['activity_type']
-            count = row['count']
-            
-            if lang not in week_progress[date]:
-                week_progress[date][lang] = {}
-            week_progress[date][lang][activity] = count
-        
+        week_progress = _get_week_progress(cursor, week_offset)
         conn.close()
         return week_progress
     except Exception as e:
@@ -4124,6 +5514,242 @@ def get_week_progress(week_offset: int = 0) -> Dict:
         return {}
 
 
+def _get_weekly_stats(cursor, days: int = 7, offset: int = 0) -> List[Dict]:
+    """get_weekly_stats on an open cursor (row_factory sqlite3.Row)"""
+    # Calculate date range with offset
+    end_date = config.get_current_time() - timedelta(days=offset)
+    start_date = end_date - timedelta(days=days-1)
+    
+    # Get activity counts by date
+    cursor.execute('''
+        SELECT 
+            completed_date as date,
+            COUNT(*) as activity_count
+        FROM activity_history
+        WHERE user_id = 1 
+        AND completed_at IS NOT NULL
+        AND completed_at >= ?
+        GROUP BY completed_date
+        ORDER BY date ASC
+    ''', (start_date.strftime('%Y-%m-%d'),))
+    
+    activity_counts = {row['date']: row['activity_count'] for row in cursor.fetchall()}
+    
+    # Get lesson counts by date
+    cursor.execute('''
+        SELECT 
+            DATE(completed_at) as date,
+            COUNT(*) as lesson_count
+        FROM lesson_completions
+        WHERE user_id = 1 
+        AND completed_at IS NOT NULL
+        AND completed_at >= ?
+        GROUP BY DATE(completed_at)
+        ORDER BY date ASC
+    ''', (start_date.strftime('%Y-%m-%d'),))
+    
+    lesson_counts = {row['date']: row['lesson_count'] for row in cursor.fetchall()}
+    
+    # Get word counts by date (from activity_data JSON)
+    cursor.execute('''
+        SELECT 
+            completed_date as date,
+            activity_data
+        FROM activity_history
+        WHERE user_id = 1 
+        AND completed_at IS NOT NULL
+        AND completed_at >= ?
+        ORDER BY date ASC
+    ''', (start_date.strftime('%Y-%m-%d'),))
+    
+    word_counts = {}
+    for row in cursor.fetchall():
+        date = row['date']
+        if row['activity_data']:
+            try:
+                data = json.loads(row['activity_data'])
+                # Count words from different activity types
+                words = 0
+                if 'vocabulary' in data:
+                    words += len(data['vocabulary'])
+                if 'sentences' in data:
+                    words += len(data['sentences'])
+                if 'questions' in data:
+                    words += len(data['questions'])
+                
+                word_counts[date] = word_counts.get(date, 0) + words
+            except:
+                pass
+    
+    # Build response for all days in range
+    stats = []
+    current_date = start_date
+    for i in range(days):
+        date_str = current_date.strftime('%Y-%m-%d')
+        stats.append({
+            'date': date_str,
+            'day': current_date.strftime('%a'),  # Mon, Tue, etc.
+            'activities': activity_counts.get(date_str, 0),
+            'lessons': lesson_counts.get(date_str, 0),
+            'words': word_counts.get(date_str, 0)
+        })
+        current_date += timedelta(days=1)
+    
+    return stats
+
+
+def get_weekly_stats(days: int = 7, offset: int = 0) -> List[Dict]:
+    """Get activity, lesson and word counts for each of the past N days
+
+    Args:
+        days: Number of days to retrieve
+        offset: Days to shift the range back from today (0 for the past week, 7 for the week before)
+
+    Returns:
+        List of {date, day, activities, lessons, words}, oldest first
+    """
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    stats = _get_weekly_stats(cursor, days, offset)
+    conn.close()
+    return stats
+
+
+# ============================================================================
+# Home Screen
+# ============================================================================
+
+# GET /api/home gathers what the home screen used to fetch from /api/dashboard,
+# /api/streak, /api/srs/stats, /api/today-goals-all, /api/week-overview and
+# /api/weekly-stats in one read transaction. Results are cached on
+# home_data_version, which triggers bump on every write to the tables they are
+# built from (see migrations._m009_home_data_version and
+# _m014_lesson_completions_home_version), and on the day.
+_home_cache: 'OrderedDict[tuple, Dict]' = OrderedDict()
+_home_cache_lock = threading.Lock()
+
+
+def _home_days() -> Tuple[str, str]:
+    """The days home data depends on: local (goals, progress) and app timezone (streak, SRS)"""
+    return datetime.now().strftime('%Y-%m-%d'), config.get_current_date_str()
+
+
+def get_home_data_version() -> int:
+    """Current home_data_version (changes with every write home data depends on)"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT version FROM home_data_version WHERE id = 1')
+    row = cursor.fetchone()
+    conn.close()
+    return row[0] if row else 0
+
+
+def home_data_etag(language: str, version: int, user_id: int = 1) -> str:
+    """ETag for get_home_data at `version` (today only)"""
+    return f'"home-{user_id}-{language}-{version}-{"-".join(_home_days())}"'
+
+
+def get_home_data(language: str, user_id: int = 1) -> Dict:
+    """Everything the home screen shows, read in one transaction
+
+    Returns:
+        {
+            "language": str,
+            "version": int,        # home_data_version the data was read at
+            "dashboard": {...},    # as /api/dashboard/{language}
+            "streak": {...},       # as /api/streak
+            "srs_stats": {...},    # as /api/srs/stats/{language}
+            "today_goals_all": {...},  # as /api/today-goals-all
+            "today_progress": {language: {...}},  # daily progress of each language with goals today
+            "week_overview": {...},    # as /api/week-overview (this week)
+            "weekly_stats": [...],     # as /api/weekly-stats (past 7 days)
+            "cached": bool
+        }
+    """
+    days = _home_days()
+    now = config.get_current_time()
+    # Today's SRS quota row is created on first use, and the streak state on
+    # first read; do both before the read
+    quota = get_daily_quota(language, days[1], user_id)
+    conn = get_connection()
+    _ensure_streak_state(conn)
+    conn.close()
+
+    version = get_home_data_version()
+    key = (user_id, language, version, days)
+    with _home_cache_lock:
+        if key in _home_cache:
+            _home_cache.move_to_end(key)
+            return {**_home_cache[key], 'cached': True}
+
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    try:
+        # Deferred BEGIN: the first SELECT pins the snapshot every later one reads
+        cursor.execute('BEGIN')
+        cursor.execute('SELECT version FROM home_data_version WHERE id = 1')
+        row = cursor.fetchone()
+        version = row[0] if row else 0
+        cursor.execute('SELECT * FROM user_profile WHERE id = 1')
+        row = cursor.fetchone()
+        profile = dict(row) if row else {}
+        all_goals = _get_all_languages_today_goals(cursor)
+        today_progress = {lang: _get_daily_progress(cursor, lang, days[0]) for lang in all_goals}
+        progress = today_progress.get(language) or _get_daily_progress(cursor, language, days[0])
+        summary = _read_level_summary(cursor, language, user_id)
+        streak = _read_streak(cursor)
+        cursor.execute(
+            'SELECT * FROM srs_daily_quota WHERE user_id = ? AND language = ? AND date = ?',
+            (user_id, language, days[1])
+        )
+        row = cursor.fetchone()
+        srs_stats = _get_srs_stats(cursor, language, user_id, _daily_quota_from_row(row) if row else quota)
+        week_goals = _get_week_goals_all_languages(cursor, 0)
+        week_progress = _get_week_progress(cursor, 0)
+        weekly_stats = _get_weekly_stats(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+
+    # Only before the level summary's first build (which writes) is it read separately
+    level = _user_level_from_summary(summary) if summary else calculate_user_level(language, user_id)
+    monday = now - timedelta(days=now.weekday())
+    day_names = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+    result = {
+        'language': language,
+        'version': version,
+        'dashboard': {
+            'streak': profile.get('streak', 0),
+            'progress': progress,
+            'goals': all_goals.get(language, {}),
+            'level': level,
+        },
+        'streak': streak,
+        'srs_stats': srs_stats,
+        'today_goals_all': {
+            'goals': all_goals,
+            'day': day_names[now.weekday()],
+            'date': days[1],
+        },
+        'today_progress': today_progress,
+        'week_overview': {
+            'week_start': monday.strftime('%Y-%m-%d'),
+            'week_end': (monday + timedelta(days=6)).strftime('%Y-%m-%d'),
+            'week_offset': 0,
+            'goals': week_goals,
+            'progress': week_progress,
+        },
+        'weekly_stats': weekly_stats,
+    }
+    with _home_cache_lock:
+        _home_cache[(user_id, language, version, days)] = result
+        while len(_home_cache) > config.HOME_CACHE_SIZE:
+            _home_cache.popitem(last=False)
+    return {**result, 'cached': False}
+
+
 # ============================================================================
 # Language Personalization Settings
 # ============================================================================
@@ -4135,7 +5761,7 @@ def get_language_personalization(language: str) -> Dict:
         Dict with 'default_transliterate' (bool) and other settings
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4185,7 +5811,7 @@ def update_language_personalization(language: str, default_transliterate: bool)
     try:
         from datetime import datetime
         
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Check if settings exist
@@ -4241,7 +5867,7 @@ def add_lesson(lesson_id: str, title: str, language: str, level: str, steps: Lis
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         cursor = conn.cursor()
         
         now = datetime.now().isoformat()
@@ -4280,7 +5906,7 @@ def update_lesson(lesson_id: str, title: str, language: str, level: str, steps:
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH, timeout=10.0)
+        conn = get_connection()
         cursor = conn.cursor()
         
         now = datetime.now().isoformat()
@@ -4310,7 +5936,7 @@ def get_lessons_by_language(language: str) -> List[Dict]:
         List of lesson dictionaries
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4353,7 +5979,7 @@ def get_lesson_by_id(lesson_id: str) -> Optional[Dict]:
         Lesson dictionary or None if not found
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4395,7 +6021,7 @@ def record_lesson_completion(user_id: int, lesson_id: str, answers: Dict, feedba
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         now = datetime.now().isoformat()
@@ -4425,7 +6051,7 @@ def get_lesson_completions(user_id: int, lesson_id: str = None) -> List[Dict]:
         List of completion dictionaries
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4486,7 +6112,7 @@ def add_unit(unit_id: str, unit_number: int, language: str, title: str, subtitle
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         now = datetime.now().isoformat()
@@ -4528,7 +6154,7 @@ def get_units_by_language(language: str) -> List[Dict]:
         List of unit dictionaries with progress
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4579,7 +6205,7 @@ def update_unit_progress(user_id: int, unit_id: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Get total lessons in unit
@@ -4637,7 +6263,7 @@ def save_lesson_progress(user_id: int, lesson_id: str, current_step: int, comple
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         now = datetime.now().isoformat()
@@ -4672,7 +6298,7 @@ def get_lesson_progress(user_id: int, lesson_id: str) -> Optional[Dict]:
         Progress dictionary or None if not found
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4708,7 +6334,7 @@ def clear_lesson_progress(user_id: int, lesson_id: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -4733,7 +6359,7 @@ def clear_lesson_progress(user_id: int, lesson_id: str) -> bool:
 def get_user_active_languages(user_id: int = 1) -> List[str]:
     """Get list of languages the user is actively learning"""
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Get distinct languages from user's vocabulary progress
@@ -4759,17 +6385,26 @@ def get_user_active_languages(user_id: int = 1) -> List[str]:
 
 
 def find_word_by_translation(word: str, language: str) -> Optional[Dict]:
-    """Find if a word already exists in the vocabulary"""
+    """Find if a word already exists in the vocabulary
+    
+    Matches any " /"-separated variant of a translation, compared as search
+    keys (see search_key), through the vocabulary_search_keys index.
+    """
+    keys = search_keys('translation', word)
+    if not keys:
+        return None
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT * FROM vocabulary
-            WHERE language = ? AND LOWER(translation) = LOWER(?)
+            SELECT v.* FROM vocabulary_search_keys k
+            JOIN vocabulary v ON v.id = k.word_id
+            WHERE k.language = ? AND k.field = 'translation' AND k.key = ?
+            ORDER BY v.id
             LIMIT 1
-        ''', (language, word))
+        ''', (language, keys[0]))
         
         row = cursor.fetchone()
         conn.close()
@@ -4782,6 +6417,64 @@ def find_word_by_translation(word: str, language: str) -> Optional[Dict]:
         return None
 
 
+def find_words_by_translations(words: List[str], language: str) -> Dict[str, Dict]:
+    """find_word_by_translation for many words in one query
+
+    Returns word -> vocabulary row for the words that exist (the lowest id
+    when several rows share the word's key).
+    """
+    keys = {}
+    for word in words:
+        word_keys = search_keys('translation', word)
+        if word_keys:
+            keys[word] = word_keys[0]
+    if not keys:
+        return {}
+    try:
+        conn = get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT k.key AS search_key, v.* FROM vocabulary_search_keys k
+            JOIN vocabulary v ON v.id = k.word_id
+            WHERE k.language = ? AND k.field = 'translation'
+              AND k.key IN (SELECT value FROM json_each(?))
+            ORDER BY v.id
+        ''', (language, json.dumps(sorted(set(keys.values())))))
+        rows_by_key = {}
+        for row in cursor.fetchall():
+            row = dict(row)
+            rows_by_key.setdefault(row.pop('search_key'), row)
+        conn.close()
+        return {word: rows_by_key[key] for word, key in keys.items() if key in rows_by_key}
+    except Exception as e:
+        print(f"Error finding words: {e}")
+        return {}
+
+
+def get_words_by_ids(word_ids: List[int], user_id: int = 1) -> List[Dict]:
+    """Vocabulary rows (with mastery_level and next_review_date) in the order of `word_ids`"""
+    if not word_ids:
+        return []
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    rows_by_id = {}
+    # Chunked to stay under SQLite's bound parameter limit
+    for i in range(0, len(word_ids), 900):
+        chunk = list(word_ids[i:i + 900])
+        cursor.execute(f'''
+            SELECT v.*, COALESCE(ws.mastery_level, 'new') as mastery_level,
+                   COALESCE(ws.next_review_date, '') as next_review_date
+            FROM vocabulary v
+            LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = ?
+            WHERE v.id IN ({','.join('?' * len(chunk))})
+        ''', [user_id] + chunk)
+        rows_by_id.update((row['id'], dict(row)) for row in cursor.fetchall())
+    conn.close()
+    return [rows_by_id[word_id] for word_id in word_ids if word_id in rows_by_id]
+
+
 def insert_vocabulary_entry(
     language: str,
     english_word: str,
@@ -4793,24 +6486,71 @@ def insert_vocabulary_entry(
     verb_transitivity: Optional[str] = None
 ) -> int:
     """Insert a new vocabulary entry and return its ID"""
+    word_ids = insert_vocabulary_entries([{
+        'language': language,
+        'english_word': english_word,
+        'translation': translation,
+        'transliteration': transliteration,
+        'word_class': word_class,
+        'level': level,
+        'origin': origin,
+        'verb_transitivity': verb_transitivity,
+    }])
+    return word_ids[0] if word_ids else 0
+
+
+def insert_vocabulary_entries(entries: List[Dict]) -> List[int]:
+    """Insert vocabulary entries in one transaction and return their IDs
+
+    Each entry has the insert_vocabulary_entry arguments as keys (language,
+    english_word, translation, transliteration and word_class required).
+    Returns [] if the insert failed (nothing is inserted).
+    """
+    if not entries:
+        return []
+    conn = None
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            INSERT INTO vocabulary 
-            (language, english_word, translation, transliteration, word_class, level, origin, verb_transitivity)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (language, english_word, translation, transliteration, word_class, level, origin, verb_transitivity))
-        
-        word_id = cursor.lastrowid
+        word_ids = []
+        key_rows = []
+        total_deltas = defaultdict(lambda: defaultdict(int))
+        for entry in entries:
+            cursor.execute('''
+                INSERT INTO vocabulary 
+                (language, english_word, translation, transliteration, word_class, level, origin, verb_transitivity)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (entry['language'], entry['english_word'], entry['translation'], entry['transliteration'],
+                  entry['word_class'], entry.get('level'), entry.get('origin', 'user'),
+                  entry.get('verb_transitivity')))
+            word_ids.append(cursor.lastrowid)
+            key_rows.append((cursor.lastrowid, entry['language'], entry['english_word'],
+                             entry['translation'], entry['transliteration']))
+            total_deltas[entry['language']][_level_key(entry.get('level'))] += 1
+        
+        _write_vocabulary_search_keys(cursor, key_rows)
+        for language, deltas in total_deltas.items():
+            _apply_level_summary_deltas(cursor, language, deltas, {})
         conn.commit()
         conn.close()
+        conn = None
+        
+        from . import vocab_search, vocab_matcher, lemma_index
+        for language in total_deltas:
+            vocab_search.add_words(language, [
+                word_id for word_id, entry in zip(word_ids, entries) if entry['language'] == language
+            ])
+            vocab_matcher.invalidate(language)
+            lemma_index.invalidate(language)
         
-        return word_id
+        return word_ids
     except Exception as e:
-        print(f"Error inserting vocabulary entry: {e}")
-        return 0
+        print(f"Error inserting vocabulary entries: {e}")
+        if conn is not None:
+            conn.rollback()
+            conn.close()
+        return []
 
 
 # ============================================================================
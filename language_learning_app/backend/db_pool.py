@@ -0,0 +1,200 @@
+"""
+Pooled SQLite connections for the Fluo backend
+
+Every db.py function opens a connection, runs a couple of queries and closes it
+again. Opening a fresh sqlite3 connection each time means re-reading the schema
+and re-applying PRAGMAs on every call, and concurrent writers without a busy
+timeout fail immediately with "database is locked".
+
+get_connection() hands out connections from a small per-thread pool instead.
+Connections are never shared between threads (FastAPI runs sync endpoints on a
+threadpool), and calling close() on a pooled connection rolls back any
+uncommitted work and returns it to the pool rather than closing it. Nested
+checkouts on the same thread (a db function calling another one while its own
+connection is still open) simply get a second connection, so they behave
+exactly like the old connect/close pairs.
+"""
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from . import config
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() returns it to the per-thread pool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool: Optional['ConnectionPool'] = None
+        self._checked_out = False
+
+    def close(self):
+        """Return the connection to its pool (or really close it if unpooled)"""
+        if self._pool is None:
+            super().close()
+            return
+        if not self._checked_out:
+            # Already returned (e.g. close() called from both except and finally)
+            return
+        self._checked_out = False
+        self._pool._release(self)
+
+    def really_close(self):
+        """Close the underlying sqlite3 connection"""
+        self._pool = None
+        self._checked_out = False
+        super().close()
+
+
+class ConnectionPool:
+    """Per-thread pool of configured SQLite connections for one database file"""
+
+    def __init__(self, db_path: str, max_idle_per_thread: int = None):
+        self.db_path = db_path
+        self.max_idle_per_thread = (
+            max_idle_per_thread if max_idle_per_thread is not None
+            else config.DB_POOL_MAX_IDLE_PER_THREAD
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all_idle: List[List[PooledConnection]] = []
+        self._wal_checked = False
+        self.stats = {
+            'connections_opened': 0,
+            'checkouts': 0,
+            'reuses': 0,
+        }
+
+    def _idle(self) -> List[PooledConnection]:
+        idle = getattr(self._local, 'idle', None)
+        if idle is None:
+            idle = []
+            self._local.idle = idle
+            with self._lock:
+                self._all_idle.append(idle)
+        return idle
+
+    def _open(self) -> PooledConnection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=config.DB_BUSY_TIMEOUT_MS / 1000.0,
+            factory=PooledConnection,
+            # Thread confinement is enforced by the per-thread idle lists;
+            # this only lets close_all() close idle connections from any thread
+            check_same_thread=False,
+        )
+        apply_pragmas(conn)
+        if not self._wal_checked:
+            # journal_mode is persistent in the database file, so only the
+            # first connection needs to switch it
+            conn.execute(f"PRAGMA journal_mode={config.DB_JOURNAL_MODE}")
+            self._wal_checked = True
+        conn._pool = self
+        with self._lock:
+            self.stats['connections_opened'] += 1
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """Check out a connection for the current thread"""
+        idle = self._idle()
+        if idle:
+            conn = idle.pop()
+            reused = True
+        else:
+            conn = self._open()
+            reused = False
+        conn._checked_out = True
+        with self._lock:
+            self.stats['checkouts'] += 1
+            if reused:
+                self.stats['reuses'] += 1
+        return conn
+
+    def _release(self, conn: PooledConnection):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error as e:
+            print(f"[DBPool] Discarding broken connection: {str(e)}")
+            conn.really_close()
+            return
+
+        idle = self._idle()
+        if len(idle) < self.max_idle_per_thread:
+            idle.append(conn)
+        else:
+            conn.really_close()
+
+    def close_all(self):
+        """Close every idle connection in every thread (e.g. before swapping the DB file)"""
+        with self._lock:
+            idle_lists = list(self._all_idle)
+        for idle in idle_lists:
+            while idle:
+                try:
+                    idle.pop().really_close()
+                except IndexError:
+                    break
+
+
+def apply_pragmas(conn: sqlite3.Connection):
+    """Apply the per-connection performance PRAGMAs from config"""
+    conn.execute(f"PRAGMA busy_timeout={int(config.DB_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA synchronous={config.DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size={int(config.DB_CACHE_SIZE_KB) * -1}")
+    conn.execute(f"PRAGMA mmap_size={int(config.DB_MMAP_SIZE_BYTES)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str = None) -> ConnectionPool:
+    """Get (or create) the pool for a database file"""
+    db_path = db_path or config.DB_PATH
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = ConnectionPool(db_path)
+                _pools[db_path] = pool
+    return pool
+
+
+def get_connection(db_path: str = None) -> sqlite3.Connection:
+    """Get a database connection
+
+    Drop-in replacement for sqlite3.connect(config.DB_PATH): callers set
+    row_factory, commit and close() exactly as before. With DB_POOL_ENABLED
+    off, this falls back to the legacy behaviour of a plain fresh connection
+    per call (useful for benchmarking and debugging).
+
+    Args:
+        db_path: Database file, defaults to config.DB_PATH
+
+    Returns:
+        sqlite3.Connection (a PooledConnection)
+    """
+    if not config.DB_POOL_ENABLED:
+        return sqlite3.connect(db_path or config.DB_PATH, factory=PooledConnection)
+    return get_pool(db_path).acquire()
+
+
+def get_pool_stats(db_path: str = None) -> Dict:
+    """Get checkout/reuse counters for a pool"""
+    pool = get_pool(db_path)
+    with pool._lock:
+        return dict(pool.stats)
+
+
+def close_all_pools():
+    """Close all idle pooled connections"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
@@ -0,0 +1,104 @@
+"""
+Local stand-in for a Gemini Live session, for load tests and offline development.
+
+FakeGeminiLiveClient has the same interface as GeminiLiveClient and yields
+responses in the same shape, but never touches the network. It behaves like
+the real service closely enough to exercise the relay's buffering:
+
+- send_audio() takes some time per call (send_latency_ms), like a network
+  write, and after utterance_ms of microphone audio it "hears" the end of an
+  utterance and starts a reply
+- connect() takes connect_ms, like the real Live handshake (which is what
+  the session pool keeps warm)
+- send_text() starts a reply immediately
+- replies arrive after first_chunk_ms, as 24kHz 16-bit mono PCM chunks of
+  chunk_ms each, paced at real time (realtime=False sends them as a burst)
+
+Enable it for the backend with FLUO_LIVE_FAKE_GEMINI=1.
+"""
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+INPUT_BYTES_PER_SECOND = 16000 * 2
+OUTPUT_BYTES_PER_SECOND = 24000 * 2
+
+
+class FakeGeminiLiveClient:
+    """In-process fake of GeminiLiveClient"""
+
+    def __init__(self, reply_seconds: float = 3.0, chunk_ms: int = 40, first_chunk_ms: int = 300,
+                 utterance_ms: int = 2000, send_latency_ms: float = 2.0, realtime: bool = True,
+                 connect_ms: float = 0.0):
+        self.reply_seconds = reply_seconds
+        self.chunk_ms = chunk_ms
+        self.first_chunk_ms = first_chunk_ms
+        self.utterance_ms = utterance_ms
+        self.send_latency_ms = send_latency_ms
+        self.realtime = realtime
+        self.connect_ms = connect_ms
+
+        self.session = None
+        self.language = "kannada"
+        self.voice_name = "Kore"
+        self.conversation_context = None
+        self.audio_bytes_received = 0
+        self._utterance_bytes = 0
+        self._replies: Optional[asyncio.Queue] = None
+
+    async def start_session(self, language: str = "kannada", conversation_context: Optional[Dict[str, Any]] = None,
+                            voice_name: str = "Kore"):
+        await self.connect(language, voice_name)
+        await self.apply_context(conversation_context)
+        return True
+
+    async def connect(self, language: str = "kannada", voice_name: str = "Kore", system_instruction: Optional[str] = None):
+        await asyncio.sleep(self.connect_ms / 1000)
+        self.language = language
+        self.voice_name = voice_name
+        self.session = object()
+        self._replies = asyncio.Queue()
+        self._replies.put_nowait({"type": "setup_complete", "message": "Session setup complete"})
+        return True
+
+    async def apply_context(self, conversation_context: Optional[Dict[str, Any]] = None):
+        if not self.session:
+            raise RuntimeError("Session not started. Call connect() first.")
+        await asyncio.sleep(self.send_latency_ms / 1000)
+        self.conversation_context = conversation_context or {}
+
+    async def send_audio(self, audio_data: bytes):
+        if not self.session:
+            raise RuntimeError("Session not started. Call start_session() first.")
+        await asyncio.sleep(self.send_latency_ms / 1000)
+        self.audio_bytes_received += len(audio_data)
+        self._utterance_bytes += len(audio_data)
+        if self._utterance_bytes >= INPUT_BYTES_PER_SECOND * self.utterance_ms / 1000:
+            self._utterance_bytes = 0
+            self._replies.put_nowait({"type": "_reply", "text": "ಸರಿ, ಮುಂದುವರಿಸಿ."})
+
+    async def send_text(self, text: str):
+        if not self.session:
+            raise RuntimeError("Session not started. Call start_session() first.")
+        self._replies.put_nowait({"type": "_reply", "text": f"ನೀವು ಹೇಳಿದ್ದು: {text}"})
+
+    async def receive_responses(self) -> AsyncIterator[Dict[str, Any]]:
+        if not self.session:
+            raise RuntimeError("Session not started. Call start_session() first.")
+        chunk_size = int(OUTPUT_BYTES_PER_SECOND * self.chunk_ms / 1000) & ~1
+        chunk_count = max(1, int(self.reply_seconds * 1000 / self.chunk_ms))
+        while self.session:
+            event = await self._replies.get()
+            if event["type"] != "_reply":
+                yield event
+                continue
+            await asyncio.sleep(self.first_chunk_ms / 1000)
+            for _ in range(chunk_count):
+                yield {"type": "response", "audio_chunks": [os.urandom(chunk_size)], "text_chunks": [], "is_final": False}
+                if self.realtime:
+                    await asyncio.sleep(self.chunk_ms / 1000)
+            yield {"type": "response", "audio_chunks": [], "text_chunks": [event["text"]], "is_final": True}
+
+    async def close_session(self):
+        self.session = None
@@ -11,6 +11,8 @@ from typing import Optional, AsyncIterator, Dict, Any
 from google import genai
 from google.genai import types
 
+from . import llm_gateway
+
 
 class GeminiLiveClient:
     """
@@ -28,13 +30,15 @@ class GeminiLiveClient:
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable not set")
         
-        # Initialize client
-        self.client = genai.Client(api_key=self.api_key)
+        # Without a specific key, the gateway's client for the session's
+        # event loop is used (see start_session)
+        self.client = genai.Client(api_key=self.api_key) if api_key else None
         self.model_id = "gemini-2.5-flash-native-audio-preview-12-2025"  # Gemini Live model
         
         # Session state
         self.session = None
         self._session_manager = None
+        self._live_slot = None  # Held 'live' lane slot while a session is open
         self.conversation_context = None
         self.language = "kannada"
         self.voice_name = "Kore"  # Default voice
@@ -53,12 +57,28 @@ class GeminiLiveClient:
             conversation_context: Context including speaker profile, tasks, topic
             voice_name: Voice to use for TTS (Puck, Charon, Kore, Fenrir, Aoede)
         """
-        self.language = language
         self.conversation_context = conversation_context or {}
-        self.voice_name = voice_name
+        self.language = language
         
         # Build system instruction from context
-        system_instruction = self._build_system_instruction()
+        return await self.connect(language, voice_name, self._build_system_instruction())
+    
+    async def connect(self, language: str = "kannada", voice_name: str = "Kore", system_instruction: Optional[str] = None):
+        """
+        Open a Gemini Live session without a conversation context (see live_pool.py)
+        
+        The context can be given later with apply_context(). Without a system
+        instruction, a generic one for the language is used.
+        
+        Args:
+            language: Target language for conversation
+            voice_name: Voice to use for TTS (Puck, Charon, Kore, Fenrir, Aoede)
+            system_instruction: Full system instruction, if the context is already known
+        """
+        self.language = language
+        self.voice_name = voice_name
+        if system_instruction is None:
+            system_instruction = self._build_base_instruction()
         
         # Configure generation
         config = types.LiveConnectConfig(
@@ -73,10 +93,15 @@ class GeminiLiveClient:
             system_instruction=system_instruction
         )
         
+        # Wait for a free Live session slot (LLM_LIVE_CONCURRENCY)
+        self._live_slot = llm_gateway.get_gateway().slot('live')
+        await self._live_slot.__aenter__()
+        
         # Start session
         try:
             # connect() returns an async context manager, we need to enter it
-            session_manager = self.client.aio.live.connect(
+            client = self.client or llm_gateway.get_gateway().client
+            session_manager = client.aio.live.connect(
                 model=self.model_id,
                 config=config
             )
@@ -92,8 +117,37 @@ class GeminiLiveClient:
             print(f"[GeminiLive] Error starting session: {error_msg}")
             import traceback
             traceback.print_exc()
+            await self._release_live_slot(e)
             raise Exception(f"Failed to start Gemini Live session: {error_msg}")
     
+    async def apply_context(self, conversation_context: Optional[Dict[str, Any]] = None):
+        """
+        Give a connected session its conversation context (speaker profile, tasks, topic)
+        
+        The system instruction of a pooled session is fixed at connect time, so
+        the context goes in as an opening user turn that doesn't ask for a reply.
+        """
+        if not self.session:
+            raise RuntimeError("Session not started. Call connect() first.")
+        self.conversation_context = conversation_context or {}
+        context_text = self._build_system_instruction()
+        await self.session.send(
+            input=types.LiveClientContent(
+                turns=[types.Content(role="user", parts=[types.Part(text=context_text)])],
+                turn_complete=False
+            )
+        )
+    
+    def _build_base_instruction(self) -> str:
+        """System instruction for a session whose context arrives after connect"""
+        return "\n".join([
+            f"You are a native {self.language} speaker having a natural conversation.",
+            "Your character, the scenario and the learner's level follow in the first message;",
+            "stay in that role for the rest of the conversation.",
+            f"- Speak ONLY in {self.language}",
+            "- Keep responses conversational and natural",
+        ])
+    
     def _build_system_instruction(self) -> str:
         """
         Build system instruction from conversation context
@@ -297,6 +351,16 @@ class GeminiLiveClient:
             finally:
                 self.session = None
                 self._session_manager = None
+        await self._release_live_slot()
+    
+    async def _release_live_slot(self, error: Optional[Exception] = None):
+        """Give the 'live' lane slot back to the gateway"""
+        if self._live_slot:
+            slot, self._live_slot = self._live_slot, None
+            if error:
+                await slot.__aexit__(type(error), error, error.__traceback__)
+            else:
+                await slot.__aexit__(None, None, None)
 
 
 # Example usage (for testing)
@@ -0,0 +1,430 @@
+"""
+Script-aware tokenizer and suffix-stripping lemma index
+
+Generated text uses vocabulary words inflected: Kannada/Tamil/Telugu/Malayalam
+case and plural suffixes agglutinate onto the stem (ಮರ -> ಮರದಲ್ಲಿ, மரம் ->
+மரத்தை), Hindi/Urdu nouns take oblique and plural forms and verbs lose their
+infinitive ending (लड़का -> लड़कों, करना -> करता). Exact or substring matching
+either misses those or matches any word that happens to start with a short
+vocabulary form.
+
+tokenize() splits text into words in any script (letters, combining marks,
+digits and joiners). A LemmaIndex holds, for one language, a trie of every
+single-word vocabulary form plus the stem variants the language's STEM_RULES
+derive from it (ಊರ from ಊರು, which only matches before a suffix; लड़के from
+लड़का, a word on its own), and a reversed trie of the language's SUFFIXES.
+lookup() walks the token through the stem trie once and checks the remainder
+against the suffix positions found by one backwards walk, so a token maps to
+its vocabulary ids in O(len(token)); the longest stem that leaves nothing or a
+known suffix wins.
+
+Indexes are built from the vocabulary table (the Oxford-5000 CSVs plus user
+words) by scripts/build_lemma_index.py and stored under config.LEMMA_INDEX_DIR
+as gzipped "stem<TAB>flag<TAB>ids" lines with a fingerprint of the vocabulary
+they were built from. A stale or missing file is rebuilt (and rewritten) on
+first use; a vocabulary sync rebuilds, a custom word insert drops the index.
+"""
+import gzip
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from . import config
+from .db_pool import get_connection
+
+
+FORMAT_VERSION = 1
+
+# Joiners are part of words in the Indic scripts and Urdu
+_JOINERS = {'\u200c', '\u200d'}
+# Arabic code points Urdu text is often typed with -> the Urdu letters the CSVs use
+_ARABIC_TO_URDU = str.maketrans({'ي': 'ی', 'ى': 'ی', 'ك': 'ک', 'ه': 'ہ'})
+
+# Suffixes that follow a vocabulary form (or a stem from STEM_RULES) inside one
+# word: case markers with their linking consonants, plurals, common verb
+# endings and clitics. Stacked ones (plural + case) are listed whole.
+SUFFIXES: Dict[str, List[str]] = {
+    'kannada': [
+        'ವು', 'ವನ್ನು', 'ಕ್ಕೆ', 'ದಿಂದ', 'ದಲ್ಲಿ', 'ದ', 'ದೊಂದಿಗೆ', 'ವೂ', 'ವೇ',
+        'ಯು', 'ಯನ್ನು', 'ಗೆ', 'ಯಿಂದ', 'ಯಲ್ಲಿ', 'ಯ', 'ಯೊಂದಿಗೆ', 'ಯೂ', 'ಯೇ',
+        'ನು', 'ನನ್ನು', 'ನಿಗೆ', 'ನಿಂದ', 'ನಲ್ಲಿ', 'ನ', 'ನೊಂದಿಗೆ', 'ಳು', 'ಳನ್ನು', 'ಳಿಗೆ', 'ಳ',
+        'ನ್ನು', 'ಿಗೆ', 'ಿಂದ', 'ಲ್ಲಿ', 'ಿನ', 'ಿನಲ್ಲಿ', 'ಕೆ',
+        'ಗಳು', 'ಗಳನ್ನು', 'ಗಳಿಗೆ', 'ಗಳಿಂದ', 'ಗಳಲ್ಲಿ', 'ಗಳ', 'ಗಳೂ', 'ಗಳೇ',
+        'ರು', 'ರನ್ನು', 'ರಿಗೆ', 'ರಿಂದ', 'ರಲ್ಲಿ', 'ರ',
+        'ೂ', 'ೇ', 'ಾ',
+        'ತ್ತೇನೆ', 'ತ್ತೀಯ', 'ತ್ತೀಯೆ', 'ತ್ತಾನೆ', 'ತ್ತಾಳೆ', 'ತ್ತದೆ', 'ತ್ತೇವೆ', 'ತ್ತೀರಿ', 'ತ್ತಾರೆ',
+        'ತ್ತಿದ್ದೇನೆ', 'ತ್ತಿದ್ದಾನೆ', 'ತ್ತಿದ್ದಾಳೆ', 'ತ್ತಿದ್ದಾರೆ', 'ತ್ತಿದೆ', 'ತ್ತಾ', 'ತ್ತ',
+        'ವ', 'ವುದು', 'ವುದಿಲ್ಲ', 'ವುದನ್ನು',
+        'ಬೇಕು', 'ಬಹುದು', 'ಲು', 'ಲಿಲ್ಲ', 'ಬೇಡ', 'ದೆ', 'ಿ', 'ಿದ', 'ಿದೆ', 'ಿದನು', 'ಿದಳು', 'ಿದರು',
+        'ಿದೆನು', 'ಿದ್ದೇನೆ', 'ಿದ್ದಾನೆ', 'ಿದ್ದಾಳೆ', 'ಿದ್ದಾರೆ', 'ಿದ್ದೆ', 'ಿದರೆ', 'ೋಣ', 'ಿರಿ',
+    ],
+    'tamil': [
+        'ை', 'ில்', 'ின்', 'ுக்கு', 'ால்', 'ோடு', 'ிலிருந்து', 'ிடம்', 'ும்', 'ுடன்', 'ா', 'ே',
+        'வை', 'வின்', 'வுக்கு', 'வில்', 'விடம்', 'வோடு', 'வும்', 'வுடன்',
+        'யை', 'யின்', 'யில்', 'யிடம்', 'யும்', 'யோடு', 'யுடன்', 'க்கு',
+        'கள்', 'களை', 'களில்', 'களுக்கு', 'களின்', 'களால்', 'களோடு', 'களும்', 'களிடம்',
+        'கிறேன்', 'கிறாய்', 'கிறான்', 'கிறாள்', 'கிறது', 'கிறோம்', 'கிறார்', 'கிறார்கள்',
+        'ந்தேன்', 'ந்தாய்', 'ந்தான்', 'ந்தாள்', 'ந்தது', 'ந்தோம்', 'ந்தார்', 'ந்தார்கள்',
+        'வேன்', 'வாய்', 'வான்', 'வாள்', 'வோம்', 'வார்', 'வார்கள்', 'ய', 'த்தேன்', 'த்தான்', 'த்தது',
+    ],
+    'telugu': [
+        'లు', 'లను', 'లకు', 'లలో', 'ల', 'లతో', 'లని',
+        'ని', 'ను', 'కి', 'కు', 'లో', 'తో', 'నుంచి', 'నుండి', 'గా', 'ది', 'యొక్క',
+        'ాన్ని', 'ానికి', 'ంలో', 'ంతో', 'ి', 'ా', 'ే', 'ూ',
+        'స్తాను', 'స్తావు', 'స్తాడు', 'స్తుంది', 'స్తాము', 'స్తారు', 'ాను', 'ావు', 'ాడు', 'ింది',
+        'ాము', 'ారు', 'డం', 'టం', 'కూడదు', 'ాలి',
+    ],
+    'malayalam': [
+        'ിൽ', 'ിന്റെ', 'ിന്', 'ിനെ', 'െ', 'ോട്', 'ാൽ', 'ിലേക്ക്', 'ിൽനിന്ന്', 'ും', 'ോ', 'േ',
+        'യിൽ', 'യുടെ', 'യെ', 'യ്ക്ക്', 'ക്ക്', 'യോട്', 'യും',
+        'കൾ', 'ങ്ങൾ', 'കളുടെ', 'കളിൽ', 'കളെ', 'കൾക്ക്', 'ങ്ങളിൽ', 'ങ്ങളുടെ', 'ങ്ങളെ', 'ങ്ങൾക്ക്',
+        'ുന്നു', 'ുന്ന', 'ാൻ', 'ണം', 'ുന്നില്ല', 'ും', 'ുമോ',
+    ],
+    'hindi': [
+        'ों', 'ें', 'ओं', 'एँ', 'एं', 'ाएँ', 'ाएं', 'ाओं', 'याँ', 'यां', 'यों',
+        'ता', 'ती', 'ते', 'ा', 'ी', 'े', 'ीं', 'ूँगा', 'ूंगा', 'ूँगी', 'ूंगी', 'ेगा', 'ेगी', 'ेंगे', 'ेंगी',
+        'ोगे', 'ोगी', 'ो', 'कर', 'के', 'ने', 'िए', 'िये', 'या', 'यी', 'ये', 'ईं', 'ए', 'ई', 'ऊँ', 'ऊं',
+    ],
+    'urdu': [
+        'وں', 'یں', 'ات', 'ے', 'ی', 'ا', 'یاں',
+        'تا', 'تی', 'تے', 'تیں', 'و', 'یے', 'یا', 'ئی', 'ئے', 'کر', 'نے', 'ئیں', 'ؤں', 'ئیے',
+    ],
+}
+
+# (ending, replacement, standalone): a vocabulary form ending in `ending` also
+# has the stem form[:-len(ending)] + replacement. Standalone stems are words on
+# their own (Hindi oblique लड़के); the others only match with a suffix.
+STEM_RULES: Dict[str, List[Tuple[str, str, bool]]] = {
+    'kannada': [('ು', '', False)],
+    'tamil': [('ம்', 'த்த', False), ('ம்', 'ங்', False), ('்', '', False), ('டு', 'ட்ட', False),
+              ('று', 'ற்ற', False), ('ு', '', False)],
+    'telugu': [('ం', 'ా', False), ('ం', '', False), ('ము', '', False), ('ు', '', False)],
+    'malayalam': [('ം', 'ത്ത', False), ('ം', 'ങ്ങ', False), ('്', '', False), ('ുക', '', False)],
+    'hindi': [('ा', 'े', True), ('ा', '', False), ('ी', 'ि', False), ('ना', '', False), ('ना', 'ने', True)],
+    'urdu': [('ا', 'ے', True), ('ا', '', False), ('نا', '', False), ('نا', 'نے', True), ('ی', '', False)],
+}
+
+# Shorter stems would match too many unrelated words once a suffix is allowed
+MIN_STEM_LENGTH = 2
+
+FLAG_FORM = 1    # The vocabulary form itself (matches alone or with a suffix)
+FLAG_STEM = 2    # A derived stem (needs a suffix unless standalone)
+FLAG_STANDALONE = 4
+
+
+def normalize(text: str) -> str:
+    """NFC, lowercase, Arabic letters folded to their Urdu forms"""
+    return unicodedata.normalize('NFC', text).lower().translate(_ARABIC_TO_URDU)
+
+
+def is_word_char(char: str) -> bool:
+    return unicodedata.category(char)[0] in 'LMN' or char in _JOINERS
+
+
+def tokenize(text: str) -> List[Tuple[int, str]]:
+    """(start, word) for every word of normalized `text`, in any script"""
+    tokens = []
+    start = None
+    for i, char in enumerate(text):
+        if is_word_char(char):
+            if start is None:
+                start = i
+        elif start is not None:
+            tokens.append((start, text[start:i]))
+            start = None
+    if start is not None:
+        tokens.append((start, text[start:]))
+    return tokens
+
+
+def _single_word_forms(translation: str) -> List[str]:
+    """Normalized " /"-separated variants of a translation that are one word"""
+    forms = []
+    for variant in (translation or '').split(' /'):
+        tokens = tokenize(normalize(variant.strip()))
+        if len(tokens) == 1 and tokens[0][1] not in forms:
+            forms.append(tokens[0][1])
+    return forms
+
+
+class LemmaIndex:
+    """Stem trie + reversed suffix trie for one language"""
+
+    def __init__(self, language: str):
+        self.language = language
+        self.fingerprint = None
+        self.built_at = None
+        # stem -> {word_id: flags}
+        self._stems: Dict[str, Dict[int, int]] = {}
+        self._trie: List[Dict[str, int]] = [{}]
+        self._terminal: Dict[int, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        self._suffix_trie: List[Dict[str, int]] = [{}]
+        self._suffix_end: set = set()
+        self._build_suffix_trie(SUFFIXES.get(language, []))
+
+    def __len__(self):
+        return len(self._stems)
+
+    def _build_suffix_trie(self, suffixes: List[str]):
+        for suffix in suffixes:
+            state = 0
+            for char in reversed(normalize(suffix)):
+                next_state = self._suffix_trie[state].get(char)
+                if next_state is None:
+                    next_state = len(self._suffix_trie)
+                    self._suffix_trie[state][char] = next_state
+                    self._suffix_trie.append({})
+                state = next_state
+            self._suffix_end.add(state)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def build(self, rows):
+        """Index (id, translation) vocabulary rows"""
+        stems: Dict[str, Dict[int, int]] = defaultdict(dict)
+        rules = STEM_RULES.get(self.language, [])
+        for word_id, translation in rows:
+            for form in _single_word_forms(translation):
+                stems[form][word_id] = stems[form].get(word_id, 0) | FLAG_FORM
+                for ending, replacement, standalone in rules:
+                    if not form.endswith(ending) or len(form) == len(ending):
+                        continue
+                    stem = form[:-len(ending)] + normalize(replacement)
+                    if len(stem) < MIN_STEM_LENGTH or stem == form:
+                        continue
+                    flags = FLAG_STEM | (FLAG_STANDALONE if standalone else 0)
+                    stems[stem][word_id] = stems[stem].get(word_id, 0) | flags
+        self._load_stems(stems)
+
+    def _load_stems(self, stems: Dict[str, Dict[int, int]]):
+        trie: List[Dict[str, int]] = [{}]
+        terminal = {}
+        for stem, word_flags in stems.items():
+            state = 0
+            for char in stem:
+                next_state = trie[state].get(char)
+                if next_state is None:
+                    next_state = len(trie)
+                    trie[state][char] = next_state
+                    trie.append({})
+                state = next_state
+            # (ids matching the stem alone, ids matching it with a suffix)
+            alone = tuple(sorted(w for w, f in word_flags.items() if f & (FLAG_FORM | FLAG_STANDALONE)))
+            terminal[state] = (alone, tuple(sorted(word_flags)))
+        self._stems, self._trie, self._terminal = dict(stems), trie, terminal
+        self.built_at = time.time()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _suffix_starts(self, token: str) -> set:
+        """Positions i where token[i:] is a known suffix (one backwards walk)"""
+        starts = set()
+        state = 0
+        for i in range(len(token) - 1, 0, -1):
+            state = self._suffix_trie[state].get(token[i])
+            if state is None:
+                break
+            if state in self._suffix_end:
+                starts.add(i)
+        return starts
+
+    def lookup(self, token: str) -> Tuple[int, ...]:
+        """Vocabulary ids of a normalized word: its longest stem followed by nothing or a suffix"""
+        suffix_starts = None
+        best = ()
+        state = 0
+        for i, char in enumerate(token):
+            state = self._trie[state].get(char)
+            if state is None:
+                break
+            entry = self._terminal.get(state)
+            if entry is None:
+                continue
+            end = i + 1
+            if end == len(token):
+                if entry[0]:
+                    best = entry[0]
+            else:
+                if suffix_starts is None:
+                    suffix_starts = self._suffix_starts(token)
+                if end in suffix_starts:
+                    best = entry[1]
+        return best
+
+    def lookup_form(self, token: str) -> Tuple[int, ...]:
+        """Vocabulary ids one of whose forms is exactly the normalized word (no stem rule or suffix)"""
+        return tuple(sorted(w for w, f in self._stems.get(token, {}).items() if f & FLAG_FORM))
+
+    def find(self, text: str) -> List[Tuple[int, int]]:
+        """(position, word id) of every vocabulary word in normalized `text`"""
+        found = []
+        for start, token in tokenize(text):
+            for word_id in self.lookup(token):
+                found.append((start, word_id))
+        return found
+
+    def match(self, text: str) -> List[int]:
+        """Ids of the vocabulary words in `text`, in order of first occurrence"""
+        return list(dict.fromkeys(word_id for _, word_id in self.find(normalize(text))))
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        """Write the index as gzipped "stem<TAB>flags<TAB>id,id..." lines after a JSON header"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        header = {'format': FORMAT_VERSION, 'language': self.language, 'fingerprint': self.fingerprint}
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            f.write(json.dumps(header) + '\n')
+            for stem in sorted(self._stems):
+                by_flags = defaultdict(list)
+                for word_id, flags in self._stems[stem].items():
+                    by_flags[flags].append(word_id)
+                for flags, word_ids in sorted(by_flags.items()):
+                    f.write(f"{stem}\t{flags}\t{','.join(map(str, sorted(word_ids)))}\n")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['LemmaIndex']:
+        """Read an index written by save(); None if it's missing or another format"""
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                if header.get('format') != FORMAT_VERSION:
+                    return None
+                stems: Dict[str, Dict[int, int]] = defaultdict(dict)
+                for line in f:
+                    stem, flags, word_ids = line.rstrip('\n').split('\t')
+                    for word_id in word_ids.split(','):
+                        stems[stem][int(word_id)] = int(flags)
+        except (OSError, ValueError):
+            return None
+        index = cls(header['language'])
+        index.fingerprint = header.get('fingerprint')
+        index._load_stems(stems)
+        return index
+
+
+# ============================================================================
+# Per-language registry
+# ============================================================================
+
+_indexes: Dict[str, LemmaIndex] = {}
+_registry_lock = threading.Lock()
+# One build at a time per language, so concurrent first uses share a build
+_build_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+
+def index_path(language: str) -> str:
+    return os.path.join(config.LEMMA_INDEX_DIR, f"{language}.tsv.gz")
+
+
+def _vocabulary_fingerprint(cursor, language: str) -> str:
+    """Changes whenever a row of the language's vocabulary is added, removed or re-translated"""
+    cursor.execute('''
+        SELECT COUNT(*), COALESCE(MAX(id), 0), TOTAL(LENGTH(translation)), TOTAL(id * LENGTH(translation))
+        FROM vocabulary
+        WHERE language = ?
+    ''', (language,))
+    return '-'.join(str(int(value)) for value in cursor.fetchone())
+
+
+def build_index(language: str, save: bool = True) -> Optional[LemmaIndex]:
+    """Build (or rebuild) a language's index from the vocabulary table and store it"""
+    try:
+        start = time.perf_counter()
+        conn = get_connection()
+        cursor = conn.cursor()
+        fingerprint = _vocabulary_fingerprint(cursor, language)
+        cursor.execute('SELECT id, translation FROM vocabulary WHERE language = ?', (language,))
+        rows = cursor.fetchall()
+        conn.close()
+        index = LemmaIndex(language)
+        index.build(rows)
+        index.fingerprint = fingerprint
+        if save:
+            try:
+                index.save(index_path(language))
+            except OSError as e:
+                # Still usable in memory; the next process rebuilds it
+                print(f"[LemmaIndex] Could not store {language} index: {str(e)}")
+        with _registry_lock:
+            _indexes[language] = index
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"[LemmaIndex] Built {len(index)} {language} stems in {elapsed_ms:.0f}ms")
+        return index
+    except Exception as e:
+        print(f"[LemmaIndex] Error building index for {language}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def _load_or_build(language: str) -> Optional[LemmaIndex]:
+    index = LemmaIndex.load(index_path(language))
+    conn = get_connection()
+    fingerprint = _vocabulary_fingerprint(conn.cursor(), language)
+    conn.close()
+    if index is None or index.language != language or index.fingerprint != fingerprint:
+        return build_index(language)
+    with _registry_lock:
+        _indexes[language] = index
+    return index
+
+
+def get_index(language: str) -> Optional[LemmaIndex]:
+    """Get the index for a language, loading (or building) it on first use"""
+    index = _indexes.get(language)
+    if index is None:
+        with _registry_lock:
+            build_lock = _build_locks[language]
+        with build_lock:
+            index = _indexes.get(language)
+            if index is None:
+                index = _load_or_build(language)
+    return index
+
+
+def invalidate(language: str):
+    """Drop a language's index; it is rebuilt on next use"""
+    with _registry_lock:
+        _indexes.pop(language, None)
+
+
+def refresh(language: str):
+    """Rebuild a language's index after its vocabulary was reloaded
+
+    Languages whose index was never loaded are left alone; their stored
+    index no longer matches the vocabulary fingerprint, so first use rebuilds it.
+    """
+    if language in _indexes:
+        with _registry_lock:
+            build_lock = _build_locks[language]
+        with build_lock:
+            build_index(language)
+
+
+def lemma_ids(language: str, word: str) -> Tuple[int, ...]:
+    """Vocabulary ids a single (possibly inflected) word maps to"""
+    index = get_index(language)
+    return index.lookup(normalize(word.strip())) if index else ()
+
+
+def form_ids(language: str, word: str) -> Tuple[int, ...]:
+    """Vocabulary ids a single word is exactly a form of
+
+    Unlike lemma_ids, no suffix is stripped: a short stem plus a one-letter
+    suffix matches unrelated words too often to file a word under it unchecked.
+    """
+    index = get_index(language)
+    return index.lookup_form(normalize(word.strip())) if index else ()
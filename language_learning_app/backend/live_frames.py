@@ -0,0 +1,70 @@
+"""
+Binary WebSocket frames for live conversation audio.
+
+Audio travels as binary WebSocket messages instead of base64 inside JSON text
+frames: an 8-byte header followed by raw 16-bit little-endian mono PCM.
+Control messages (session setup, transcripts, turn completion) stay JSON text
+frames.
+
+    offset  size  field
+    0       1     version (FRAME_VERSION)
+    1       1     kind    (KIND_AUDIO_IN: client microphone, KIND_AUDIO_OUT: model speech)
+    2       2     flags   (FLAG_FINAL: last chunk of a turn)
+    4       4     seq     (per-direction sequence number, wraps at 2**32)
+    8       ...   payload (PCM samples)
+
+All header fields are big-endian (network order, DataView's default on the
+client).
+"""
+import struct
+from typing import NamedTuple
+
+
+FRAME_VERSION = 1
+HEADER = struct.Struct('!BBHI')
+
+KIND_AUDIO_IN = 1
+KIND_AUDIO_OUT = 2
+
+FLAG_FINAL = 0x0001
+
+# PCM formats on each side of the Gemini Live session; sent to the client in
+# setup_complete so it doesn't have to hard-code them
+AUDIO_FORMATS = {
+    'input': {'encoding': 'pcm_s16le', 'sample_rate': 16000, 'channels': 1},
+    'output': {'encoding': 'pcm_s16le', 'sample_rate': 24000, 'channels': 1},
+}
+
+
+class FrameError(ValueError):
+    """A binary message that isn't a valid audio frame"""
+    pass
+
+
+class Frame(NamedTuple):
+    kind: int
+    seq: int
+    final: bool
+    payload: bytes
+
+
+def encode_frame(kind: int, payload: bytes, seq: int = 0, final: bool = False) -> bytes:
+    """Header plus raw payload, ready for websocket.send_bytes()"""
+    flags = FLAG_FINAL if final else 0
+    return HEADER.pack(FRAME_VERSION, kind, flags, seq & 0xFFFFFFFF) + payload
+
+
+def decode_frame(data: bytes) -> Frame:
+    """Parse a binary message received from the client
+
+    Raises:
+        FrameError: Too short, or an unsupported version / kind
+    """
+    if len(data) < HEADER.size:
+        raise FrameError(f"Frame of {len(data)} bytes is shorter than the {HEADER.size}-byte header")
+    version, kind, flags, seq = HEADER.unpack_from(data)
+    if version != FRAME_VERSION:
+        raise FrameError(f"Unsupported frame version {version}")
+    if kind not in (KIND_AUDIO_IN, KIND_AUDIO_OUT):
+        raise FrameError(f"Unknown frame kind {kind}")
+    return Frame(kind, seq, bool(flags & FLAG_FINAL), bytes(data[HEADER.size:]))
@@ -0,0 +1,304 @@
+"""
+Pool of pre-connected Gemini Live sessions, keyed on (language, voice).
+
+Opening a Live session (WebSocket handshake + setup) takes long enough to be
+the largest part of the wait between "start conversation" and the AI being
+ready. The pool keeps a few sessions connected ahead of time, with a generic
+system instruction for the language, and hands one out on checkout:
+
+    client, warm, setup_ms = await get_pool().checkout(language, voice, context)
+
+A warm session gets its conversation context afterwards (apply_context(), an
+opening user turn - the system instruction is fixed once connected). With no
+warm session available, or if applying the context to one fails, checkout
+falls back to a cold start_session() with the full system instruction.
+
+Sizing follows recent demand per key. Over the last LIVE_POOL_RATE_WINDOW_S
+the checkout rate is measured; a key is only kept warm if at least one
+checkout is expected within LIVE_POOL_IDLE_TTL_S (otherwise the session would
+most likely be retired unused), and then with enough sessions to cover
+BURST_FACTOR times the checkouts expected while a replacement connects. Idle sessions hold a 'live'
+lane slot in the LLM gateway, so the pool never warms a session when that
+would leave no slot for a cold start, and stays within
+LIVE_POOL_MAX_IDLE_PER_KEY / LIVE_POOL_MAX_IDLE_TOTAL.
+
+A maintenance task closes idle sessions older than LIVE_POOL_IDLE_TTL_S and
+any surplus above the current target.
+
+stats() reports idle sessions per key, hit/miss counters and setup-to-ready
+latency (checkout until the session can take audio) for warm and cold starts.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+from . import config
+from . import live_relay
+from . import llm_gateway
+
+
+# A key is kept warm only if at least this many checkouts are expected within the idle TTL
+MIN_EXPECTED_CHECKOUTS_PER_TTL = 1.0
+# Arrivals are bursty: keep this many times the checkouts expected during one connect
+BURST_FACTOR = 2
+# Assumed connect time until a cold start has been measured
+DEFAULT_CONNECT_SECONDS = 1.0
+
+
+def _default_client_factory():
+    if config.LIVE_FAKE_GEMINI:
+        from .fake_gemini_live import FakeGeminiLiveClient
+        return FakeGeminiLiveClient()
+    from .gemini_live_client import GeminiLiveClient
+    return GeminiLiveClient()
+
+
+class LiveSessionPool:
+    """Warm Gemini Live sessions per (language, voice), sized from recent checkout rate"""
+
+    def __init__(self, client_factory: Optional[Callable] = None,
+                 max_idle_per_key: Optional[int] = None, max_idle_total: Optional[int] = None,
+                 idle_ttl_s: Optional[float] = None, rate_window_s: Optional[float] = None,
+                 maintenance_interval_s: Optional[float] = None, check_live_lane: bool = True):
+        self.client_factory = client_factory or _default_client_factory
+        self.max_idle_per_key = config.LIVE_POOL_MAX_IDLE_PER_KEY if max_idle_per_key is None else max_idle_per_key
+        self.max_idle_total = config.LIVE_POOL_MAX_IDLE_TOTAL if max_idle_total is None else max_idle_total
+        self.idle_ttl_s = config.LIVE_POOL_IDLE_TTL_S if idle_ttl_s is None else idle_ttl_s
+        self.rate_window_s = config.LIVE_POOL_RATE_WINDOW_S if rate_window_s is None else rate_window_s
+        self.maintenance_interval_s = (config.LIVE_POOL_MAINTENANCE_INTERVAL_S
+                                       if maintenance_interval_s is None else maintenance_interval_s)
+        self.check_live_lane = check_live_lane
+
+        # key -> deque of (client, connected_at), oldest first
+        self._idle: Dict[Tuple[str, str], deque] = {}
+        self._warming: Dict[Tuple[str, str], int] = {}
+        # key -> checkout timestamps within the rate window
+        self._checkouts: Dict[Tuple[str, str], deque] = {}
+        self._connect_seconds = deque(maxlen=50)
+        self._tasks = set()
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+        self.setup_warm = live_relay.LatencyHistogram()
+        self.setup_cold = live_relay.LatencyHistogram()
+        self.hits = 0
+        self.misses = 0
+        self.warmed = 0
+        self.warm_failed = 0
+        self.context_failed = 0
+        self.retired_ttl = 0
+        self.retired_surplus = 0
+
+    # ------------------------------------------------------------------
+    # Checkout
+    # ------------------------------------------------------------------
+
+    async def checkout(self, language: str, voice_name: str, conversation_context: Optional[Dict] = None):
+        """
+        A Live session for `language` / `voice_name` with `conversation_context` applied
+
+        Returns (client, warm, setup_ms); the caller owns the client and closes it.
+        """
+        start = time.perf_counter()
+        self._ensure_maintenance()
+        key = (language, voice_name)
+        self._record_checkout(key)
+
+        client = self._pop_idle(key)
+        if client is not None:
+            try:
+                await client.apply_context(conversation_context)
+            except Exception as e:
+                print(f"[LivePool] Warm session for {key} failed to take context, starting cold: {e}")
+                self.context_failed += 1
+                await self._close(client)
+                client = None
+
+        warm = client is not None
+        if warm:
+            self.hits += 1
+        else:
+            self.misses += 1
+            client = self.client_factory()
+            connect_start = time.perf_counter()
+            await client.start_session(language=language, conversation_context=conversation_context,
+                                       voice_name=voice_name)
+            self._connect_seconds.append(time.perf_counter() - connect_start)
+
+        setup_ms = (time.perf_counter() - start) * 1000
+        (self.setup_warm if warm else self.setup_cold).observe(setup_ms)
+        self._refill(key)
+        return client, warm, setup_ms
+
+    def _pop_idle(self, key):
+        idle = self._idle.get(key)
+        now = time.monotonic()
+        while idle:
+            client, connected_at = idle.pop()  # Newest first: least likely to have been dropped by the server
+            if now - connected_at <= self.idle_ttl_s:
+                return client
+            self.retired_ttl += 1
+            self._spawn(self._close(client))
+        return None
+
+    # ------------------------------------------------------------------
+    # Sizing
+    # ------------------------------------------------------------------
+
+    def _record_checkout(self, key):
+        stamps = self._checkouts.setdefault(key, deque())
+        stamps.append(time.monotonic())
+        self._trim_checkouts(key)
+
+    def _trim_checkouts(self, key):
+        stamps = self._checkouts.get(key)
+        cutoff = time.monotonic() - self.rate_window_s
+        while stamps and stamps[0] < cutoff:
+            stamps.popleft()
+
+    def _avg_connect_seconds(self) -> float:
+        if not self._connect_seconds:
+            return DEFAULT_CONNECT_SECONDS
+        return sum(self._connect_seconds) / len(self._connect_seconds)
+
+    def target(self, key) -> int:
+        """Idle sessions to keep for `key` given its checkout rate over the rate window"""
+        self._trim_checkouts(key)
+        rate = len(self._checkouts.get(key, ())) / self.rate_window_s  # Checkouts per second
+        if rate * self.idle_ttl_s < MIN_EXPECTED_CHECKOUTS_PER_TTL:
+            return 0
+        wanted = max(1, math.ceil(rate * self._avg_connect_seconds() * BURST_FACTOR))
+        return min(wanted, self.max_idle_per_key)
+
+    def _idle_total(self) -> int:
+        return sum(len(idle) for idle in self._idle.values()) + sum(self._warming.values())
+
+    def _live_lane_has_room(self) -> bool:
+        """True if warming one more session still leaves a 'live' slot free for a cold start"""
+        if not self.check_live_lane:
+            return True
+        lane = llm_gateway.get_gateway().stats()['live']
+        return lane['in_flight'] + lane['queued'] + 2 <= lane['limit']
+
+    def _refill(self, key):
+        """Start warming sessions for `key` up to its target"""
+        have = len(self._idle.get(key, ())) + self._warming.get(key, 0)
+        for _ in range(self.target(key) - have):
+            if self._idle_total() >= self.max_idle_total or not self._live_lane_has_room():
+                break
+            self._warming[key] = self._warming.get(key, 0) + 1
+            self._spawn(self._warm(key))
+
+    async def _warm(self, key):
+        language, voice_name = key
+        client = self.client_factory()
+        try:
+            start = time.perf_counter()
+            await client.connect(language, voice_name)
+            self._connect_seconds.append(time.perf_counter() - start)
+            self._idle.setdefault(key, deque()).append((client, time.monotonic()))
+            self.warmed += 1
+        except Exception as e:
+            print(f"[LivePool] Error warming session for {key}: {e}")
+            self.warm_failed += 1
+            await self._close(client)
+        finally:
+            self._warming[key] -= 1
+
+    # ------------------------------------------------------------------
+    # Retirement
+    # ------------------------------------------------------------------
+
+    def _ensure_maintenance(self):
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def _maintenance_loop(self):
+        while True:
+            await asyncio.sleep(self.maintenance_interval_s)
+            try:
+                await self.maintain()
+            except Exception as e:
+                print(f"[LivePool] Maintenance error: {e}")
+
+    async def maintain(self):
+        """Close idle sessions past their TTL or above target, then top keys back up"""
+        now = time.monotonic()
+        retire = []
+        for key, idle in self._idle.items():
+            while idle and now - idle[0][1] > self.idle_ttl_s:
+                retire.append(idle.popleft()[0])
+                self.retired_ttl += 1
+            surplus = len(idle) - self.target(key)
+            for _ in range(max(0, surplus)):
+                retire.append(idle.popleft()[0])
+                self.retired_surplus += 1
+        for client in retire:
+            await self._close(client)
+        for key in list(self._checkouts):
+            self._refill(key)
+
+    async def close_all(self):
+        """Close every idle session and stop maintenance (server shutdown)"""
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            self._maintenance_task = None
+        for task in list(self._tasks):
+            task.cancel()
+        for idle in self._idle.values():
+            while idle:
+                await self._close(idle.popleft()[0])
+
+    async def _close(self, client):
+        try:
+            await client.close_session()
+        except Exception as e:
+            print(f"[LivePool] Error closing session: {e}")
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Idle sessions and targets per key, hit/miss/retire counters, setup-to-ready latency"""
+        keys = set(self._idle) | set(self._checkouts)
+        checkouts = self.hits + self.misses
+        return {
+            'keys': {
+                f"{language}/{voice}": {
+                    'idle': len(self._idle.get((language, voice), ())),
+                    'warming': self._warming.get((language, voice), 0),
+                    'target': self.target((language, voice)),
+                    'checkouts_in_window': len(self._checkouts.get((language, voice), ())),
+                }
+                for language, voice in sorted(keys)
+            },
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / checkouts, 3) if checkouts else 0.0,
+            'warmed': self.warmed,
+            'warm_failed': self.warm_failed,
+            'context_failed': self.context_failed,
+            'retired_ttl': self.retired_ttl,
+            'retired_surplus': self.retired_surplus,
+            'avg_connect_ms': round(self._avg_connect_seconds() * 1000, 1),
+            'setup_to_ready_warm': self.setup_warm.stats(),
+            'setup_to_ready_cold': self.setup_cold.stats(),
+        }
+
+
+_pool: Optional[LiveSessionPool] = None
+
+
+def get_pool() -> LiveSessionPool:
+    """The process-wide pool (created on first use, from the server's event loop)"""
+    global _pool
+    if _pool is None:
+        _pool = LiveSessionPool()
+    return _pool
@@ -0,0 +1,240 @@
+"""
+Buffers and metrics between the live conversation WebSocket and Gemini Live.
+
+A ConversationSession relays audio in both directions through bounded
+buffers, each drained by its own task, so neither side can stall the other:
+
+    socket reader --MicAudioBuffer--> mic sender --> Gemini Live
+    Gemini receiver --ClientSendQueue--> client sender --> socket
+
+MicAudioBuffer applies the overflow policy for microphone audio when Gemini
+is slower than the mic (config.LIVE_MIC_OVERFLOW_POLICY):
+
+    'coalesce'     merge the oldest queued chunks into one larger send
+                   (nothing is lost until a merged chunk would exceed
+                   LIVE_MIC_COALESCE_MAX_BYTES, then the oldest is dropped)
+    'drop_oldest'  drop the oldest queued chunk
+
+Mic audio older than LIVE_MIC_MAX_AGE_MS by the time it could be sent is
+dropped as stale: the user has moved on and Gemini should hear the present.
+
+ClientSendQueue never drops control messages; when a slow client lets model
+speech pile up beyond its bound, the oldest audio frames are dropped (the full
+turn is still stored and referenced by response_complete's audio_url).
+
+LatencyHistogram records per-session mic-to-Gemini and Gemini-to-client
+latencies in fixed buckets.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+
+MIC_OVERFLOW_POLICIES = ('coalesce', 'drop_oldest')
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds)"""
+
+    BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, latency_ms: float):
+        for i, bound in enumerate(self.BUCKETS_MS):
+            if latency_ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def merge(self, other: 'LatencyHistogram'):
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (capped at the largest value seen)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                bound = self.BUCKETS_MS[i] if i < len(self.BUCKETS_MS) else self.max_ms
+                return round(min(bound, self.max_ms), 1)
+        return round(self.max_ms, 1)
+
+    def stats(self) -> dict:
+        labels = [f"<={bound}" for bound in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}"]
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 1) if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max_ms, 1),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class MicAudioBuffer:
+    """Bounded buffer of microphone chunks waiting to be sent to Gemini Live
+
+    put() never blocks (the socket reader must keep up with the client);
+    get() returns everything queued, coalesced into one send.
+    """
+
+    def __init__(self, max_chunks: int, max_age_ms: float, policy: str = 'coalesce',
+                 coalesce_max_bytes: int = 32000):
+        if policy not in MIC_OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown mic overflow policy: {policy}")
+        self.max_chunks = max(1, max_chunks)
+        self.max_age = max_age_ms / 1000
+        self.policy = policy
+        self.coalesce_max_bytes = coalesce_max_bytes
+        # Entries are [data, received_at timestamps of the chunks merged into it]
+        self._entries = deque()
+        self._ready = asyncio.Event()
+        self.received = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped_overflow = 0
+        self.dropped_stale = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, data: bytes, received_at: Optional[float] = None):
+        self.received += 1
+        self._entries.append([data, [received_at if received_at is not None else time.perf_counter()]])
+        if len(self._entries) > self.max_chunks:
+            self._overflow()
+        self.max_depth = max(self.max_depth, len(self._entries))
+        self._ready.set()
+
+    def _overflow(self):
+        if self.policy == 'coalesce':
+            oldest, following = self._entries[0], self._entries[1]
+            if len(oldest[0]) + len(following[0]) <= self.coalesce_max_bytes:
+                self._entries.popleft()
+                following[0] = oldest[0] + following[0]
+                following[1] = oldest[1] + following[1]
+                self.coalesced += len(oldest[1])
+                return
+        dropped = self._entries.popleft()
+        self.dropped_overflow += len(dropped[1])
+
+    async def get(self) -> Tuple[bytes, List[float]]:
+        """Wait for audio; returns (PCM to send, receive timestamps of the chunks in it)"""
+        while True:
+            while not self._entries:
+                self._ready.clear()
+                await self._ready.wait()
+
+            now = time.perf_counter()
+            while self._entries and now - self._entries[0][1][-1] > self.max_age:
+                self.dropped_stale += len(self._entries.popleft()[1])
+
+            parts, stamps, size = [], [], 0
+            while self._entries and (not parts or size + len(self._entries[0][0]) <= self.coalesce_max_bytes):
+                data, received = self._entries.popleft()
+                parts.append(data)
+                stamps.extend(received)
+                size += len(data)
+            if parts:
+                if len(parts) > 1:
+                    self.coalesced += len(parts) - 1
+                self.sent += len(stamps)
+                return b''.join(parts), stamps
+
+    def stats(self) -> dict:
+        return {
+            'policy': self.policy,
+            'received': self.received,
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'dropped_overflow': self.dropped_overflow,
+            'dropped_stale': self.dropped_stale,
+            'depth': len(self._entries),
+            'max_depth': self.max_depth,
+        }
+
+
+class ClientSendQueue:
+    """Outbound messages for the client: control messages (never dropped) and audio frames (bounded)"""
+
+    def __init__(self, max_audio_frames: int):
+        self.max_audio_frames = max(1, max_audio_frames)
+        # Entries are (is_audio, payload, enqueued_at)
+        self._entries = deque()
+        self._audio_frames = 0
+        self._ready = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self.sent = 0
+        self.dropped_audio = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _append(self, entry):
+        self._entries.append(entry)
+        self.max_depth = max(self.max_depth, len(self._entries))
+        self._drained.clear()
+        self._ready.set()
+
+    def put_control(self, text: str):
+        self._append((False, text, time.perf_counter()))
+
+    def put_audio(self, frame: bytes, received_at: Optional[float] = None):
+        if self._audio_frames >= self.max_audio_frames:
+            # Drop the oldest queued audio frame, keep control messages in order
+            for i, (is_audio, _, _) in enumerate(self._entries):
+                if is_audio:
+                    del self._entries[i]
+                    self._audio_frames -= 1
+                    self.dropped_audio += 1
+                    break
+        self._audio_frames += 1
+        self._append((True, frame, received_at if received_at is not None else time.perf_counter()))
+
+    async def get(self) -> Tuple[bool, object, float]:
+        while not self._entries:
+            self._drained.set()
+            self._ready.clear()
+            await self._ready.wait()
+        entry = self._entries.popleft()
+        if entry[0]:
+            self._audio_frames -= 1
+        self.sent += 1
+        return entry
+
+    async def drain(self, timeout: float):
+        """Wait until everything queued has been handed to the sender"""
+        if self._entries:
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            'sent': self.sent,
+            'dropped_audio': self.dropped_audio,
+            'depth': len(self._entries),
+            'max_depth': self.max_depth,
+        }
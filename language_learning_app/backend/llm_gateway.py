@@ -0,0 +1,324 @@
+"""
+Process-wide gateway for Gemini calls (text generation, TTS, Live sessions).
+
+Calls go through one google.genai Client per event loop, so its HTTP
+connection pool is reused instead of a new client per request; a client's
+async transport belongs to the loop it was created on, so it is never
+shared across loops. Each model lane ('text', 'tts', 'live') has its own
+concurrency limit; callers beyond the limit queue for a slot instead of
+piling onto the API.
+
+The gateway runs on its own event loop in a daemon thread. That lets the
+FastAPI handlers (awaiting on the server loop) and code running in worker
+threads share the same limits:
+
+    response = await get_gateway().generate_content('text', model, prompt, config, timeout=60)
+    response = get_gateway().generate_content_sync('tts', model, text, config, timeout=30)
+
+Timeouts cancel the underlying request (asyncio.wait_for on the SDK's async
+API), so a timed-out call doesn't keep running in a leaked thread. If the
+awaiting request is cancelled (e.g. the client disconnected), the call is
+cancelled too.
+
+stats() reports per-lane queue depth, in-flight calls and outcome counters.
+"""
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from . import config
+
+
+class LLMTimeoutError(Exception):
+    """A gateway call did not finish within its timeout (the request was cancelled)"""
+    pass
+
+
+class _Lane:
+    """Concurrency limit and counters for one model lane (used on the gateway loop only)"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.semaphore = asyncio.Semaphore(self.limit)
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.total_latency = 0.0
+        self.total_wait = 0.0
+
+    async def acquire(self):
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.total_wait += time.perf_counter() - start
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed + self.timed_out + self.cancelled
+        return {
+            'limit': self.limit,
+            'queued': self.queued,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'failed': self.failed,
+            'timed_out': self.timed_out,
+            'cancelled': self.cancelled,
+            'avg_latency_ms': round(self.total_latency / self.completed * 1000, 1) if self.completed else 0.0,
+            'avg_wait_ms': round(self.total_wait / finished * 1000, 1) if finished else 0.0,
+        }
+
+
+class _SlotClaim:
+    """Hands a slot acquired on the gateway loop to the slot() caller waiting for it
+
+    Whichever side comes second (the acquire finishing, or the caller being
+    cancelled) releases the slot if the caller won't get to use it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.lane: Optional[_Lane] = None
+        self.abandoned = False
+
+
+class LLMGateway:
+    """Shared google.genai client plus per-lane concurrency limits"""
+
+    def __init__(self, limits: Dict[str, int]):
+        self._limits = dict(limits)
+        self._lanes: Dict[str, _Lane] = {}
+        self._clients = weakref.WeakKeyDictionary()  # event loop -> google.genai Client
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Event loop / client
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name='llm-gateway', daemon=True)
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    @property
+    def client(self):
+        """The google.genai Client of the running event loop (created on first use there)
+
+        Outside a running loop this is the gateway loop's client.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = self._ensure_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(loop)
+                if client is None:
+                    if not config.GEMINI_API_KEY:
+                        raise Exception("GEMINI_API_KEY not set")
+                    from google import genai as google_genai
+                    client = self._clients[loop] = google_genai.Client(api_key=config.GEMINI_API_KEY)
+        return client
+
+    def _lane(self, name: str) -> _Lane:
+        # Only called on the gateway loop, so semaphores bind to it
+        lane = self._lanes.get(name)
+        if lane is None:
+            if name not in self._limits:
+                raise ValueError(f"Unknown LLM gateway lane: {name}")
+            lane = self._lanes[name] = _Lane(name, self._limits[name])
+        return lane
+
+    async def _on_gateway_loop(self, coro):
+        """Await `coro` on the gateway loop, from whatever loop we're on"""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def run_sync(self, coro):
+        """Run a coroutine on the gateway loop and block the calling thread for its result"""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run_sync() called from the gateway loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    async def _generate_content(self, lane_name: str, model: str, contents, generation_config, timeout: Optional[float]):
+        lane = self._lane(lane_name)
+        await lane.acquire()
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self.client.aio.models.generate_content(
+                    model=model,
+                    contents=contents,
+                    config=generation_config,
+                ),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            lane.timed_out += 1
+            raise LLMTimeoutError(f"{lane_name} call to {model} timed out after {timeout} seconds")
+        except asyncio.CancelledError:
+            lane.cancelled += 1
+            raise
+        except Exception:
+            lane.failed += 1
+            raise
+        finally:
+            lane.release()
+        lane.completed += 1
+        lane.total_latency += time.perf_counter() - start
+        return response
+
+    async def generate_content(self, lane: str, model: str, contents, generation_config=None, timeout: Optional[float] = None):
+        """generate_content on the shared client, within `lane`'s concurrency limit
+
+        Args:
+            lane: 'text', 'tts' or 'live'
+            model: Model name
+            contents: Prompt / contents passed to the SDK
+            generation_config: Optional types.GenerateContentConfig
+            timeout: Seconds before the request is cancelled (LLMTimeoutError); time
+                spent queued for a slot doesn't count
+
+        Returns:
+            The SDK's GenerateContentResponse
+        """
+        return await self._on_gateway_loop(
+            self._generate_content(lane, model, contents, generation_config, timeout)
+        )
+
+    def generate_content_sync(self, lane: str, model: str, contents, generation_config=None, timeout: Optional[float] = None):
+        """Blocking generate_content() for code running in worker threads"""
+        return self.run_sync(self._generate_content(lane, model, contents, generation_config, timeout))
+
+    @asynccontextmanager
+    async def slot(self, lane_name: str):
+        """Hold one of `lane_name`'s slots for the duration of the block (e.g. a Live session)
+
+            async with get_gateway().slot('live'):
+                ...
+        """
+        loop = self._ensure_loop()
+        claim = _SlotClaim()
+        try:
+            lane = await self._on_gateway_loop(self._acquire_slot(lane_name, claim))
+        except asyncio.CancelledError:
+            # Cancelled while the gateway loop acquired the slot (or just after):
+            # nobody will release it in the finally below, so give it back here,
+            # or have _acquire_slot do so if the acquire hasn't finished yet
+            with claim.lock:
+                claim.abandoned = True
+                acquired = claim.lane
+            if acquired is not None:
+                loop.call_soon_threadsafe(self._release_abandoned, acquired)
+            raise
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            loop.call_soon_threadsafe(self._release_slot, lane, failed, time.perf_counter() - start)
+
+    async def _acquire_slot(self, lane_name: str, claim: '_SlotClaim') -> _Lane:
+        lane = self._lane(lane_name)
+        await lane.acquire()
+        with claim.lock:
+            abandoned = claim.abandoned
+            claim.lane = lane
+        if abandoned:
+            self._release_abandoned(lane)
+        return lane
+
+    @staticmethod
+    def _release_abandoned(lane: _Lane):
+        lane.release()
+        lane.cancelled += 1
+
+    @staticmethod
+    def _release_slot(lane: _Lane, failed: bool, elapsed: float):
+        lane.release()
+        if failed:
+            lane.failed += 1
+        else:
+            lane.completed += 1
+            lane.total_latency += elapsed
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Per-lane limit, queue depth, in-flight calls, outcome counters and average latency/wait"""
+        # Lanes are created lazily; report configured ones that haven't been used yet too
+        result = {}
+        for name, limit in self._limits.items():
+            lane = self._lanes.get(name)
+            result[name] = lane.stats() if lane else _idle_stats(limit)
+        return result
+
+
+def _idle_stats(limit: int) -> dict:
+    return {
+        'limit': limit, 'queued': 0, 'in_flight': 0, 'completed': 0, 'failed': 0,
+        'timed_out': 0, 'cancelled': 0, 'avg_latency_ms': 0.0, 'avg_wait_ms': 0.0,
+    }
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """The process-wide gateway (created on first use)"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway({
+                    'text': config.LLM_TEXT_CONCURRENCY,
+                    'tts': config.LLM_TTS_CONCURRENCY,
+                    'live': config.LLM_LIVE_CONCURRENCY,
+                })
+    return _gateway
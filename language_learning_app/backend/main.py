@@ -4,18 +4,27 @@ FastAPI server providing REST endpoints for the mobile app
 """
 from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response, FileResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 import asyncio
 import json
 import sqlite3
+import time
+from collections import deque
 from . import db
 from . import api_client
 from . import config
+from . import db_pool
+from . import llm_gateway
+from . import audio_store
 from . import transliteration
-from .websocket_conversation import handle_websocket_conversation
+from . import live_pool
+from . import srs_engine
+from . import lemma_index
+from . import vocab_import
+from .websocket_conversation import handle_websocket_conversation, manager as live_session_manager
 from .prompting.lesson_prompts import LESSON_FREE_RESPONSE_GRADING_PROMPT
 
 # ============================================================================
@@ -88,40 +97,129 @@ async def startup_event():
         print(f"[Startup] Vocabulary sync failed: {e}")
         traceback.print_exc()
 
+    # Build the in-memory vocabulary search indexes (after sync so they see the
+    # final rows). This takes a few seconds, so do it in the background; a
+    # search that arrives first just waits for its language's build.
+    if config.VOCAB_SEARCH_ENGINE == 'memory':
+        print("[Startup] Building vocabulary search indexes in the background...")
+        import threading
+        from . import vocab_search
+        threading.Thread(target=vocab_search.build_all_indexes, daemon=True).start()
+
+    # Delete stored audio nothing references any more (e.g. live conversations
+    # that were never saved); it scans activity history, so in the background
+    import threading
+    from . import audio_store
+    threading.Thread(target=audio_store.prune_unreferenced, daemon=True).start()
+
+    # Recompute the cached user level summaries from scratch, now and periodically
+    if config.LEVEL_SUMMARY_CHECK_INTERVAL_S > 0:
+        import threading
+        threading.Thread(
+            target=db.run_level_summary_checks, args=(config.LEVEL_SUMMARY_CHECK_INTERVAL_S,), daemon=True
+        ).start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pre-connected Gemini Live sessions and record queued TTS cache hits"""
+    from . import tts_cache
+    tts_cache.flush_hits()
+    if config.LIVE_POOL_ENABLED:
+        await live_pool.get_pool().close_all()
+
 # ============================================================================
 # Progress Tracking for TTS Generation
 # ============================================================================
 
 class TTSProgressTracker:
-    """Track TTS generation progress for a session"""
-    def __init__(self, session_id: str, total_paragraphs: int):
+    """Track TTS generation progress for a session
+
+    Besides per-paragraph statuses, each paragraph's text and audio reference
+    are sent to SSE clients as soon as they're ready, so playback of the first
+    paragraph can start while later ones are still being synthesized.
+    """
+    def __init__(self, session_id: str, total_paragraphs: int, on_first_audio=None):
         self.session_id = session_id
         self.total_paragraphs = total_paragraphs
         self.progress = {i: 'pending' for i in range(total_paragraphs)}
         self.queues = []  # List of asyncio queues for SSE clients
-        
-    def update(self, paragraph_index: int, status: str):
-        """Update progress for a paragraph"""
-        self.progress[paragraph_index] = status
-        # Notify all connected clients
+        self.passage_name = None
+        self.paragraphs = []  # Paragraph texts, once the passage is generated
+        self.audio = {}  # paragraph_index -> {'audio_id', 'audio_url'}
+        self.started_at = time.perf_counter()
+        self.time_to_first_audio_ms = None
+        self._on_first_audio = on_first_audio
+
+    def _broadcast(self, data: dict):
         for queue in self.queues:
             try:
-                queue.put_nowait({
-                    'paragraph_index': paragraph_index,
-                    'status': status,
-                    'progress': self.progress.copy()
-                })
+                queue.put_nowait(data)
             except:
                 pass
+
+    def set_paragraphs(self, paragraphs: list, passage_name: str = None):
+        """Publish the passage text before any audio exists"""
+        self.passage_name = passage_name
+        self.paragraphs = list(paragraphs)
+        if self.total_paragraphs != len(self.paragraphs):
+            print(f"[TTS Progress] Updating tracker from {self.total_paragraphs} to {len(self.paragraphs)} paragraphs")
+            self.total_paragraphs = len(self.paragraphs)
+            self.progress = {i: 'pending' for i in range(self.total_paragraphs)}
+            # Notify all connected SSE clients about the updated paragraph count
+            self._broadcast({
+                'type': 'update_count',
+                'total_paragraphs': self.total_paragraphs,
+                'progress': self.progress.copy()
+            })
+        self._broadcast({
+            'type': 'paragraphs',
+            'passage_name': passage_name,
+            'paragraphs': self.paragraphs,
+            'total_paragraphs': self.total_paragraphs,
+        })
+
+    def update(self, paragraph_index: int, status: str, audio_data: dict = None):
+        """Update progress for a paragraph (with its audio reference once it's complete)"""
+        self.progress[paragraph_index] = status
+        event = {
+            'paragraph_index': paragraph_index,
+            'status': status,
+            'progress': self.progress.copy()
+        }
+        if status == 'complete' and audio_data and audio_data.get('audio_id'):
+            self.audio[paragraph_index] = {
+                'audio_id': audio_data['audio_id'],
+                'audio_url': audio_data.get('audio_url'),
+            }
+            event.update(self.audio[paragraph_index])
+            if paragraph_index < len(self.paragraphs):
+                event['text'] = self.paragraphs[paragraph_index]
+        # Playback starts at the first paragraph: time-to-first-audio is when it
+        # (or, if it failed, the next available one) became playable
+        if self.time_to_first_audio_ms is None and self.audio and self.progress.get(0) in ('complete', 'error'):
+            self.time_to_first_audio_ms = round((time.perf_counter() - self.started_at) * 1000, 1)
+            print(f"[TTS Progress] Session {self.session_id}: first audio after {self.time_to_first_audio_ms}ms")
+            if self._on_first_audio:
+                self._on_first_audio(self.time_to_first_audio_ms)
+        if self.time_to_first_audio_ms is not None:
+            event['time_to_first_audio_ms'] = self.time_to_first_audio_ms
+        # Notify all connected clients
+        self._broadcast(event)
     
     def add_client(self, queue):
         """Add a new SSE client queue"""
         self.queues.append(queue)
-        # Send current progress immediately
+        # Send current progress immediately (clients connecting late also get
+        # the text and audio that are already available)
         queue.put_nowait({
             'type': 'init',
             'progress': self.progress.copy(),
-            'total_paragraphs': self.total_paragraphs
+            'total_paragraphs': self.total_paragraphs,
+            'passage_name': self.passage_name,
+            'paragraphs': self.paragraphs,
+            'audio': self.audio.copy(),
+            'time_to_first_audio_ms': self.time_to_first_audio_ms,
         })
     
     def remove_client(self, queue):
@@ -132,12 +230,14 @@ class TTSProgressTracker:
 
 class TTSProgressStore:
     """Manager for TTS progress tracking sessions"""
-    def __init__(self):
+    def __init__(self, metrics_window: int = 200):
         self.sessions = {}  # session_id -> TTSProgressTracker
+        # Time from session start to the first playable paragraph, recent sessions
+        self.first_audio_samples = deque(maxlen=metrics_window)
     
     def create_session(self, session_id: str, total_paragraphs: int):
         """Create a new progress tracking session"""
-        tracker = TTSProgressTracker(session_id, total_paragraphs)
+        tracker = TTSProgressTracker(session_id, total_paragraphs, on_first_audio=self.first_audio_samples.append)
         self.sessions[session_id] = tracker
         return tracker
     
@@ -154,6 +254,19 @@ class TTSProgressStore:
         if session_id in self.sessions:
             del self.sessions[session_id]
 
+    def stats(self) -> dict:
+        """Time-to-first-audio over recent listening sessions"""
+        samples = sorted(self.first_audio_samples)
+        if not samples:
+            return {'sessions': 0, 'avg_time_to_first_audio_ms': 0.0,
+                    'p50_time_to_first_audio_ms': 0.0, 'p95_time_to_first_audio_ms': 0.0}
+        return {
+            'sessions': len(samples),
+            'avg_time_to_first_audio_ms': round(sum(samples) / len(samples), 1),
+            'p50_time_to_first_audio_ms': samples[len(samples) // 2],
+            'p95_time_to_first_audio_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        }
+
 
 # Global store to track TTS progress for active sessions
 tts_progress_store = TTSProgressStore()
@@ -247,6 +360,18 @@ def health_check():
     return {"status": "healthy", "service": "fluo-backend"}
 
 
+@app.get("/api/llm/stats")
+def llm_gateway_stats():
+    """Queue depth, in-flight calls and outcome counters per Gemini lane (text, tts, live),
+    plus TTS audio cache hit rate and listening time-to-first-audio"""
+    from . import tts_cache
+    return {
+        "lanes": llm_gateway.get_gateway().stats(),
+        "tts_cache": tts_cache.stats(),
+        "listening": tts_progress_store.stats(),
+    }
+
+
 # ============================================================================
 # WebSocket Endpoints
 # ============================================================================
@@ -260,6 +385,15 @@ async def websocket_conversation_live(websocket: WebSocket):
     await handle_websocket_conversation(websocket)
 
 
+@app.get("/api/live/stats")
+async def live_conversation_stats():
+    """Relay queue counters and mic-to-Gemini / Gemini-to-client latency histograms
+    of active live conversation sessions, plus the warm session pool"""
+    stats = live_session_manager.stats()
+    stats["pool"] = live_pool.get_pool().stats() if config.LIVE_POOL_ENABLED else None
+    return stats
+
+
 # ============================================================================
 # User Profile Endpoints
 # ============================================================================
@@ -349,6 +483,33 @@ def get_dashboard(language: str):
         raise HTTPException(status_code=500, detail=f"Error loading dashboard: {str(e)}")
 
 
+@app.get("/api/home")
+def get_home(request: Request, language: str = Query(..., description="Selected language code")):
+    """Everything the home screen loads, in one round trip
+    
+    Combines /api/dashboard/{language}, /api/streak, /api/srs/stats/{language},
+    /api/today-goals-all (with each of those languages' daily progress) and
+    /api/week-overview, read in one transaction (see db.get_home_data).
+    
+    The ETag changes with any write the data depends on (and with the day);
+    send it back as If-None-Match to get a 304 while nothing has changed.
+    """
+    try:
+        etag = db.home_data_etag(language, db.get_home_data_version())
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers=headers)
+        
+        data = db.get_home_data(language)
+        headers['ETag'] = db.home_data_etag(language, data['version'])
+        return Response(content=json.dumps(data), media_type='application/json', headers=headers)
+    except Exception as e:
+        print(f"Error in get_home: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error loading home screen: {str(e)}")
+
+
 # ============================================================================
 # Vocabulary Endpoints
 # ============================================================================
@@ -438,6 +599,37 @@ def transliterate_endpoint(request: TransliterationRequest):
     }
 
 
+class TransliterationBatchRequest(BaseModel):
+    texts: List[str]
+    language: str
+    to_script: Optional[str] = 'IAST'  # IAST or ITRANS
+    from_script: Optional[str] = None
+
+@app.post("/api/transliterate/batch")
+def transliterate_batch_endpoint(request: TransliterationBatchRequest):
+    """Transliterate several texts of one language in one call
+
+    Results are in the order of `texts`. Each distinct word is transliterated
+    once across the whole batch (and cached for later calls). Without
+    from_script the source script is detected per text, as for
+    /api/transliterate.
+    """
+    if len(request.texts) > config.TRANSLITERATION_BATCH_MAX_TEXTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.TRANSLITERATION_BATCH_MAX_TEXTS} texts per batch",
+        )
+    results = transliteration.transliterate_many(
+        request.texts, request.language, request.to_script or 'IAST', request.from_script
+    )
+    return {
+        "transliterations": results,
+        "requested_from": request.from_script,
+        "requested_to": request.to_script,
+        "language": request.language,
+    }
+
+
 # ============================================================================
 # Vocabulary Import Endpoint
 # ============================================================================
@@ -448,161 +640,78 @@ class TextImportRequest(BaseModel):
     target_languages: Optional[List[str]] = None  # Languages to cross-translate into
 
 @app.post("/api/vocab/import-text")
-async def import_text_to_vocab(request: TextImportRequest):
+async def import_text_to_vocab(request: TextImportRequest, background_tasks: BackgroundTasks, wait: bool = False):
     """Import text to vocabulary with lemmatization and translation
 
-    Process:
-    1. Split text into words
-    2. Batch lemmatize words (10 words per batch)
-    3. Check for existing entries
-    4. Batch translate new words
-    5. Transliterate using Aksharmukha
-    6. Insert into database with origin='user'
-    """
-    try:
-        import re
-        import traceback
-        from .prompting.vocab_import_prompts import get_lemmatization_prompt, get_translation_prompt
-
-        # Use target_languages from request, or fall back to user's active languages
-        if request.target_languages and len(request.target_languages) > 0:
-            user_languages = request.target_languages
-        else:
-            user_languages = []
+    Starts an import job (see vocab_import.py): words the lemma index knows
+    are resolved without the LLM, the rest are lemmatized and the new lemmas
+    translated in concurrent batches, then looked up, transliterated and
+    inserted (origin='user') in batches. Progress is streamed by
+    GET /api/vocab/import-text/progress/{job_id} and the outcome is served by
+    GET /api/vocab/import-text/result/{job_id}. Importing the same text again
+    reuses its LLM results.
 
-        # Step 1: Split text into words
-        words = re.findall(
-            r'[\w\u0900-\u097F\u0C00-\u0C7F\u0D00-\u0D7F\u0B80-\u0BFF\u0A80-\u0AFF\u0C80-\u0CFF]+',
-            request.text,
-        )
-        words = list(dict.fromkeys(w.strip() for w in words if w.strip()))  # dedupe, preserve order
+    With ?wait=true the import runs inside the request and its result is
+    returned directly.
+    """
+    job = vocab_import.create_job(request.text, request.language, request.target_languages)
+    if wait:
+        await vocab_import.run_job(job)
+        return vocab_import_result(job.job_id)
+    background_tasks.add_task(vocab_import.run_job, job)
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "message": "Import started. Connect to the progress endpoint for updates."
+    }
 
-        if not words:
-            return {
-                "success": True,
-                "message": "No words found in text",
-                "new_words": 0, "existing_words": 0,
-                "added": [], "existing": []
-            }
 
-        BATCH_SIZE = 10
-        all_lemmatized = []
+@app.get("/api/vocab/import-text/progress/{job_id}")
+async def vocab_import_progress_sse(job_id: str):
+    """Server-Sent Events endpoint for vocabulary import progress"""
+    job = vocab_import.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
 
-        # Step 2: Batch lemmatize
-        for i in range(0, len(words), BATCH_SIZE):
-            batch = words[i:i + BATCH_SIZE]
-            prompt = get_lemmatization_prompt(request.language, batch)
-            response_text, *_ = api_client.generate_text_with_gemini(
-                prompt, model_name=api_client.GEMINI_MODEL
-            )
-            try:
-                parsed = json.loads(response_text.strip().replace('```json', '').replace('```', ''))
-                if isinstance(parsed, list):
-                    all_lemmatized.extend(parsed)
-            except json.JSONDecodeError as e:
-                print(f"Lemmatization batch {i // BATCH_SIZE + 1} parse error: {e}")
-                continue
-
-        if not all_lemmatized:
-            raise HTTPException(status_code=400, detail="Failed to lemmatize words")
-
-        # Step 3: Check existing entries
-        existing_words = []
-        new_words = []
-        seen = set()
-
-        for wd in all_lemmatized:
-            word = wd.get('word', '').strip()
-            if not word or word in seen:
-                continue
-            seen.add(word)
-            existing = db.find_word_by_translation(word, request.language)
-            if existing:
-                translit = existing.get('transliteration', '')
-                if not translit and existing.get('translation'):
-                    translit = transliteration.transliterate_text(
-                        existing['translation'], request.language, 'IAST'
-                    )
-                existing_words.append({
-                    'word': word,
-                    'transliteration': translit,
-                    'english_word': existing.get('english_word', ''),
-                    'word_class': existing.get('word_class', '')
-                })
-            else:
-                new_words.append(wd)
-
-        # Step 4: Batch translate new words
-        added_words = []
-        for i in range(0, len(new_words), BATCH_SIZE):
-            batch = new_words[i:i + BATCH_SIZE]
-            prompt = get_translation_prompt(request.language, batch, user_languages)
-            response_text, *_ = api_client.generate_text_with_gemini(
-                prompt, model_name=api_client.GEMINI_MODEL
-            )
-            try:
-                translations = json.loads(response_text.strip().replace('```json', '').replace('```', ''))
-            except json.JSONDecodeError as e:
-                print(f"Translation batch {i // BATCH_SIZE + 1} parse error: {e}")
-                continue
-
-            # Step 5: Transliterate with Aksharmukha and insert
-            for td in translations:
-                word = td.get('word', '').strip()
-                if not word:
-                    continue
-                word_class = next(
-                    (w['word_class'] for w in batch if w['word'] == word),
-                    td.get('word_class', 'noun')
-                )
-                translit = transliteration.transliterate_text(word, request.language, 'IAST')
-
-                db.insert_vocabulary_entry(
-                    language=request.language,
-                    english_word=td.get('english', ''),
-                    translation=word,
-                    transliteration=translit,
-                    word_class=word_class,
-                    level=None,
-                    origin='user',
-                )
-                added_words.append({
-                    'word': word,
-                    'transliteration': translit,
-                    'english_word': td.get('english', ''),
-                    'word_class': word_class,
-                })
-
-                # Insert cross-language translations
-                for lang, trans_text in td.get('translations', {}).items():
-                    if lang in user_languages and trans_text:
-                        if not db.find_word_by_translation(trans_text, lang):
-                            t_translit = transliteration.transliterate_text(trans_text, lang, 'IAST')
-                            db.insert_vocabulary_entry(
-                                language=lang,
-                                english_word=td.get('english', ''),
-                                translation=trans_text,
-                                transliteration=t_translit,
-                                word_class=word_class,
-                                level=None,
-                                origin='user',
-                            )
+    async def event_generator():
+        """Generate SSE events for import stages, then the result or error"""
+        queue = asyncio.Queue()
+        job.add_client(queue)
+        try:
+            while True:
+                try:
+                    data = await asyncio.wait_for(queue.get(), timeout=30.0)
+                    yield f"data: {json.dumps(data)}\n\n"
+                    if data.get('type') in ('complete', 'error'):
+                        break
+                except asyncio.TimeoutError:
+                    # Send keepalive
+                    yield f": keepalive\n\n"
+        finally:
+            job.remove_client(queue)
 
-        return {
-            "success": True,
-            "message": f"Added {len(added_words)} new words, {len(existing_words)} already exist",
-            "new_words": len(added_words),
-            "existing_words": len(existing_words),
-            "added": added_words,
-            "existing": existing_words,
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
         }
+    )
 
-    except json.JSONDecodeError as e:
-        import traceback; traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Failed to parse AI response: {str(e)}")
-    except Exception as e:
-        import traceback; traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/vocab/import-text/result/{job_id}")
+def vocab_import_result(job_id: str):
+    """Result of an import job ({"status": "running", ...} while it runs)"""
+    job = vocab_import.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if job.status == 'error':
+        raise HTTPException(status_code=job.error_status, detail=job.error)
+    if job.status != 'complete':
+        return {"status": job.status, "stage": job.stage, "done": job.done, "total": job.total}
+    return job.result
 
 
 # ============================================================================
@@ -656,7 +765,7 @@ class LessonFreeResponseRequest(BaseModel):
 
 
 @app.post("/api/lessons/grade-free-response")
-def grade_lesson_free_response(request: LessonFreeResponseRequest):
+async def grade_lesson_free_response(request: LessonFreeResponseRequest):
     """Grade a free response answer from a lesson using AI"""
     try:
         # Use the prompt from prompting folder
@@ -668,7 +777,7 @@ def grade_lesson_free_response(request: LessonFreeResponseRequest):
         )
         
         # Generate with Gemini
-        response_text, response_time, token_info, is_truncated, _ = api_client.generate_text_with_gemini(prompt)
+        response_text, response_time, token_info, is_truncated, _ = await api_client.generate_text_with_gemini_async(prompt)
         
         if not response_text:
             raise HTTPException(status_code=500, detail="Failed to generate feedback")
@@ -804,7 +913,7 @@ def clear_progress(lesson_id: str):
 def get_lesson_by_id(lesson_id: str, user_id: int = 1):
     """Get a specific lesson by ID with completion status"""
     try:
-        conn = db.sqlite3.connect(db.config.DB_PATH)
+        conn = db_pool.get_connection()
         conn.row_factory = db.sqlite3.Row
         cursor = conn.cursor()
         
@@ -858,7 +967,7 @@ def get_unit_lessons(unit_id: str, user_id: int = 1):
     """Get all lessons in a unit with completion status"""
     try:
         # Get all lessons for this unit
-        conn = db.sqlite3.connect(db.config.DB_PATH)
+        conn = db_pool.get_connection()
         conn.row_factory = db.sqlite3.Row
         cursor = conn.cursor()
         
@@ -931,12 +1040,15 @@ def update_unit_progress_endpoint(unit_id: str, user_id: int = 1):
 
 
 @app.post("/api/lessons/admin/reload")
-def reload_lessons_from_files():
-    """Admin endpoint to reload lessons from JSON files on disk into the database."""
+def reload_lessons_from_files(force: bool = False):
+    """Admin endpoint to reload lessons from JSON files on disk into the database.
+    
+    Only changed files are re-parsed; pass ?force=true to re-parse all of them.
+    """
     try:
-        db.sync_lessons_from_files()
+        db.sync_lessons_from_files(force=force)
         # Count what was loaded
-        conn = db.sqlite3.connect(db.config.DB_PATH)
+        conn = db_pool.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT COUNT(*) FROM lessons')
         lesson_count = cursor.fetchone()[0]
@@ -1028,7 +1140,7 @@ async def create_reading_activity(language: str, request: Request):
         user_interests = []
         if custom_topic is None:
             try:
-                conn = sqlite3.connect(config.DB_PATH)
+                conn = db_pool.get_connection()
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT value FROM user_preferences
@@ -1068,7 +1180,7 @@ async def create_reading_activity(language: str, request: Request):
         print(f"Selected {len(required_learning_words)} required learning words: {[w.get('english_word') for w in required_learning_words]}")
         
         # Dictionary will be populated from words extracted from story text
-        activity = api_client.generate_reading_activity(
+        activity = await api_client.generate_reading_activity(
             word_bank_words, 
             None, 
             language, 
@@ -1203,7 +1315,7 @@ async def listening_progress_sse(session_id: str):
 # Store for completed activities by session_id
 completed_activities = {}
 
-def generate_listening_activity_background(
+async def generate_listening_activity_background(
     session_id: str,
     word_bank_words: list,
     language: str,
@@ -1220,7 +1332,7 @@ def generate_listening_activity_background(
         elif user_interests:
             print(f"[Background Task] User interests: {user_interests}")
         
-        activity = api_client.generate_listening_activity(
+        activity = await api_client.generate_listening_activity(
             word_bank_words, 
             language, 
             required_learning_words=required_learning_words, 
@@ -1248,13 +1360,25 @@ def generate_listening_activity_background(
         
         # Save activity to history
         activity_data_json = json.dumps(activity)
-        activity_id = db.log_activity(language, 'listening', 0.0, activity_data_json)
+        activity_id = await asyncio.to_thread(db.log_activity, language, 'listening', 0.0, activity_data_json)
         if activity_id:
             print(f"✅ [Background Task] Activity logged with ID: {activity_id}")
             activity['activity_id'] = activity_id
         
-        # Extract words_used from activity
-        words_used_data = activity.get('_words_used_data', [])
+        # Words used, as extracted from the passage text
+        words_used_data = [
+            {
+                "id": w["id"],
+                "word": w["english_word"],
+                "kannada": w.get("translation", ""),
+                "transliteration": w.get("transliteration", ""),
+                "word_class": w.get("word_class", ""),
+                "level": w.get("level", ""),
+                "mastery_level": w.get("mastery_level", "new"),
+                "verb_transitivity": w.get("verb_transitivity", ""),
+            }
+            for w in activity.get('_words_used_data', [])
+        ]
         
         # Build API details
         token_info = activity.get("_token_info", {})
@@ -1272,6 +1396,7 @@ def generate_listening_activity_background(
             "token_info": token_info,
             "tts_cost": tts_cost,
             "tts_response_time": activity.get("_tts_response_time", 0.0),
+            "time_to_first_audio_ms": activity.get("_time_to_first_audio_ms"),
             "total_cost": total_cost,
             "voice_used": activity.get("_voice_used", ""),
             "speaker_profile": activity.get("_speaker_profile"),
@@ -1343,7 +1468,7 @@ async def create_listening_activity(language: str, request: Request, background_
         user_interests = []
         if custom_topic is None:
             try:
-                conn = sqlite3.connect(config.DB_PATH)
+                conn = db_pool.get_connection()
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT value FROM user_preferences
@@ -1468,7 +1593,7 @@ async def create_speaking_activity(language: str, request: Request):
         user_interests = []
         if custom_topic is None:
             try:
-                conn = sqlite3.connect(config.DB_PATH)
+                conn = db_pool.get_connection()
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT value FROM user_preferences
@@ -1524,7 +1649,7 @@ async def create_speaking_activity(language: str, request: Request):
         print(f"User CEFR level: {user_cefr_level}")
         print(f"Selected {len(required_learning_words)} required learning words: {[w.get('english_word') for w in required_learning_words]}")
         
-        activity = api_client.generate_speaking_activity(
+        activity = await api_client.generate_speaking_activity(
             word_bank_words, 
             language, 
             required_learning_words=required_learning_words, 
@@ -1565,7 +1690,7 @@ async def create_speaking_activity(language: str, request: Request):
         activity_name = activity.get('activity_name', '')
         
         all_text = speaking_topic + ' ' + instructions + ' ' + activity_name
-        words_used_from_text = api_client.extract_words_from_text(all_text, word_bank_words)
+        words_used_from_text = api_client.extract_words_from_text(all_text, language)
         
         for w in words_used_from_text:
             words_used_data.append({
@@ -1631,7 +1756,7 @@ async def create_translation_activity(language: str, request: Request):
         user_cefr_level = user_level_info.get('level', 'A1')
         
         # Get all active languages user is learning
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = db_pool.get_connection()
         cursor = conn.cursor()
         
         # Get other languages user is learning (not the target language)
@@ -1691,7 +1816,7 @@ async def create_translation_activity(language: str, request: Request):
         print(f"Sentence distribution: {sentences_per_language}")
         
         # Generate translation activity
-        activity = api_client.generate_translation_activity(
+        activity = await api_client.generate_translation_activity(
             target_language=language,
             target_level=user_cefr_level,
             source_languages=other_languages,
@@ -1739,22 +1864,19 @@ async def create_translation_activity(language: str, request: Request):
                 if sentence.get('expected_translation'):
                     all_text += ' ' + sentence['expected_translation']
         
-        # Get word bank for extraction
-        word_bank_words = db.get_words_for_activity(language, learned_limit=200, learning_limit=50)
-        if word_bank_words:
-            words_used_from_text = api_client.extract_words_from_text(all_text, word_bank_words)
-            
-            for w in words_used_from_text:
-                words_used_data.append({
-                    "id": w.get("id", 0),
-                    "word": w.get("english_word", ""),
-                    "kannada": w.get("translation", ""),
-                    "transliteration": w.get("transliteration", ""),
-                    "word_class": w.get("word_class", ""),
-                    "level": w.get("level", ""),
-                    "mastery_level": w.get("mastery_level", "new"),
-                    "verb_transitivity": w.get("verb_transitivity", ""),
-                })
+        words_used_from_text = api_client.extract_words_from_text(all_text, language)
+        
+        for w in words_used_from_text:
+            words_used_data.append({
+                "id": w.get("id", 0),
+                "word": w.get("english_word", ""),
+                "kannada": w.get("translation", ""),
+                "transliteration": w.get("transliteration", ""),
+                "word_class": w.get("word_class", ""),
+                "level": w.get("level", ""),
+                "mastery_level": w.get("mastery_level", "new"),
+                "verb_transitivity": w.get("verb_transitivity", ""),
+            })
         
         activity['_words_used_data'] = words_used_data
         
@@ -1803,7 +1925,7 @@ async def create_writing_activity(language: str, request: Request):
         user_interests = []
         if custom_topic is None:
             try:
-                conn = sqlite3.connect(config.DB_PATH)
+                conn = db_pool.get_connection()
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT value FROM user_preferences
@@ -1860,7 +1982,7 @@ async def create_writing_activity(language: str, request: Request):
         print(f"Selected {len(selected_learning)} learning words + {len(selected_learned)} learned words = {len(required_learning_words)} total required words")
         print(f"Required words: {[w.get('english_word') for w in required_learning_words]}")
         
-        activity = api_client.generate_writing_activity(
+        activity = await api_client.generate_writing_activity(
             word_bank_words, 
             language, 
             required_learning_words=required_learning_words, 
@@ -1903,59 +2025,19 @@ async def create_writing_activity(language: str, request: Request):
         writing_prompt = activity.get('writing_prompt', '')
         activity_name = activity.get('activity_name', '')
         
-        # Add required words
-        for kannada_word in required_words:
-            db_words, _ = db.get_vocabulary(language, search=kannada_word, limit=1, offset=0)
-            if db_words:
-                w = db_words[0]
-                words_used_data.append({
-                    "id": w.get("id", 0),
-                    "word": w.get("english_word", ""),
-                    "kannada": w.get("translation", ""),
-                    "transliteration": w.get("transliteration", ""),
-                    "word_class": w.get("word_class", ""),
-                    "level": w.get("level", ""),
-                    "mastery_level": w.get("mastery_level", "new"),  # Ensure mastery_level is included
-                    "verb_transitivity": w.get("verb_transitivity", ""),
-                })
-        
-        # Extract words from writing prompt and activity name
-        import re
-        combined_text = writing_prompt
-        if activity_name:
-            combined_text += ' ' + activity_name
-        
-        if combined_text:
-            kannada_words = re.findall(r'[\u0C80-\u0CFF]+', combined_text)
-            unique_words = list(set(kannada_words))
-            unique_words.sort(key=len, reverse=True)
-            
-            matched_word_ids = {w.get('id') for w in words_used_data}
-            
-            for kannada_word in unique_words[:50]:  # Limit to avoid too many
-                db_words, _ = db.get_vocabulary(language, search=kannada_word, limit=5, offset=0)
-                if db_words:
-                    for w in db_words:
-                        if w.get('id') not in matched_word_ids:
-                            word_kannada = w.get('translation', '').strip()
-                            word_variants = word_kannada.split(' /')
-                            for variant in word_variants:
-                                variant = variant.strip()
-                                if kannada_word == variant or kannada_word in variant or variant in kannada_word:
-                                    words_used_data.append({
-                                        "id": w.get("id", 0),
-                                        "word": w.get("english_word", ""),
-                                        "kannada": w.get("translation", ""),
-                                        "transliteration": w.get("transliteration", ""),
-                                        "word_class": w.get("word_class", ""),
-                                        "level": w.get("level", ""),
-                                        "mastery_level": w.get("mastery_level", "new"),  # Ensure mastery_level is included
-                                        "verb_transitivity": w.get("verb_transitivity", ""),
-                                    })
-                                    matched_word_ids.add(w.get('id'))
-                                    break
-                            if w.get('id') in matched_word_ids:
-                                break
+        # Required words first, then words in the writing prompt and activity name
+        all_text = ' '.join(str(w) for w in required_words) + ' ' + writing_prompt + ' ' + activity_name
+        for w in api_client.extract_words_from_text(all_text, language):
+            words_used_data.append({
+                "id": w.get("id", 0),
+                "word": w.get("english_word", ""),
+                "kannada": w.get("translation", ""),
+                "transliteration": w.get("transliteration", ""),
+                "word_class": w.get("word_class", ""),
+                "level": w.get("level", ""),
+                "mastery_level": w.get("mastery_level", "new"),  # Ensure mastery_level is included
+                "verb_transitivity": w.get("verb_transitivity", ""),
+            })
         
         # Store words_used_data in activity for reopening
         activity['_words_used_data'] = words_used_data
@@ -1993,7 +2075,7 @@ async def create_writing_activity(language: str, request: Request):
 
 
 @app.post("/api/activity/writing/{language}/grade")
-def grade_writing_activity(language: str, request: WritingGradingRequest):
+async def grade_writing_activity(language: str, request: WritingGradingRequest):
     """Grade a writing activity using Gemini 2.5 Flash"""
     try:
         # Validate required fields
@@ -2005,7 +2087,7 @@ def grade_writing_activity(language: str, request: WritingGradingRequest):
             raise HTTPException(status_code=400, detail="Required words list cannot be empty")
         
         # Get user's CEFR level
-        user_level_info = db.calculate_user_level(language)
+        user_level_info = await asyncio.to_thread(db.calculate_user_level, language)
         user_cefr_level = user_level_info.get('level', 'A1')
         
         # Ensure evaluation_criteria is not empty
@@ -2016,7 +2098,7 @@ def grade_writing_activity(language: str, request: WritingGradingRequest):
 ವ್ಯಾಕರಣದ ನಿಖರತೆ, ಪದಗಳ ಸರಿಯಾದ ಬಳಕೆ, ಮತ್ತು ಸ್ಪಷ್ಟತೆಯನ್ನು ಕಾಪಾಡಿಕೊಳ್ಳಬೇಕು.
 ಲೇಖನವು ಸಂಬಂಧಿತವಾಗಿರಬೇಕು, ಸ್ಪಷ್ಟವಾಗಿರಬೇಕು, ಮತ್ತು ಪೂರ್ಣವಾಗಿರಬೇಕು."""
         
-        grading_result = api_client.grade_writing_activity(
+        grading_result = await api_client.grade_writing_activity(
             user_text=request.user_text,
             writing_prompt=request.writing_prompt,
             required_words=request.required_words,
@@ -2128,6 +2210,8 @@ def grade_speaking_activity(language: str, request: SpeakingGradingRequest):
         user_level_info = db.calculate_user_level(language)
         user_cefr_level = user_level_info.get('level', 'A1')
         
+        # Blocks on the LLM gateway's 'text' lane; this sync endpoint runs in
+        # FastAPI's threadpool, so the event loop isn't held up
         grading_result = api_client.grade_speaking_activity_with_audio(
             audio_data=audio_bytes,
             audio_format=request.audio_format,
@@ -2224,7 +2308,7 @@ def grade_speaking_activity(language: str, request: SpeakingGradingRequest):
 
 
 @app.post("/api/activity/translation/{language}/grade")
-def grade_translation_activity(language: str, request: TranslationGradingRequest):
+async def grade_translation_activity(language: str, request: TranslationGradingRequest):
     """Grade a translation activity using Gemini 2.5 Flash"""
     try:
         # Validate required fields
@@ -2232,10 +2316,10 @@ def grade_translation_activity(language: str, request: TranslationGradingRequest
             raise HTTPException(status_code=400, detail="Translations list cannot be empty")
         
         # Get user's CEFR level
-        user_level_info = db.calculate_user_level(language)
+        user_level_info = await asyncio.to_thread(db.calculate_user_level, language)
         user_cefr_level = user_level_info.get('level', 'A1')
         
-        grading_result = api_client.grade_translation_activity(
+        grading_result = await api_client.grade_translation_activity(
             translations=request.translations,
             target_language=language,
             user_cefr_level=user_cefr_level
@@ -2312,7 +2396,7 @@ def grade_translation_activity(language: str, request: TranslationGradingRequest
 
 
 @app.post("/api/activity/conversation/{language}/intro-audio")
-def generate_intro_audio(language: str, request: Dict):
+async def generate_intro_audio(language: str, request: Dict):
     """Generate TTS audio for conversation introduction"""
     try:
         introduction = request.get('introduction')
@@ -2324,12 +2408,11 @@ def generate_intro_audio(language: str, request: Dict):
             raise HTTPException(status_code=400, detail="Introduction and voice required")
         
         # Generate TTS
-        from api_client import generate_tts, generate_tts_style_instruction
-        audio_data, _, _ = generate_tts(
+        _, audio_data, _, _ = await api_client.generate_tts_async(
             introduction,
             language='kn-IN',
             voice=voice,
-            style_instruction=generate_tts_style_instruction(
+            style_instruction=api_client.generate_tts_style_instruction(
                 introduction,
                 '',
                 selected_region=region,
@@ -2377,6 +2460,45 @@ def get_listening_audio(language: str, request: Dict):
         raise HTTPException(status_code=500, detail=f"Error getting audio: {str(e)}")
 
 
+@app.get("/api/audio/{audio_id}")
+def get_audio(audio_id: str, request: Request):
+    """Serve a stored audio blob (e.g. TTS output referenced by activities) as raw bytes.
+    
+    Supports single-range `Range: bytes=...` requests (206 Partial Content) so
+    players can seek and stream without downloading the whole file first.
+    """
+    blob = audio_store.get_blob(audio_id)
+    if not blob:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    path, mime_type, size = blob
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': f'"{audio_id}"',
+        # audio_id is the content hash, so the bytes behind a URL never change
+        'Cache-Control': 'public, max-age=31536000, immutable',
+    }
+    if request.headers.get('if-none-match') == headers['ETag']:
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        byte_range = audio_store.parse_range(request.headers.get('range'), size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+    if byte_range is None:
+        return FileResponse(path, media_type=mime_type, headers=headers)
+    
+    start, end = byte_range
+    with open(path, 'rb') as f:
+        f.seek(start)
+        content = f.read(end - start + 1)
+    return Response(
+        content=content,
+        status_code=206,
+        media_type=mime_type,
+        headers={**headers, 'Content-Range': f'bytes {start}-{end}/{size}'}
+    )
+
+
 @app.post("/api/activity/conversation/{language}/create")
 async def create_conversation_activity(language: str, request: Request):
     """Create a new conversation activity with automatically selected topic and tasks"""
@@ -2397,7 +2519,7 @@ async def create_conversation_activity(language: str, request: Request):
         user_interests = []
         if custom_topic is None:
             try:
-                conn = sqlite3.connect(config.DB_PATH)
+                conn = db_pool.get_connection()
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT value FROM user_preferences
@@ -2423,7 +2545,7 @@ async def create_conversation_activity(language: str, request: Request):
         words.extend(list(mastered_words[:50]))
         
         # Generate conversation activity (topic is randomly selected inside)
-        activity = api_client.generate_conversation_activity(
+        activity = await api_client.generate_conversation_activity(
             words[:30],
             language,
             user_cefr_level=user_cefr_level,
@@ -2437,7 +2559,7 @@ async def create_conversation_activity(language: str, request: Request):
         
         # Extract words used from introduction and tasks
         all_text = activity.get('introduction', '') + ' ' + ' '.join(activity.get('tasks', []))
-        words_used_from_text = api_client.extract_words_from_text(all_text, words)
+        words_used_from_text = api_client.extract_words_from_text(all_text, language)
         
         words_used_data = [
             {
@@ -2470,7 +2592,7 @@ async def create_conversation_activity(language: str, request: Request):
             activity['conversation_id'] = conversation_id
             activity['activity_id'] = conversation_id
             activity_data_json = json.dumps(activity)
-            conn = sqlite3.connect(config.DB_PATH)
+            conn = db_pool.get_connection()
             cursor = conn.cursor()
             cursor.execute(
                 'UPDATE activity_history SET activity_data = ? WHERE id = ?',
@@ -2501,31 +2623,88 @@ async def create_conversation_activity(language: str, request: Request):
         raise HTTPException(status_code=500, detail=f"Error creating conversation activity: {str(e)}")
 
 
+def _load_conversation_activity_data(language: str, conversation_id: int):
+    """Raw activity_data of a conversation in activity_history (None if there is none)"""
+    conn = db_pool.get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT activity_data FROM activity_history
+        WHERE user_id = 1 AND language = ? AND activity_type = 'conversation'
+        AND id = ?
+    ''', (language, conversation_id))
+    row = cursor.fetchone()
+    conn.close()
+    return row['activity_data'] if row else None
+
+
+def _latest_conversation_id(language: str):
+    conn = db_pool.get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id FROM activity_history
+        WHERE user_id = 1 AND language = ? AND activity_type = 'conversation'
+        ORDER BY completed_at DESC LIMIT 1
+    ''', (language,))
+    row = cursor.fetchone()
+    conn.close()
+    return row['id'] if row else None
+
+
+def _save_conversation(language: str, conversation_id, activity_data: dict):
+    """Update a conversation in activity_history (or log a new one); returns its id"""
+    if conversation_id:
+        # Update existing conversation by ID
+        try:
+            conn = db_pool.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE activity_history
+                SET activity_data = ?, completed_at = CURRENT_TIMESTAMP
+                WHERE user_id = 1 AND language = ? AND activity_type = 'conversation' AND id = ?
+            ''', (json.dumps(activity_data), language, conversation_id))
+            conn.commit()
+            conn.close()
+            return conversation_id
+        except Exception as e:
+            print(f"Error updating conversation {conversation_id}: {e}")
+            # Fallback: create new entry if update fails
+            db.log_activity(
+                language,
+                'conversation',
+                json.dumps(activity_data),
+                0.0
+            )
+            return _latest_conversation_id(language) or conversation_id
+    # Create new conversation entry
+    db.log_activity(
+        language,
+        'conversation',
+        json.dumps(activity_data),
+        0.0
+    )
+    # Get the new conversation ID
+    return _latest_conversation_id(language)
+
+
 @app.post("/api/activity/conversation/{language}/rate")
-def rate_conversation(language: str, request: ConversationRatingRequest):
+async def rate_conversation(language: str, request: ConversationRatingRequest):
     """Rate conversation performance after tasks are completed"""
     try:
         # Get user's CEFR level
-        user_level_info = db.calculate_user_level(language)
+        user_level_info = await asyncio.to_thread(db.calculate_user_level, language)
         user_cefr_level = user_level_info.get('level', 'A1')
         
         # Load conversation activity data
-        import sqlite3
-        conn = sqlite3.connect(config.DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT activity_data FROM activity_history
-            WHERE user_id = 1 AND language = ? AND activity_type = 'conversation'
-            AND id = ?
-        ''', (language, request.conversation_id))
-        row = cursor.fetchone()
-        conn.close()
+        activity_data_raw = await asyncio.to_thread(
+            _load_conversation_activity_data, language, request.conversation_id
+        )
         
-        if not row or not row['activity_data']:
+        if not activity_data_raw:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
-        activity_data = json.loads(row['activity_data'])
+        activity_data = json.loads(activity_data_raw)
         tasks = activity_data.get('tasks', [])
         topic = activity_data.get('_topic', '')
         words_used_data = activity_data.get('_words_used_data', [])
@@ -2535,7 +2714,7 @@ def rate_conversation(language: str, request: ConversationRatingRequest):
         learning_words = [w for w in words_used_data if w.get('mastery_level') in ['learning', 'review']]
         
         # Rate conversation
-        rating_result = api_client.rate_conversation_performance(
+        rating_result = await api_client.rate_conversation_performance(
             request.conversation_transcript,
             tasks,
             topic,
@@ -2564,7 +2743,8 @@ def rate_conversation(language: str, request: ConversationRatingRequest):
             activity_data['messages'] = []
         
         # Save updated activity data
-        db.update_activity_score(
+        await asyncio.to_thread(
+            db.update_activity_score,
             language,
             'conversation',
             rating_result.get('score', 0) / 100.0,  # Convert to 0-1 range
@@ -2591,16 +2771,16 @@ def rate_conversation(language: str, request: ConversationRatingRequest):
 
 
 @app.post("/api/activity/conversation/{language}")
-def create_conversation_response(language: str, request: ConversationRequest):
+async def create_conversation_response(language: str, request: ConversationRequest):
     """Generate a conversation response from AI tutor"""
     
     # Get user's CEFR level
-    user_level_info = db.calculate_user_level(language)
+    user_level_info = await asyncio.to_thread(db.calculate_user_level, language)
     user_cefr_level = user_level_info.get('level', 'A1')
     
     # Get known/learning words for grounding
-    learning_words, _ = db.get_vocabulary(language, mastery_filter='learning')
-    review_words, _ = db.get_vocabulary(language, mastery_filter='review')
+    learning_words, _ = await asyncio.to_thread(db.get_vocabulary, language, mastery_filter='learning')
+    review_words, _ = await asyncio.to_thread(db.get_vocabulary, language, mastery_filter='review')
     words = list(learning_words)
     words.extend(list(review_words))
     
@@ -2617,22 +2797,10 @@ def create_conversation_response(language: str, request: ConversationRequest):
     
     if conversation_id:
         # Load conversation from activity_history
-        conn = sqlite3.connect(config.DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT activity_data FROM activity_history
-            WHERE user_id = 1 AND language = ? AND activity_type = 'conversation'
-            AND id = ?
-        ''', (language, conversation_id))
-        
-        row = cursor.fetchone()
-        conn.close()
+        activity_data_raw = await asyncio.to_thread(_load_conversation_activity_data, language, conversation_id)
         
-        if row and row['activity_data']:
+        if activity_data_raw:
             try:
-                activity_data_raw = row['activity_data']
                 # Handle case where activity_data might already be parsed or is a string
                 if isinstance(activity_data_raw, str):
                     activity_data = json.loads(activity_data_raw)
@@ -2692,7 +2860,7 @@ def create_conversation_response(language: str, request: ConversationRequest):
     # Generate response with error handling
     try:
         # Pass speaker profile, region, and formality from activity data to ensure consistency
-        response = api_client.generate_conversation_response(
+        response = await api_client.generate_conversation_response(
             request.message, 
             words[:20], 
             language, 
@@ -2770,7 +2938,7 @@ def create_conversation_response(language: str, request: ConversationRequest):
     audio_data = response.get("_audio_data")
     # Debug: Log audio data status
     if response.get("response"):
-        has_audio = audio_data is not None and audio_data.get("audio_base64")
+        has_audio = audio_data is not None and audio_data.get("audio_id")
         print(f"[DEBUG] Saving message: has_audio={has_audio}, audio_data_type={type(audio_data)}, response_length={len(response.get('response', ''))}")
         if not has_audio:
             print(f"[DEBUG] Message missing audio - TTS error: {response.get('_tts_error', 'None')}")
@@ -2791,18 +2959,8 @@ def create_conversation_response(language: str, request: ConversationRequest):
     existing_activity_data = {}
     if conversation_id:
         try:
-            conn = sqlite3.connect(config.DB_PATH)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT activity_data FROM activity_history
-                WHERE user_id = 1 AND language = ? AND activity_type = 'conversation'
-                AND id = ?
-            ''', (language, conversation_id))
-            row = cursor.fetchone()
-            conn.close()
-            if row and row['activity_data']:
-                activity_data_raw = row['activity_data']
+            activity_data_raw = await asyncio.to_thread(_load_conversation_activity_data, language, conversation_id)
+            if activity_data_raw:
                 # Handle case where activity_data might already be parsed or is a string
                 if isinstance(activity_data_raw, str):
                     existing_activity_data = json.loads(activity_data_raw)
@@ -2840,58 +2998,7 @@ def create_conversation_response(language: str, request: ConversationRequest):
     }
     
     # Use conversation_id if continuing, otherwise create new entry
-    if conversation_id:
-        # Update existing conversation by ID
-        try:
-            conn = sqlite3.connect(config.DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE activity_history
-                SET activity_data = ?, completed_at = CURRENT_TIMESTAMP
-                WHERE user_id = 1 AND language = ? AND activity_type = 'conversation' AND id = ?
-            ''', (json.dumps(activity_data), language, conversation_id))
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            print(f"Error updating conversation {conversation_id}: {e}")
-            # Fallback: create new entry if update fails
-            db.log_activity(
-                language,
-                'conversation',
-                json.dumps(activity_data),
-                0.0
-            )
-            conn = sqlite3.connect(config.DB_PATH)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT id FROM activity_history
-                WHERE user_id = 1 AND language = ? AND activity_type = 'conversation'
-                ORDER BY completed_at DESC LIMIT 1
-            ''', (language,))
-            row = cursor.fetchone()
-            conn.close()
-            conversation_id = row['id'] if row else conversation_id
-    else:
-        # Create new conversation entry
-        db.log_activity(
-            language,
-            'conversation',
-            json.dumps(activity_data),
-            0.0
-        )
-        # Get the new conversation ID
-        conn = sqlite3.connect(config.DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id FROM activity_history
-            WHERE user_id = 1 AND language = ? AND activity_type = 'conversation'
-            ORDER BY completed_at DESC LIMIT 1
-        ''', (language,))
-        row = cursor.fetchone()
-        conn.close()
-        conversation_id = row['id'] if row else None
+    conversation_id = await asyncio.to_thread(_save_conversation, language, conversation_id, activity_data)
     
     # Ensure response is not None before accessing it
     if response is None:
@@ -3282,6 +3389,43 @@ def update_flashcard_word(request: FlashcardUpdateRequest):
         raise HTTPException(status_code=500, detail=f"Error updating word state: {str(e)}")
 
 
+class FlashcardReview(BaseModel):
+    """One review in a flashcard batch"""
+    word_id: int
+    comfort_level: str  # 'again', 'hard', 'good', 'easy'; anything else fails just this review
+    reviewed_at: Optional[str] = None  # ISO 8601; defaults to now
+    idempotency_key: Optional[str] = None  # Unique per review, so replays are applied once
+
+class FlashcardBatchRequest(BaseModel):
+    """Model for a batch of flashcard reviews, applied in order"""
+    reviews: List[FlashcardReview]
+
+@app.post("/api/flashcard/batch")
+def update_flashcard_batch(request: FlashcardBatchRequest):
+    """Apply many flashcard reviews in one transaction (e.g. a finished or offline session)
+    
+    Reviews with an idempotency_key that was already applied are returned as
+    'duplicate' instead of being applied again, so a client can safely resend a
+    batch whose response it never saw.
+    """
+    if len(request.reviews) > config.FLASHCARD_BATCH_MAX_REVIEWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.FLASHCARD_BATCH_MAX_REVIEWS} reviews per batch"
+        )
+    try:
+        result = db.apply_flashcard_review_batch(
+            [review.dict() for review in request.reviews],
+            user_id=1
+        )
+        return {"success": True, **result}
+    except Exception as e:
+        print(f"Error applying flashcard batch: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error applying flashcard batch: {str(e)}")
+
+
 # ============================================================================
 # SRS (Spaced Repetition System) Endpoints
 # ============================================================================
@@ -3362,11 +3506,19 @@ async def update_srs_settings_api(language: str, request: Request):
             'interval_multiplier': body.get('interval_multiplier')
         }
         
+        previous = db.get_srs_settings_for_language(language)
         for key, value in advanced_settings.items():
             if value is not None:
                 db.update_user_setting(key, str(value), language)
         
-        return {"success": True, "message": "Settings updated"}
+        # Cards outside new ease bounds are rescheduled right away
+        rescheduled = 0
+        current = db.get_srs_settings_for_language(language)
+        if (current['min_ease_factor'], current['max_ease_factor']) != \
+                (previous['min_ease_factor'], previous['max_ease_factor']):
+            rescheduled = db.reschedule_language(language)
+        
+        return {"success": True, "message": "Settings updated", "rescheduled_cards": rescheduled}
     except HTTPException:
         raise
     except Exception as e:
@@ -3389,6 +3541,47 @@ def get_srs_stats_api(language: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/srs/forecast/{language}")
+def forecast_srs_workload_api(language: str, days: int = 90, new_cards_per_day: Optional[int] = None,
+                              reviews_per_day: Optional[int] = None):
+    """Forecast daily flashcard load under proposed SRS settings
+
+    Query params:
+        days: Days to forecast (30-365, default 90)
+        new_cards_per_day, reviews_per_day: Proposed quotas (default: current settings)
+
+    Returns per-day lists aligned with "dates":
+        {
+            "dates": [...],
+            "reviews": [...],     # Due reviews done (up to reviews_per_day)
+            "new_cards": [...],   # New cards introduced
+            "lapses": [...],      # Reviews expected to be forgotten
+            "backlog": [...],     # Due reviews left over at the end of the day
+            "summary": {...},
+            "cached": bool
+        }
+    """
+    try:
+        if not srs_engine.HAS_NUMPY:
+            raise HTTPException(status_code=503, detail="numpy is not installed")
+        if not config.SRS_FORECAST_MIN_DAYS <= days <= config.SRS_FORECAST_MAX_DAYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"days must be between {config.SRS_FORECAST_MIN_DAYS} and {config.SRS_FORECAST_MAX_DAYS}"
+            )
+        if (new_cards_per_day is not None and new_cards_per_day < 0) or \
+                (reviews_per_day is not None and reviews_per_day < 0):
+            raise HTTPException(status_code=400, detail="Quotas must not be negative")
+        return db.forecast_srs_workload(language, days, new_cards_per_day, reviews_per_day)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error forecasting SRS workload: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/srs/simulate")
 async def simulate_srs_interval(request: Request):
     """Simulate SRS intervals for different button presses
@@ -3426,53 +3619,13 @@ async def simulate_srs_interval(request: Request):
         max_ease = body.get('max_ease', 2.5)
         interval_multiplier = body.get('interval_multiplier', 1.0)
         
-        from datetime import datetime, timedelta
-        
         def calculate_next_interval(response: str):
             """Calculate next interval based on response"""
-            new_ease = ease_factor
-            
-            if response == "again":
-                # Failed: Reset to learning steps, decrease ease
-                new_ease = max(min_ease, ease_factor - ease_decrement)
-                if current_interval == 0:
-                    interval = 0  # Show again today (0 * multiplier = 0)
-                else:
-                    interval = max(1, current_interval * 0.5 * interval_multiplier)
-            
-            elif response == "hard":
-                # Hard: Multiply by 1.2, slight ease decrease
-                new_ease = max(min_ease, ease_factor - ease_decrement * 0.5)
-                if current_interval == 0:
-                    interval = 1 * interval_multiplier
-                else:
-                    interval = max(1, current_interval * 1.2 * interval_multiplier)
-            
-            elif response == "good":
-                # Good: Normal progression, slight ease increase
-                new_ease = min(max_ease, ease_factor + ease_increment)
-                if current_interval == 0:
-                    interval = 1 * interval_multiplier
-                elif current_interval == 1:
-                    interval = 6 * interval_multiplier
-                else:
-                    interval = current_interval * new_ease * interval_multiplier
-            
-            elif response == "easy":
-                # Easy: Larger jump, bigger ease increase
-                new_ease = min(max_ease, ease_factor + ease_increment * 1.5)
-                if current_interval == 0:
-                    interval = 4 * interval_multiplier
-                else:
-                    interval = current_interval * new_ease * 1.3 * interval_multiplier
-            
-            else:
-                interval = current_interval * interval_multiplier
-            
-            # Round interval
-            interval = round(interval, 1)
-            
-            # Calculate next review date
+            interval, new_ease = srs_engine.simulate_interval(
+                response, current_interval, ease_factor,
+                ease_increment=ease_increment, ease_decrement=ease_decrement,
+                min_ease=min_ease, max_ease=max_ease, interval_multiplier=interval_multiplier,
+            )
             next_review = datetime.now() + timedelta(days=interval)
             
             return {
@@ -3521,6 +3674,26 @@ def preview_srs_intervals(word_id: int, user_id: int = 1):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/srs/optimize/{language}")
+def optimize_srs_memory_model(language: str):
+    """Fit the SRS memory model to this language's review history
+    
+    Returns the fitted parameters with the log loss before and after fitting,
+    the number of reviews and cards used, and how long the fit took.
+    """
+    try:
+        if not srs_engine.HAS_NUMPY:
+            raise HTTPException(status_code=503, detail="numpy is not installed")
+        return db.fit_srs_memory_model(language)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error fitting SRS memory model: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/srs/review-history/{word_id}")
 def get_word_review_history(word_id: int, user_id: int = 1):
     """Get the review history for a specific word
@@ -3539,7 +3712,7 @@ def get_word_review_history(word_id: int, user_id: int = 1):
     }
     """
     try:
-        conn = sqlite3.connect(config.DB_PATH)
+        conn = db_pool.get_connection()
         cursor = conn.cursor()
         
         # Get word data from vocabulary table
@@ -3789,7 +3962,7 @@ def get_activity_history(language: str, limit: int = 1000):
     Default limit is 1000 to show all activities. Activities should not expire.
     """
     import sqlite3
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = db_pool.get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -3816,100 +3989,12 @@ def get_weekly_stats(days: int = 7, offset: int = 0):
     
     Returns daily aggregates of activities completed, words learned, and lessons completed
     """
-    import sqlite3
-    from datetime import datetime, timedelta
-    
-    conn = sqlite3.connect(config.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Calculate date range with offset
-    end_date = config.get_current_time() - timedelta(days=offset)
-    start_date = end_date - timedelta(days=days-1)
-    
-    # Get activity counts by date
-    cursor.execute('''
-        SELECT 
-            DATE(completed_at) as date,
-            COUNT(*) as activity_count
-        FROM activity_history
-        WHERE user_id = 1 
-        AND completed_at IS NOT NULL
-        AND completed_at >= ?
-        GROUP BY DATE(completed_at)
-        ORDER BY date ASC
-    ''', (start_date.strftime('%Y-%m-%d'),))
-    
-    activity_counts = {row['date']: row['activity_count'] for row in cursor.fetchall()}
-    
-    # Get lesson counts by date
-    cursor.execute('''
-        SELECT 
-            DATE(completed_at) as date,
-            COUNT(*) as lesson_count
-        FROM lesson_completions
-        WHERE user_id = 1 
-        AND completed_at IS NOT NULL
-        AND completed_at >= ?
-        GROUP BY DATE(completed_at)
-        ORDER BY date ASC
-    ''', (start_date.strftime('%Y-%m-%d'),))
-    
-    lesson_counts = {row['date']: row['lesson_count'] for row in cursor.fetchall()}
-    
-    # Get word counts by date (from activity_data JSON)
-    cursor.execute('''
-        SELECT 
-            DATE(completed_at) as date,
-            activity_data
-        FROM activity_history
-        WHERE user_id = 1 
-        AND completed_at IS NOT NULL
-        AND completed_at >= ?
-        ORDER BY date ASC
-    ''', (start_date.strftime('%Y-%m-%d'),))
-    
-    word_counts = {}
-    for row in cursor.fetchall():
-        date = row['date']
-        if row['activity_data']:
-            try:
-                data = json.loads(row['activity_data'])
-                # Count words from different activity types
-                words = 0
-                if 'vocabulary' in data:
-                    words += len(data['vocabulary'])
-                if 'sentences' in data:
-                    words += len(data['sentences'])
-                if 'questions' in data:
-                    words += len(data['questions'])
-                
-                word_counts[date] = word_counts.get(date, 0) + words
-            except:
-                pass
-    
-    conn.close()
-    
-    # Build response for all days in range
-    stats = []
-    current_date = start_date
-    for i in range(days):
-        date_str = current_date.strftime('%Y-%m-%d')
-        stats.append({
-            'date': date_str,
-            'day': current_date.strftime('%a'),  # Mon, Tue, etc.
-            'activities': activity_counts.get(date_str, 0),
-            'lessons': lesson_counts.get(date_str, 0),
-            'words': word_counts.get(date_str, 0)
-        })
-        current_date += timedelta(days=1)
-    
-    return {'stats': stats}
+    return {'stats': db.get_weekly_stats(days, offset)}
 
 @app.get("/api/activity/{activity_id}")
 def get_activity_by_id(activity_id: int):
     """Get a specific activity by ID"""
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = db_pool.get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -3946,7 +4031,7 @@ def get_daily_activities(date: str):
     """
     import sqlite3
     
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = db_pool.get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -3960,7 +4045,7 @@ def get_daily_activities(date: str):
             activity_data
         FROM activity_history
         WHERE user_id = 1 
-        AND DATE(completed_at) = ?
+        AND completed_date = ?
         ORDER BY completed_at DESC
     ''', (date,))
     
@@ -4118,7 +4203,7 @@ def get_user_languages():
     """Get list of languages the user wants to learn, sorted by level (C2 -> A0)"""
     import sqlite3
     
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = db_pool.get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -4212,7 +4297,7 @@ async def save_user_languages(request: Request):
     data = await request.json()
     languages = data.get('languages', [])
     
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = db_pool.get_connection()
     cursor = conn.cursor()
     
     # Create user_preferences table if it doesn't exist
@@ -4246,7 +4331,7 @@ async def save_user_languages(request: Request):
 def get_user_interests():
     """Get user's selected interests/tags"""
     
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = db_pool.get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -4286,7 +4371,7 @@ async def save_user_interests(request: Request):
     data = await request.json()
     interests = data.get('interests', [])
     
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = db_pool.get_connection()
     cursor = conn.cursor()
     
     # Create user_preferences table if it doesn't exist
@@ -4322,7 +4407,7 @@ async def save_user_interests(request: Request):
 def get_user_preferences(keys: str = None):
     """Get user preferences by keys (comma-separated)"""
     
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = db_pool.get_connection()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -4382,7 +4467,7 @@ def get_user_preferences(keys: str = None):
 def save_user_preferences(preferences: dict):
     """Save user preferences (supports multiple key-value pairs)"""
     
-    conn = sqlite3.connect(config.DB_PATH)
+    conn = db_pool.get_connection()
     cursor = conn.cursor()
     
     # Create user_preferences table if it doesn't exist
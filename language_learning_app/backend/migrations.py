@@ -0,0 +1,499 @@
+"""
+Versioned schema migrations for the Fluo database
+
+init_db_schema() creates any missing tables with CREATE TABLE IF NOT EXISTS and
+then calls run_migrations(), which applies every step in MIGRATIONS whose
+version is newer than the one recorded in the schema_version table. Each step
+runs in its own transaction and is recorded once it succeeds, so a step is
+never re-run against a database that already has it.
+
+To change the schema of an existing table, append a new step here rather than
+adding another try/except ALTER TABLE to db.py.
+"""
+import sqlite3
+from typing import Callable, List, Tuple
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def _table_exists(cursor, table: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (table,)
+    )
+    return cursor.fetchone() is not None
+
+
+def _column_names(cursor, table: str) -> List[str]:
+    # table_xinfo (unlike table_info) also lists generated columns
+    cursor.execute(f"PRAGMA table_xinfo({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _add_column(cursor, table: str, column: str, coldef: str) -> bool:
+    """Add a column if the table exists and doesn't have it yet
+
+    Returns:
+        True if the column was added
+    """
+    if not _table_exists(cursor, table):
+        return False
+    if column in _column_names(cursor, table):
+        return False
+    cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {coldef}')
+    return True
+
+
+def _create_index(cursor, name: str, table: str, columns: str):
+    """Create an index if its table exists"""
+    if not _table_exists(cursor, table):
+        return
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})')
+
+
+# ============================================================================
+# Migration steps
+# ============================================================================
+
+def _m001_legacy_columns(cursor):
+    """Columns that used to be added ad hoc with try/except ALTER TABLE"""
+    _add_column(cursor, 'user_profile', 'name', "TEXT DEFAULT 'Language Learner'")
+    _add_column(cursor, 'user_profile', 'profile_picture_url', 'TEXT')
+
+    if _add_column(cursor, 'user_settings', 'language', "TEXT DEFAULT 'kannada'"):
+        # Settings written before per-language settings existed belong to Kannada
+        cursor.execute("UPDATE user_settings SET language = 'kannada' WHERE language IS NULL")
+
+    _add_column(cursor, 'word_states', 'introduced_date', 'TEXT')
+    _add_column(cursor, 'word_states', 'interval_days', 'REAL')
+    _add_column(cursor, 'vocabulary', 'origin', "TEXT DEFAULT 'default'")
+
+    # user_preferences originally only had an 'interests' column
+    _add_column(cursor, 'user_preferences', 'key', 'TEXT')
+    _add_column(cursor, 'user_preferences', 'value', 'TEXT')
+    _add_column(cursor, 'user_preferences', 'created_at', 'TEXT DEFAULT CURRENT_TIMESTAMP')
+    _add_column(cursor, 'user_preferences', 'updated_at', 'TEXT DEFAULT CURRENT_TIMESTAMP')
+
+    _add_column(cursor, 'activity_history', 'activity_data', 'TEXT')
+    _add_column(cursor, 'activity_history', 'score', 'REAL')
+
+    _add_column(cursor, 'lessons', 'unit_id', 'TEXT')
+    _add_column(cursor, 'lessons', 'lesson_number', 'INTEGER')
+
+
+def _m002_hot_query_indexes(cursor):
+    """Indexes for the review queue, vocabulary filters and activity stats"""
+    # get_vocabulary / calculate_user_level / new-card selection filter by language and level
+    _create_index(cursor, 'idx_vocabulary_language_level', 'vocabulary', 'language, level')
+    # Due-review and mastery counts filter word_states by user and mastery, then review date
+    _create_index(
+        cursor, 'idx_word_states_user_mastery_review',
+        'word_states', 'user_id, mastery_level, next_review_date'
+    )
+    # /api/weekly-stats and get_daily_stats range-scan completed_at per user
+    _create_index(
+        cursor, 'idx_activity_history_user_completed',
+        'activity_history', 'user_id, completed_at'
+    )
+
+
+def _m003_activity_completed_date(cursor):
+    """completed_date = DATE(completed_at), so per-day queries can use an index
+
+    On SQLite >= 3.31 this is a virtual generated column. Older SQLite builds
+    get a plain column kept in sync by triggers instead.
+    """
+    if not _table_exists(cursor, 'activity_history'):
+        return
+
+    if 'completed_date' not in _column_names(cursor, 'activity_history'):
+        if sqlite3.sqlite_version_info >= (3, 31, 0):
+            cursor.execute('''
+                ALTER TABLE activity_history ADD COLUMN completed_date TEXT
+                GENERATED ALWAYS AS (DATE(completed_at)) VIRTUAL
+            ''')
+        else:
+            cursor.execute('ALTER TABLE activity_history ADD COLUMN completed_date TEXT')
+            cursor.execute('UPDATE activity_history SET completed_date = DATE(completed_at)')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_activity_history_completed_date_insert
+                AFTER INSERT ON activity_history
+                BEGIN
+                    UPDATE activity_history SET completed_date = DATE(NEW.completed_at)
+                    WHERE id = NEW.id;
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_activity_history_completed_date_update
+                AFTER UPDATE OF completed_at ON activity_history
+                BEGIN
+                    UPDATE activity_history SET completed_date = DATE(NEW.completed_at)
+                    WHERE id = NEW.id;
+                END
+            ''')
+
+    # /api/daily-activities and the daily stats group or filter by day per user
+    _create_index(
+        cursor, 'idx_activity_history_user_completed_date',
+        'activity_history', 'user_id, completed_date, completed_at'
+    )
+    # The streak calculation counts activities per (language, activity_type, day)
+    _create_index(
+        cursor, 'idx_activity_history_lang_type_date',
+        'activity_history', 'language, activity_type, completed_date'
+    )
+
+
+def _m004_vocabulary_fts(cursor):
+    """FTS5 search table over vocabulary plus its sync triggers (see vocab_fts.py)"""
+    if not _table_exists(cursor, 'vocabulary'):
+        return
+    from . import vocab_fts
+    vocab_fts.create_fts_schema(cursor)
+
+
+def _m005_vocabulary_sync_key(cursor):
+    """source_hash + lookup index for the incremental CSV sync (see db.load_vocabulary_from_csv)"""
+    # Hash of the raw CSV fields a row was loaded from; unchanged rows are skipped
+    _add_column(cursor, 'vocabulary', 'source_hash', 'TEXT')
+    _create_index(
+        cursor, 'idx_vocabulary_sync_key',
+        'vocabulary', 'language, english_word, translation, word_class'
+    )
+
+
+def _m006_sync_manifest_entity(cursor):
+    """sync_manifest.entity_id: the lesson/unit a file was loaded into, for pruning"""
+    _add_column(cursor, 'sync_manifest', 'entity_id', 'TEXT')
+
+
+def _m007_activity_audio_blobs(cursor):
+    """Move base64 TTS audio embedded in activity_history.activity_data into the audio store"""
+    if not _table_exists(cursor, 'activity_history') or not _table_exists(cursor, 'audio_blobs'):
+        return
+    import json
+    from . import audio_store
+    cursor.execute('''
+        SELECT id, activity_data FROM activity_history
+        WHERE activity_data LIKE '%"audio_base64"%'
+    ''')
+    rows = cursor.fetchall()
+    moved_total = 0
+    for row_id, activity_data in rows:
+        try:
+            data = json.loads(activity_data)
+        except (TypeError, ValueError):
+            continue
+        data, moved = audio_store.externalize_audio(data, cursor=cursor)
+        if moved:
+            cursor.execute(
+                'UPDATE activity_history SET activity_data = ? WHERE id = ?',
+                (json.dumps(data), row_id)
+            )
+            moved_total += moved
+    print(f"[Migrations]   moved {moved_total} audio blobs out of {len(rows)} activities")
+
+
+def _m008_live_conversation_audio(cursor):
+    """Move base64 PCM kept on live conversation transcript messages into the audio store"""
+    if not _table_exists(cursor, 'activity_history') or not _table_exists(cursor, 'audio_blobs'):
+        return
+    import json
+    from . import audio_store
+    cursor.execute('''
+        SELECT id, activity_data FROM activity_history
+        WHERE activity_type = 'conversation' AND activity_data LIKE '%"audio_data"%'
+    ''')
+    rows = cursor.fetchall()
+    moved_total = 0
+    for row_id, activity_data in rows:
+        try:
+            data = json.loads(activity_data)
+        except (TypeError, ValueError):
+            continue
+        messages = data.get('messages') if isinstance(data, dict) else None
+        if not isinstance(messages, list):
+            continue
+        moved = audio_store.externalize_live_messages(messages, cursor=cursor)
+        if moved:
+            cursor.execute(
+                'UPDATE activity_history SET activity_data = ? WHERE id = ?',
+                (json.dumps(data), row_id)
+            )
+            moved_total += moved
+    print(f"[Migrations]   moved {moved_total} live audio blobs out of {len(rows)} conversations")
+
+
+# Tables the home screen (db.get_home_data) is built from
+HOME_DATA_TABLES = (
+    'word_states', 'activity_history', 'daily_progress', 'weekly_goals',
+    'srs_daily_quota', 'language_goals', 'user_profile', 'vocabulary',
+)
+
+
+def _create_home_version_triggers(cursor, table: str):
+    """Triggers bumping home_data_version on every insert, update and delete on `table`"""
+    if not _table_exists(cursor, table):
+        return
+    for event in ('insert', 'update', 'delete'):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_home_version_{event}
+            AFTER {event.upper()} ON {table}
+            BEGIN
+                UPDATE home_data_version SET version = version + 1 WHERE id = 1;
+            END
+        ''')
+
+
+def _m009_home_data_version(cursor):
+    """home_data_version counter, bumped by triggers on every write to HOME_DATA_TABLES
+
+    The /api/home ETag and response cache are keyed on it, so any writer
+    (including scripts that bypass db.py) invalidates them.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS home_data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO home_data_version (id, version) VALUES (1, 0)')
+    for table in HOME_DATA_TABLES:
+        _create_home_version_triggers(cursor, table)
+
+
+def _m010_streak_dirty_days(cursor):
+    """Triggers marking the days whose goal completion a write may change (see db streak state)
+
+    Activity rows count toward a day's goals once scored above 0, keyed on
+    DATE(completed_at); week-specific weekly_goals rows (not the 'default'
+    template) set the goals of one day.
+    """
+    if _table_exists(cursor, 'activity_history'):
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_activity_history_streak_insert
+            AFTER INSERT ON activity_history
+            WHEN NEW.score > 0 AND NEW.completed_at IS NOT NULL
+            BEGIN
+                INSERT OR IGNORE INTO streak_dirty_days (date) VALUES (DATE(NEW.completed_at));
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_activity_history_streak_update
+            AFTER UPDATE OF score, completed_at, language, activity_type ON activity_history
+            WHEN OLD.score > 0 OR NEW.score > 0
+            BEGIN
+                INSERT OR IGNORE INTO streak_dirty_days (date)
+                SELECT DATE(OLD.completed_at) WHERE OLD.completed_at IS NOT NULL;
+                INSERT OR IGNORE INTO streak_dirty_days (date)
+                SELECT DATE(NEW.completed_at) WHERE NEW.completed_at IS NOT NULL;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_activity_history_streak_delete
+            AFTER DELETE ON activity_history
+            WHEN OLD.score > 0 AND OLD.completed_at IS NOT NULL
+            BEGIN
+                INSERT OR IGNORE INTO streak_dirty_days (date) VALUES (DATE(OLD.completed_at));
+            END
+        ''')
+    if _table_exists(cursor, 'weekly_goals'):
+        goal_date = '''DATE({row}.week_start_date, '+' || (CASE {row}.day_of_week
+            WHEN 'monday' THEN 0 WHEN 'tuesday' THEN 1 WHEN 'wednesday' THEN 2 WHEN 'thursday' THEN 3
+            WHEN 'friday' THEN 4 WHEN 'saturday' THEN 5 WHEN 'sunday' THEN 6 END) || ' days')'''
+        for event, rows in (('insert', ['NEW']), ('update', ['OLD', 'NEW']), ('delete', ['OLD'])):
+            marks = ''.join(f'''
+                INSERT OR IGNORE INTO streak_dirty_days (date)
+                SELECT {goal_date.format(row=row)}
+                WHERE {row}.week_start_date != 'default' AND {goal_date.format(row=row)} IS NOT NULL;'''
+                            for row in rows)
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_weekly_goals_streak_{event}
+                AFTER {event.upper()} ON weekly_goals
+                BEGIN{marks}
+                END
+            ''')
+
+
+def _m011_vocabulary_search_keys(cursor):
+    """Normalized per-variant search keys for vocabulary (see db.search_key), backfilled
+
+    The keys are computed in Python, so triggers only drop a word's keys when
+    it is deleted or its text changes; db.fill_vocabulary_search_keys writes
+    them for rows that have none.
+    """
+    if not _table_exists(cursor, 'vocabulary'):
+        return
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vocabulary_search_keys (
+            language TEXT NOT NULL,
+            field TEXT NOT NULL,
+            key TEXT NOT NULL,
+            word_id INTEGER NOT NULL,
+            PRIMARY KEY (language, field, key, word_id)
+        ) WITHOUT ROWID
+    ''')
+    _create_index(cursor, 'idx_vocabulary_search_keys_word', 'vocabulary_search_keys', 'word_id')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_vocabulary_search_keys_delete
+        AFTER DELETE ON vocabulary
+        BEGIN
+            DELETE FROM vocabulary_search_keys WHERE word_id = OLD.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_vocabulary_search_keys_update
+        AFTER UPDATE OF language, english_word, translation, transliteration ON vocabulary
+        BEGIN
+            DELETE FROM vocabulary_search_keys WHERE word_id = OLD.id;
+        END
+    ''')
+    from . import db
+    db.fill_vocabulary_search_keys(cursor)
+
+
+def _m012_lessons_unit_index(cursor):
+    """Lessons by unit, once 001 has added lessons.unit_id and lesson_number to old databases"""
+    _create_index(cursor, 'idx_lessons_unit', 'lessons', 'unit_id, lesson_number')
+
+
+def _m013_tts_cache_audio_ids(cursor):
+    """Point TTS cache entries at audio store blobs and drop the cache's own WAV copies"""
+    if not _table_exists(cursor, 'tts_cache'):
+        return
+    _add_column(cursor, 'tts_cache', 'audio_id', 'TEXT')
+    if not _table_exists(cursor, 'audio_blobs'):
+        return
+    import os
+    from . import audio_store
+    from . import config
+    cursor.execute('SELECT cache_key FROM tts_cache WHERE audio_id IS NULL')
+    keys = [row[0] for row in cursor.fetchall()]
+    moved = 0
+    for key in keys:
+        path = os.path.join(config.TTS_CACHE_DIR, key[:2], key + '.wav')
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            cursor.execute('DELETE FROM tts_cache WHERE cache_key = ?', (key,))
+            continue
+        audio_id = audio_store.save(data, 'audio/wav', cursor=cursor)
+        cursor.execute(
+            'UPDATE tts_cache SET audio_id = ?, size_bytes = ? WHERE cache_key = ?',
+            (audio_id, len(data), key)
+        )
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        moved += 1
+    print(f"[Migrations]   pointed {moved} of {len(keys)} TTS cache entries at the audio store")
+
+
+def _m014_lesson_completions_home_version(cursor):
+    """Bump home_data_version on lesson completions, now that /api/home includes the weekly stats"""
+    _create_home_version_triggers(cursor, 'lesson_completions')
+
+
+def _m015_transliteration_cache(cursor):
+    """Per-word transliteration results (see transliteration.py)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS transliteration_cache (
+            from_scheme TEXT NOT NULL,
+            to_scheme TEXT NOT NULL,
+            text TEXT NOT NULL,
+            result TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (from_scheme, to_scheme, text)
+        ) WITHOUT ROWID
+    ''')
+
+
+# Ordered list of (version, description, step). Never renumber or edit a step
+# that has shipped; append a new one instead.
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, 'legacy ad hoc columns', _m001_legacy_columns),
+    (2, 'hot query indexes', _m002_hot_query_indexes),
+    (3, 'activity_history.completed_date', _m003_activity_completed_date),
+    (4, 'vocabulary_fts search table', _m004_vocabulary_fts),
+    (5, 'vocabulary sync key', _m005_vocabulary_sync_key),
+    (6, 'sync_manifest.entity_id', _m006_sync_manifest_entity),
+    (7, 'activity audio to blob store', _m007_activity_audio_blobs),
+    (8, 'live conversation audio to blob store', _m008_live_conversation_audio),
+    (9, 'home data version triggers', _m009_home_data_version),
+    (10, 'streak dirty-day triggers', _m010_streak_dirty_days),
+    (11, 'vocabulary search keys', _m011_vocabulary_search_keys),
+    (12, 'lessons unit index', _m012_lessons_unit_index),
+    (13, 'tts cache audio store references', _m013_tts_cache_audio_ids),
+    (14, 'lesson completions home data version triggers', _m014_lesson_completions_home_version),
+    (15, 'transliteration_cache table', _m015_transliteration_cache),
+]
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+
+def ensure_schema_version_table(cursor):
+    """Create the schema_version bookkeeping table"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def get_schema_version(conn) -> int:
+    """Get the highest applied migration version (0 for a fresh database)"""
+    cursor = conn.cursor()
+    ensure_schema_version_table(cursor)
+    cursor.execute('SELECT MAX(version) FROM schema_version')
+    row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else 0
+
+
+def run_migrations(conn) -> int:
+    """Apply all pending migrations in order
+
+    Args:
+        conn: Open database connection (tables should already be created)
+
+    Returns:
+        Number of migrations applied
+    """
+    cursor = conn.cursor()
+    ensure_schema_version_table(cursor)
+    conn.commit()
+    current = get_schema_version(conn)
+
+    applied = 0
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            cursor.execute('BEGIN')
+            step(cursor)
+            cursor.execute(
+                'INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                (version, description)
+            )
+            conn.commit()
+            applied += 1
+            print(f"[Migrations] ✓ Applied {version:03d}: {description}")
+        except Exception as e:
+            conn.rollback()
+            print(f"[Migrations] Error applying {version:03d} ({description}): {str(e)}")
+            import traceback
+            traceback.print_exc()
+            # Later steps may depend on this one, so stop here
+            break
+
+    if applied:
+        # Refresh planner statistics so the new indexes get picked up
+        cursor.execute('PRAGMA optimize')
+    return applied
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark the flashcard endpoints with and without the SQLite connection pool.
+
+Runs GET /api/flashcards/{language} and POST /api/flashcard/update against a
+throwaway copy of the database, first with DB_POOL_ENABLED off (a fresh
+sqlite3 connection per db call, the old behaviour) and then with it on, and
+prints requests/sec for each.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_db_pool [--language kannada] [--requests 500] [--threads 8]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend import config
+
+
+COMFORT_LEVELS = ['again', 'hard', 'good', 'easy']
+
+
+def run_requests(client, language: str, total: int, threads: int, word_ids):
+    """Fire a mix of flashcard fetches and updates, return (req/sec, error_count)"""
+    errors = 0
+
+    def one(i):
+        if i % 2 == 0:
+            resp = client.get(f"/api/flashcards/{language}", params={'limit': 20})
+        else:
+            resp = client.post("/api/flashcard/update", json={
+                'word_id': random.choice(word_ids),
+                'comfort_level': random.choice(COMFORT_LEVELS),
+            })
+        return resp.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for status in pool.map(one, range(total)):
+            if status != 200:
+                errors += 1
+    elapsed = time.perf_counter() - start
+    return (total / elapsed if elapsed > 0 else 0.0), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--language', default='kannada')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    if not os.path.exists(config.DB_PATH):
+        print(f"❌ Database not found at {config.DB_PATH} — start the backend once to create it")
+        sys.exit(1)
+
+    # Work on a copy so the benchmark never touches real review history
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-bench-')
+    bench_db = os.path.join(tmp_dir, config.DB_NAME)
+    shutil.copy(config.DB_PATH, bench_db)
+    config.DB_PATH = bench_db
+
+    from fastapi.testclient import TestClient
+    from backend import db, db_pool
+    from backend.main import app
+
+    conn = db_pool.get_connection()
+    word_ids = [row[0] for row in conn.execute(
+        'SELECT id FROM vocabulary WHERE language = ? LIMIT 200', (args.language,)
+    ).fetchall()]
+    conn.close()
+    if not word_ids:
+        print(f"❌ No vocabulary for {args.language}")
+        sys.exit(1)
+
+    # Not using the client as a context manager: that would run the startup
+    # event (lesson/vocab sync) and skew the numbers
+    client = TestClient(app)
+
+    results = {}
+    try:
+        for label, enabled in (('no pool (connect per call)', False), ('pooled', True)):
+            config.DB_POOL_ENABLED = enabled
+            run_requests(client, args.language, min(50, args.requests), args.threads, word_ids)  # warm-up
+            rps, errors = run_requests(client, args.language, args.requests, args.threads, word_ids)
+            results[label] = rps
+            print(f"{label:28s} {rps:8.1f} req/s  ({errors} errors)")
+    finally:
+        db_pool.close_all_pools()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    baseline, pooled = results.get('no pool (connect per call)'), results.get('pooled')
+    if baseline and pooled:
+        print(f"\nSpeedup: {pooled / baseline:.2f}x")
+    print(f"Pool stats: {db_pool.get_pool_stats(bench_db)}")
+
+
+if __name__ == '__main__':
+    main()
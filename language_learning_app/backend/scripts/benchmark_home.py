@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark the home screen aggregate (GET /api/home, db.get_home_data).
+
+Builds a throwaway database with two languages of vocabulary and word states,
+weekly goals and a daily activity history (so the streak walks back --streak
+days), then times:
+
+- the separate calls behind /api/dashboard, /api/streak, /api/srs/stats,
+  /api/today-goals-all (+ /api/dashboard per language with goals) and
+  /api/week-overview
+- get_home_data cold (median of five, cache emptied) and cached
+- the version read an If-None-Match request is answered from (304)
+- a bulk word_states update with and without the home_data_version triggers
+
+Checks the aggregate matches the separate calls, that writes to each tracked
+table change the version (including writes that bypass db.py) and reads do
+not. Exits with status 1 if a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_home [--words 5000] [--streak 60]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from backend import config
+
+
+LANGUAGES = ['kannada', 'hindi']
+ACTIVITIES = ['reading', 'listening', 'writing']
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def median_ms(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def seed(db, words: int, streak_days: int):
+    rng = random.Random(5)
+    conn = db.get_connection()
+    for language in LANGUAGES:
+        conn.executemany(
+            'INSERT INTO vocabulary (language, english_word, translation, level) VALUES (?, ?, ?, ?)',
+            [(language, f'word {i}', f'{language} {i}', ['a1', 'a2', 'b1'][i % 3]) for i in range(words)]
+        )
+    today = datetime.now().date()
+    conn.execute('''
+        INSERT INTO word_states (word_id, user_id, mastery_level, next_review_date, review_count, ease_factor)
+        SELECT id, 1, 'review', ?, 3, 2.5 FROM vocabulary WHERE id % 2 = 0
+    ''', ((today + timedelta(days=rng.randint(-3, 10))).strftime('%Y-%m-%d'),))
+    # One goal per language and activity every day, met on each of the last streak_days days
+    goals, activities = [], []
+    for weeks_ago in range(streak_days // 7 + 2):
+        monday = today - timedelta(days=today.weekday(), weeks=weeks_ago)
+        for day in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']:
+            goals += [(language, activity, day, monday.strftime('%Y-%m-%d'), 1)
+                      for language in LANGUAGES for activity in ACTIVITIES]
+    for days_ago in range(1, streak_days + 1):
+        day = (today - timedelta(days=days_ago)).strftime('%Y-%m-%d 12:00:00')
+        activities += [(language, activity, day) for language in LANGUAGES for activity in ACTIVITIES]
+    conn.executemany('''
+        INSERT INTO weekly_goals (language, activity_type, day_of_week, week_start_date, target_count)
+        VALUES (?, ?, ?, ?, ?)
+    ''', goals)
+    conn.executemany('''
+        INSERT INTO activity_history (user_id, language, activity_type, activity_data, score, started_at, completed_at)
+        VALUES (1, ?1, ?2, '', 0.9, ?3, ?3)
+    ''', activities)
+    conn.executemany('''
+        INSERT INTO daily_progress (user_id, language, activity_type, date, count) VALUES (1, ?, ?, ?, 1)
+    ''', [(language, activity, day[:10]) for language, activity, day in activities])
+    conn.commit()
+    conn.close()
+
+
+def separate_calls(db, language: str) -> dict:
+    """What the home screen gathered from the individual endpoints"""
+    def dashboard(lang):
+        return {
+            'streak': db.get_user_profile().get('streak', 0),
+            'progress': db.get_daily_progress(lang),
+            'goals': db.get_today_goals(lang),
+            'level': db.calculate_user_level(lang),
+        }
+    all_goals = db.get_all_languages_today_goals()
+    return {
+        'dashboard': dashboard(language),
+        'streak': db.calculate_goal_based_streak(),
+        'srs_stats': db.get_srs_stats(language),
+        'today_goals': all_goals,
+        'today_progress': {lang: dashboard(lang)['progress'] for lang in all_goals},
+        'week_goals': db.get_week_goals_all_languages(0),
+        'week_progress': db.get_week_progress(0),
+        'weekly_stats': db.get_weekly_stats(7, 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=5000, help='Vocabulary rows per language')
+    parser.add_argument('--streak', type=int, default=60, help='Days of met goals before today')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-home-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    config.VOCAB_SEARCH_ENGINE = 'legacy'
+    language = LANGUAGES[0]
+    try:
+        from backend import db, db_pool
+        db.init_db_schema()
+        seed(db, args.words, args.streak)
+        print(f"\n{len(LANGUAGES)} x {args.words} words, {args.streak}-day streak\n")
+
+        separate_ms = median_ms(lambda: separate_calls(db, language))
+        separate = separate_calls(db, language)
+
+        def cold():
+            db._home_cache.clear()
+            return db.get_home_data(language)
+
+        cold_ms = median_ms(cold)
+        home = db.get_home_data(language)
+        cached_ms = median_ms(lambda: db.get_home_data(language))
+        version_ms = median_ms(db.get_home_data_version)
+        print(f"  separate calls      {separate_ms:8.2f}ms")
+        print(f"  /api/home cold      {cold_ms:8.2f}ms")
+        print(f"  /api/home cached    {cached_ms:8.2f}ms")
+        print(f"  ETag check (304)    {version_ms:8.2f}ms\n")
+
+        check(home['cached'], "repeat request served from the cache")
+        check(home['dashboard'] == separate['dashboard'], "dashboard matches /api/dashboard")
+        check(home['streak'] == separate['streak'] and home['streak']['current_streak'] >= args.streak,
+              f"streak matches /api/streak ({home['streak']['current_streak']} days)")
+        check(home['srs_stats'] == separate['srs_stats'], "SRS stats match /api/srs/stats")
+        check(home['today_goals_all']['goals'] == separate['today_goals']
+              and home['today_progress'] == separate['today_progress'],
+              "today's goals and progress match /api/today-goals-all + /api/dashboard")
+        check(home['week_overview']['goals'] == separate['week_goals']
+              and home['week_overview']['progress'] == separate['week_progress'],
+              "week overview matches /api/week-overview")
+        check(home['weekly_stats'] == separate['weekly_stats'], "weekly stats match /api/weekly-stats")
+
+        version = db.get_home_data_version()
+        separate_calls(db, language)
+        check(db.get_home_data_version() == version, "reads leave the version alone")
+
+        word_id = db.get_words_for_review(language, 1)[0]['id']
+
+        def write_sql(sql):
+            def write():
+                conn = db.get_connection()
+                conn.execute(sql)
+                conn.commit()
+                conn.close()
+            return write
+
+        # The last two bypass db.py, as scripts do
+        writes = [
+            ('flashcard review (word_states)', lambda: db.update_word_state_from_flashcard(word_id, 1, 'good')),
+            ('weekly goals', lambda: db.update_weekly_goals(language, {'monday': {'reading': 2}})),
+            ('activity_history insert', write_sql(
+                "INSERT INTO activity_history (language, activity_type, score, started_at, completed_at) "
+                "VALUES ('kannada', 'reading', 1.0, datetime('now'), datetime('now'))")),
+            ('daily_progress update', write_sql("UPDATE daily_progress SET count = count + 1 WHERE id = 1")),
+            ('lesson_completions insert', write_sql(
+                "INSERT INTO lesson_completions (lesson_id, completed_at) VALUES ('lesson-1', datetime('now'))")),
+        ]
+        for name, write in writes:
+            version = db.get_home_data_version()
+            write()
+            check(db.get_home_data_version() > version, f"{name} changes the version")
+        after = db.get_home_data(language)
+        check(not after['cached'], "a changed version rebuilds the response")
+
+        conn = db.get_connection()
+        rows = conn.execute('SELECT COUNT(*) FROM word_states').fetchone()[0]
+        with_triggers = median_ms(lambda: (conn.execute('UPDATE word_states SET review_count = review_count + 1'),
+                                           conn.commit()))
+        for event in ('insert', 'update', 'delete'):
+            conn.execute(f'DROP TRIGGER trg_word_states_home_version_{event}')
+        without_triggers = median_ms(lambda: (conn.execute('UPDATE word_states SET review_count = review_count + 1'),
+                                              conn.commit()))
+        conn.close()
+        print(f"\n  updating {rows} word_states: {with_triggers:.1f}ms with the version triggers, "
+              f"{without_triggers:.1f}ms without")
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Benchmark the lemma index (lemma_index.py) against the earlier matchers.
+
+Loads the real vocabulary CSVs into a throwaway database and, per language,
+generates --stories stories of --words words each: vocabulary words (mostly
+inflected with that language's case, plural and verb endings, some bare, a
+few multi-word entries) between filler words that aren't vocabulary. Reports
+precision, recall and tokens/sec of:
+
+- substring: every token against every vocabulary variant with substring
+  tests, as extract_words_from_text did before vocab_matcher
+- prefix: the vocab_matcher automaton alone (forms that start a word)
+- lemma: match_word_ids (whole-word forms from the automaton, inflected
+  single words from the lemma index)
+
+A planted word counts as found if any id carrying that surface form is found;
+every other id found is a false positive. Also checks known inflections map
+to their lemma, that a stored index loads back identical and that a stale one
+(vocabulary changed since it was written) is rebuilt. Exits with status 1 if
+a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_lemma_index [--stories 20] [--words 300]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import unicodedata
+from collections import defaultdict
+
+from backend import config
+
+
+# Inflections the stories use, per language: (ending, replacements). The first
+# ending a form has is swapped for one of its replacements; '' (any form
+# ending in a consonant) appends one.
+INFLECTIONS = {
+    'kannada': [('ು', ['ಿನಲ್ಲಿ', 'ನ್ನು', 'ಿಗೆ', 'ಿನ', 'ುಗಳು']), ('ೆ', ['ೆಯಲ್ಲಿ', 'ೆಯನ್ನು', 'ೆಗೆ', 'ೆಯ']),
+                ('ಿ', ['ಿಯಲ್ಲಿ', 'ಿಯನ್ನು', 'ಿಗೆ', 'ಿಯ']), ('', ['ದಲ್ಲಿ', 'ವನ್ನು', 'ಕ್ಕೆ', 'ದ', 'ಗಳು'])],
+    'tamil': [('ம்', ['த்தை', 'த்தில்', 'த்தின்', 'ங்கள்']), ('டு', ['ட்டை', 'ட்டில்']),
+              ('்', ['ை', 'ில்', 'ுக்கு']), ('ு', ['ை', 'ில்', 'ுக்கு']),
+              ('', ['யை', 'யில்', 'யும்'])],
+    'telugu': [('ం', ['ాన్ని', 'ానికి', 'ంలో']), ('ు', ['ులు', 'ుకు', 'ులో']), ('', ['లు', 'ని', 'తో'])],
+    'malayalam': [('ം', ['ത്തിൽ', 'ത്തിന്റെ', 'ങ്ങൾ']), ('്', ['ിൽ', 'ിന്റെ', 'ിനെ']),
+                  ('', ['യിൽ', 'യുടെ', 'യെ'])],
+    'hindi': [('ना', ['ता', 'ती', 'ते', 'कर', 'ेगा']), ('ा', ['े', 'ों']), ('', ['ों', 'ें'])],
+    'urdu': [('نا', ['تا', 'تی', 'تے', 'کر']), ('ا', ['ے', 'وں']), ('', ['وں', 'یں'])],
+}
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def median_ms(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def inflect(language: str, form: str, rng: random.Random) -> str:
+    for ending, replacements in INFLECTIONS[language]:
+        if form.endswith(ending) and len(form) > len(ending) + 1:
+            stem = form[:len(form) - len(ending)]
+            # The catch-all case appends to a consonant (inherent vowel) only
+            if not ending and unicodedata.category(form[-1]) != 'Lo':
+                return form
+            return stem + rng.choice(replacements)
+    return form
+
+
+def make_filler(rng: random.Random, letters: list, signs: list, known: set) -> str:
+    while True:
+        word = ''.join(rng.choice(letters) + rng.choice(signs) for _ in range(rng.randint(2, 4)))
+        if word not in known:
+            return word
+
+
+def substring_match(tokens: list, variants: list) -> set:
+    """Token-vs-variant substring tests over the whole vocabulary"""
+    found = set()
+    for token in set(tokens):
+        for word_id, variant in variants:
+            if token in variant or variant in token:
+                found.add(word_id)
+    return found
+
+
+def score(found: set, planted: list, ids_by_form: dict):
+    """(true positives, false positives, planted words found)"""
+    gold = set()
+    hits = 0
+    for form in planted:
+        ids = ids_by_form[form]
+        gold |= ids
+        hits += bool(ids & found)
+    return len(found & gold), len(found - gold), hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stories', type=int, default=20, help='Stories per language')
+    parser.add_argument('--words', type=int, default=300, help='Words per story')
+    parser.add_argument('--substring-stories', type=int, default=3,
+                        help='Stories per language the (slow) substring matcher runs on')
+    args = parser.parse_args()
+
+    rng = random.Random(22)
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-lemma-index-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    config.LEMMA_INDEX_DIR = os.path.join(tmp_dir, 'lemma_index')
+    config.VOCAB_SEARCH_ENGINE = 'legacy'
+    try:
+        from backend import db, db_pool, lemma_index, vocab_matcher
+        db.init_db_schema()
+        for language in INFLECTIONS:
+            db.load_vocabulary_from_csv(language)
+
+        sample_texts = {}
+        print(f"\n{'language':10s} {'matcher':10s} {'precision':>9s} {'recall':>7s} {'tokens/s':>10s}")
+        for language in INFLECTIONS:
+            conn = db.get_connection()
+            rows = conn.execute('SELECT id, translation FROM vocabulary WHERE language = ?', (language,)).fetchall()
+            conn.close()
+            ids_by_form = defaultdict(set)
+            variants = []
+            for word_id, translation in rows:
+                for form in vocab_matcher.surface_forms(translation):
+                    ids_by_form[form].add(word_id)
+                    variants.append((word_id, form))
+            single = [form for form in ids_by_form if len(lemma_index.tokenize(form)) == 1]
+            multi = [form for form in ids_by_form if len(lemma_index.tokenize(form)) > 1]
+            letters = sorted({c for form in single for c in form if unicodedata.category(c) == 'Lo'})
+            signs = [''] + sorted({c for form in single for c in form if unicodedata.category(c) == 'Mn'})[:6]
+            known = set(ids_by_form)
+
+            stories = []
+            for _ in range(args.stories):
+                words, planted = [], []
+                while len(words) < args.words:
+                    roll = rng.random()
+                    if roll < 0.25:
+                        form = rng.choice(single)
+                        words.append(inflect(language, form, rng) if rng.random() < 0.7 else form)
+                        planted.append(form)
+                    elif roll < 0.28 and multi:
+                        form = rng.choice(multi)
+                        words.append(form)
+                        planted.append(form)
+                    else:
+                        words.append(make_filler(rng, letters, signs, known))
+                stories.append((' '.join(words) + '.', planted))
+            sample_texts[language] = stories[0][0]
+
+            lemma_index.get_index(language)
+            prefix_matcher = vocab_matcher.get_matcher(language)
+            runs = {
+                'substring': (lambda text: substring_match(
+                    [t for _, t in lemma_index.tokenize(lemma_index.normalize(text))], variants),
+                    stories[:args.substring_stories]),
+                'prefix': (lambda text: set(prefix_matcher.match(text)), stories),
+                'lemma': (lambda text: set(vocab_matcher.match_word_ids(language, text)), stories),
+            }
+            results = {}
+            for name, (fn, run_stories) in runs.items():
+                tp = fp = hits = planted_count = tokens = 0
+                start = time.perf_counter()
+                for text, planted in run_stories:
+                    t, f, h = score(fn(text), planted, ids_by_form)
+                    tp, fp, hits, planted_count = tp + t, fp + f, hits + h, planted_count + len(planted)
+                    tokens += len(lemma_index.tokenize(text))
+                elapsed = time.perf_counter() - start
+                precision = tp / (tp + fp) if tp + fp else 0.0
+                recall = hits / planted_count if planted_count else 0.0
+                results[name] = (precision, recall)
+                print(f"{language:10s} {name:10s} {precision:9.3f} {recall:7.3f} {tokens / elapsed:10.0f}")
+
+            check(results['lemma'][1] >= 0.9, f"{language}: lemma recall {results['lemma'][1]:.3f} >= 0.9")
+            check(results['lemma'][1] > results['prefix'][1] and results['lemma'][0] >= results['prefix'][0],
+                  f"{language}: lemma beats prefix on recall without losing precision")
+        print()
+
+        examples = {
+            'kannada': ([(1, 'ಮರ'), (2, 'ಊರು'), (3, 'ಮನೆ')], 'ಮರದಲ್ಲಿ ಊರಿಗೆ ಮನೆಯನ್ನು ಮರಗಳು', [1, 2, 3]),
+            'tamil': ([(1, 'மரம்'), (2, 'வீடு')], 'மரத்தை வீட்டில்', [1, 2]),
+            'hindi': ([(1, 'लड़का'), (2, 'करना'), (3, 'किताब')], 'लड़कों ने करके किताबें', [1, 2, 3]),
+            'urdu': ([(1, 'لڑکا'), (2, 'کتاب')], 'لڑکے کتابیں', [1, 2]),
+        }
+        for language, (example_rows, text, expected) in examples.items():
+            index = lemma_index.LemmaIndex(language)
+            index.build(example_rows)
+            check(index.match(text) == expected, f"{language}: {text} -> {expected}")
+        index = lemma_index.LemmaIndex('kannada')
+        index.build([(1, 'ಊರು')])
+        check(index.match('ಊರ') == [], "derived stems don't match without a suffix")
+
+        path = lemma_index.index_path('kannada')
+        loaded = lemma_index.LemmaIndex.load(path)
+        built = lemma_index.get_index('kannada')
+        text = sample_texts['kannada']
+        check(loaded is not None and loaded.fingerprint == built.fingerprint
+              and loaded.match(text) == built.match(text),
+              f"stored index loads back identical ({os.path.getsize(path) / 1024:.0f}KB)")
+        load_ms = median_ms(lambda: lemma_index.LemmaIndex.load(path), 3)
+        build_ms = median_ms(lambda: lemma_index.build_index('kannada', save=False), 3)
+        print(f"  kannada index: load {load_ms:.0f}ms, build {build_ms:.0f}ms")
+
+        word_id = db.insert_vocabulary_entry('kannada', 'benchmark word', 'ಬೆಂಚುಮಾರ್ಕು', 'benchumarku', 'noun', 'a2')
+        check(lemma_index.lemma_ids('kannada', 'ಬೆಂಚುಮಾರ್ಕಿನಲ್ಲಿ') == (word_id,),
+              "stale stored index rebuilt after a custom word insert")
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Measure bytes per turn of the live conversation WebSocket protocol.
+
+Replays synthetic Gemini Live turns (24kHz 16-bit mono PCM, delivered in
+chunks) through ConversationSession.stream_gemini_responses with a fake
+WebSocket and Gemini client, and counts what goes over the wire and what
+ends up persisted in the conversation's activity_data. The same turns are
+also sized under the old protocol: each chunk base64 in a JSON text frame, the
+whole turn base64 again in response_complete, and base64 in the stored
+transcript.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_live_frames [--turns 5] [--seconds 6] [--chunk-ms 40]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import shutil
+import tempfile
+
+from backend import config
+
+
+OUTPUT_BYTES_PER_SECOND = 24000 * 2  # 24kHz, 16-bit, mono
+
+
+class FakeWebSocket:
+    """Counts bytes the session sends"""
+
+    def __init__(self):
+        self.text_bytes = 0
+        self.binary_bytes = 0
+
+    async def send_text(self, text: str):
+        self.text_bytes += len(text.encode('utf-8'))
+
+    async def send_bytes(self, data: bytes):
+        self.binary_bytes += len(data)
+
+
+class FakeGeminiClient:
+    """Yields pre-built Gemini Live responses"""
+
+    def __init__(self, turns):
+        self.turns = turns
+
+    async def receive_responses(self):
+        for text, chunks in self.turns:
+            for chunk in chunks:
+                yield {"type": "response", "audio_chunks": [chunk], "text_chunks": [], "is_final": False}
+            yield {"type": "response", "audio_chunks": [], "text_chunks": [text], "is_final": True}
+
+
+def build_turns(count: int, seconds: float, chunk_ms: int):
+    chunk_size = int(OUTPUT_BYTES_PER_SECOND * chunk_ms / 1000) & ~1
+    turn_size = int(OUTPUT_BYTES_PER_SECOND * seconds) & ~1
+    turns = []
+    for t in range(count):
+        pcm = os.urandom(turn_size)
+        chunks = [pcm[i:i + chunk_size] for i in range(0, len(pcm), chunk_size)]
+        turns.append((f"ಉತ್ತರ {t + 1}: ನಮಸ್ಕಾರ, ನೀವು ಹೇಗಿದ್ದೀರಿ?", chunks))
+    return turns
+
+
+def legacy_bytes(turns):
+    """(wire bytes, stored bytes) of the old base64-in-JSON protocol"""
+    wire = 0
+    messages = []
+    for text, chunks in turns:
+        for chunk in chunks:
+            wire += len(json.dumps({
+                "type": "audio_chunk",
+                "data": base64.b64encode(chunk).decode('utf-8'),
+                "is_final": False,
+            }).encode('utf-8'))
+        full_audio = base64.b64encode(b"".join(chunks)).decode('utf-8')
+        wire += len(json.dumps({"type": "response_complete", "text": text, "audio": full_audio}).encode('utf-8'))
+        messages.append({"user_message": "...", "ai_response": text, "timestamp": "", "audio_data": full_audio})
+    return wire, len(json.dumps({"messages": messages}).encode('utf-8'))
+
+
+def binary_bytes(turns):
+    """(wire bytes, stored bytes) of the binary-frame protocol"""
+    from backend.websocket_conversation import ConversationSession
+
+    websocket = FakeWebSocket()
+
+    async def run():
+        session = ConversationSession(websocket, 'benchmark')
+        session.gemini_client = FakeGeminiClient(turns)
+        session.start_relay()
+        await session.stream_gemini_responses()
+        await session.client_queue.drain(timeout=10)
+        return session
+
+    session = asyncio.run(run())
+    wire = websocket.text_bytes + websocket.binary_bytes
+    return wire, len(json.dumps({"messages": session.messages}).encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=5)
+    parser.add_argument('--seconds', type=float, default=6.0, help='Seconds of AI speech per turn')
+    parser.add_argument('--chunk-ms', type=int, default=40, help='Audio per Gemini chunk')
+    args = parser.parse_args()
+
+    # Turn audio is written to the audio store; keep it out of the real one
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-live-bench-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    config.AUDIO_STORE_DIR = os.path.join(tmp_dir, 'audio')
+    # Turns are replayed as a burst; don't let the relay drop frames of it
+    config.LIVE_CLIENT_QUEUE_FRAMES = 1_000_000
+
+    try:
+        turns = build_turns(args.turns, args.seconds, args.chunk_ms)
+        pcm_per_turn = sum(len(c) for c in turns[0][1])
+        old_wire, old_stored = legacy_bytes(turns)
+        new_wire, new_stored = binary_bytes(turns)
+        from backend import db_pool
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\n{args.turns} turns of {args.seconds}s speech ({pcm_per_turn} PCM bytes each, "
+          f"{len(turns[0][1])} chunks of {args.chunk_ms}ms)\n")
+    print(f"{'protocol':10s} {'wire B/turn':>12s} {'x PCM':>7s} {'stored B/turn':>14s}")
+    for name, wire, stored in (('json+b64', old_wire, old_stored), ('binary', new_wire, new_stored)):
+        print(f"{name:10s} {wire / args.turns:12.0f} {wire / args.turns / pcm_per_turn:7.2f} {stored / args.turns:14.0f}")
+    print(f"\nwire bytes saved: {(1 - new_wire / old_wire) * 100:.1f}%, "
+          f"stored bytes saved: {(1 - new_stored / old_stored) * 100:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark flashcard selection with and without the materialized review queue.
+
+Builds a throwaway database with one language of synthetic vocabulary and a
+user who has reviewed --reviewed cards (random mastery, ease and review dates,
+a share of them due today), then times get_words_for_review (what
+/api/flashcards and /api/words-for-review call):
+
+- direct: REVIEW_QUEUE_ENABLED off, every due card ranked on each call
+- queue:  the first call of the day (builds the queue), then steady-state reads
+
+It also times flashcard updates, which keep the queue current, and checks that
+both paths return cards in the same priority order.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_review_queue [--words 25000] [--reviewed 20000] [--requests 200]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from backend import config
+
+
+LANGUAGE = 'kannada'
+LEVELS = ['a1', 'a2', 'b1', 'b2', 'c1', 'c2']
+
+
+def seed(db_path: str, words: int, reviewed: int):
+    """Synthetic vocabulary plus word_states for the first `reviewed` words"""
+    rng = random.Random(42)
+    today = config.get_current_time().date()
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        'INSERT INTO vocabulary (language, english_word, translation, level) VALUES (?, ?, ?, ?)',
+        [(LANGUAGE, f'word {i}', f'ಪದ {i}', rng.choice(LEVELS)) for i in range(words)]
+    )
+    word_ids = [row[0] for row in conn.execute('SELECT id FROM vocabulary ORDER BY id')]
+    states = []
+    for word_id in rng.sample(word_ids, reviewed):
+        next_review = today + timedelta(days=rng.randint(-30, 90))
+        last_reviewed = next_review - timedelta(days=rng.randint(1, 30))
+        states.append((
+            word_id, 1, rng.choice(['learning', 'review', 'mastered']),
+            next_review.strftime('%Y-%m-%d'), rng.randint(1, 12), round(rng.uniform(1.3, 3.5), 2),
+            last_reviewed.strftime('%Y-%m-%d'), last_reviewed.strftime('%Y-%m-%d'),
+        ))
+    conn.executemany('''
+        INSERT INTO word_states (word_id, user_id, mastery_level, next_review_date, review_count,
+                                 ease_factor, last_reviewed, introduced_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', states)
+    conn.commit()
+    due = conn.execute(
+        "SELECT COUNT(*) FROM word_states WHERE next_review_date <= ?", (today.strftime('%Y-%m-%d'),)
+    ).fetchone()[0]
+    conn.close()
+    return due
+
+
+def timed(fn, repeat: int) -> float:
+    """Average milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def priorities(db, cards):
+    today = config.get_current_time().date()
+    return [
+        round(db._review_priority(c['level'], c['mastery_level'], c['ease_factor'],
+                                  c['next_review_date'], c['last_reviewed'], today), 6)
+        if c['mastery_level'] != 'new' else ('new', c['level_order'])
+        for c in cards
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=25000, help='Vocabulary size')
+    parser.add_argument('--reviewed', type=int, default=20000, help='Cards the user has reviewed')
+    parser.add_argument('--requests', type=int, default=200, help='Reads per measurement')
+    parser.add_argument('--limit', type=int, default=50, help='Cards per request')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-review-queue-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    failed = False
+    try:
+        from backend import db, db_pool
+        db.init_db_schema()
+        due = seed(config.DB_PATH, args.words, args.reviewed)
+        print(f"\n{args.words} words, {args.reviewed} reviewed, {due} due today; limit={args.limit}\n")
+
+        config.REVIEW_QUEUE_ENABLED = False
+        direct_ms = timed(lambda: db.get_words_for_review(LANGUAGE, args.limit), args.requests)
+        direct_all = db.get_words_for_review(LANGUAGE, due + 20)
+
+        config.REVIEW_QUEUE_ENABLED = True
+        build_ms = timed(lambda: db.get_words_for_review(LANGUAGE, args.limit), 1)
+        queue_ms = timed(lambda: db.get_words_for_review(LANGUAGE, args.limit), args.requests)
+        queue_all = db.get_words_for_review(LANGUAGE, due + 20)
+
+        sample = [card['id'] for card in db.get_words_for_review(LANGUAGE, args.limit)]
+        comfort = ['again', 'hard', 'good', 'easy']
+        updates = [(word_id, comfort[i % 4]) for i, word_id in enumerate(sample)]
+        half = len(updates) // 2
+
+        def update_all(batch):
+            for word_id, comfort_level in batch:
+                db.update_word_state_from_flashcard(word_id, 1, comfort_level)
+
+        # Same number of cards each way; without a current queue there is nothing to keep up
+        update_queue_ms = timed(lambda: update_all(updates[:half]), 1) / max(1, half)
+        config.REVIEW_QUEUE_ENABLED = False
+        conn = db.get_connection()
+        db.invalidate_review_queue(conn.cursor(), LANGUAGE)
+        conn.commit()
+        conn.close()
+        update_direct_ms = timed(lambda: update_all(updates[half:]), 1) / max(1, len(updates) - half)
+        config.REVIEW_QUEUE_ENABLED = True
+
+        # After the updates, both paths must still agree
+        queue_after = db.get_words_for_review(LANGUAGE, due + 20)
+        config.REVIEW_QUEUE_ENABLED = False
+        direct_after = db.get_words_for_review(LANGUAGE, due + 20)
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"{'get_words_for_review':32s} {'ms/request':>10s}")
+    print(f"{'direct (rank every due card)':32s} {direct_ms:10.2f}")
+    print(f"{'queue, first call (build)':32s} {build_ms:10.2f}")
+    print(f"{'queue, steady state':32s} {queue_ms:10.2f}")
+    print(f"\nspeedup (steady state): {direct_ms / queue_ms:.1f}x")
+    print(f"flashcard update: {update_direct_ms:.2f}ms without queue, {update_queue_ms:.2f}ms with queue upkeep")
+
+    for name, direct, queued in (('initial', direct_all, queue_all), ('after updates', direct_after, queue_after)):
+        same_order = priorities(db, direct) == priorities(db, queued)
+        same_cards = sorted(c['id'] for c in direct) == sorted(c['id'] for c in queued)
+        print(f"parity ({name}): priority order {'ok' if same_order else 'MISMATCH'}, "
+              f"cards {'ok' if same_cards else 'MISMATCH'} ({len(queued)} cards)")
+        failed |= not (same_order and same_cards)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark and check the stored vocabulary search keys (vocabulary_search_keys).
+
+Loads the real vocabulary CSVs into a throwaway database and, per language,
+matches queries built from sampled rows (English words and fragments,
+transliterations with and without diacritics, native-script translations)
+with:
+
+    old   the legacy get_vocabulary matching as it was before the keys:
+          LOWER(...) LIKE candidates, re-normalized and filtered in Python
+    keys  db._search_key_matches over vocabulary_search_keys
+
+and times find_word_by_translation's LOWER(translation) = LOWER(?) scan
+against the key lookup. Checks that the keys still find every word the old
+matching found (short variants aside, see old_search_ids), that
+get_vocabulary (VOCAB_SEARCH_ENGINE = 'legacy') reports full totals, that
+exact English matches rank first (also among the thousands of matches for
+"to"), that every row is keyed after the CSV load, that the migration backfills an
+existing database, that keys follow inserts, updates, deletes and rows
+written by scripts, and that a variant of a multi-variant translation is
+found by find_word_by_translation. Exits with status 1 if a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_search_keys [--samples 40]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from backend import config
+
+
+LANGUAGES = ['kannada', 'tamil', 'telugu', 'malayalam', 'hindi', 'urdu']
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def median_ms(fn, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def old_search_ids(cursor, language: str, search: str, fetch_limit: int = 1000) -> set:
+    """Ids matched by the pre-key legacy search (its SQL candidates and Python filter)
+
+    fetch_limit capped the candidates at 1000 (-1: no cap, every match).
+    Except that a transliteration variant of 1-2 letters only counts as
+    inside the query when it starts it: the old filter matched "in" ("l")
+    for "dramatically" whenever a longer variant let the word through the SQL.
+    """
+    from backend.db import normalize_iast_diacritics
+    normalized_search = normalize_iast_diacritics(search)
+    search_term = f'%{search}%'
+    significant_parts = [search[i:i+3] for i in range(len(search)-2)] if len(search) >= 3 else [search]
+    part_conditions = ' OR '.join(['LOWER(v.transliteration) LIKE LOWER(?)' for _ in significant_parts])
+    cursor.execute(f'''
+        SELECT v.id, v.english_word, v.translation, v.transliteration FROM vocabulary v
+        WHERE v.language = ? AND (
+            LOWER(v.english_word) LIKE LOWER(?)
+            OR v.translation LIKE ?
+            OR LOWER(v.transliteration) LIKE LOWER(?)
+            OR LOWER(v.english_word) LIKE LOWER(?)
+            OR {part_conditions}
+        )
+        LIMIT ?
+    ''', [language, search_term, search_term, search_term, search_term]
+        + [f'%{part}%' for part in significant_parts] + [fetch_limit])
+    found = set()
+    for word_id, english, translation, translit in cursor.fetchall():
+        translit = (translit or '').lower()
+        if search.lower() in (english or '').lower():
+            found.add(word_id)
+        elif any(search in variant.strip() for variant in (translation or '').split(' /')):
+            found.add(word_id)
+        elif any(search.lower() in variant.strip() for variant in translit.split(' /')):
+            found.add(word_id)
+        else:
+            for variant in translit.split(' /'):
+                normalized = normalize_iast_diacritics(variant.strip())
+                if (normalized_search in normalized or (len(normalized) >= 3 and normalized in normalized_search)
+                        or normalized.startswith(normalized_search) or normalized_search.startswith(normalized)):
+                    found.add(word_id)
+                    break
+    return found
+
+
+def build_queries(rows, samples: int):
+    from backend.db import normalize_iast_diacritics
+    queries = []
+    step = max(len(rows) // samples, 1)
+    for english, translation, translit in rows[::step][:samples]:
+        english = (english or '').split('/')[0].split(' (')[0].strip().lower()
+        translit = (translit or '').split('/')[0].strip().lower()
+        translation = (translation or '').split('/')[0].strip()
+        queries += [q for q in (english, english[1:5], translit, normalize_iast_diacritics(translit),
+                                translit[:4], translation) if q]
+    return queries
+
+
+def key_count(cursor, word_id: int) -> int:
+    cursor.execute('SELECT COUNT(*) FROM vocabulary_search_keys WHERE word_id = ?', (word_id,))
+    return cursor.fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=40, help='Vocabulary rows sampled per language')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-search-keys-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    config.LEMMA_INDEX_DIR = os.path.join(tmp_dir, 'lemma_index')
+    config.VOCAB_SEARCH_ENGINE = 'legacy'
+    try:
+        from backend import db, db_pool, migrations
+        db.init_db_schema()
+        for language in LANGUAGES:
+            db.load_vocabulary_from_csv(language)
+        conn = db.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT COUNT(*) FROM vocabulary v
+            WHERE NOT EXISTS (SELECT 1 FROM vocabulary_search_keys k WHERE k.word_id = v.id)
+        ''')
+        unkeyed = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM vocabulary_search_keys')
+        keys = cursor.fetchone()[0]
+        check(unkeyed == 0, f"every row keyed by the CSV load ({keys} keys)")
+
+        print(f"\n{'language':10s} {'queries':>7s} {'old ms':>8s} {'keys ms':>8s} {'old found':>9s} "
+              f"{'keys found':>10s} {'lookup old ms':>13s} {'lookup keys ms':>14s}")
+        for language in LANGUAGES:
+            cursor.execute('SELECT english_word, translation, transliteration FROM vocabulary WHERE language = ?',
+                           (language,))
+            rows = cursor.fetchall()
+            queries = build_queries(rows, args.samples)
+
+            old_results = [old_search_ids(cursor, language, q, fetch_limit=-1) for q in queries]
+            new_results = [set(db._search_key_matches(cursor, language, q)) for q in queries]
+            old_ms = median_ms(lambda: [old_search_ids(cursor, language, q) for q in queries])
+            new_ms = median_ms(lambda: [db._search_key_matches(cursor, language, q) for q in queries])
+            missed = [q for q, old, new in zip(queries, old_results, new_results) if old - new]
+
+            natives = [(t or '').split(' /')[0].strip() for _, t, _ in rows[:500]]
+            lookup_old_ms = median_ms(lambda: [cursor.execute(
+                'SELECT * FROM vocabulary WHERE language = ? AND LOWER(translation) = LOWER(?) LIMIT 1',
+                (language, t)).fetchone() for t in natives])
+            lookup_new_ms = median_ms(lambda: [db.find_word_by_translation(t, language) for t in natives])
+            print(f"{language:10s} {len(queries):7d} {old_ms:8.0f} {new_ms:8.0f} "
+                  f"{sum(map(len, old_results)):9d} {sum(map(len, new_results)):10d} "
+                  f"{lookup_old_ms:13.0f} {lookup_new_ms:14.0f}")
+            check(not missed, f"{language}: key matching finds every word the old matching found"
+                  + (f" (missed for {missed[:3]})" if missed else ''))
+            check(all(db.get_vocabulary(language, search=q, limit=10)[1] == len(matches)
+                      for q, matches in zip(queries[:40], new_results)),
+                  f"{language}: get_vocabulary totals are the full match counts")
+            exact = [q for q in queries[::6] if q in db.search_keys('english', q)
+                     and db.find_word_ids_by_key(language, 'english', q)]
+            misranked = [q for q in exact
+                         if q not in db.search_keys('english', db.get_vocabulary(language, search=q, limit=10)[0][0]['english_word'])]
+            check(not misranked, f"{language}: an exact English match ranks first ({len(exact)} queries)"
+                  + (f" (not for {misranked[:3]})" if misranked else ''))
+            check(all(db.find_word_by_translation(t, language) for t in natives if t),
+                  f"{language}: find_word_by_translation finds every first variant")
+        print()
+
+        # A variant of a multi-variant translation
+        cursor.execute('''
+            SELECT id, language, translation FROM vocabulary WHERE translation LIKE '% / %' LIMIT 1
+        ''')
+        word_id, language, translation = cursor.fetchone()
+        second = translation.split(' /')[1].strip()
+        found = db.find_word_by_translation(second, language)
+        check(found is not None and found['translation'] == translation,
+              f"find_word_by_translation finds the second variant '{second}'")
+        words, total = db.get_vocabulary('kannada', search='to', limit=10)
+        check(words and words[0]['english_word'].lower() == 'to',
+              f"legacy search for 'to' ranks the exact match first of {total} ({words[0]['english_word'] if words else None})")
+        check(db.search_key('transliteration', 'Rāsāyana') == 'rasayana'
+              and db.search_key('english', 'Café') == 'cafe', "search_key strips diacritics and case")
+        prefixed = db.find_word_ids_by_key('kannada', 'english', 'Hous', prefix=True)
+        cursor.execute("SELECT id FROM vocabulary WHERE language = 'kannada' AND english_word LIKE 'hous%' ORDER BY id")
+        check(prefixed and prefixed == [row[0] for row in cursor.fetchall()],
+              f"prefix lookup finds every English word starting with 'hous' ({len(prefixed)})")
+
+        # Keys follow inserts, updates and deletes
+        word_id = db.insert_vocabulary_entry('kannada', 'benchmark word', 'ಬೆಂಚುಮಾರ್ಕು / ಪೀಠಕಾರಕ', 'beṃcumārku / pīṭhakāraka',
+                                             'noun', 'a2')
+        check(db.find_word_ids_by_key('kannada', 'transliteration', 'pithakaraka') == [word_id]
+              and key_count(cursor, word_id) == 5, "insert_vocabulary_entry writes the row's keys")
+        cursor.execute("UPDATE vocabulary SET transliteration = 'bencumarku' WHERE id = ?", (word_id,))
+        check(key_count(cursor, word_id) == 0, "updating a word's text drops its keys")
+        db.fill_vocabulary_search_keys(cursor, 'kannada')
+        conn.commit()
+        check(db.find_word_ids_by_key('kannada', 'transliteration', 'bencumarku') == [word_id]
+              and not db.find_word_ids_by_key('kannada', 'transliteration', 'pithakaraka'),
+              "fill_vocabulary_search_keys rekeys the updated word")
+        cursor.execute('DELETE FROM vocabulary WHERE id = ?', (word_id,))
+        check(key_count(cursor, word_id) == 0, "deleting a word drops its keys")
+        cursor.execute("INSERT INTO vocabulary (language, english_word, translation) VALUES ('kannada', 'script word', 'ಸ್ಕ್ರಿಪ್ಟ್')")
+        word_id = cursor.lastrowid
+        conn.commit()
+        db.init_db_schema()
+        check(key_count(cursor, word_id) == 2, "init_db_schema keys rows written by scripts")
+
+        # The migration backfills a database from before the keys
+        cursor.execute('DROP TABLE vocabulary_search_keys')
+        cursor.execute('DELETE FROM schema_version WHERE version >= 11')
+        conn.commit()
+        start = time.perf_counter()
+        migrations.run_migrations(conn)
+        backfill_ms = (time.perf_counter() - start) * 1000
+        cursor.execute('SELECT COUNT(*) FROM vocabulary_search_keys')
+        check(cursor.fetchone()[0] == keys + 2, f"migration 011 backfills every key ({backfill_ms:.0f}ms)")
+        fill_ms = median_ms(lambda: db.fill_vocabulary_search_keys(cursor))
+        print(f"  startup fill with every row keyed: {fill_ms:.1f}ms")
+
+        conn.close()
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
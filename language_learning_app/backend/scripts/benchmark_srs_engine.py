@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark and check the SRS engine (srs_engine.py).
+
+Builds a throwaway database with one language of synthetic vocabulary, word
+states and a review history drawn from a known memory model, then:
+
+- schedules --cards flashcard reviews per card (srs_engine.schedule_flashcard)
+  and batched (schedule_flashcard_batch), and checks they agree
+- narrows the ease bounds and reschedules the language (db.reschedule_language),
+  checking every card ends up within the new bounds
+- fits the memory model to the review history (db.fit_srs_memory_model) and
+  compares its log loss with the default and the true parameters
+- forecasts --days of reviews for the cards (simulate_workload)
+
+Exits with status 1 if a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_srs_engine [--cards 10000] [--history-cards 3000] [--days 365]
+"""
+import argparse
+import math
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from backend import config, srs_engine
+
+
+LANGUAGE = 'kannada'
+SETTINGS = {
+    'default_ease_factor': config.DEFAULT_EASE_FACTOR,
+    'min_ease_factor': config.MIN_EASE_FACTOR,
+    'max_ease_factor': config.MAX_EASE_FACTOR,
+    'ease_factor_increment': config.EASE_FACTOR_INCREMENT,
+    'ease_factor_decrement': config.EASE_FACTOR_DECREMENT,
+}
+# Parameters the synthetic history is drawn from
+TRUE_PARAMS = (0.8, 2.0, 5.0, 20.0, 2.6, 0.2, 1.2, 0.6, 1.4, 1.2, 0.4, 1.5)
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def synthetic_history(cards: int, reviews_per_card: int, rng: random.Random):
+    """Review rows (word index, date, rating) scheduled by the app's flashcard rules,
+    recall drawn from TRUE_PARAMS"""
+    import numpy as np
+    rows = []
+    start = date.today() - timedelta(days=400)
+    for card in range(cards):
+        day = start + timedelta(days=rng.randint(0, 60))
+        mastery, count, ease, stability = 'new', 0, SETTINGS['default_ease_factor'], None
+        elapsed = 0
+        for _ in range(rng.randint(2, reviews_per_card)):
+            if stability is None:
+                rating = rng.choices(srs_engine.RATINGS, weights=(2, 2, 5, 1))[0]
+                stability = TRUE_PARAMS[srs_engine.RATING_CODES[rating]]
+            else:
+                recall = srs_engine.retrievability(elapsed, stability)
+                if rng.random() >= recall:
+                    rating = 'again'
+                else:
+                    rating = rng.choices(('hard', 'good', 'easy'), weights=(2, 6, 2))[0]
+                stability = float(srs_engine._next_stability(
+                    TRUE_PARAMS, np.array([stability]), np.array([float(elapsed)]),
+                    np.array([srs_engine.RATING_CODES[rating]]))[0])
+            rows.append((card, day, rating))
+            count += 1
+            mastery, ease, interval = srs_engine.schedule_flashcard(mastery, count, ease, rating, SETTINGS)
+            # Reviews land on or a little after their due day
+            elapsed = max(1, interval) + rng.choice((0, 0, 0, 1, 2, 5))
+            day += timedelta(days=elapsed)
+            if day >= date.today():
+                break
+    return rows
+
+
+def seed(db_path: str, cards: int, history_cards: int, reviews_per_card: int):
+    rng = random.Random(7)
+    today = date.today()
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        'INSERT INTO vocabulary (language, english_word, translation, level) VALUES (?, ?, ?, ?)',
+        [(LANGUAGE, f'word {i}', f'ಪದ {i}', 'a1') for i in range(cards)]
+    )
+    word_ids = [row[0] for row in conn.execute('SELECT id FROM vocabulary ORDER BY id')]
+    states = []
+    for word_id in word_ids:
+        interval = rng.randint(1, 60)
+        last_reviewed = today - timedelta(days=rng.randint(0, interval))
+        states.append((
+            word_id, 1, rng.choice(['learning', 'review', 'mastered']),
+            (last_reviewed + timedelta(days=interval)).strftime('%Y-%m-%d'), rng.randint(1, 12),
+            round(rng.uniform(1.3, 3.5), 2), last_reviewed.strftime('%Y-%m-%d'),
+            last_reviewed.strftime('%Y-%m-%d'), interval,
+        ))
+    conn.executemany('''
+        INSERT INTO word_states (word_id, user_id, mastery_level, next_review_date, review_count,
+                                 ease_factor, last_reviewed, introduced_date, interval_days)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', states)
+    history = synthetic_history(history_cards, reviews_per_card, rng)
+    conn.executemany('''
+        INSERT INTO review_history (word_id, user_id, reviewed_at, rating, activity_type)
+        VALUES (?, 1, ?, ?, 'flashcard')
+    ''', [(word_ids[card], day.strftime('%Y-%m-%d 10:00:00'), rating) for card, day, rating in history])
+    conn.commit()
+    conn.close()
+    return states, len(history)
+
+
+def bench_schedule(cards: int):
+    print(f"\nScheduling {cards} flashcard reviews")
+    rng = random.Random(1)
+    mastery = [rng.randrange(4) for _ in range(cards)]
+    count = [rng.randint(1, 15) for _ in range(cards)]
+    ease = [round(rng.uniform(1.3, 3.5), 2) for _ in range(cards)]
+    rating = [rng.randrange(4) for _ in range(cards)]
+
+    start = time.perf_counter()
+    scalar = [srs_engine.schedule_flashcard(srs_engine.MASTERY_LEVELS[m], c, e, srs_engine.RATINGS[r], SETTINGS)
+              for m, c, e, r in zip(mastery, count, ease, rating)]
+    scalar_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    new_mastery, new_ease, interval = srs_engine.schedule_flashcard_batch(mastery, count, ease, rating, SETTINGS)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    mismatches = sum(
+        (srs_engine.MASTERY_CODES[m], e, i) != (new_mastery[k], new_ease[k], interval[k])
+        for k, (m, e, i) in enumerate(scalar)
+    )
+    print(f"  per card {scalar_ms:8.1f}ms   batched {batch_ms:6.1f}ms   ({scalar_ms / batch_ms:.0f}x)")
+    check(mismatches == 0, f"batched schedule matches per-card schedule ({mismatches} mismatches)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, default=10000, help='Cards with a word state')
+    parser.add_argument('--history-cards', type=int, default=3000, help='Cards with a synthetic review history')
+    parser.add_argument('--reviews-per-card', type=int, default=30, help='Most reviews per card in the history')
+    parser.add_argument('--days', type=int, default=365, help='Forecast horizon')
+    parser.add_argument('--runs', type=int, default=4, help='Simulation runs to average')
+    args = parser.parse_args()
+
+    if not srs_engine.HAS_NUMPY:
+        print("numpy is not installed")
+        sys.exit(1)
+    import numpy as np
+
+    bench_schedule(args.cards)
+
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-srs-engine-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    try:
+        from backend import db, db_pool
+        db.init_db_schema()
+        states, reviews = seed(config.DB_PATH, args.cards, min(args.history_cards, args.cards), args.reviews_per_card)
+
+        print(f"\nRescheduling {args.cards} cards into ease 1.5-2.8")
+        db.update_user_setting('min_ease_factor', '1.5', LANGUAGE)
+        db.update_user_setting('max_ease_factor', '2.8', LANGUAGE)
+        start = time.perf_counter()
+        changed = db.reschedule_language(LANGUAGE)
+        reschedule_ms = (time.perf_counter() - start) * 1000
+        conn = db.get_connection()
+        low, high = conn.execute('SELECT MIN(ease_factor), MAX(ease_factor) FROM word_states').fetchone()
+        conn.close()
+        print(f"  {changed} cards changed in {reschedule_ms:.0f}ms")
+        check(1.5 <= low and high <= 2.8, f"ease factors within bounds ({low:.2f}-{high:.2f})")
+
+        print(f"\nFitting the memory model to {reviews} reviews")
+        result = db.fit_srs_memory_model(LANGUAGE)
+        word_ids, days, ratings, _ = db._load_review_days(LANGUAGE)
+        sequences = srs_engine._ReviewSequences(word_ids, days, ratings, 128)
+        true_loss = sequences.replay(TRUE_PARAMS)[0] / sequences.predictions
+        print(f"  {result['evaluations']} evaluations in {result['seconds']}s")
+        print(f"  log loss: default {result['baseline_log_loss']:.4f}, fitted {result['log_loss']:.4f}, "
+              f"true parameters {true_loss:.4f}")
+        check(result['log_loss'] < result['baseline_log_loss'], "fit improves on the default parameters")
+        check(result['log_loss'] < true_loss + 0.01, "fit gets within 0.01 of the true parameters' log loss")
+        check(db.get_srs_memory_model(LANGUAGE)['params'] == result['params'], "fitted model saved")
+
+        print(f"\nForecasting {args.days} days for {args.cards} cards ({args.runs} runs)")
+        today = date.today()
+        due = [(date.fromisoformat(s[3]) - today).days for s in states]
+        mastery = [srs_engine.MASTERY_CODES[s[2]] for s in states]
+        start = time.perf_counter()
+        forecast = srs_engine.simulate_workload(
+            due, mastery, [s[4] for s in states], [s[5] for s in states], SETTINGS,
+            days=args.days, new_cards_available=2000, new_cards_per_day=10, reviews_per_day=200,
+            runs=args.runs, seed=1,
+        )
+        simulate_ms = (time.perf_counter() - start) * 1000
+        reviews_per_day = np.array(forecast['reviews'])
+        print(f"  {simulate_ms:.0f}ms; reviews/day first week {reviews_per_day[:7].mean():.0f}, "
+              f"days 30-60 {reviews_per_day[30:60].mean():.0f}, last 30 days {reviews_per_day[-30:].mean():.0f}")
+        check(reviews_per_day.max() <= 200, "reviews per day stay within reviews_per_day")
+        check(math.isclose(sum(forecast['new_cards']), 2000), "every available new card introduced")
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
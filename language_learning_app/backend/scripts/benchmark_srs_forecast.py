@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the SRS workload forecast (GET /api/srs/forecast/{language}).
+
+Builds a throwaway database with --cards reviewed cards, a synthetic review
+history and a pool of new cards (see benchmark_srs_engine.seed), then times
+db.forecast_srs_workload:
+
+- cold (median of three, forecast cache emptied), with rating shares from review_history
+- the same request again (served from the forecast cache)
+- after one flashcard review (card state version changed: recomputed)
+- cold with a fitted memory model
+
+Checks each cold forecast finishes within --budget-ms, the cache is hit and
+invalidated as expected, and the quotas hold. Exits with status 1 if a check
+fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_srs_forecast [--cards 10000] [--days 365] [--budget-ms 200]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from backend import config, srs_engine
+from backend.scripts.benchmark_srs_engine import LANGUAGE, seed
+
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def timed_forecast(db, args, **quotas):
+    start = time.perf_counter()
+    forecast = db.forecast_srs_workload(LANGUAGE, args.days, **quotas)
+    return forecast, (time.perf_counter() - start) * 1000
+
+
+def cold_forecast(db, args, repeat: int = 3):
+    """Median of `repeat` forecasts, each with an empty forecast cache"""
+    timings = []
+    for _ in range(repeat):
+        db._forecast_cache.clear()
+        forecast, ms = timed_forecast(db, args)
+        timings.append(ms)
+    return forecast, statistics.median(timings)
+
+
+def report(name: str, forecast, ms: float):
+    summary = forecast['summary']
+    print(f"{name:34s} {ms:8.1f}ms  cached={forecast['cached']!s:5s}  avg {summary['average_reviews']:6.1f}/day  "
+          f"peak {summary['peak_reviews']:6.1f} on {summary['peak_date']}  backlog {summary['final_backlog']:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, default=10000, help='Reviewed cards')
+    parser.add_argument('--new-cards', type=int, default=5000, help='Cards not yet introduced')
+    parser.add_argument('--history-cards', type=int, default=3000, help='Cards with a synthetic review history')
+    parser.add_argument('--days', type=int, default=365, help='Forecast horizon')
+    parser.add_argument('--budget-ms', type=float, default=200.0, help='Target for a cold forecast')
+    args = parser.parse_args()
+
+    if not srs_engine.HAS_NUMPY:
+        print("numpy is not installed")
+        sys.exit(1)
+
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-srs-forecast-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    try:
+        from backend import db, db_pool
+        db.init_db_schema()
+        seed(config.DB_PATH, args.cards, min(args.history_cards, args.cards), 30)
+        conn = sqlite3.connect(config.DB_PATH)
+        conn.executemany(
+            'INSERT INTO vocabulary (language, english_word, translation, level) VALUES (?, ?, ?, ?)',
+            [(LANGUAGE, f'new word {i}', f'ಹೊಸ ಪದ {i}', 'a2') for i in range(args.new_cards)]
+        )
+        conn.commit()
+        conn.close()
+        db.update_srs_settings(LANGUAGE, 15, 400)
+        print(f"\n{args.cards} reviewed cards, {args.new_cards} new; {args.days}-day forecast\n")
+
+        forecast, ms = cold_forecast(db, args)
+        report('cold (rating shares)', forecast, ms)
+        check(ms < args.budget_ms, f"cold forecast within {args.budget_ms:.0f}ms ({ms:.0f}ms)")
+        check(max(forecast['reviews']) <= 400 and max(forecast['new_cards']) <= 15, "quotas respected")
+
+        again, ms = timed_forecast(db, args)
+        report('same request', again, ms)
+        check(again['cached'] and again['reviews'] == forecast['reviews'], "repeat request served from cache")
+
+        proposal, ms = timed_forecast(db, args, new_cards_per_day=5, reviews_per_day=150)
+        report('proposed 5 new / 150 reviews', proposal, ms)
+        check(not proposal['cached'], "different settings recomputed")
+
+        word_id = db.get_words_for_review(LANGUAGE, 1)[0]['id']
+        db.update_word_state_from_flashcard(word_id, 1, 'good')
+        after, ms = timed_forecast(db, args)
+        report('after a review', after, ms)
+        check(not after['cached'], "a review invalidates cached forecasts")
+
+        result = db.fit_srs_memory_model(LANGUAGE)
+        print(f"\nfitted memory model in {result['seconds']}s\n")
+        modelled, ms = cold_forecast(db, args)
+        report('cold (memory model)', modelled, ms)
+        check(modelled['memory_model'] and not modelled['cached'], "forecast uses the fitted model")
+        check(ms < args.budget_ms, f"cold forecast with memory model within {args.budget_ms:.0f}ms ({ms:.0f}ms)")
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
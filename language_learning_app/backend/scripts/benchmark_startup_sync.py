@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the startup sync path (schema init, lesson sync, vocabulary sync).
+
+Times the same steps the FastAPI startup event runs, against a throwaway
+database:
+
+    cold  empty database: schema creation, full lesson and vocabulary load
+    warm  nothing changed since the last sync: manifest checks only
+    force lesson and vocabulary files re-parsed regardless of the manifest
+
+Pass --db to start from a copy of an existing database instead of an empty one
+(the "cold" run is then the first sync of that database).
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_startup_sync [--warm-runs 5] [--db backend/data/fluo.db]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from backend import config
+
+
+def timed(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_startup(force: bool = False):
+    """Per-step timings in ms of one startup sync"""
+    from backend import db
+    return {
+        'schema': timed(db.init_db_schema),
+        'lessons': timed(db.sync_lessons_from_files, force=force),
+        'vocab': timed(db.sync_vocab_from_csvs, force=force),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='Existing database to copy instead of starting empty')
+    parser.add_argument('--warm-runs', type=int, default=5, help='Warm startups to average')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-startup-bench-')
+    bench_db = os.path.join(tmp_dir, config.DB_NAME)
+    if args.db:
+        shutil.copy(args.db, bench_db)
+    config.DB_PATH = bench_db
+    # The memory search index is built in the background after startup; keep it out
+    config.VOCAB_SEARCH_ENGINE = 'legacy'
+
+    try:
+        # Importing db runs init_db_schema, so time it as part of the cold start
+        start = time.perf_counter()
+        from backend import db, db_pool
+        import_ms = (time.perf_counter() - start) * 1000
+
+        results = []
+        cold = run_startup()
+        cold['schema'] += import_ms
+        results.append(('cold', cold))
+
+        warm = [run_startup() for _ in range(max(args.warm_runs, 1))]
+        results.append((f'warm x{len(warm)}', {
+            step: sum(run[step] for run in warm) / len(warm) for step in cold
+        }))
+        results.append(('force', run_startup(force=True)))
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\n{'run':10s} {'schema ms':>10s} {'lessons ms':>11s} {'vocab ms':>10s} {'total ms':>10s}")
+    for name, timings in results:
+        print(f"{name:10s} {timings['schema']:10.1f} {timings['lessons']:11.1f} {timings['vocab']:10.1f}"
+              f" {sum(timings.values()):10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memoized transliteration service (transliteration.py).
+
+Loads the real vocabulary CSVs into a throwaway database and, per language,
+times transliterating every vocabulary word and --passages generated passages
+(vocabulary words with punctuation, repeats and paragraph breaks):
+
+    uncached  aksharamukha + clean_iast + schwa deletion on each whole text,
+              as every transliterate_text call did before the cache
+    cold      transliterate_many with empty caches (each distinct word once)
+    stored    a new process: in-memory cache empty, transliteration_cache warm
+    warm      everything in the in-memory cache
+
+Checks the cached word-by-word results equal the uncached whole-text ones
+(ISO and ITRANS, Urdu in both scripts and to Arabic script), that warm calls
+don't reach aksharamukha, that stored results are ignored after a
+CACHE_VERSION bump and that the in-memory cache stays within its size.
+Exits with status 1 if a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_transliteration [--passages 20] [--words 200]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from backend import config
+
+
+LANGUAGES = ['kannada', 'tamil', 'telugu', 'malayalam', 'hindi', 'urdu']
+PUNCTUATION = ['', '', '', ',', '.', '!', '?', '।', ':']
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def median_ms(fn, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def uncached(text: str, language: str, to_script: str = 'ISO', from_script_override: str = None) -> str:
+    """The transliterate_text pipeline on the whole text, without the cache"""
+    from backend import transliteration
+    if not text or transliteration._passthrough(text):
+        return text
+    from_scheme = transliteration._source_scheme(text, language, from_script_override)
+    if from_scheme is None:
+        return text
+    to_scheme = transliteration._target_scheme(to_script)
+    result = transliteration.transliterate.process(from_scheme, to_scheme, text)
+    if to_scheme.upper() in ('IAST', 'ISO'):
+        result = transliteration.clean_iast(result)
+        result = transliteration.delete_final_schwa(result, language)
+    return result
+
+
+def make_passage(rng: random.Random, words: list, length: int) -> str:
+    # Draw from a small pool so words repeat, as in a story
+    pool = rng.sample(words, min(len(words), length // 3))
+    parts = []
+    for i in range(length):
+        parts.append(rng.choice(pool) + rng.choice(PUNCTUATION))
+        if i % 40 == 39:
+            parts.append('\n\n')
+        elif i % 15 == 14:
+            parts.append('\n')
+    return ' '.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--passages', type=int, default=20, help='Passages per language')
+    parser.add_argument('--words', type=int, default=200, help='Words per passage')
+    args = parser.parse_args()
+
+    rng = random.Random(23)
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-transliteration-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    config.VOCAB_SEARCH_ENGINE = 'legacy'
+    try:
+        from backend import db, db_pool, transliteration
+        db.init_db_schema()
+
+        print(f"\n{'language':10s} {'texts':>6s} {'uncached ms':>12s} {'cold ms':>9s} {'stored ms':>10s} "
+              f"{'warm ms':>8s}")
+        for language in LANGUAGES:
+            db.load_vocabulary_from_csv(language)
+            conn = db.get_connection()
+            words = [row[0] for row in conn.execute(
+                'SELECT translation FROM vocabulary WHERE language = ?', (language,))]
+            conn.close()
+            passages = [make_passage(rng, words, args.words) for _ in range(args.passages)]
+
+            for name, texts in (('words', words), ('passages', passages)):
+                start = time.perf_counter()
+                expected = [uncached(t, language) for t in texts]
+                uncached_ms = (time.perf_counter() - start) * 1000
+
+                transliteration.clear_cache(stored=True)
+                start = time.perf_counter()
+                cold_result = transliteration.transliterate_many(texts, language)
+                cold_ms = (time.perf_counter() - start) * 1000
+
+                def stored():
+                    transliteration.clear_cache()
+                    return transliteration.transliterate_many(texts, language)
+                stored_ms = median_ms(stored)
+                stored_result = stored()
+                misses = transliteration.cache_info()['misses']
+                warm_ms = median_ms(lambda: transliteration.transliterate_many(texts, language))
+                print(f"{language:10s} {len(texts):6d} {uncached_ms:12.0f} {cold_ms:9.0f} {stored_ms:10.0f} "
+                      f"{warm_ms:8.1f}  {name}")
+                check(cold_result == expected and stored_result == expected,
+                      f"{language} {name}: cached results equal uncached")
+                check(misses == 0 and transliteration.cache_info()['misses'] == 0,
+                      f"{language} {name}: stored and warm calls don't reach aksharamukha")
+
+            sample = passages[:3] + words[:200]
+            check(transliteration.transliterate_many(sample, language, 'ITRANS')
+                  == [uncached(t, language, 'ITRANS') for t in sample], f"{language}: ITRANS equal uncached")
+            check([transliteration.transliterate_text(t, language) for t in sample[:20]]
+                  == [uncached(t, language) for t in sample[:20]], f"{language}: transliterate_text equal uncached")
+        print()
+
+        # Urdu authored in Arabic script, and Devanagari Urdu to Arabic script
+        arabic = transliteration.transliterate_many(words[:300], 'urdu', 'Urdu', 'Devanagari')
+        check(arabic == [uncached(t, 'urdu', 'Urdu', 'Devanagari') for t in words[:300]],
+              "urdu: Devanagari -> Arabic script equal uncached")
+        check(transliteration.transliterate_many(arabic, 'urdu') == [uncached(t, 'urdu') for t in arabic],
+              "urdu: Arabic script -> ISO equal uncached")
+        check(transliteration.transliterate_many(['Error: no text', 'This is an English sentence', ''], 'kannada')
+              == ['Error: no text', 'This is an English sentence', ''], "error messages and English pass through")
+
+        transliteration.clear_cache()
+        transliteration.CACHE_VERSION += 1
+        transliteration.transliterate_many(words[:50], 'urdu')
+        check(transliteration.cache_info()['stored_hits'] == 0, "stored results ignored after a CACHE_VERSION bump")
+
+        config.TRANSLITERATION_CACHE_SIZE = 100
+        transliteration.transliterate_many(passages[:3], 'urdu')
+        check(transliteration.cache_info()['size'] <= 100, "in-memory cache stays within TRANSLITERATION_CACHE_SIZE")
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
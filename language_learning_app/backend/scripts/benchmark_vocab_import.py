@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Benchmark and check the pipelined vocabulary import (vocab_import.py).
+
+Loads the real Kannada and Hindi vocabulary CSVs into a throwaway database and
+imports a generated Kannada text (vocabulary words, inflected forms the
+lemmatizer maps back to vocabulary and to each other, and new words) with
+Hindi cross-translation, twice from the same starting database:
+
+    old    the import as POST /api/vocab/import-text ran it before the jobs:
+           sequential LLM batches, a lookup per lemma, a transliteration and
+           insert per word
+    jobs   vocab_import.run_job
+
+Gemini is replaced, in this script only, by a fake with --latency-ms per
+call that lemmatizes and translates deterministically, so both imports see
+the same answers. Checks that the job adds and finds the same words (and
+cross-language rows) as the old import, keeps at most
+VOCAB_IMPORT_CONCURRENCY calls in flight, uses one lookup query and one
+insert transaction per stage, streams stage progress and the result to SSE
+clients (late ones too), that importing the same text again makes no LLM
+call, and that failed batches aren't cached and fail the job with 400 when
+nothing could be lemmatized. Exits with status 1 if a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_vocab_import [--new-words 120] [--latency-ms 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from backend import config
+
+
+CONSONANTS = 'ಕಗಚಜಟಡತದನಪಬಮಯರಲವಸಹ'
+VOWEL_SIGNS = ['', 'ಾ', 'ಿ', 'ು', 'ೆ', 'ೊ']
+PLURAL = 'ಗಳು'
+UNKNOWN_SUFFIX = 'ಕ್ಕಿಂತಲೂಹ'
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+class FakeGemini:
+    """Stands in for api_client.generate_text_with_gemini_async
+
+    Prompts are the JSON the patched prompt builders below produce. The
+    lemma of a word is lemma_map's entry (itself otherwise); a translation's
+    Hindi is a made-up word, or an existing Hindi word for every fifth.
+    """
+    def __init__(self, latency_ms: float, lemma_map: dict, hindi_words: list):
+        self.latency = latency_ms / 1000
+        self.lemma_map = lemma_map
+        self.hindi_words = hindi_words
+        self.calls = Counter()
+        self.in_flight = 0
+        self.peak = 0
+        self.fail_tasks = set()
+
+    def hindi_for(self, word: str) -> str:
+        n = sum(map(ord, word))
+        if n % 5 == 0:
+            return self.hindi_words[n % len(self.hindi_words)]
+        return 'पि' + ''.join(chr(0x0915 + (ord(c) + i) % 30) for i, c in enumerate(word[:4]))
+
+    async def __call__(self, prompt, model_name=None, **kwargs):
+        request = json.loads(prompt)
+        self.calls[request['task']] += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if request['task'] in self.fail_tasks:
+            raise RuntimeError('fake Gemini failure')
+        if request['task'] == 'lemmatize':
+            result = [{'word': self.lemma_map.get(w, w), 'word_class': 'noun'} for w in request['words']]
+        else:
+            result = [{
+                'word': w['word'],
+                'english': f"imported {w['word']}",
+                'word_class': 'verb',  # the lemmatizer's word class wins
+                'translations': {lang: self.hindi_for(w['word']) for lang in request['targets']},
+            } for w in request['words']]
+        return f"```json\n{json.dumps(result, ensure_ascii=False)}\n```", self.latency, {}, False, {}
+
+
+def fake_lemmatization_prompt(language, words):
+    return json.dumps({'task': 'lemmatize', 'words': list(words)})
+
+
+def fake_translation_prompt(language, words, target_languages):
+    return json.dumps({'task': 'translate', 'words': list(words), 'targets': list(target_languages)})
+
+
+async def old_import(text: str, language: str, user_languages: list) -> dict:
+    """POST /api/vocab/import-text as it was before the jobs (with the fake prompts)
+
+    Words are pre-resolved by exact vocabulary form, as vocab_import does, so
+    both imports send the same words to the lemmatizer.
+    """
+    from backend import api_client, db, lemma_index, transliteration
+
+    def existing_entry(word, existing):
+        translit = existing.get('transliteration', '')
+        if not translit and existing.get('translation'):
+            translit = transliteration.transliterate_text(existing['translation'], language, 'IAST')
+        return {'word': word, 'transliteration': translit,
+                'english_word': existing.get('english_word', ''), 'word_class': existing.get('word_class', '')}
+
+    tokens = lemma_index.tokenize(lemma_index.normalize(text))
+    words = list(dict.fromkeys(word for _, word in tokens))
+    resolved_ids, unresolved = [], []
+    for word in words:
+        word_ids = lemma_index.form_ids(language, word)
+        if word_ids:
+            resolved_ids.append(word_ids[0])
+        else:
+            unresolved.append(word)
+    resolved_ids = list(dict.fromkeys(resolved_ids))
+    existing_ids = set(resolved_ids)
+    existing_words = [existing_entry(row['translation'], row) for row in db.get_words_by_ids(resolved_ids)]
+    words = unresolved
+
+    all_lemmatized = []
+    for i in range(0, len(words), 10):
+        response_text, *_ = await api_client.generate_text_with_gemini_async(
+            fake_lemmatization_prompt(language, words[i:i + 10]))
+        all_lemmatized.extend(json.loads(response_text.strip().replace('```json', '').replace('```', '')))
+
+    new_words, seen = [], set()
+    for wd in all_lemmatized:
+        word = wd.get('word', '').strip()
+        if not word or word in seen:
+            continue
+        seen.add(word)
+        existing = db.find_word_by_translation(word, language)
+        if not existing:
+            word_ids = lemma_index.form_ids(language, word)
+            existing = next(iter(db.get_words_by_ids(word_ids[:1])), None)
+        if existing:
+            if existing['id'] not in existing_ids:
+                existing_ids.add(existing['id'])
+                existing_words.append(existing_entry(word, existing))
+        else:
+            new_words.append(wd)
+
+    added_words = []
+    for i in range(0, len(new_words), 10):
+        batch = new_words[i:i + 10]
+        response_text, *_ = await api_client.generate_text_with_gemini_async(
+            fake_translation_prompt(language, batch, user_languages))
+        translations = json.loads(response_text.strip().replace('```json', '').replace('```', ''))
+        batch_words = [td.get('word', '').strip() for td in translations]
+        translits = dict(zip(batch_words, transliteration.transliterate_many(batch_words, language, 'IAST')))
+        for td in translations:
+            word = td.get('word', '').strip()
+            word_class = next((w['word_class'] for w in batch if w['word'] == word), td.get('word_class', 'noun'))
+            db.insert_vocabulary_entry(language, td.get('english', ''), word, translits[word], word_class, None, 'user')
+            added_words.append({'word': word, 'transliteration': translits[word],
+                                'english_word': td.get('english', ''), 'word_class': word_class})
+            for lang, trans_text in td.get('translations', {}).items():
+                if lang in user_languages and trans_text and not db.find_word_by_translation(trans_text, lang):
+                    db.insert_vocabulary_entry(lang, td.get('english', ''), trans_text,
+                                               transliteration.transliterate_text(trans_text, lang, 'IAST'),
+                                               word_class, None, 'user')
+    return {"success": True, "new_words": len(added_words), "existing_words": len(existing_words),
+            "added": added_words, "existing": existing_words}
+
+
+def build_text(rng: random.Random, vocab_words: list, new_words: int):
+    """Kannada text of vocabulary words, new words and forms the fake lemmatizer maps back"""
+    novel = set()
+    while len(novel) < new_words:
+        novel.add(''.join(rng.choice(CONSONANTS) + rng.choice(VOWEL_SIGNS) for _ in range(4)))
+    novel = sorted(novel)
+    known = rng.sample(vocab_words, new_words)
+    lemma_map = {}
+    for word in novel[:new_words // 4]:
+        lemma_map[word + PLURAL] = word
+    for word in known[:new_words // 4]:
+        lemma_map[word + UNKNOWN_SUFFIX] = word
+    tokens = known + novel + list(lemma_map)
+    rng.shuffle(tokens)
+    return ' '.join(tokens + tokens[:len(tokens) // 3]), lemma_map
+
+
+def vocabulary_rows(db_path: str):
+    conn = sqlite3.connect(db_path)
+    rows = set(conn.execute('''
+        SELECT language, english_word, translation, transliteration, word_class, origin
+        FROM vocabulary WHERE origin = 'user'
+    '''))
+    conn.close()
+    return rows
+
+
+def reset_indexes():
+    from backend import lemma_index, vocab_matcher, vocab_search
+    for language in ('kannada', 'hindi'):
+        lemma_index.invalidate(language)
+        vocab_matcher.invalidate(language)
+        vocab_search.invalidate(language)
+
+
+def counting(module, name: str, counter: Counter):
+    original = getattr(module, name)
+
+    def wrapper(*args, **kwargs):
+        counter[name] += 1
+        return original(*args, **kwargs)
+    setattr(module, name, wrapper)
+
+
+async def watched_job(text: str, language: str, targets: list):
+    """Run a job with an SSE client queue attached; returns (job, events)"""
+    from backend import vocab_import
+    job = vocab_import.create_job(text, language, targets)
+    queue = asyncio.Queue()
+    job.add_client(queue)
+    await vocab_import.run_job(job)
+    job.remove_client(queue)
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return job, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--new-words', type=int, default=120, help='New words in the imported text')
+    parser.add_argument('--latency-ms', type=float, default=200, help='Latency of each fake Gemini call')
+    args = parser.parse_args()
+
+    rng = random.Random(25)
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-vocab-import-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    config.LEMMA_INDEX_DIR = os.path.join(tmp_dir, 'lemma_index')
+    config.VOCAB_SEARCH_ENGINE = 'legacy'
+    try:
+        from backend import api_client, db, db_pool, vocab_import
+        db.init_db_schema()
+        for language in ('kannada', 'hindi'):
+            db.load_vocabulary_from_csv(language)
+        conn = db.get_connection()
+        vocab_words = [row[0] for row in conn.execute(
+            "SELECT translation FROM vocabulary WHERE language = 'kannada' AND translation NOT LIKE '% %'")]
+        hindi_words = [row[0] for row in conn.execute(
+            "SELECT translation FROM vocabulary WHERE language = 'hindi' AND translation NOT LIKE '% %'")]
+        conn.close()
+        db_pool.close_all_pools()
+        fresh_db = os.path.join(tmp_dir, 'fresh.db')
+        shutil.copy(config.DB_PATH, fresh_db)
+
+        text, lemma_map = build_text(rng, vocab_words, args.new_words)
+        fake = FakeGemini(args.latency_ms, lemma_map, hindi_words)
+        api_client.generate_text_with_gemini_async = fake
+        vocab_import.get_lemmatization_prompt = fake_lemmatization_prompt
+        vocab_import.get_translation_prompt = fake_translation_prompt
+        queries = Counter()
+        for name in ('find_word_by_translation', 'find_words_by_translations',
+                     'insert_vocabulary_entry', 'insert_vocabulary_entries'):
+            counting(db, name, queries)
+        print(f"\ntext: {len(text.split())} words, {len(set(text.split()))} distinct; "
+              f"fake Gemini latency {args.latency_ms:.0f}ms, VOCAB_IMPORT_CONCURRENCY = {config.VOCAB_IMPORT_CONCURRENCY}")
+
+        # Old sequential import
+        start = time.perf_counter()
+        old = asyncio.run(old_import(text, 'kannada', ['hindi']))
+        old_ms = (time.perf_counter() - start) * 1000
+        old_calls, old_queries, old_peak = sum(fake.calls.values()), dict(queries), fake.peak
+        old_rows = vocabulary_rows(config.DB_PATH)
+
+        # Same import as a job, from the same starting database
+        db_pool.close_all_pools()
+        config.DB_PATH = fresh_db
+        reset_indexes()
+        fake.calls.clear()
+        fake.peak = 0
+        queries.clear()
+        start = time.perf_counter()
+        job, events = asyncio.run(watched_job(text, 'kannada', ['hindi']))
+        job_ms = (time.perf_counter() - start) * 1000
+        new = job.result or {}
+        job_rows = vocabulary_rows(config.DB_PATH)
+
+        print(f"\n{'import':8s} {'ms':>8s} {'LLM calls':>9s} {'peak':>5s} {'lookups':>8s} {'inserts':>8s} "
+              f"{'new':>5s} {'existing':>8s}")
+        print(f"{'old':8s} {old_ms:8.0f} {old_calls:9d} {old_peak:5d} "
+              f"{old_queries.get('find_word_by_translation', 0):8d} {old_queries.get('insert_vocabulary_entry', 0):8d} "
+              f"{old['new_words']:5d} {old['existing_words']:8d}")
+        print(f"{'jobs':8s} {job_ms:8.0f} {sum(fake.calls.values()):9d} {fake.peak:5d} "
+              f"{queries['find_words_by_translations']:8d} {queries['insert_vocabulary_entries']:8d} "
+              f"{new.get('new_words', 0):5d} {new.get('existing_words', 0):8d}\n")
+
+        check(job.status == 'complete', f"job completes ({job.status}{': ' + str(job.error) if job.error else ''})")
+        check(sorted(map(json.dumps, new.get('added', []))) == sorted(map(json.dumps, old['added'])),
+              f"job adds the same words as the old import ({old['new_words']})")
+        check(sorted(e['word'] for e in new.get('existing', [])) == sorted(e['word'] for e in old['existing']),
+              f"job finds the same existing words ({old['existing_words']})")
+        check(job_rows == old_rows and any(row[0] == 'hindi' for row in job_rows),
+              f"job writes the same vocabulary rows, cross-language included ({len(job_rows)})")
+        check(1 < fake.peak <= config.VOCAB_IMPORT_CONCURRENCY,
+              f"LLM calls run concurrently, at most VOCAB_IMPORT_CONCURRENCY ({fake.peak} in flight)")
+        check(queries['find_word_by_translation'] == 0 and queries['insert_vocabulary_entry'] == 0
+              and queries['find_words_by_translations'] == 3 and queries['insert_vocabulary_entries'] == 1,
+              "one lookup query per stage and language, one insert transaction")
+        check(job_ms < old_ms / 2, f"job at least twice as fast ({old_ms / max(job_ms, 1):.1f}x)")
+
+        stages = [e['stage'] for e in events if e['type'] == 'stage']
+        progress = [e for e in events if e['type'] == 'progress']
+        check(events and events[0]['type'] == 'init' and events[-1]['type'] == 'complete'
+              and events[-1]['result'] == new, "SSE client gets init, then the result last")
+        check(stages == ['tokenize', 'lemmatize', 'lookup', 'translate', 'transliterate', 'insert'],
+              f"SSE stages in order ({', '.join(stages)})")
+        check(len(progress) == sum(fake.calls.values()) and all(
+            e['done'] <= e['total'] for e in progress), f"SSE progress per LLM batch ({len(progress)})")
+        late = asyncio.Queue()
+        job.add_client(late)
+        check([late.get_nowait()['type'], late.get_nowait()['type']] == ['init', 'complete'],
+              "a client connecting after the job finished gets the result")
+
+        # Same text again: no LLM calls, every word exists now
+        fake.calls.clear()
+        queries.clear()
+        start = time.perf_counter()
+        again, _ = asyncio.run(watched_job(text, 'kannada', ['hindi']))
+        again_ms = (time.perf_counter() - start) * 1000
+        check(again.cached and not fake.calls and again.result['new_words'] == 0
+              and again.result['existing_words'] >= new.get('new_words', 0),
+              f"re-import is served from the text cache: no LLM calls, nothing new ({again_ms:.0f}ms)")
+        check(vocabulary_rows(config.DB_PATH) == job_rows, "re-import inserts nothing")
+
+        # Failed batches aren't cached; nothing lemmatized fails the job
+        other_text = ' '.join(''.join(rng.choice(CONSONANTS) + 'ೌ' for _ in range(4)) for _ in range(30))
+        vocab_import.clear_cache()
+        fake.fail_tasks = {'translate'}
+        failed, _ = asyncio.run(watched_job(other_text, 'kannada', []))
+        fake.fail_tasks = set()
+        fake.calls.clear()
+        retried, _ = asyncio.run(watched_job(other_text, 'kannada', []))
+        check(failed.status == 'complete' and failed.result['new_words'] == 0 and not retried.cached
+              and fake.calls['lemmatize'] > 0 and retried.result['new_words'] > 0,
+              "an import with failed batches is not cached; importing it again retries them")
+        fake.fail_tasks = {'lemmatize'}
+        novel_text = ' '.join(''.join(rng.choice(CONSONANTS) + 'ೈ' for _ in range(5)) for _ in range(12))
+        failed, _ = asyncio.run(watched_job(novel_text, 'kannada', []))
+        check(failed.status == 'error' and failed.error_status == 400,
+              f"nothing lemmatized fails the job with 400 ({failed.error_status}: {failed.error})")
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark vocabulary search latency per engine across all six languages.
+
+Runs the same query mix (short prefixes, English words, transliterations,
+native script and typos drawn from each language's vocabulary) through
+db.get_vocabulary() with VOCAB_SEARCH_ENGINE set to 'legacy', 'memory' and
+'fts5', and prints mean / p95 latency per language and engine. The memory
+index build time is reported separately and not counted in query latency.
+
+By default the vocabulary is loaded from the CSVs into a throwaway database;
+pass --db to run against a copy of an existing database instead.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_vocab_search [--samples 30] [--engines memory,fts5] [--db backend/data/fluo.db]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from backend import config
+
+
+LANGUAGES = ['kannada', 'tamil', 'telugu', 'malayalam', 'hindi', 'urdu']
+ENGINES = ['legacy', 'memory', 'fts5']
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def time_queries(language: str, queries, repeat: int):
+    """Latencies in ms of get_vocabulary for each query, best of `repeat` runs"""
+    from backend import db
+    latencies = []
+    for _, query in queries:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            db.get_vocabulary(language, search=query, limit=50)
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        latencies.append(best)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='Existing database to copy instead of loading the CSVs')
+    parser.add_argument('--samples', type=int, default=30, help='Vocabulary rows sampled per language')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per query (best is kept)')
+    parser.add_argument('--engines', default=','.join(ENGINES))
+    args = parser.parse_args()
+
+    engines = [e.strip() for e in args.engines.split(',') if e.strip()]
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        print(f"❌ Unknown engine(s): {', '.join(sorted(unknown))}")
+        sys.exit(1)
+
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-search-bench-')
+    bench_db = os.path.join(tmp_dir, config.DB_NAME)
+    if args.db:
+        shutil.copy(args.db, bench_db)
+    config.DB_PATH = bench_db
+
+    try:
+        from backend import db, db_pool, vocab_search
+        from backend.scripts.check_search_parity import build_queries
+        if not args.db:
+            db.sync_vocab_from_csvs()
+
+        print(f"\n{'language':10s} {'engine':7s} {'queries':>7s} {'mean ms':>8s} {'p95 ms':>8s} {'max ms':>8s}")
+        totals = {engine: [] for engine in engines}
+        for language in LANGUAGES:
+            conn = db_pool.get_connection()
+            conn.row_factory = db.sqlite3.Row
+            rows = conn.execute(
+                'SELECT english_word, translation, transliteration FROM vocabulary WHERE language = ?',
+                (language,)
+            ).fetchall()
+            conn.close()
+            if not rows:
+                print(f"{language:10s} no vocabulary, skipping")
+                continue
+
+            queries = build_queries(rows, args.samples)
+            # Short prefixes are what the vocab screen sends on the first keystrokes
+            queries += [('short', query[:2]) for kind, query in queries if kind == 'exact' and len(query) >= 2]
+
+            for engine in engines:
+                config.VOCAB_SEARCH_ENGINE = engine
+                if engine == 'memory':
+                    start = time.perf_counter()
+                    vocab_search.get_index(language)
+                    print(f"{language:10s} (memory index build {(time.perf_counter() - start) * 1000:.0f} ms)")
+                latencies = time_queries(language, queries, args.repeat)
+                totals[engine].extend(latencies)
+                print(f"{language:10s} {engine:7s} {len(latencies):7d} {sum(latencies) / len(latencies):8.1f}"
+                      f" {percentile(latencies, 0.95):8.1f} {max(latencies):8.1f}")
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print("\nAll languages")
+    for engine, latencies in totals.items():
+        if latencies:
+            print(f"  {engine:7s} mean {sum(latencies) / len(latencies):6.1f} ms"
+                  f"  p95 {percentile(latencies, 0.95):6.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Benchmark "words used" extraction (api_client.extract_words_from_text).
+
+Builds a throwaway database with --words Kannada and Hindi vocabulary rows
+(some with " / " variants and multi-word entries) and generated texts that use
+--used of them, inflected, then times:
+
+- the previous extraction: Kannada regex tokens against a 250-word word bank
+  with substring tests
+- the previous writing activity path: one fuzzy get_vocabulary search per
+  Kannada token
+- vocab_matcher compiling a language and matching a text against all of it
+  (match_word_ids, with the lemma index)
+
+Checks the matcher finds every planted word in both scripts (second variants,
+multi-word entries and suffixed forms included), that single-character forms
+don't match inside words, and that it follows vocabulary changes (a custom
+word insert and a CSV re-sync). Exits with status 1 if a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.benchmark_words_used [--words 5000] [--used 60]
+"""
+import argparse
+import csv
+import os
+import random
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import unicodedata
+
+from backend import config
+
+
+# Consonant + vowel-sign syllables, so generated words look like real ones
+SCRIPTS = {
+    'kannada': ([chr(c) for c in range(0x0C95, 0x0CB9) if unicodedata.category(chr(c)) == 'Lo'], ['', 'ಾ', 'ಿ', 'ು', 'ೆ', 'ೊ'],
+                ['ಗೆ', 'ನ್ನು', 'ದಲ್ಲಿ']),
+    'hindi': ([chr(c) for c in range(0x0915, 0x0939)], ['', 'ा', 'ि', 'ी', 'ु', 'े'], ['ों', 'ें', '']),
+}
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def median_ms(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def make_word(rng: random.Random, language: str, seen: set) -> str:
+    consonants, signs, _ = SCRIPTS[language]
+    while True:
+        word = ''.join(rng.choice(consonants) + rng.choice(signs) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            return word
+
+
+def legacy_extract(text: str, word_bank: list) -> list:
+    """extract_words_from_text before vocab_matcher"""
+    unique_words = list(set(re.findall(r'[\u0C80-\u0CFF]+', text)))
+    unique_words.sort(key=len, reverse=True)
+    matched_words, matched_ids = [], set()
+    for kannada_word in unique_words[:100]:
+        for word_entry in word_bank:
+            if word_entry.get('id') in matched_ids:
+                continue
+            for variant in word_entry.get('translation', '').strip().split(' /'):
+                variant = variant.strip()
+                if kannada_word == variant or kannada_word in variant or variant in kannada_word:
+                    matched_words.append(word_entry)
+                    matched_ids.add(word_entry.get('id'))
+                    break
+            if word_entry.get('id') in matched_ids:
+                break
+    return matched_words
+
+
+def write_csv(path: str, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['english_word', 'translation', 'transliteration', 'word_class', 'level'])
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=5000, help='Vocabulary rows per language')
+    parser.add_argument('--used', type=int, default=60, help='Vocabulary words planted in each text')
+    args = parser.parse_args()
+
+    rng = random.Random(21)
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-words-used-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    config.VOCAB_DIR = tmp_dir
+    config.KANNADA_VOCAB_FILE = os.path.join(tmp_dir, 'kannada-oxford-5000.csv')
+    config.LEMMA_INDEX_DIR = os.path.join(tmp_dir, 'lemma_index')
+    config.VOCAB_SEARCH_ENGINE = 'memory'
+    try:
+        from backend import api_client, db, db_pool, vocab_matcher
+        db.init_db_schema()
+
+        texts = {}
+        for language in SCRIPTS:
+            seen = set()
+            rows = []
+            for i in range(args.words):
+                translation = make_word(rng, language, seen)
+                if i % 10 == 0:
+                    translation += ' / ' + make_word(rng, language, seen)
+                elif i % 25 == 1:
+                    translation += ' ' + make_word(rng, language, seen)
+                rows.append([f'{language} word {i}', translation, f'word {i}', 'noun', 'a1'])
+            if language == 'kannada':
+                write_csv(config.KANNADA_VOCAB_FILE, rows)
+                db.load_vocabulary_from_csv(language)
+            else:
+                for row in rows:
+                    db.insert_vocabulary_entry(language, row[0], row[1], row[2], row[3], row[4])
+            conn = db.get_connection()
+            ids = {english: word_id for word_id, english in conn.execute(
+                'SELECT id, english_word FROM vocabulary WHERE language = ?', (language,))}
+            conn.close()
+            # Planted words (second variants, suffixed) between filler words that aren't vocabulary
+            planted = rng.sample(range(args.words), args.used)
+            filler_seen = set(seen)
+            parts = []
+            for i in planted:
+                variants = rows[i][1].split(' / ')
+                parts.append(rng.choice(variants) + rng.choice(SCRIPTS[language][2]))
+                parts += [make_word(rng, language, filler_seen) for _ in range(3)]
+            texts[language] = (' '.join(parts) + '.', {ids[rows[i][0]] for i in planted})
+
+        print(f"\n{args.words} words per language, {args.used} planted per text "
+              f"({len(texts['kannada'][0])} characters)\n")
+
+        conn = db.get_connection()
+        conn.execute('''
+            INSERT INTO word_states (word_id, user_id, mastery_level, review_count, ease_factor)
+            SELECT id, 1, CASE WHEN id % 5 = 0 THEN 'learning' ELSE 'mastered' END, 3, 2.5
+            FROM vocabulary WHERE language = 'kannada' AND id % 10 < 2
+        ''')
+        conn.commit()
+        conn.close()
+        word_bank = db.get_words_for_activity('kannada', learned_limit=200, learning_limit=50)
+        text, planted = texts['kannada']
+        legacy_ms = median_ms(lambda: legacy_extract(text, word_bank))
+        tokens = list(set(re.findall(r'[\u0C80-\u0CFF]+', text)))[:50]
+        search_ms = median_ms(lambda: [db.get_vocabulary('kannada', search=t, limit=5) for t in tokens], 3)
+        vocab_matcher.invalidate('kannada')
+        compile_ms = median_ms(lambda: vocab_matcher.build_matcher('kannada'), 3)
+        match_ms = median_ms(lambda: vocab_matcher.match_word_ids('kannada', text), 20)
+        extract_ms = median_ms(lambda: api_client.extract_words_from_text(text, 'kannada'), 20)
+        print(f"\n  legacy word bank scan ({len(word_bank)} words)      {legacy_ms:8.2f}ms")
+        print(f"  legacy per-token search ({len(tokens)} tokens)     {search_ms:8.2f}ms")
+        print(f"  matcher compile                         {compile_ms:8.2f}ms")
+        print(f"  matcher single pass                     {match_ms:8.2f}ms")
+        print(f"  extract_words_from_text (with rows)     {extract_ms:8.2f}ms\n")
+
+        for language, (text, planted) in texts.items():
+            found = set(vocab_matcher.match_word_ids(language, text))
+            check(planted <= found, f"{language}: all {len(planted)} planted words found "
+                                    f"({len(found - planted)} others)")
+        words = api_client.extract_words_from_text(texts['hindi'][0], 'hindi')
+        check(all('mastery_level' in w for w in words), "rows carry mastery_level")
+
+        matcher = vocab_matcher.VocabMatcher('test')
+        matcher.build([(1, 'ಈ'), (2, 'ಶುಭ ದಿನ'), (3, 'ಮನೆ')])
+        check(matcher.match('ಈಗ ಶುಭ ದಿನ, ಮನೆಗೆ ಈ') == [2, 3, 1],
+              "single-character forms only match whole words; phrases and suffixed forms match")
+
+        word_id = db.insert_vocabulary_entry('kannada', 'new word', 'ಹೊಸಪದ / ನವೀನ', 'hosapada', 'noun', 'a2')
+        check(vocab_matcher.match_word_ids('kannada', 'ಇದು ನವೀನವನ್ನು') == [word_id],
+              "custom word insert picked up")
+        rows[0][1] = 'ಬದಲಾದ'
+        write_csv(config.KANNADA_VOCAB_FILE, rows)
+        db.load_vocabulary_from_csv('kannada')
+        check(vocab_matcher.match_word_ids('kannada', 'ಬದಲಾದ') != [], "vocabulary re-sync picked up")
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
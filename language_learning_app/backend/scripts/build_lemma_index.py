@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Build the per-language lemma indexes (lemma_index.py) ahead of time.
+
+Builds each language's index from the vocabulary table (the Oxford-5000 CSVs
+plus user words) and writes it to config.LEMMA_INDEX_DIR. The app also builds
+a missing or stale index on first use; running this after a deploy or a
+vocabulary change keeps that work out of the first request.
+
+Run from language_learning_app/:
+    python -m backend.scripts.build_lemma_index [--db path/to/fluo.db] [--language kannada ...]
+"""
+import argparse
+import os
+
+from backend import config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=config.DB_PATH, help='Database to read vocabulary from (default: the app database)')
+    parser.add_argument('--language', action='append', help='Language to build (repeatable; default: all)')
+    args = parser.parse_args()
+
+    config.DB_PATH = args.db
+    from backend import db, db_pool, lemma_index
+    db.init_db_schema()
+    for language in args.language or db.SUPPORTED_VOCAB_LANGUAGES:
+        index = lemma_index.build_index(language)
+        path = lemma_index.index_path(language)
+        if index and os.path.exists(path):
+            print(f"  {language}: {os.path.getsize(path) / 1024:.0f}KB at {path}")
+    db_pool.close_all_pools()
+
+
+if __name__ == '__main__':
+    main()
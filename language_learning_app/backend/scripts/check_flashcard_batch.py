@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Check POST /api/flashcard/batch (db.apply_flashcard_review_batch).
+
+Builds a throwaway database with a small vocabulary and checks that:
+
+- reviews dated before today (sent late by an offline client) are counted in
+  the srs_daily_quota row of their own day, which is created if missing
+- today's reviews are counted in today's row
+- a replayed idempotency key is returned as 'duplicate' and counted once
+- an unknown rating or word_id fails only its own card, with nothing written
+  to review_history for it
+
+Exits with status 1 if a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.check_flashcard_batch
+"""
+import os
+import shutil
+import sys
+import tempfile
+from datetime import timedelta
+
+from backend import config
+
+
+LANGUAGE = 'kannada'
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def quota_row(db, date: str):
+    conn = db.get_connection()
+    row = conn.execute('''
+        SELECT new_cards_completed, reviews_completed FROM srs_daily_quota
+        WHERE user_id = 1 AND language = ? AND date = ?
+    ''', (LANGUAGE, date)).fetchone()
+    conn.close()
+    return tuple(row) if row else None
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-flashcard-batch-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    try:
+        from backend import db, db_pool
+        db.init_db_schema()
+        conn = db.get_connection()
+        conn.executemany(
+            'INSERT INTO vocabulary (language, english_word, translation, level) VALUES (?, ?, ?, ?)',
+            [(LANGUAGE, f'word {i}', f'{LANGUAGE} {i}', 'a1') for i in range(10)]
+        )
+        conn.commit()
+        word_ids = [row[0] for row in conn.execute('SELECT id FROM vocabulary ORDER BY id')]
+        conn.close()
+
+        now = config.get_current_time()
+        today = now.strftime('%Y-%m-%d')
+        earlier = now - timedelta(days=2)
+        earlier_date = earlier.strftime('%Y-%m-%d')
+        print()
+
+        # Three new cards reviewed offline two days ago, then one of them again
+        backdated = [
+            {'word_id': word_id, 'comfort_level': 'good',
+             'reviewed_at': earlier.isoformat(), 'idempotency_key': f'offline-{word_id}'}
+            for word_id in word_ids[:3]
+        ]
+        backdated.append({'word_id': word_ids[0], 'comfort_level': 'hard',
+                          'reviewed_at': (earlier + timedelta(minutes=5)).isoformat(),
+                          'idempotency_key': 'offline-again'})
+        result = db.apply_flashcard_review_batch(backdated)
+        check(result['applied'] == 4, f"backdated batch applied ({result['applied']}/4)")
+        check(quota_row(db, earlier_date) == (3, 1),
+              f"backdated reviews counted on their own day ({quota_row(db, earlier_date)}, expected (3, 1))")
+        check((quota_row(db, today) or (0, 0)) == (0, 0), "backdated reviews not counted today")
+
+        result = db.apply_flashcard_review_batch(backdated)
+        check(result['duplicates'] == 4 and quota_row(db, earlier_date) == (3, 1),
+              "replayed batch returned as duplicates and not counted again")
+
+        # Today: two new cards, one bad rating, one unknown word
+        conn = db.get_connection()
+        history_before = conn.execute('SELECT COUNT(*) FROM review_history').fetchone()[0]
+        conn.close()
+        result = db.apply_flashcard_review_batch([
+            {'word_id': word_ids[3], 'comfort_level': 'easy'},
+            {'word_id': word_ids[4], 'comfort_level': 'meh'},
+            {'word_id': 10 ** 9, 'comfort_level': 'good'},
+            {'word_id': word_ids[5], 'comfort_level': 'again'},
+        ])
+        statuses = [entry['status'] for entry in result['results']]
+        check(statuses == ['applied', 'error', 'error', 'applied'],
+              f"bad rating and unknown word fail only their own card ({statuses})")
+        check(quota_row(db, today) == (2, 0), f"today's reviews counted today ({quota_row(db, today)})")
+        conn = db.get_connection()
+        history_after = conn.execute('SELECT COUNT(*) FROM review_history').fetchone()[0]
+        bad_state = conn.execute('SELECT COUNT(*) FROM word_states WHERE word_id = ?', (word_ids[4],)).fetchone()[0]
+        conn.close()
+        check(history_after - history_before == 2 and bad_state == 0,
+              "the card with the bad rating is neither logged nor rescheduled")
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
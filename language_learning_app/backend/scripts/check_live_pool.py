@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Check the Gemini Live session pool against the local fake Gemini Live.
+
+Drives live_pool.LiveSessionPool with fake_gemini_live.FakeGeminiLiveClient
+(connect takes --connect-ms) and checks that:
+
+- a one-off checkout starts cold and leaves nothing warm (no recent demand)
+- steady checkouts get warm sessions, with their own context applied, and
+  warm setup-to-ready latency is well below a cold connect
+- the pool grows with the checkout rate, within its per-key cap
+- idle sessions are retired once demand stops and their TTL passes
+
+Prints the pool's stats and exits with status 1 if any check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.check_live_pool [--connect-ms 300] [--checkouts 30] [--interval-ms 200]
+        [--idle-ttl-s 2] [--rate-window-s 3]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import sys
+
+from backend import live_pool
+from backend.fake_gemini_live import FakeGeminiLiveClient
+
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def make_pool(args, **overrides):
+    options = dict(
+        client_factory=functools.partial(FakeGeminiLiveClient, connect_ms=args.connect_ms, send_latency_ms=1.0),
+        max_idle_per_key=3, max_idle_total=4, idle_ttl_s=args.idle_ttl_s,
+        rate_window_s=args.rate_window_s, maintenance_interval_s=0.1, check_live_lane=False,
+    )
+    options.update(overrides)
+    return live_pool.LiveSessionPool(**options)
+
+
+async def one_off(args):
+    print("\nOne-off checkout")
+    pool = make_pool(args)
+    client, warm, setup_ms = await pool.checkout('kannada', 'Kore', {'topic': 'market'})
+    await asyncio.sleep(args.connect_ms / 1000 * 2)
+    check(not warm and setup_ms >= args.connect_ms, f"cold start ({setup_ms:.0f}ms)")
+    check(pool.stats()['keys']['kannada/Kore']['idle'] == 0, "nothing kept warm without recent demand")
+    await client.close_session()
+    await pool.close_all()
+
+
+async def steady(args):
+    print(f"\nSteady demand: {args.checkouts} checkouts every {args.interval_ms}ms")
+    pool = make_pool(args)
+    contexts_ok = True
+    for i in range(args.checkouts):
+        context = {'topic': f'conversation {i}'}
+        client, warm, _ = await pool.checkout('hindi', 'Puck', context)
+        contexts_ok &= client.conversation_context == context and client.language == 'hindi'
+        await client.close_session()
+        await asyncio.sleep(args.interval_ms / 1000)
+    stats = pool.stats()
+    check(stats['hits'] > args.checkouts // 2, f"most checkouts warm ({stats['hits']}/{args.checkouts})")
+    check(contexts_ok, "every session carries the context it was checked out with")
+    warm_p50 = stats['setup_to_ready_warm']['p50_ms']
+    cold_p50 = stats['setup_to_ready_cold']['p50_ms']
+    check(warm_p50 < cold_p50 / 4, f"warm setup p50 {warm_p50}ms vs cold {cold_p50}ms")
+
+    wait_s = max(args.idle_ttl_s, args.rate_window_s) + 0.5
+    print(f"\nDemand stops; waiting {wait_s}s for the idle TTL and rate window to pass")
+    await asyncio.sleep(wait_s)
+    stats = pool.stats()
+    check(stats['keys']['hindi/Puck']['idle'] == 0 and stats['retired_ttl'] + stats['retired_surplus'] > 0,
+          f"idle sessions retired (ttl {stats['retired_ttl']}, surplus {stats['retired_surplus']})")
+    await pool.close_all()
+    return stats
+
+
+async def sizing(args):
+    print("\nSizing from checkout rate")
+    pool = make_pool(args, rate_window_s=1.0)
+    key = ('tamil', 'Kore')
+    pool._connect_seconds.append(args.connect_ms / 1000)
+    for _ in range(2):
+        pool._record_checkout(key)
+    low = pool.target(key)
+    for _ in range(40):
+        pool._record_checkout(key)
+    high = pool.target(key)
+    check(1 <= low < high, f"target grows with rate ({low} -> {high})")
+    check(high <= pool.max_idle_per_key, f"target capped at {pool.max_idle_per_key} per key")
+
+
+async def run(args):
+    await one_off(args)
+    stats = await steady(args)
+    await sizing(args)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connect-ms', type=float, default=300.0, help='Fake Gemini Live connect time')
+    parser.add_argument('--checkouts', type=int, default=30)
+    parser.add_argument('--interval-ms', type=float, default=200.0, help='Time between checkouts')
+    parser.add_argument('--idle-ttl-s', type=float, default=2.0)
+    parser.add_argument('--rate-window-s', type=float, default=3.0, help='Window the checkout rate is measured over')
+    args = parser.parse_args()
+
+    stats = asyncio.run(run(args))
+    print("\nPool stats after steady demand:")
+    print(json.dumps({k: v for k, v in stats.items() if not k.startswith('setup_to_ready')}, indent=2))
+    for name in ('setup_to_ready_warm', 'setup_to_ready_cold'):
+        s = stats[name]
+        print(f"{name:20s} count {s['count']:3d}  p50 {s['p50_ms']:7.1f}ms  p95 {s['p95_ms']:7.1f}ms")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
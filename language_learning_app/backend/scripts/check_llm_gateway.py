@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Check that LLMGateway.slot() never leaks a lane slot.
+
+A caller on another event loop (the server loop) waits for the gateway loop
+to acquire its slot; cancelling it (e.g. a websocket dropped during Live
+setup) right around the moment the acquire completes must still give the
+slot back. Runs many such callers, cancelling each after a random delay,
+and checks that the lane ends with nothing in flight and every slot free.
+
+Exits with status 1 if a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.check_llm_gateway [--callers 2000] [--limit 2]
+"""
+import argparse
+import asyncio
+import random
+import sys
+
+from backend.llm_gateway import LLMGateway
+
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+async def hold(gateway: LLMGateway):
+    async with gateway.slot('live'):
+        await asyncio.sleep(random.uniform(0, 0.002))
+
+
+async def run(args):
+    gateway = LLMGateway({'live': args.limit})
+    tasks = []
+    for _ in range(args.callers):
+        task = asyncio.create_task(hold(gateway))
+        tasks.append(task)
+        await asyncio.sleep(random.uniform(0, 0.0005))
+        if random.random() < 0.5:
+            task.cancel()
+    # With leaked slots the remaining callers would queue forever
+    try:
+        await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=30)
+        finished = True
+    except asyncio.TimeoutError:
+        finished = False
+    check(finished, "all callers got a slot or were cancelled")
+    # Releases are scheduled onto the gateway loop; let them run
+    await asyncio.sleep(0.2)
+
+    stats = gateway.stats()['live']
+    print(f"\n{stats}\n")
+    check(stats['in_flight'] == 0 and stats['queued'] == 0, f"nothing left in flight ({stats['in_flight']})")
+
+    async def free_slots():
+        lane = gateway._lane('live')
+        return lane.semaphore._value
+
+    free = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(free_slots(), gateway._ensure_loop()))
+    check(free == args.limit, f"every slot free again ({free}/{args.limit})")
+
+    try:
+        await asyncio.wait_for(hold(gateway), timeout=5)
+        usable = True
+    except asyncio.TimeoutError:
+        usable = False
+    check(usable, "lane still hands out slots after the cancellations")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--callers', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
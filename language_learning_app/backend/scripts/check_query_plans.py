@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Assert that the hot queries are served by the indexes added in migrations.py.
+
+Runs EXPLAIN QUERY PLAN for the streak, daily/weekly stats, daily activities,
+vocabulary level and review queue queries and fails (exit code 1) if any of
+them stops using its expected index, e.g. after a schema or query change.
+
+By default the check runs against a fresh throwaway database built by
+init_db_schema(); pass --db to check an existing database instead.
+
+Run from language_learning_app/:
+    python -m backend.scripts.check_query_plans [--db backend/data/fluo.db]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+from backend import config
+
+
+# (description, sql, params, expected index)
+HOT_QUERIES = [
+    (
+        'streak: activities per language/type/day',
+        '''SELECT COUNT(*) FROM activity_history
+           WHERE language = ? AND activity_type = ? AND completed_date = ? AND score > 0''',
+        ('kannada', 'reading', '2026-01-01'),
+        'idx_activity_history_lang_type_date',
+    ),
+    (
+        '/api/daily-activities',
+        '''SELECT id, activity_type, language, completed_at FROM activity_history
+           WHERE user_id = 1 AND completed_date = ? ORDER BY completed_at DESC''',
+        ('2026-01-01',),
+        'idx_activity_history_user_completed_date',
+    ),
+    (
+        '/api/weekly-stats',
+        '''SELECT completed_date AS date, COUNT(*) FROM activity_history
+           WHERE user_id = 1 AND completed_at IS NOT NULL AND completed_at >= ?
+           GROUP BY completed_date''',
+        ('2026-01-01',),
+        'idx_activity_history_user_completed',
+    ),
+    (
+        'vocabulary by language and level',
+        'SELECT COUNT(*) FROM vocabulary WHERE language = ? AND level = ?',
+        ('kannada', 'a1'),
+        'idx_vocabulary_language_level',
+    ),
+    (
+        'word_states by mastery and due date',
+        '''SELECT COUNT(*) FROM word_states
+           WHERE user_id = ? AND mastery_level = ? AND next_review_date <= ?''',
+        (1, 'review', '2026-01-01'),
+        'idx_word_states_user_mastery_review',
+    ),
+    (
+        'vocabulary search key equality (find_word_by_translation)',
+        '''SELECT word_id FROM vocabulary_search_keys
+           WHERE language = ? AND field = 'translation' AND key = ?''',
+        ('kannada', 'ಮನೆ'),
+        'PRIMARY KEY (language=? AND field=? AND key=?)',
+    ),
+    (
+        'vocabulary search key prefix',
+        '''SELECT DISTINCT word_id FROM vocabulary_search_keys
+           WHERE language = ? AND field = 'transliteration' AND key >= ? AND key < ?''',
+        ('kannada', 'man', 'man\U0010ffff'),
+        'PRIMARY KEY (language=? AND field=? AND key>? AND key<?)',
+    ),
+    (
+        'vocabulary search keys of a word (delete/update triggers)',
+        'DELETE FROM vocabulary_search_keys WHERE word_id = ?',
+        (1,),
+        'idx_vocabulary_search_keys_word',
+    ),
+]
+
+
+def explain(cursor, sql: str, params) -> str:
+    cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+    return '\n'.join(row[3] for row in cursor.fetchall())
+
+
+def check_plans(conn) -> bool:
+    """Print each plan and return True if every query uses its expected index"""
+    cursor = conn.cursor()
+    all_ok = True
+    for description, sql, params, expected_index in HOT_QUERIES:
+        plan = explain(cursor, sql, params)
+        ok = expected_index in plan
+        all_ok = all_ok and ok
+        print(f"{'✓' if ok else '❌'} {description} (expects {expected_index})")
+        for line in plan.splitlines():
+            print(f"      {line}")
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='Existing database to check (migrations are applied to it)')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-plans-')
+    config.DB_PATH = os.path.abspath(args.db) if args.db else os.path.join(tmp_dir, config.DB_NAME)
+
+    try:
+        # Importing db runs init_db_schema(), which applies pending migrations
+        from backend import db  # noqa: F401
+        from backend import db_pool
+        conn = db_pool.get_connection()
+        ok = check_plans(conn)
+        conn.close()
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if not ok:
+        print("\n❌ Some hot queries are not using their indexes")
+        sys.exit(1)
+    print("\n✓ All hot queries use their indexes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Check that the FTS5 vocabulary search ranks results like the Python scoring.
+
+For each of the six languages, builds a set of queries from sampled vocabulary
+rows (exact English words, prefixes, inner substrings, transliterations with
+and without diacritics, native-script translations and one-letter typos) and
+compares the top-N of the fts5 engine (vocab_fts.py) against the in-memory
+index (vocab_search.py, which reuses calculate_similarity_score):
+
+    overlap    share of the reference top-N that fts5 also returns in its top-N
+    inversions share of adjacent fts5 results whose reference tier goes up
+               (tiers: exact > prefix > contains > edit distance)
+
+Fails (exit code 1) if the mean overlap or inversion rate is outside the
+thresholds.
+
+By default the vocabulary is loaded from the CSVs into a throwaway database;
+pass --db to run against a copy of an existing database instead.
+
+Run from language_learning_app/:
+    python -m backend.scripts.check_search_parity [--top 10] [--samples 40] [--db backend/data/fluo.db]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+from backend import config
+
+
+LANGUAGES = ['kannada', 'tamil', 'telugu', 'malayalam', 'hindi', 'urdu']
+
+
+def tier(score: float) -> int:
+    """Rank bucket of a calculate_similarity_score value (higher is better)"""
+    if score >= 1.0:
+        return 3  # exact
+    if score >= 0.9:
+        return 2  # prefix
+    if score >= 0.6:
+        return 1  # contains / high edit similarity
+    return 0      # edit distance
+
+
+def first_variant(text: str) -> str:
+    return (text or '').split('/')[0].strip()
+
+
+def build_queries(rows, samples: int, seed: int = 7):
+    """(kind, query) pairs drawn from sampled vocabulary rows"""
+    from backend.db import normalize_iast_diacritics
+    rng = random.Random(seed)
+    queries = []
+    for row in rng.sample(rows, min(samples, len(rows))):
+        english = first_variant(row['english_word']).split(' (')[0].lower()
+        translit = first_variant(row['transliteration']).lower()
+        translation = first_variant(row['translation'])
+        if english:
+            queries.append(('exact', english))
+            if len(english) >= 5:
+                queries.append(('prefix', english[:4]))
+                queries.append(('contains', english[1:5]))
+        if translit:
+            queries.append(('translit', translit))
+            queries.append(('normalized', normalize_iast_diacritics(translit)))
+            if len(translit) >= 6:
+                cut = rng.randrange(1, len(translit) - 1)
+                queries.append(('typo', translit[:cut] + translit[cut + 1:]))
+        if translation:
+            queries.append(('native', translation))
+    return queries
+
+
+def compare(language: str, queries, top: int):
+    """Per-kind [overlap, inversion_rate] lists for one language"""
+    from backend import vocab_fts, vocab_search
+
+    index = vocab_search.get_index(language)
+    results = {}
+    for kind, query in queries:
+        reference = index.search(query)
+        reference_scores = dict(reference)
+        reference_top = [word_id for word_id, _ in reference[:top]]
+
+        fts_result = vocab_fts.search_vocabulary(language, query, limit=top)
+        if fts_result is None:
+            raise RuntimeError('vocabulary_fts is not available in this database')
+        fts_top = [word['id'] for word in fts_result[0]]
+
+        if reference_top:
+            overlap = len(set(reference_top) & set(fts_top)) / len(reference_top)
+        else:
+            overlap = 1.0 if not fts_top else 0.0
+
+        tiers = [tier(reference_scores.get(word_id, 0.0)) for word_id in fts_top]
+        pairs = max(len(tiers) - 1, 1)
+        inversions = sum(1 for a, b in zip(tiers, tiers[1:]) if b > a) / pairs
+
+        results.setdefault(kind, []).append((overlap, inversions))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='Existing database to copy instead of loading the CSVs')
+    parser.add_argument('--top', type=int, default=10, help='Compare the top N results (default 10)')
+    parser.add_argument('--samples', type=int, default=40, help='Vocabulary rows sampled per language')
+    parser.add_argument('--min-overlap', type=float, default=0.9)
+    parser.add_argument('--max-inversions', type=float, default=0.05)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-parity-')
+    parity_db = os.path.join(tmp_dir, config.DB_NAME)
+    if args.db:
+        shutil.copy(args.db, parity_db)
+    config.DB_PATH = parity_db
+    config.VOCAB_SEARCH_ENGINE = 'memory'
+
+    try:
+        from backend import db, db_pool
+        if not args.db:
+            db.sync_vocab_from_csvs()
+
+        all_overlaps, all_inversions = [], []
+        for language in LANGUAGES:
+            conn = db_pool.get_connection()
+            conn.row_factory = db.sqlite3.Row
+            rows = conn.execute(
+                'SELECT english_word, translation, transliteration FROM vocabulary WHERE language = ?',
+                (language,)
+            ).fetchall()
+            conn.close()
+            if not rows:
+                print(f"  {language}: no vocabulary, skipping")
+                continue
+
+            results = compare(language, build_queries(rows, args.samples), args.top)
+            print(f"\n{language}")
+            for kind, values in sorted(results.items()):
+                overlaps = [o for o, _ in values]
+                inversions = [i for _, i in values]
+                all_overlaps.extend(overlaps)
+                all_inversions.extend(inversions)
+                print(f"  {kind:11s} n={len(values):3d}  overlap@{args.top} {sum(overlaps) / len(overlaps):.2f}"
+                      f"  inversions {sum(inversions) / len(inversions):.3f}")
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if not all_overlaps:
+        print("❌ No vocabulary to compare")
+        sys.exit(1)
+
+    mean_overlap = sum(all_overlaps) / len(all_overlaps)
+    mean_inversions = sum(all_inversions) / len(all_inversions)
+    print(f"\nOverall: overlap@{args.top} {mean_overlap:.3f} (min {args.min_overlap}), "
+          f"inversions {mean_inversions:.3f} (max {args.max_inversions})")
+    if mean_overlap < args.min_overlap or mean_inversions > args.max_inversions:
+        print("❌ fts5 ranking has drifted from the Python scoring")
+        sys.exit(1)
+    print("✓ fts5 ranking matches the Python scoring")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark the incremental goal streak (calculate_goal_based_streak).
+
+Builds a throwaway database and, for --histories random goal and activity
+histories (goals on some days of some weeks, met or missed at random, each
+with at least one missed goal day), checks the streak read from streak_days
+against:
+
+- the previous algorithm, a scan back over up to 365 days, for current_streak
+  and today_complete
+- a brute-force pass over every goal day for longest_streak (the scan only
+  ever saw the current run)
+
+then applies random writes (activities on past days scored, re-scored to 0 and
+deleted, week goals replaced through db.update_weekly_goals, some of them in
+raw SQL with no update_streak call) and checks after each that the
+incrementally maintained state equals a rebuild from history.
+
+Finally times the streak read against the scan for a user with --years of
+history. Exits with status 1 if a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.check_streak [--histories 30] [--writes 40] [--years 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from backend import config
+
+
+LANGUAGES = ['kannada', 'hindi']
+ACTIVITIES = ['reading', 'listening', 'writing']
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def median_ms(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def legacy_streak(db) -> dict:
+    """The streak as calculate_goal_based_streak computed it before streak_days"""
+    conn = db.get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    today = config.get_current_time().date()
+    current_streak = longest_streak = temp_streak = 0
+    today_complete = False
+    for days_ago in range(365):
+        check_date = today - timedelta(days=days_ago)
+        date_str = check_date.strftime('%Y-%m-%d')
+        cursor.execute('''
+            SELECT language, activity_type, target_count
+            FROM weekly_goals
+            WHERE week_start_date = ? AND day_of_week = ?
+        ''', (db.get_week_start(check_date).strftime('%Y-%m-%d'), check_date.strftime('%A').lower()))
+        goals = cursor.fetchall()
+        if not goals:
+            if days_ago == 0:
+                today_complete = True
+            continue
+        all_goals_met = True
+        for goal in goals:
+            cursor.execute('''
+                SELECT COUNT(*) as count FROM activity_history
+                WHERE language = ? AND activity_type = ? AND completed_date = ? AND score > 0
+            ''', (goal['language'], goal['activity_type'], date_str))
+            if cursor.fetchone()['count'] < goal['target_count']:
+                all_goals_met = False
+                break
+        if all_goals_met:
+            temp_streak += 1
+            if days_ago == 0:
+                today_complete = True
+                current_streak = temp_streak
+        else:
+            if days_ago == 0:
+                current_streak = temp_streak = 0
+            else:
+                current_streak = max(current_streak, temp_streak)
+                break
+        longest_streak = max(longest_streak, temp_streak)
+    conn.row_factory = None
+    conn.close()
+    return {'current_streak': current_streak, 'longest_streak': max(longest_streak, current_streak),
+            'today_complete': today_complete}
+
+
+def longest_run(db) -> int:
+    """Longest run of met goal days, by brute force over every goal day"""
+    conn = db.get_connection()
+    goal_days = {}
+    for week_start, day, language, activity, target in conn.execute(
+            "SELECT week_start_date, day_of_week, language, activity_type, target_count "
+            "FROM weekly_goals WHERE week_start_date != 'default'"):
+        date = (datetime.strptime(week_start, '%Y-%m-%d') + timedelta(days=DAYS.index(day))).strftime('%Y-%m-%d')
+        goal_days.setdefault(date, []).append((language, activity, target))
+    longest = run = 0
+    for date in sorted(goal_days):
+        met = all(conn.execute(
+            'SELECT COUNT(*) FROM activity_history WHERE completed_date = ? AND language = ? '
+            'AND activity_type = ? AND score > 0', (date, language, activity)).fetchone()[0] >= target
+                  for language, activity, target in goal_days[date])
+        run = run + 1 if met else 0
+        longest = max(longest, run)
+    conn.close()
+    return longest
+
+
+def add_activities(conn, rows):
+    conn.executemany('''
+        INSERT INTO activity_history (user_id, language, activity_type, activity_data, score, started_at, completed_at)
+        VALUES (1, ?1, ?2, '', ?3, ?4, ?4)
+    ''', rows)
+
+
+def seed_history(db, rng: random.Random, weeks: int):
+    """Random week goals over the last `weeks` weeks, each goal day met with probability 0.85"""
+    conn = db.get_connection()
+    for table in ('weekly_goals', 'activity_history', 'streak_state'):
+        conn.execute(f'DELETE FROM {table}')
+    today = config.get_current_time().date()
+    this_monday = today - timedelta(days=today.weekday())
+    goals, activities = [], []
+    missed = False
+    for weeks_ago in range(weeks - 1, -1, -1):
+        if rng.random() < 0.1:
+            continue  # A week without goals
+        monday = this_monday - timedelta(weeks=weeks_ago)
+        for index, day in enumerate(DAYS):
+            date = monday + timedelta(days=index)
+            if date > today or rng.random() < 0.2:
+                continue
+            day_goals = rng.sample([(l, a) for l in LANGUAGES for a in ACTIVITIES], rng.randint(1, 3))
+            met = rng.random() < 0.85 and missed  # The first goal day is always missed
+            missed = True
+            for language, activity in day_goals:
+                target = rng.randint(1, 2)
+                goals.append((language, activity, day, monday.strftime('%Y-%m-%d'), target))
+                done = target if met else rng.randint(0, target - 1)
+                # Unscored attempts don't count
+                activities += [(language, activity, 0.0, date.strftime('%Y-%m-%d 09:00:00'))] * rng.randint(0, 1)
+                activities += [(language, activity, 0.8, date.strftime('%Y-%m-%d 18:30:00'))] * done
+    conn.executemany('''
+        INSERT INTO weekly_goals (language, activity_type, day_of_week, week_start_date, target_count)
+        VALUES (?, ?, ?, ?, ?)
+    ''', goals)
+    add_activities(conn, activities)
+    conn.commit()
+    conn.close()
+
+
+def random_write(db, rng: random.Random, weeks: int) -> str:
+    """One random goal or activity write on a recent or past day"""
+    today = config.get_current_time().date()
+    date = today - timedelta(days=rng.randint(0, weeks * 7 - 1))
+    language, activity = rng.choice(LANGUAGES), rng.choice(ACTIVITIES)
+    conn = db.get_connection()
+    kind = rng.choice(['activity', 'activity', 'rescore', 'delete', 'goals'])
+    if kind == 'activity':
+        add_activities(conn, [(language, activity, 1.0, date.strftime('%Y-%m-%d 20:00:00'))])
+    elif kind in ('rescore', 'delete'):
+        row = conn.execute('SELECT id FROM activity_history WHERE score > 0 ORDER BY RANDOM() LIMIT 1').fetchone()
+        if row:
+            if kind == 'rescore':
+                conn.execute('UPDATE activity_history SET score = 0 WHERE id = ?', (row[0],))
+            else:
+                conn.execute('DELETE FROM activity_history WHERE id = ?', (row[0],))
+    conn.commit()
+    conn.close()
+    if kind == 'goals':
+        week_goals = {day: {activity: rng.randint(1, 2)} for day in rng.sample(DAYS, rng.randint(0, 4))}
+        with contextlib.redirect_stdout(io.StringIO()):  # SRS quota sync report
+            db.update_weekly_goals(language, week_goals, db.get_week_start(
+                datetime.combine(date, datetime.min.time())).strftime('%Y-%m-%d'))
+    elif rng.random() < 0.7:
+        # Otherwise left to the next read
+        db.update_streak()
+    return kind
+
+
+def rebuild(db):
+    """db.rebuild_streak_state without the report"""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    db._rebuild_streak_state(cursor)
+    conn.commit()
+    conn.close()
+
+
+def state(db):
+    conn = db.get_connection()
+    rows = conn.execute('SELECT date, met, run FROM streak_days ORDER BY date').fetchall()
+    longest = conn.execute('SELECT longest_run FROM streak_state').fetchone()
+    conn.close()
+    return rows, longest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--histories', type=int, default=30, help='Random histories to check')
+    parser.add_argument('--weeks', type=int, default=30, help='Weeks of history in each')
+    parser.add_argument('--writes', type=int, default=40, help='Random writes applied to each history')
+    parser.add_argument('--years', type=int, default=3, help='History of the benchmarked user')
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-streak-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    config.VOCAB_SEARCH_ENGINE = 'legacy'
+    try:
+        from backend import db, db_pool
+        db.init_db_schema()
+
+        print(f"\n{args.histories} histories of {args.weeks} weeks, {args.writes} writes each\n")
+        mismatched_scan = mismatched_longest = drifted = 0
+        kinds = {}
+        for _ in range(args.histories):
+            seed_history(db, rng, args.weeks)
+            streak = db.calculate_goal_based_streak()
+            legacy = legacy_streak(db)
+            if (streak['current_streak'], streak['today_complete']) != \
+                    (legacy['current_streak'], legacy['today_complete']):
+                mismatched_scan += 1
+                print(f"    scan mismatch: {streak} vs {legacy}")
+            mismatched_longest += streak['longest_streak'] != longest_run(db)
+            for _ in range(args.writes):
+                kind = random_write(db, rng, args.weeks)
+                kinds[kind] = kinds.get(kind, 0) + 1
+                streak = db.calculate_goal_based_streak()
+                incremental = state(db)
+                rebuild(db)
+                if state(db) != incremental or db.calculate_goal_based_streak() != streak:
+                    drifted += 1
+                    print(f"    drift after a {kind} write")
+        check(not mismatched_scan, "current streak and today_complete match the 365-day scan")
+        check(not mismatched_longest, "longest streak matches a pass over every goal day")
+        check(not drifted, f"incremental state equals a rebuild after every write "
+                           f"({', '.join(f'{n} {kind}' for kind, n in sorted(kinds.items()))})")
+
+        # A long-time user: the same goals every day for --years, all met
+        conn = db.get_connection()
+        for table in ('weekly_goals', 'activity_history', 'streak_state'):
+            conn.execute(f'DELETE FROM {table}')
+        today = config.get_current_time().date()
+        days = [today - timedelta(days=n) for n in range(args.years * 365)]
+        mondays = sorted({day - timedelta(days=day.weekday()) for day in days})
+        conn.executemany('''
+            INSERT INTO weekly_goals (language, activity_type, day_of_week, week_start_date, target_count)
+            VALUES (?, ?, ?, ?, 1)
+        ''', [(language, activity, day, monday.strftime('%Y-%m-%d'))
+              for monday in mondays for day in DAYS for language in LANGUAGES for activity in ACTIVITIES])
+        add_activities(conn, [(language, activity, 0.9, day.strftime('%Y-%m-%d 12:00:00'))
+                              for day in days for language in LANGUAGES for activity in ACTIVITIES])
+        conn.commit()
+        conn.close()
+        rebuilt = median_ms(db.rebuild_streak_state, 3)
+        streak = db.calculate_goal_based_streak()
+        legacy = legacy_streak(db)
+        read_ms = median_ms(db.calculate_goal_based_streak, 50)
+        scan_ms = median_ms(lambda: legacy_streak(db))
+        print(f"\n  {args.years}-year history: scan {scan_ms:.2f}ms, read {read_ms:.3f}ms, rebuild {rebuilt:.1f}ms")
+        print(f"  streak {streak['current_streak']} (longest {streak['longest_streak']}); "
+              f"the scan reported {legacy['current_streak']} (longest {legacy['longest_streak']})\n")
+        check(streak['current_streak'] == len(days) == streak['longest_streak'],
+              "an unbroken history counts every day, not only the last 365")
+        check(read_ms < scan_ms, "read faster than the scan")
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark the cached user level summaries (calculate_user_level).
+
+Builds a throwaway database with a synthetic --words word vocabulary CSV
+spread over the CEFR levels and a random set of mastered words, then:
+
+- times the from-scratch aggregate over vocabulary and word_states against
+  calculate_user_level served from user_level_summary
+- applies flashcard and activity reviews, a bulk level update, custom word
+  inserts and a vocabulary re-sync that drops, adds and re-levels rows, and
+  checks after each step that the summary matches a recount from scratch
+  (db.check_level_summaries) and that calculate_user_level is unchanged by
+  rebuilding the summary
+- writes word_states behind the summary's back and checks the consistency
+  check finds and repairs the drift
+
+Exits with status 1 if a check fails.
+
+Run from language_learning_app/:
+    python -m backend.scripts.check_user_level [--words 5000] [--reads 200]
+"""
+import argparse
+import csv
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from backend import config
+
+
+LANGUAGE = 'kannada'
+LEVELS = ['a1', 'a2', 'b1', 'b2', 'c1', 'c2', '']
+
+failures = []
+
+
+def check(ok: bool, message: str):
+    print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+
+
+def write_csv(path: str, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['english_word', 'translation', 'transliteration', 'word_class', 'level'])
+        writer.writerows(rows)
+
+
+def median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def check_consistent(db, step: str):
+    result = db.check_level_summaries(repair=False)
+    check(not result['mismatches'], f"{step}: summary matches a recount")
+    level = db.calculate_user_level(LANGUAGE)
+    conn = db.get_connection()
+    conn.execute('DELETE FROM user_level_summary')
+    conn.commit()
+    conn.close()
+    check(db.calculate_user_level(LANGUAGE) == level, f"{step}: level unchanged by a rebuild ({level['level']}, "
+                                                      f"{level['total_mastered']} mastered)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=5000, help='Vocabulary rows')
+    parser.add_argument('--reads', type=int, default=200, help='Timed reads of each kind')
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-user-level-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    config.VOCAB_DIR = tmp_dir
+    config.KANNADA_VOCAB_FILE = os.path.join(tmp_dir, 'kannada-oxford-5000.csv')
+    config.VOCAB_SEARCH_ENGINE = 'legacy'
+    try:
+        from backend import db, db_pool
+        db.init_db_schema()
+        rows = [[f'word {i}', f'ಪದ {i}', f'pada {i}', 'noun', LEVELS[i * len(LEVELS) // args.words]]
+                for i in range(args.words)]
+        write_csv(config.KANNADA_VOCAB_FILE, rows)
+        db.load_vocabulary_from_csv(LANGUAGE)
+
+        conn = db.get_connection()
+        word_ids = [row[0] for row in conn.execute('SELECT id FROM vocabulary WHERE language = ?', (LANGUAGE,))]
+        conn.executemany('''
+            INSERT INTO word_states (word_id, user_id, mastery_level, review_count, ease_factor)
+            VALUES (?, 1, ?, 3, 2.5)
+        ''', [(word_id, rng.choice(['mastered', 'mastered', 'learning', 'review'])) for word_id in word_ids])
+        conn.commit()
+        conn.close()
+
+        print(f"\n{args.words} words; {args.reads} reads each\n")
+
+        def scratch():
+            conn = db.get_connection()
+            db._compute_level_summary(conn.cursor(), LANGUAGE, 1)
+            conn.close()
+
+        scratch_ms = median_ms(scratch, args.reads)
+        level = db.calculate_user_level(LANGUAGE)
+        cached_ms = median_ms(lambda: db.calculate_user_level(LANGUAGE), args.reads)
+        print(f"  from scratch {scratch_ms:7.3f}ms   summary {cached_ms:7.3f}ms   ({scratch_ms / cached_ms:.0f}x)")
+        print(f"  level {level['level']}, {level['progress']}% towards {level['next_level']}, "
+              f"{level['total_mastered']} mastered\n")
+        check_consistent(db, "initial build")
+
+        for word_id in rng.sample(word_ids, 300):
+            db.update_word_state_from_flashcard(word_id, 1, rng.choice(['again', 'hard', 'good', 'easy']))
+        for word_id in rng.sample(word_ids, 100):
+            db.update_word_state(word_id, 1, rng.random() < 0.7)
+        check_consistent(db, "after 400 reviews")
+
+        db.bulk_update_word_states_by_level(LANGUAGE, 'B1', 'mastered')
+        db.bulk_update_word_states_by_level(LANGUAGE, 'a1', 'learning')
+        check_consistent(db, "after bulk level updates")
+
+        for i, word_level in enumerate(['A2', 'c1', None]):
+            db.insert_vocabulary_entry(LANGUAGE, f'custom {i}', f'ಹೊಸ {i}', f'hosa {i}', 'noun', word_level)
+        check_consistent(db, "after custom word inserts")
+
+        # Re-sync: drop 200 rows, move 200 to another level, add 100
+        rng.shuffle(rows)
+        rows = rows[200:]
+        for row in rows[:200]:
+            row[4] = rng.choice([l for l in LEVELS if l != row[4]])
+        rows += [[f'extra word {i}', f'ಇನ್ನೊಂದು {i}', f'innondu {i}', 'verb', rng.choice(LEVELS)] for i in range(100)]
+        write_csv(config.KANNADA_VOCAB_FILE, rows)
+        result = db.load_vocabulary_from_csv(LANGUAGE)
+        print(f"  re-sync: {result['inserted']} inserted, {result['updated']} updated, {result['deleted']} deleted")
+        check_consistent(db, "after vocabulary re-sync")
+
+        conn = db.get_connection()
+        conn.execute("UPDATE word_states SET mastery_level = 'mastered' WHERE word_id IN "
+                     "(SELECT word_id FROM word_states WHERE mastery_level != 'mastered' LIMIT 50)")
+        conn.commit()
+        conn.close()
+        found = db.check_level_summaries()
+        check(len(found['mismatches']) == 1, "direct word_states writes detected")
+        check(not db.check_level_summaries(repair=False)['mismatches'], "drift repaired")
+
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
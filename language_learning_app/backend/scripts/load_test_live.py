@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Load test the live conversation relay against the local fake Gemini Live.
+
+Runs many concurrent sessions through handle_websocket_conversation, each
+with a scripted client WebSocket that streams microphone PCM in real time (or
+in bursts) and reads model speech back, some of them deliberately slow. Gemini
+is replaced by fake_gemini_live.FakeGeminiLiveClient. Reports mic-to-Gemini
+and Gemini-to-client latency, merged across sessions, plus what the relay
+dropped or coalesced.
+
+Run from language_learning_app/:
+    python -m backend.scripts.load_test_live [--sessions 20] [--seconds 10] [--slow-fraction 0.25]
+        [--client-delay-ms 20] [--gemini-send-ms 2] [--policy coalesce|drop_oldest] [--burst]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from backend import config
+
+
+MIC_BYTES_PER_SECOND = 16000 * 2
+
+
+class ScriptedWebSocket:
+    """Client side of one session: start, stream mic audio, end; optionally slow to read"""
+
+    def __init__(self, seconds: float, mic_chunk_ms: int, burst: bool, send_delay_ms: float):
+        from backend import live_frames
+        self.frames = live_frames
+        self.seconds = seconds
+        self.mic_chunk_ms = mic_chunk_ms
+        self.burst = burst
+        self.send_delay = send_delay_ms / 1000
+        self.session = None
+        self.audio_frames = 0
+        self.turns = 0
+        self._script = self._messages()
+
+    async def _messages(self):
+        yield {"type": "websocket.receive", "text": json.dumps({"type": "start_session", "config": {}})}
+        chunk = os.urandom(int(MIC_BYTES_PER_SECOND * self.mic_chunk_ms / 1000) & ~1)
+        chunks = int(self.seconds * 1000 / self.mic_chunk_ms)
+        per_second = max(1, 1000 // self.mic_chunk_ms)
+        for seq in range(chunks):
+            if self.burst:
+                # A second's worth at once, then nothing (e.g. a stalled mobile uplink)
+                if seq % per_second == 0 and seq:
+                    await asyncio.sleep(1.0)
+            else:
+                await asyncio.sleep(self.mic_chunk_ms / 1000)
+            yield {"type": "websocket.receive",
+                   "bytes": self.frames.encode_frame(self.frames.KIND_AUDIO_IN, chunk, seq)}
+        await asyncio.sleep(0.5)
+        yield {"type": "websocket.receive", "text": json.dumps({"type": "end_session"})}
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        if self.session is None:
+            from backend.websocket_conversation import manager
+            self.session = next(s for s in manager.active_sessions.values() if s.websocket is self)
+        try:
+            return await self._script.__anext__()
+        except StopAsyncIteration:
+            return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send_bytes(self, data: bytes):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.audio_frames += 1
+
+    async def send_text(self, text: str):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        if '"response_complete"' in text:
+            self.turns += 1
+
+
+async def run_sessions(args):
+    from backend.websocket_conversation import handle_websocket_conversation
+    from backend.live_relay import LatencyHistogram
+
+    sockets = []
+    for i in range(args.sessions):
+        slow = i < int(args.sessions * args.slow_fraction)
+        sockets.append(ScriptedWebSocket(args.seconds, args.mic_chunk_ms, args.burst,
+                                         args.client_delay_ms if slow else 0))
+    start = time.perf_counter()
+    await asyncio.gather(*(handle_websocket_conversation(ws) for ws in sockets))
+    elapsed = time.perf_counter() - start
+
+    merged = {'mic_to_gemini': LatencyHistogram(), 'gemini_to_client': LatencyHistogram()}
+    totals = {'mic_received': 0, 'mic_sent': 0, 'mic_coalesced': 0, 'mic_dropped_overflow': 0,
+              'mic_dropped_stale': 0, 'audio_frames_dropped': 0, 'audio_frames_delivered': 0, 'turns': 0}
+    for ws in sockets:
+        session = ws.session
+        merged['mic_to_gemini'].merge(session.mic_to_gemini)
+        merged['gemini_to_client'].merge(session.gemini_to_client)
+        mic = session.mic_buffer.stats()
+        totals['mic_received'] += mic['received']
+        totals['mic_sent'] += mic['sent']
+        totals['mic_coalesced'] += mic['coalesced']
+        totals['mic_dropped_overflow'] += mic['dropped_overflow']
+        totals['mic_dropped_stale'] += mic['dropped_stale']
+        totals['audio_frames_dropped'] += session.client_queue.stats()['dropped_audio']
+        totals['audio_frames_delivered'] += ws.audio_frames
+        totals['turns'] += ws.turns
+    return elapsed, merged, totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=10.0, help='Microphone audio streamed per session')
+    parser.add_argument('--mic-chunk-ms', type=int, default=100)
+    parser.add_argument('--burst', action='store_true', help='Send mic audio in one-second bursts')
+    parser.add_argument('--slow-fraction', type=float, default=0.25, help='Share of clients that read slowly')
+    parser.add_argument('--client-delay-ms', type=float, default=20.0, help='Per-message delay of slow clients')
+    parser.add_argument('--gemini-send-ms', type=float, default=2.0, help='Fake Gemini time per send_audio')
+    parser.add_argument('--policy', choices=['coalesce', 'drop_oldest'], default=config.LIVE_MIC_OVERFLOW_POLICY)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='fluo-live-load-')
+    config.DB_PATH = os.path.join(tmp_dir, config.DB_NAME)
+    config.AUDIO_STORE_DIR = os.path.join(tmp_dir, 'audio')
+    config.LIVE_FAKE_GEMINI = True
+    config.LIVE_MIC_OVERFLOW_POLICY = args.policy
+    # All sessions start at once, so the warm pool has nothing to offer here
+    config.LIVE_POOL_ENABLED = False
+
+    from backend import websocket_conversation, fake_gemini_live, db_pool
+    websocket_conversation.FakeGeminiLiveClient = functools.partial(
+        fake_gemini_live.FakeGeminiLiveClient, send_latency_ms=args.gemini_send_ms
+    )
+
+    try:
+        elapsed, merged, totals = asyncio.run(run_sessions(args))
+        db_pool.close_all_pools()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\n{args.sessions} sessions x {args.seconds}s mic ({'bursts' if args.burst else 'real time'}), "
+          f"{int(args.sessions * args.slow_fraction)} slow clients (+{args.client_delay_ms}ms/message), "
+          f"policy={args.policy}, took {elapsed:.1f}s\n")
+    print(f"{'latency':18s} {'count':>7s} {'avg ms':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}")
+    for name, histogram in merged.items():
+        s = histogram.stats()
+        print(f"{name:18s} {s['count']:7d} {s['avg_ms']:8.1f} {s['p50_ms']:8.1f} {s['p95_ms']:8.1f}"
+              f" {s['p99_ms']:8.1f} {s['max_ms']:8.1f}")
+    print()
+    for key, value in totals.items():
+        print(f"{key:24s} {value}")
+
+
+if __name__ == '__main__':
+    main()
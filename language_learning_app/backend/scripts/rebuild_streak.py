@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Backfill or repair the goal streak state (streak_days / streak_state).
+
+Recomputes every goal day's result and run from weekly_goals and
+activity_history. Needed once for a database whose history predates the
+streak tables (the first streak read also does it), and after editing goals
+or activities in a way the dirty-day triggers can't see (e.g. a restored
+backup of one table).
+
+Run from language_learning_app/:
+    python -m backend.scripts.rebuild_streak [--db path/to/fluo.db]
+"""
+import argparse
+
+from backend import config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=config.DB_PATH, help='Database to rebuild (default: the app database)')
+    args = parser.parse_args()
+
+    config.DB_PATH = args.db
+    from backend import db, db_pool
+    db.init_db_schema()
+    before = db.calculate_goal_based_streak()
+    db.rebuild_streak_state()
+    after = db.calculate_goal_based_streak()
+    print(f"current {before['current_streak']} -> {after['current_streak']}, "
+          f"longest {before['longest_streak']} -> {after['longest_streak']}, "
+          f"today complete: {after['today_complete']}")
+    db_pool.close_all_pools()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Sync lesson and unit JSON files (backend/lessons/) into the database.
+
+Only files whose content changed since the last sync (per the sync_manifest
+table) are re-parsed; units/lessons whose file was removed are deleted.
+
+    --check  report drift between the files and the database without writing;
+             exits 1 if anything would change
+    --force  re-parse and upsert every file
+
+Run from language_learning_app/:
+    python -m backend.scripts.sync_lessons [--check] [--force] [--db backend/data/fluo.db]
+"""
+import argparse
+import sys
+
+from backend import config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help=f'Database to sync (default {config.DB_PATH})')
+    parser.add_argument('--check', action='store_true', help='Report drift only, do not write')
+    parser.add_argument('--force', action='store_true', help='Re-parse every file')
+    args = parser.parse_args()
+
+    if args.db:
+        config.DB_PATH = args.db
+
+    from backend import db
+    summary = db.sync_lessons_from_files(force=args.force, check=args.check)
+
+    if not args.check:
+        return
+
+    drift = [('added', path) for path in summary['added']]
+    drift += [('changed', path) for path in summary['changed']]
+    drift += [('removed', path) for path in summary['removed']]
+    for kind, path in drift:
+        print(f"  {kind:8s} {path}")
+    if drift:
+        print(f"❌ {len(drift)} lesson file(s) out of sync ({summary['unchanged']} unchanged)")
+        sys.exit(1)
+    print(f"✓ Lessons in sync ({summary['unchanged']} files unchanged)")
+
+
+if __name__ == '__main__':
+    main()
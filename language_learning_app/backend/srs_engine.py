@@ -0,0 +1,605 @@
+"""
+SRS engine: the scheduling rules for every review path, per card and batched.
+
+Per card (used by db.py for flashcard and activity reviews and the interval
+preview, and by /api/srs/simulate):
+
+    schedule_flashcard(mastery_level, review_count, ease_factor, rating, settings)
+    schedule_activity(mastery_level, review_count, ease_factor, correct, settings)
+    preview_flashcard(mastery_level, review_count, ease_factor, settings)
+    simulate_interval(response, current_interval, ease_factor, ...)
+
+`settings` is the dict from db.get_srs_settings_for_language (ease bounds,
+increment/decrement, default ease).
+
+Batched over NumPy arrays, one element per card:
+
+    schedule_flashcard_batch()  the flashcard rules for many cards at once
+    reschedule()                move cards into new ease bounds (after a settings
+                                change), scaling their intervals to match
+    fit_memory_model()          fit an FSRS-style memory model to review_history
+    memory_states()             each card's stability under a fitted model
+    simulate_workload()         Monte-Carlo forecast of reviews per day
+
+Mastery levels and ratings travel as small integer codes in the batched
+functions (MASTERY_CODES / RATING_CODES, -1 for anything else).
+
+The per-card functions need nothing beyond the standard library;
+schedule_flashcard_batch() and reschedule() fall back to a loop without
+NumPy, the model fit and the simulator require it.
+"""
+import math
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+RATINGS = ('again', 'hard', 'good', 'easy')
+RATING_CODES = {rating: code for code, rating in enumerate(RATINGS)}
+AGAIN, HARD, GOOD, EASY = range(4)
+
+MASTERY_LEVELS = ('new', 'learning', 'review', 'mastered')
+MASTERY_CODES = {level: code for code, level in enumerate(MASTERY_LEVELS)}
+NEW, LEARNING, REVIEW, MASTERED = range(4)
+
+# Share of each rating by mastery level before the review, used by the
+# simulator when review_history has little to go on (rows: MASTERY_LEVELS,
+# columns: RATINGS)
+DEFAULT_RATING_PROBS = (
+    (0.25, 0.25, 0.40, 0.10),
+    (0.20, 0.25, 0.45, 0.10),
+    (0.10, 0.20, 0.55, 0.15),
+    (0.05, 0.15, 0.55, 0.25),
+)
+
+
+# ============================================================================
+# Per-card scheduling
+# ============================================================================
+
+def schedule_flashcard(mastery_level: str, review_count: int, ease_factor: float,
+                       rating: str, settings: Dict) -> Tuple[str, float, int]:
+    """Mastery level, ease factor and interval in days after a flashcard review
+
+    review_count includes this review. An interval of 0 means the card comes
+    back in the same session.
+
+    - Easy: Largest increase in ease factor, longest interval
+    - Good: Standard SRS progression, moderate ease increase
+    - Hard: Shorter interval, moderate ease decrease
+    - Again: Reset to beginning, significant ease decrease
+    """
+    if rating == 'again':
+        return 'learning', max(settings['min_ease_factor'], ease_factor - settings['ease_factor_decrement'] * 2), 0
+    if rating == 'hard':
+        return 'learning', max(settings['min_ease_factor'], ease_factor - settings['ease_factor_decrement']), 1
+    if rating not in ('good', 'easy'):
+        # Unknown rating: see the card again tomorrow, ease unchanged
+        return 'learning', ease_factor, 1
+
+    if rating == 'good':
+        young_factor, old_factor, increment = 0.5, 1.0, settings['ease_factor_increment'] * 0.5
+    else:
+        young_factor, old_factor, increment = 1.2, 1.3, settings['ease_factor_increment']
+
+    if mastery_level == 'new' or mastery_level == 'learning':
+        mastery_level = 'learning'
+        interval_days = max(1, int(review_count * ease_factor * young_factor))
+    else:
+        if mastery_level == 'review' and review_count >= 3:
+            mastery_level = 'mastered'
+        interval_days = int(review_count * ease_factor * old_factor)
+
+    return mastery_level, min(settings['max_ease_factor'], ease_factor + increment), interval_days
+
+
+def schedule_activity(mastery_level: str, review_count: int, ease_factor: float,
+                      correct: bool, settings: Dict) -> Tuple[str, float, int]:
+    """Mastery level, ease factor and interval in days after a word is used in an activity
+
+    review_count is the count before this review (simplified SM-2: new words
+    step through learning and review before the ease factor sets the interval).
+    """
+    if not correct:
+        return 'learning', max(settings['min_ease_factor'], ease_factor - settings['ease_factor_decrement']), 1
+
+    if mastery_level == 'new':
+        mastery_level, interval_days = 'learning', 1
+    elif mastery_level == 'learning':
+        mastery_level, interval_days = 'review', 3
+    else:
+        if mastery_level == 'review' and review_count >= 3:
+            mastery_level = 'mastered'
+        interval_days = int(ease_factor * 2)
+
+    return mastery_level, min(settings['max_ease_factor'], ease_factor + settings['ease_factor_increment']), interval_days
+
+
+def preview_flashcard(mastery_level: str, review_count: int, ease_factor: float,
+                      settings: Dict) -> Dict[str, Tuple[str, float, int]]:
+    """schedule_flashcard for each rating; review_count is the count so far"""
+    return {
+        rating: schedule_flashcard(mastery_level, review_count + 1, ease_factor, rating, settings)
+        for rating in RATINGS
+    }
+
+
+def simulate_interval(response: str, current_interval: float, ease_factor: float,
+                      ease_increment: float = 0.15, ease_decrement: float = 0.20,
+                      min_ease: float = 1.3, max_ease: float = 2.5,
+                      interval_multiplier: float = 1.0) -> Tuple[float, float]:
+    """(interval in days, ease factor) for the settings screen's interval calculator
+
+    Anki-style SM-2 on a card's current interval, so users can see how the
+    ease and interval settings play out.
+    """
+    new_ease = ease_factor
+
+    if response == "again":
+        # Failed: Reset to learning steps, decrease ease
+        new_ease = max(min_ease, ease_factor - ease_decrement)
+        if current_interval == 0:
+            interval = 0  # Show again today (0 * multiplier = 0)
+        else:
+            interval = max(1, current_interval * 0.5 * interval_multiplier)
+
+    elif response == "hard":
+        # Hard: Multiply by 1.2, slight ease decrease
+        new_ease = max(min_ease, ease_factor - ease_decrement * 0.5)
+        if current_interval == 0:
+            interval = 1 * interval_multiplier
+        else:
+            interval = max(1, current_interval * 1.2 * interval_multiplier)
+
+    elif response == "good":
+        # Good: Normal progression, slight ease increase
+        new_ease = min(max_ease, ease_factor + ease_increment)
+        if current_interval == 0:
+            interval = 1 * interval_multiplier
+        elif current_interval == 1:
+            interval = 6 * interval_multiplier
+        else:
+            interval = current_interval * new_ease * interval_multiplier
+
+    elif response == "easy":
+        # Easy: Larger jump, bigger ease increase
+        new_ease = min(max_ease, ease_factor + ease_increment * 1.5)
+        if current_interval == 0:
+            interval = 4 * interval_multiplier
+        else:
+            interval = current_interval * new_ease * 1.3 * interval_multiplier
+
+    else:
+        interval = current_interval * interval_multiplier
+
+    return round(interval, 1), new_ease
+
+
+# ============================================================================
+# Batched scheduling
+# ============================================================================
+
+def schedule_flashcard_batch(mastery, review_count, ease_factor, rating, settings: Dict):
+    """schedule_flashcard over arrays of cards
+
+    mastery and rating are MASTERY_CODES / RATING_CODES; review_count includes
+    this review. Returns (mastery codes, ease factors, interval days) arrays,
+    element for element what schedule_flashcard returns.
+    """
+    if not HAS_NUMPY:
+        results = [
+            schedule_flashcard(MASTERY_LEVELS[m] if 0 <= m < 4 else None, c, e,
+                               RATINGS[r] if 0 <= r < 4 else None, settings)
+            for m, c, e, r in zip(mastery, review_count, ease_factor, rating)
+        ]
+        return ([MASTERY_CODES.get(m, -1) for m, _, _ in results],
+                [e for _, e, _ in results], [i for _, _, i in results])
+
+    mastery = np.asarray(mastery, dtype=np.int8)
+    rating = np.asarray(rating, dtype=np.int8)
+    count = np.asarray(review_count, dtype=np.float64)
+    ease = np.asarray(ease_factor, dtype=np.float64)
+
+    # Per-rating tables; index -1 (the last entry) is an unknown rating
+    decrement, increment = settings['ease_factor_decrement'], settings['ease_factor_increment']
+    ease_change = np.array([-(decrement * 2), -decrement, increment * 0.5, increment, 0.0])
+    fixed_interval = np.array([0, 1, 0, 0, 1])
+    young_factor = np.array([0.0, 0.0, 0.5, 1.2, 0.0])
+    old_factor = np.array([0.0, 0.0, 1.0, 1.3, 0.0])
+
+    young = (mastery == NEW) | (mastery == LEARNING)
+    passed = (rating == GOOD) | (rating == EASY)
+
+    # Same operation order as schedule_flashcard, so intervals truncate alike
+    base = count * ease
+    interval = np.where(
+        passed,
+        np.where(young, np.maximum(1, np.floor(base * young_factor[rating])), np.floor(base * old_factor[rating])),
+        fixed_interval[rating],
+    ).astype(np.int64)
+
+    changed = ease + ease_change[rating]
+    new_ease = np.where(rating == AGAIN, np.maximum(settings['min_ease_factor'], changed),
+                        np.where(rating == HARD, np.maximum(settings['min_ease_factor'], changed),
+                                 np.where(passed, np.minimum(settings['max_ease_factor'], changed), ease)))
+
+    promoted = np.where((mastery == REVIEW) & (count >= 3), MASTERED, mastery)
+    new_mastery = np.where(passed & ~young, promoted, LEARNING).astype(np.int8)
+    return new_mastery, new_ease, interval
+
+
+def reschedule(ease_factor, interval_days, settings: Dict):
+    """Fit cards into the ease bounds in `settings`
+
+    Cards whose ease factor falls outside [min_ease_factor, max_ease_factor]
+    are clamped, and their interval is scaled by the same ratio (intervals of
+    0 stay 0, others stay at least a day). Returns (ease factors, intervals,
+    changed mask).
+    """
+    min_ease, max_ease = settings['min_ease_factor'], settings['max_ease_factor']
+    if not HAS_NUMPY:
+        eases, intervals, changed = [], [], []
+        for ease, interval in zip(ease_factor, interval_days):
+            clamped = min(max_ease, max(min_ease, ease))
+            if clamped != ease and interval > 0:
+                interval = max(1, int(round(interval * clamped / ease)))
+            eases.append(clamped)
+            intervals.append(interval)
+            changed.append(clamped != ease)
+        return eases, intervals, changed
+
+    ease = np.asarray(ease_factor, dtype=np.float64)
+    interval = np.asarray(interval_days, dtype=np.int64)
+    clamped = np.clip(ease, min_ease, max_ease)
+    changed = clamped != ease
+    scaled = np.maximum(1, np.rint(interval * clamped / ease)).astype(np.int64)
+    new_interval = np.where(changed & (interval > 0), scaled, interval)
+    return clamped, new_interval, changed
+
+
+# ============================================================================
+# Memory model
+# ============================================================================
+
+# FSRS-style model of how well a card is remembered. A card has a stability S
+# (days until recall probability falls to 90%), and after t days
+#
+#     R = (1 + t / (9 S)) ** -1
+#
+# The first review sets S from its rating; later reviews update it from the
+# retrievability R at the time of the review:
+#
+#     recalled:  S *= 1 + e^growth * S^-stability_decay * (e^((1 - R) retrievability_gain) - 1) * bonus
+#                (bonus is hard_penalty for 'hard', easy_bonus for 'easy', else 1)
+#     forgotten: S = min(S, lapse_scale * ((S + 1)^lapse_power - 1) * e^((1 - R) lapse_gain))
+#
+# Only the first review of a card on a given day counts.
+MEMORY_PARAM_NAMES = (
+    'init_again', 'init_hard', 'init_good', 'init_easy',
+    'growth', 'stability_decay', 'retrievability_gain', 'hard_penalty', 'easy_bonus',
+    'lapse_scale', 'lapse_power', 'lapse_gain',
+)
+DEFAULT_MEMORY_PARAMS = (0.4, 1.2, 3.0, 12.0, 3.0, 0.15, 1.0, 0.5, 1.5, 1.8, 0.3, 2.0)
+MEMORY_PARAM_BOUNDS = (
+    (0.05, 100.0), (0.05, 100.0), (0.05, 365.0), (0.05, 365.0),
+    (0.0, 5.0), (0.0, 0.8), (0.01, 3.0), (0.05, 1.0), (1.0, 4.0),
+    (0.05, 5.0), (0.01, 0.9), (0.01, 4.0),
+)
+MIN_STABILITY = 0.01
+MAX_STABILITY = 36500.0
+
+
+def retrievability(elapsed_days, stability):
+    """Recall probability after elapsed_days for the given stability"""
+    return 1.0 / (1.0 + elapsed_days / (9.0 * stability))
+
+
+def _next_stability(params, stability, elapsed, rating):
+    """Stability after a review with `rating` (arrays), `elapsed` days after the previous one"""
+    r = retrievability(elapsed, stability)
+    bonus = np.where(rating == HARD, params[7], np.where(rating == EASY, params[8], 1.0))
+    recalled = stability * (1 + math.exp(params[4]) * stability ** -params[5]
+                            * (np.exp((1 - r) * params[6]) - 1) * bonus)
+    forgotten = np.minimum(stability, params[9] * ((stability + 1) ** params[10] - 1)
+                           * np.exp((1 - r) * params[11]))
+    return np.clip(np.where(rating == AGAIN, forgotten, recalled), MIN_STABILITY, MAX_STABILITY)
+
+
+class _ReviewSequences:
+    """Review histories as padded (cards, steps) arrays, longest history first
+
+    Cards are sorted by number of reviews, so the cards still active at step k
+    are a prefix of the rows and each step works on a slice. With `prior`
+    (card ids, stability, day of last review) those cards continue from their
+    earlier state instead of starting at their first review here.
+    """
+
+    def __init__(self, card_ids, days, ratings, max_reviews_per_card: Optional[int], prior=None):
+        card_ids = np.asarray(card_ids, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        ratings = np.asarray(ratings, dtype=np.int8)
+
+        valid = (ratings >= 0) & (ratings < 4)
+        card_ids, days, ratings = card_ids[valid], days[valid], ratings[valid]
+        order = np.lexsort((days, card_ids))
+        card_ids, days, ratings = card_ids[order], days[order], ratings[order]
+
+        # First review per card per day
+        first = np.ones(len(card_ids), dtype=bool)
+        first[1:] = (card_ids[1:] != card_ids[:-1]) | (days[1:] != days[:-1])
+        card_ids, days, ratings = card_ids[first], days[first], ratings[first]
+
+        cards, starts, lengths = np.unique(card_ids, return_index=True, return_counts=True)
+        if max_reviews_per_card:
+            lengths = np.minimum(lengths, max_reviews_per_card)
+        by_length = np.argsort(-lengths, kind='stable')
+        self.card_ids = cards[by_length]
+        self.lengths = lengths[by_length]
+        starts = starts[by_length]
+
+        steps = int(self.lengths[0]) if len(self.lengths) else 0
+        self.ratings = np.full((len(cards), steps), -1, dtype=np.int8)
+        self.days = np.zeros((len(cards), steps), dtype=np.int64)
+        row = np.repeat(np.arange(len(cards)), self.lengths)
+        step = np.arange(len(row)) - np.repeat(np.cumsum(self.lengths) - self.lengths, self.lengths)
+        source = np.repeat(starts, self.lengths) + step
+        self.ratings[row, step] = ratings[source]
+        self.days[row, step] = days[source]
+        self.elapsed = np.diff(self.days, axis=1, prepend=self.days[:, :1]).astype(np.float64)
+        # Cards active at each step (a prefix of the rows)
+        self.active = np.array([np.count_nonzero(self.lengths > k) for k in range(steps)], dtype=np.int64)
+        self.predictions = int(self.lengths.sum() - len(self.lengths))
+
+        self.prior_stability = np.full(len(cards), np.nan)
+        self.prior_elapsed = np.zeros(len(cards))
+        if prior is not None and len(prior[0]) and len(cards):
+            prior_ids, prior_stability, prior_day = (np.asarray(values) for values in prior)
+            order = np.argsort(prior_ids)
+            prior_ids, prior_stability, prior_day = prior_ids[order], prior_stability[order], prior_day[order]
+            at = np.minimum(np.searchsorted(prior_ids, self.card_ids), len(prior_ids) - 1)
+            known = prior_ids[at] == self.card_ids
+            self.prior_stability[known] = prior_stability[at[known]]
+            self.prior_elapsed[known] = self.days[known, 0] - prior_day[at[known]]
+
+    def replay(self, params, with_loss: bool = True):
+        """(total log loss over reviews after the first, final stability per card)"""
+        if not len(self.lengths):
+            return 0.0, np.zeros(0)
+        first = self.ratings[:, 0].astype(np.int64)
+        stability = np.asarray(params[:4], dtype=np.float64)[first]
+        known = ~np.isnan(self.prior_stability)
+        if known.any():
+            stability[known] = _next_stability(params, self.prior_stability[known],
+                                               self.prior_elapsed[known], first[known])
+        loss = 0.0
+        for k in range(1, len(self.active)):
+            m = self.active[k]
+            s = stability[:m]
+            t = self.elapsed[:m, k]
+            rating = self.ratings[:m, k]
+            if with_loss:
+                p = np.clip(retrievability(t, s), 1e-4, 1 - 1e-4)
+                loss -= np.log(np.where(rating == AGAIN, 1 - p, p)).sum()
+            stability[:m] = _next_stability(params, s, t, rating)
+        return loss, stability
+
+
+def fit_memory_model(card_ids, days, ratings, initial_params: Optional[Sequence[float]] = None,
+                     max_reviews_per_card: int = 128, max_seconds: float = 10.0,
+                     tolerance: float = 1e-4) -> Dict:
+    """Fit the memory model's parameters to a review history
+
+    card_ids, days (day numbers, e.g. julianday) and ratings (RATING_CODES)
+    describe one review each, in any order. Coordinate descent on the log loss
+    of predicted recall ('again' is a failure, every other rating a success),
+    each evaluation replaying all cards at once. Stops when a full pass
+    improves the loss by less than `tolerance` per review at the smallest step,
+    or after max_seconds.
+
+    Returns a dict with 'params', 'log_loss' (per review), 'baseline_log_loss'
+    (the starting parameters), 'reviews', 'cards' and 'seconds'.
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("fit_memory_model requires numpy")
+
+    started = time.perf_counter()
+    sequences = _ReviewSequences(card_ids, days, ratings, max_reviews_per_card)
+    params = np.array(initial_params if initial_params is not None else DEFAULT_MEMORY_PARAMS, dtype=np.float64)
+    lower = np.array([b[0] for b in MEMORY_PARAM_BOUNDS])
+    upper = np.array([b[1] for b in MEMORY_PARAM_BOUNDS])
+    params = np.clip(params, lower, upper)
+
+    n = max(1, sequences.predictions)
+    best = sequences.replay(params)[0] / n
+    baseline = best
+    step = 0.2
+    evaluations = 1
+    while sequences.predictions and step > 0.002 and time.perf_counter() - started < max_seconds:
+        pass_start = best
+        for i in range(len(params)):
+            for direction in (1, -1):
+                candidate = params.copy()
+                # Initial stabilities span orders of magnitude: step those in log space
+                if i < 4:
+                    candidate[i] = params[i] * math.exp(direction * step * 2)
+                else:
+                    candidate[i] = params[i] + direction * step * (upper[i] - lower[i]) * 0.25
+                candidate[i] = min(upper[i], max(lower[i], candidate[i]))
+                if candidate[i] == params[i]:
+                    continue
+                loss = sequences.replay(candidate)[0] / n
+                evaluations += 1
+                if loss < best:
+                    params, best = candidate, loss
+                    break
+        if pass_start - best < tolerance:
+            step /= 2
+
+    return {
+        'params': {name: round(float(value), 6) for name, value in zip(MEMORY_PARAM_NAMES, params)},
+        'log_loss': round(float(best), 6),
+        'baseline_log_loss': round(float(baseline), 6),
+        'reviews': int(sequences.lengths.sum()),
+        'cards': int(len(sequences.lengths)),
+        'evaluations': evaluations,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def memory_params(params: Optional[Dict]) -> Tuple[float, ...]:
+    """Parameter tuple from fit_memory_model()['params'] (defaults for missing names)"""
+    params = params or {}
+    return tuple(float(params.get(name, default)) for name, default in zip(MEMORY_PARAM_NAMES, DEFAULT_MEMORY_PARAMS))
+
+
+def memory_states(card_ids, days, ratings, params: Optional[Dict] = None, prior=None):
+    """(card ids, stability, day of last counted review) for each card in a review history
+
+    prior: (card ids, stability, last review day) from an earlier call, when
+    card_ids/days/ratings only hold the reviews since.
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("memory_states requires numpy")
+    sequences = _ReviewSequences(card_ids, days, ratings, None, prior)
+    _, stability = sequences.replay(memory_params(params), with_loss=False)
+    last_day = sequences.days[np.arange(len(sequences.lengths)), sequences.lengths - 1]
+    return sequences.card_ids, stability, last_day
+
+
+# ============================================================================
+# Workload simulation
+# ============================================================================
+
+def simulate_workload(due_in_days, mastery, review_count, ease_factor, settings: Dict,
+                      days: int = 30, new_cards_available: int = 0, new_cards_per_day: int = 0,
+                      reviews_per_day: Optional[int] = None, rating_probs=None,
+                      stability=None, elapsed_days=None, params: Optional[Dict] = None,
+                      runs: int = 1, seed: Optional[int] = None) -> Dict:
+    """Forecast daily review load over the next `days` days
+
+    Each card is described by the days until it is due (0 or less: due today),
+    its mastery code, review count and ease factor. Every simulated day the
+    due cards are reviewed, most overdue first up to reviews_per_day (the rest
+    carry over), new_cards_per_day new cards are introduced while
+    new_cards_available lasts, and every review gets a random rating and is
+    rescheduled with schedule_flashcard_batch. 'again' brings a card back the
+    next day.
+
+    Ratings come from rating_probs (4x4, rows by mastery, columns by rating;
+    DEFAULT_RATING_PROBS if omitted). With a fitted memory model (stability and
+    elapsed_days per card, params from fit_memory_model) the chance of 'again'
+    is instead 1 - R at the time of the review, and the remaining ratings keep
+    their rating_probs proportions.
+
+    `runs` independent runs are simulated side by side and averaged. Returns
+    lists of `days` values: 'reviews' (due cards reviewed), 'new_cards',
+    'lapses' ('again' ratings) and 'backlog' (due cards left over at the end of
+    the day).
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("simulate_workload requires numpy")
+
+    rng = np.random.default_rng(seed)
+    probs = np.asarray(rating_probs if rating_probs is not None else DEFAULT_RATING_PROBS, dtype=np.float64)
+    probs = probs / probs.sum(axis=1, keepdims=True)
+    cumulative = np.cumsum(probs, axis=1)
+    # Conditional shares of hard/good/easy given the card was recalled
+    passed = probs[:, 1:] / np.maximum(probs[:, 1:].sum(axis=1, keepdims=True), 1e-9)
+    passed_cumulative = np.cumsum(passed, axis=1)
+
+    existing = len(due_in_days)
+    introduced = min(int(new_cards_available), int(new_cards_per_day) * days) if new_cards_per_day > 0 else 0
+    size = existing + introduced
+
+    def tile(values, fill, dtype):
+        column = np.empty(size, dtype=dtype)
+        column[:existing] = values
+        column[existing:] = fill
+        return np.tile(column, runs)
+
+    # Cards not yet introduced are never due; new_cards_per_day of them start each day
+    not_due = np.iinfo(np.int64).max
+    due = tile(np.asarray(due_in_days, dtype=np.int64), not_due, np.int64)
+    mastery = tile(np.asarray(mastery, dtype=np.int8), NEW, np.int8)
+    mastery = np.where(mastery < 0, LEARNING, mastery).astype(np.int8)
+    count = tile(np.asarray(review_count, dtype=np.int64), 0, np.int64)
+    ease = tile(np.asarray(ease_factor, dtype=np.float64), settings['default_ease_factor'], np.float64)
+    run_starts = np.arange(runs) * size
+
+    model = stability is not None and params is not None
+    if model:
+        model_params = memory_params(params)
+        s = tile(np.asarray(stability, dtype=np.float64), 0.0, np.float64)
+        last = tile(-np.asarray(elapsed_days, dtype=np.float64), 0.0, np.float64)
+        initial_stability = np.asarray(model_params[:4])
+
+    reviews = np.zeros(days)
+    new_cards = np.zeros(days)
+    lapses = np.zeros(days)
+    backlog = np.zeros(days)
+
+    for day in range(days):
+        waiting = np.flatnonzero(due <= day)
+        if reviews_per_day is not None and len(waiting) > reviews_per_day:
+            # Most overdue first, within each run (each run is a contiguous block of rows)
+            bounds = np.searchsorted(waiting, np.append(run_starts, runs * size))
+            kept = []
+            for r in range(runs):
+                segment = waiting[bounds[r]:bounds[r + 1]]
+                if len(segment) > reviews_per_day:
+                    segment = segment[np.argpartition(due[segment], reviews_per_day - 1)[:reviews_per_day]]
+                kept.append(segment)
+            backlog[day] = len(waiting)
+            waiting = np.concatenate(kept)
+            backlog[day] -= len(waiting)
+        first_new = existing + day * int(new_cards_per_day)
+        arriving = min(int(new_cards_per_day), max(0, size - first_new)) if new_cards_per_day > 0 else 0
+        if arriving:
+            fresh_idx = (run_starts[:, None] + np.arange(first_new, first_new + arriving)).ravel()
+            idx = np.concatenate([waiting, fresh_idx])
+        else:
+            idx = waiting
+        if not len(idx):
+            continue
+        reviews[day] = len(waiting)
+        new_cards[day] = len(idx) - len(waiting)
+
+        level = mastery[idx]
+        draw = rng.random(len(idx))
+        if model:
+            # Reviews: forgotten below R, otherwise hard/good/easy in rating_probs proportions.
+            # New cards draw from rating_probs.
+            seen = len(waiting)
+            old = idx[:seen]
+            elapsed = day - last[old]
+            recall = retrievability(elapsed, s[old])
+            forgotten = draw[:seen] >= recall
+            share = draw[:seen] / np.maximum(recall, 1e-9)
+            passed_rating = 1 + (share[:, None] > passed_cumulative[level[:seen]]).sum(axis=1)
+            rating = np.empty(len(idx), dtype=np.int8)
+            rating[:seen] = np.where(forgotten, AGAIN, np.minimum(passed_rating, EASY))
+            rating[seen:] = np.minimum((draw[seen:, None] > cumulative[level[seen:]]).sum(axis=1), EASY)
+            s[old] = _next_stability(model_params, s[old], elapsed, rating[:seen])
+            s[idx[seen:]] = initial_stability[rating[seen:]]
+            last[idx] = day
+        else:
+            rating = np.minimum((draw[:, None] > cumulative[level]).sum(axis=1), EASY).astype(np.int8)
+        lapses[day] = np.count_nonzero(rating == AGAIN)
+
+        count[idx] += 1
+        new_mastery, new_ease, interval = schedule_flashcard_batch(level, count[idx], ease[idx], rating, settings)
+        mastery[idx] = new_mastery
+        ease[idx] = new_ease
+        due[idx] = day + np.maximum(interval, 1)
+
+    return {
+        'reviews': (reviews / runs).round(2).tolist(),
+        'new_cards': (new_cards / runs).round(2).tolist(),
+        'lapses': (lapses / runs).round(2).tolist(),
+        'backlog': (backlog / runs).round(2).tolist(),
+    }
@@ -1,9 +1,282 @@
 """
 Transliteration service using aksharmukha
 Converts between various Indic scripts and Roman transliteration using IAST
+
+Text is transliterated word by word (aksharamukha keeps whitespace as is and
+doesn't look across words), and every word's result is memoized: in a bounded
+in-process LRU and in the transliteration_cache table, keyed by (from_scheme,
+to_scheme, word). Repeated words in a passage, the same vocabulary word on
+every render and a restart all hit the cache instead of aksharamukha, and the
+words a call does miss go through aksharamukha together in one call.
+Bump CACHE_VERSION when the output of a transliteration changes (aksharamukha
+upgrade, clean_iast or schwa rules) so stored results are recomputed.
 """
-from aksharamukha import transliterate
 import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from aksharamukha import transliterate
+
+from . import config
+from .db_pool import get_connection
+
+
+CACHE_VERSION = 1
+
+_LATIN_RE = re.compile(r'[a-zA-Z]')
+# Indic script ranges: Devanagari, Bengali, Tamil, Telugu, Kannada, Malayalam, etc.
+_INDIC_RE = re.compile(r'[\u0900-\u097F\u0980-\u09FF\u0A00-\u0A7F\u0A80-\u0AFF\u0B00-\u0B7F\u0B80-\u0BFF\u0C00-\u0C7F\u0C80-\u0CFF\u0D00-\u0D7F\u0600-\u06FF]')
+_ARABIC_RE = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]')
+_WHITESPACE_SPLIT_RE = re.compile(r'(\s+)')
+_FINAL_SCHWA_RE = re.compile(r'[^āīūēōṛṝḷḹ]a$')
+_SCHWA_SPLIT_RE = re.compile(r'(\s+|[.,!?;:\-—()[\]{}\"\']+)')
+_SCHWA_SEPARATOR_RE = re.compile(r'[\s.,!?;:\-—()[\]{}\"\']+')
+
+# Map common language names to aksharamukha script names (default guess)
+SCRIPT_MAP = {
+    'kannada': 'Kannada',
+    'telugu': 'Telugu',
+    'malayalam': 'Malayalam',
+    'tamil': 'Tamil',
+    'hindi': 'Devanagari',
+    'devanagari': 'Devanagari',
+    # Default for Urdu language key (assume Devanagari authoring unless Arabic chars detected)
+    'urdu': 'Devanagari',
+    'spanish': None,  # No transliteration needed for non-Indic scripts
+    'french': None,
+    'welsh': None,
+}
+
+# Map common alias names to the exact scheme names expected by aksharamukha
+TARGET_MAP = {
+    'iast': 'ISO',  # Use ISO instead of IAST for proper short/long e and o distinction
+    'iso': 'ISO',
+    'itrans': 'ITRANS',
+    'arabic': 'Arabic',
+    'urdu': 'Urdu',
+    'devanagari': 'Devanagari'
+}
+
+
+def _passthrough(text: str) -> bool:
+    """Error messages and mostly-Latin (likely English) text are returned as is"""
+    stripped = text.strip()
+    if stripped.startswith('Error:') or stripped.startswith('error:'):
+        return True
+    if len(text) <= 10:
+        return False
+    latin_chars = len(_LATIN_RE.findall(text))
+    indic_chars = len(_INDIC_RE.findall(text))
+    total_chars = latin_chars + indic_chars
+    # If >70% Latin characters and text has at least 10 chars, skip transliteration
+    return total_chars > 10 and latin_chars / total_chars > 0.7
+
+
+def _source_scheme(text: str, language: str, from_script_override: str = None) -> Optional[str]:
+    """aksharamukha source scheme for `text` (None: not an Indic script, leave it alone)
+
+    If the language is 'urdu' but the text contains Arabic/Persian characters,
+    prefer 'Urdu' (Perso-Arabic) as the source. This handles situations where
+    activities may already contain Arabic script (native Urdu) rather than
+    Devanagari authoring. Callers may pass an explicit from_script_override
+    (e.g., 'Devanagari' or 'Urdu').
+    """
+    lang_key = (from_script_override or language or '').lower()
+    if lang_key == 'urdu':
+        return 'Urdu' if _ARABIC_RE.search(text) else 'Devanagari'
+    return SCRIPT_MAP.get(lang_key)
+
+
+def _target_scheme(to_script: str) -> str:
+    return TARGET_MAP.get((to_script or 'ISO').lower(), to_script or 'ISO')
+
+
+# ============================================================================
+# Word cache: in-process LRU in front of the transliteration_cache table
+# ============================================================================
+
+_cache: 'OrderedDict[Tuple[str, str, str], str]' = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'stored_hits': 0, 'misses': 0}
+
+
+def _cache_get(keys) -> Dict[Tuple[str, str, str], str]:
+    found = {}
+    with _cache_lock:
+        for key in keys:
+            if key in _cache:
+                _cache.move_to_end(key)
+                found[key] = _cache[key]
+    return found
+
+
+def _cache_put(results: Dict[Tuple[str, str, str], str]):
+    with _cache_lock:
+        for key, result in results.items():
+            _cache[key] = result
+            _cache.move_to_end(key)
+        while len(_cache) > config.TRANSLITERATION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _load_stored(keys: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], str]:
+    """Results of earlier processes for the given (from_scheme, to_scheme, word) keys"""
+    found = {}
+    if not keys or not config.TRANSLITERATION_CACHE_PERSIST:
+        return found
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        by_schemes = {}
+        for from_scheme, to_scheme, word in keys:
+            by_schemes.setdefault((from_scheme, to_scheme), []).append(word)
+        for (from_scheme, to_scheme), words in by_schemes.items():
+            # Chunked to stay under SQLite's bound parameter limit
+            for i in range(0, len(words), 900):
+                chunk = words[i:i + 900]
+                cursor.execute(f'''
+                    SELECT text, result FROM transliteration_cache
+                    WHERE from_scheme = ? AND to_scheme = ? AND version = ?
+                      AND text IN ({','.join('?' * len(chunk))})
+                ''', [from_scheme, to_scheme, CACHE_VERSION] + chunk)
+                for word, result in cursor.fetchall():
+                    found[(from_scheme, to_scheme, word)] = result
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"[Transliteration] Error reading transliteration cache: {e}")
+    return found
+
+
+def _store(results: Dict[Tuple[str, str, str], str]):
+    if not results or not config.TRANSLITERATION_CACHE_PERSIST:
+        return
+    try:
+        conn = get_connection()
+        conn.executemany('''
+            INSERT OR REPLACE INTO transliteration_cache (from_scheme, to_scheme, text, result, version)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(f, t, w, result, CACHE_VERSION) for (f, t, w), result in results.items()])
+        conn.commit()
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"[Transliteration] Error writing transliteration cache: {e}")
+
+
+def clear_cache(stored: bool = False):
+    """Empty the in-process word cache (and the transliteration_cache table if `stored`)"""
+    with _cache_lock:
+        _cache.clear()
+        for stat in _cache_stats:
+            _cache_stats[stat] = 0
+    if stored:
+        conn = get_connection()
+        conn.execute('DELETE FROM transliteration_cache')
+        conn.commit()
+        conn.close()
+
+
+def cache_info() -> Dict:
+    """Size and hit counts of the word cache"""
+    with _cache_lock:
+        return {'size': len(_cache), 'max_size': config.TRANSLITERATION_CACHE_SIZE, **_cache_stats}
+
+
+def _transliterate_words(words: List[str], from_scheme: str, to_scheme: str, language: str) -> List[str]:
+    """Transliterate whitespace-free words, joined into one aksharamukha call
+
+    aksharamukha has a high fixed cost per call and keeps newlines, so the
+    words go through it as one newline-separated text.
+    """
+    # aksharamukha uses: process(source_script, target_script, text)
+    try:
+        results = transliterate.process(from_scheme, to_scheme, '\n'.join(words)).split('\n')
+        if len(results) != len(words):
+            results = [transliterate.process(from_scheme, to_scheme, word) for word in words]
+    except Exception as e:
+        print(f"aksharamukha.process error for from={from_scheme} to={to_scheme}: {e}")
+        # Fall back to returning original text on error
+        return list(words)
+    # Only clean ISO/IAST format - ITRANS and other schemes don't need IAST-specific cleaning
+    if str(to_scheme).upper() in ('IAST', 'ISO'):
+        # Apply schwa deletion for Hindi/Urdu
+        results = [delete_final_schwa(_clean_iast_marks(result), language) for result in results]
+    return results
+
+
+def _cache_scheme(to_scheme: str, language: str) -> str:
+    """to_scheme part of a cache key: schwa deletion makes Hindi/Urdu ISO output differ"""
+    if str(to_scheme).upper() in ('IAST', 'ISO') and language in ('hindi', 'urdu'):
+        return f"{to_scheme}-schwa"
+    return to_scheme
+
+
+def transliterate_many(texts: List[str], from_script: str = 'kannada', to_script: str = 'ISO',
+                       from_script_override: str = None) -> List[str]:
+    """Transliterate several texts of one language; see transliterate_text
+
+    Every distinct word across `texts` is looked up in the cache once, and
+    the words missing from it are transliterated once and stored.
+    """
+    to_scheme = _target_scheme(to_script)
+    clean = str(to_scheme).upper() in ('IAST', 'ISO')
+    cache_scheme = _cache_scheme(to_scheme, from_script)
+    plans = []   # per text: None (returned as is) or (from_scheme, whitespace-split parts)
+    keys = {}    # (from_scheme, cache_scheme, word), in first-seen order
+    for text in texts:
+        try:
+            from_scheme = None if not text or _passthrough(text) else \
+                _source_scheme(text, from_script, from_script_override)
+        except Exception as e:
+            print(f"Transliteration error: {e}")
+            from_scheme = None
+        if from_scheme is None:
+            plans.append(None)
+            continue
+        parts = _WHITESPACE_SPLIT_RE.split(text)
+        plans.append((from_scheme, parts))
+        for word in parts[::2]:
+            if word:
+                keys[(from_scheme, cache_scheme, word)] = None
+
+    results = _cache_get(keys)
+    missing = [key for key in keys if key not in results]
+    stored = _load_stored(missing)
+    by_source = {}
+    for key in missing:
+        if key not in stored:
+            by_source.setdefault(key[0], []).append(key)
+    computed = {}
+    for from_scheme, source_keys in by_source.items():
+        words = [key[2] for key in source_keys]
+        computed.update(zip(source_keys, _transliterate_words(words, from_scheme, to_scheme, from_script)))
+    _cache_put({**stored, **computed})
+    _store(computed)
+    results.update(stored)
+    results.update(computed)
+    with _cache_lock:
+        _cache_stats['hits'] += len(keys) - len(missing)
+        _cache_stats['stored_hits'] += len(stored)
+        _cache_stats['misses'] += len(computed)
+
+    output = []
+    for text, plan in zip(texts, plans):
+        if plan is None:
+            output.append(text)
+            continue
+        from_scheme, parts = plan
+        if len(parts) == 1:
+            # A single word: its cached result is already clean
+            output.append(results[(from_scheme, cache_scheme, parts[0])])
+            continue
+        for i in range(0, len(parts), 2):
+            if parts[i]:
+                parts[i] = results[(from_scheme, cache_scheme, parts[i])]
+        result = ''.join(parts)
+        output.append(_normalize_spacing(result) if clean else result)
+    return output
+
 
 def transliterate_text(text: str, from_script: str = 'kannada', to_script: str = 'ISO', from_script_override: str = None) -> str:
     """
@@ -21,98 +294,7 @@ def transliterate_text(text: str, from_script: str = 'kannada', to_script: str =
         Transliterated text in clean ISO/IAST format (e.g., "nānu īga mēksikō siṭiyalli vāsisuttiddēnē")
     """
     try:
-        # Skip transliteration for error messages or text that's primarily English/Latin
-        if text and (text.strip().startswith('Error:') or text.strip().startswith('error:')):
-            # Return as-is for error messages
-            return text
-        
-        # Check if text is mostly Latin characters (likely English, not Indic script)
-        # Count Latin letters vs Indic script characters
-        if text:
-            latin_chars = len(re.findall(r'[a-zA-Z]', text))
-            # Indic script ranges: Devanagari, Bengali, Tamil, Telugu, Kannada, Malayalam, etc.
-            indic_chars = len(re.findall(r'[\u0900-\u097F\u0980-\u09FF\u0A00-\u0A7F\u0A80-\u0AFF\u0B00-\u0B7F\u0B80-\u0BFF\u0C00-\u0C7F\u0C80-\u0CFF\u0D00-\u0D7F\u0600-\u06FF]', text))
-            total_chars = latin_chars + indic_chars
-            
-            # If >70% Latin characters and text has at least 10 chars, skip transliteration
-            if total_chars > 10 and latin_chars / total_chars > 0.7:
-                return text
-        
-        # Map common language names to aksharmukha script names (default guess)
-        script_map = {
-            'kannada': 'Kannada',
-            'telugu': 'Telugu',
-            'malayalam': 'Malayalam',
-            'tamil': 'Tamil',
-            'hindi': 'Devanagari',
-            'devanagari': 'Devanagari',
-            # Default for Urdu language key (assume Devanagari authoring unless Arabic chars detected)
-            'urdu': 'Devanagari',
-            'spanish': None,  # No transliteration needed for non-Indic scripts
-            'french': None,
-            'welsh': None,
-        }
-
-        # Choose source scheme. If the language is 'urdu' but the input text
-        # contains Arabic/Persian characters, prefer 'Urdu' (Perso-Arabic) as the
-        # source. This handles situations where activities may already contain
-        # Arabic script (native Urdu) rather than Devanagari authoring.
-        # Allow caller to pass an explicit from_script_override (e.g., 'Devanagari' or 'Urdu')
-        if from_script_override:
-            lang_key = (from_script_override or '').lower()
-        else:
-            lang_key = (from_script or '').lower()
-        from_scheme = script_map.get(lang_key)
-        if lang_key == 'urdu':
-            # Detect Arabic/Perso-Arabic characters in the text
-            if re.search(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]', text):
-                from_scheme = 'Urdu'
-            else:
-                from_scheme = 'Devanagari'
-
-        if from_scheme is None:
-            # For non-Indic scripts, return original text
-            return text
-        try:
-            print(f"[transliterate_text] detected from_scheme={from_scheme} for language={from_script}")
-        except Exception:
-            pass
-        
-        # Default to ISO (IAST-like with proper e/o distinction), but allow other schemes. Map common alias names to
-        # the exact scheme names expected by aksharamukha.
-        target_map = {
-            'iast': 'ISO',  # Use ISO instead of IAST for proper short/long e and o distinction
-            'iso': 'ISO',
-            'itrans': 'ITRANS',
-            'arabic': 'Arabic',
-            'urdu': 'Urdu',
-            'devanagari': 'Devanagari'
-        }
-        ts_key = (to_script or 'ISO').lower()
-        to_scheme = target_map.get(ts_key, to_script or 'ISO')
-
-        # aksharamukha uses: process(source_script, target_script, text)
-        try:
-            result = transliterate.process(from_scheme, to_scheme, text)
-        except Exception as e:
-            print(f"aksharamukha.process error for from={from_scheme} to={to_scheme}: {e}")
-            # Fall back to returning original text on error
-            return text
-        
-        # Only clean ISO/IAST format - ITRANS and other schemes don't need IAST-specific cleaning
-        if str(to_scheme).upper() in ('IAST', 'ISO'):
-            result = clean_iast(result)
-            # Apply schwa deletion for Hindi/Urdu
-            result = delete_final_schwa(result, from_script)
-        try:
-            # Debug log short preview
-            preview_in = (text or '')[:200].replace('\n', '\\n')
-            preview_out = (result or '')[:200].replace('\n', '\\n')
-            print(f"[transliterate_text] from={from_scheme} to={to_scheme} in={preview_in} out={preview_out}")
-        except Exception:
-            pass
-        
-        return result
+        return transliterate_many([text], from_script, to_script, from_script_override)[0]
     except Exception as e:
         print(f"Transliteration error: {e}")
         return text  # Return original if transliteration fails
@@ -135,21 +317,22 @@ def delete_final_schwa(text: str, language: str = None) -> str:
     def process_word(word):
         # Only delete final 'a' (short a), not ā (long a) or other vowels
         # Match: word ending in 'a' that is not preceded by ā, ī, ū, ē, ō, ṛ, ṝ, ḷ, ḹ
-        if re.search(r'[^āīūēōṛṝḷḹ]a$', word):
+        if _FINAL_SCHWA_RE.search(word):
             return word[:-1]
         return word
     
     # Split text into words and non-word parts
-    parts = re.split(r'(\s+|[.,!?;:\-—()[\]{}\"\']+)', text)
+    parts = _SCHWA_SPLIT_RE.split(text)
     result = []
     for part in parts:
-        if part and not re.match(r'[\s.,!?;:\-—()[\]{}\"\']+', part):
+        if part and not _SCHWA_SEPARATOR_RE.match(part):
             result.append(process_word(part))
         else:
             result.append(part)
     
     return ''.join(result)
 
+
 def clean_iast(text: str) -> str:
     """
     Clean ISO/IAST transliteration to standard format.
@@ -160,118 +343,74 @@ def clean_iast(text: str) -> str:
     - Preserves all standard IAST diacritics: ā, ē, ī, ō, ū, ṛ, ṝ, ḷ, ḹ, ṃ, ṇ, ṭ, ḍ, ṣ, ś, ḥ
     - Preserves SHORT e and o (without macrons) and LONG ē and ō (with macrons) as output by Aksharamukha ISO
     """
-    # NOTE: Aksharamukha's ISO output is already correct:
-    # - Short e and o appear as 'e' and 'o' (no macron)
-    # - Long ē and ō appear as 'ē' and 'ō' (with macron)
-    # - IAST scheme doesn't distinguish short/long e and o, so we use ISO instead!
-    # We should NOT convert all e->ē or o->ō as that would be incorrect!
-    
+    return _normalize_spacing(_clean_iast_marks(text))
+
+
+# NOTE: Aksharamukha's ISO output is already correct:
+# - Short e and o appear as 'e' and 'o' (no macron)
+# - Long ē and ō appear as 'ē' and 'ō' (with macron)
+# - IAST scheme doesn't distinguish short/long e and o, so we use ISO instead!
+# We should NOT convert all e->ē or o->ō as that would be incorrect!
+_IAST_REPLACEMENTS = [
     # Only handle breve vowels if they appear (rare in Aksharamukha output)
-    text = text.replace('ĕ', 'e')  # Short e with breve -> short e
-    text = text.replace('ŏ', 'o')  # Short o with breve -> short o
-    text = text.replace('ĭ', 'i')  # Short i with breve -> short i
-    text = text.replace('ŭ', 'u')  # Short u with breve -> short u
-    
+    ('ĕ', 'e'), ('ŏ', 'o'), ('ĭ', 'i'), ('ŭ', 'u'),
     # Normalize combining macrons to precomposed characters FIRST (before other operations)
-    text = re.sub(r'e\u0304', 'ē', text)  # e + combining macron -> ē
-    text = re.sub(r'o\u0304', 'ō', text)  # o + combining macron -> ō
-    text = re.sub(r'a\u0304', 'ā', text)  # a + combining macron -> ā
-    text = re.sub(r'i\u0304', 'ī', text)  # i + combining macron -> ī
-    text = re.sub(r'u\u0304', 'ū', text)  # u + combining macron -> ū
-    
+    ('e\u0304', 'ē'), ('o\u0304', 'ō'), ('a\u0304', 'ā'), ('i\u0304', 'ī'), ('u\u0304', 'ū'),
     # Normalize combining dot below for consonants (ṇ, ṭ, ḍ, ṣ, ḷ, ṃ)
-    text = re.sub(r'n\u0323', 'ṇ', text)  # n + combining dot below -> ṇ
-    text = re.sub(r't\u0323', 'ṭ', text)  # t + combining dot below -> ṭ
-    text = re.sub(r'd\u0323', 'ḍ', text)  # d + combining dot below -> ḍ
-    text = re.sub(r's\u0323', 'ṣ', text)  # s + combining dot below -> ṣ
-    text = re.sub(r'l\u0323', 'ḷ', text)  # l + combining dot below -> ḷ
-    
+    ('n\u0323', 'ṇ'), ('t\u0323', 'ṭ'), ('d\u0323', 'ḍ'), ('s\u0323', 'ṣ'), ('l\u0323', 'ḷ'),
     # Standardize anusvara: convert ṃ (m with dot below) to ṁ (m with dot above)
     # Using ṁ (U+1E41) for anusvara as per user preference
-    text = re.sub(r'm\u0323', 'ṁ', text)  # m + combining dot below -> ṁ
-    text = text.replace('ṃ', 'ṁ')  # ṃ -> ṁ (convert dot below to dot above for anusvara)
-    text = re.sub(r'm\u0307', 'ṁ', text)  # m + combining dot above -> ṁ (ensure consistency)
-    
-    # Ensure visarga (ḥ) is preserved consistently
-    # Visarga should remain as ḥ (U+1E25) - no normalization needed, just ensure it's preserved
-    
-    # Handle capital M which aksharamukha sometimes uses for anusvara in IAST
-    # Convert M to ṁ (m with dot above) in Indic transliteration contexts (before consonants, at word end, etc.)
-    # Using ṁ (U+1E41) for anusvara as per user preference
-    # This is safe because capital M is rarely used in Indic transliterations
-    # Pattern: M followed by space, end of string, or Indic consonants
-    indic_consonants = r'[kkgghṅccjñṭṭṭhḍḍḍhṇtthdndhnpbhmyrlvśṣsh]'
-    text = re.sub(r'M(?=\s|$|' + indic_consonants + r')', 'ṁ', text)  # M -> ṁ before space/end/consonants
-    
-    # Handle other forms of ḷ (l with diaeresis below, etc.)
-    text = re.sub(r'l\u0324', 'ḷ', text)  # l + combining diaeresis below (U+0324) -> ḷ
-    text = re.sub(r'l\u0325', 'ḷ', text)  # l + combining ring below (U+0325) -> ḷ
-    text = text.replace('l̤', 'ḷ')  # l with diaeresis below -> ḷ
-    
+    ('m\u0323', 'ṁ'), ('ṃ', 'ṁ'), ('m\u0307', 'ṁ'),
+]
+
+# Handle capital M which aksharamukha sometimes uses for anusvara in IAST
+# Convert M to ṁ (m with dot above) in Indic transliteration contexts (before consonants, at word end, etc.)
+# This is safe because capital M is rarely used in Indic transliterations
+# Pattern: M followed by space, end of string, or Indic consonants
+_CAPITAL_ANUSVARA_RE = re.compile(r'M(?=\s|$|[kkgghṅccjñṭṭṭhḍḍḍhṇtthdndhnpbhmyrlvśṣsh])')
+
+_IAST_LATE_REPLACEMENTS = [
+    # Handle other forms of ḷ (l with diaeresis below, ring below)
+    ('l\u0324', 'ḷ'), ('l\u0325', 'ḷ'),
     # Normalize combining dot above for ś
-    text = re.sub(r's\u0307', 'ś', text)  # s + combining dot above -> ś
-    
-    # Remove ONLY unwanted combining diacritics that aren't part of standard IAST
-    # Remove combining breve (U+0306) - we've already converted these to macrons
-    text = re.sub(r'\u0306', '', text)  # Remove combining breve
-    
-    # Remove other unwanted combining marks (grave, acute, circumflex, etc.)
-    # But keep the ones we've normalized above
-    # Remove: grave (U+0300), acute (U+0301), circumflex (U+0302), tilde (U+0303), etc.
-    # Keep: macron (U+0304), dot above (U+0307), dot below (U+0323) - already normalized
-    unwanted_marks = [
-        '\u0300',  # combining grave
-        '\u0301',  # combining acute
-        '\u0302',  # combining circumflex
-        '\u0303',  # combining tilde
-        '\u0305',  # combining overline
-        '\u0308',  # combining diaeresis
-        '\u0309',  # combining hook above
-        '\u030A',  # combining ring above
-        '\u030B',  # combining double acute
-        '\u030C',  # combining caron
-        '\u030D',  # combining vertical line above
-        '\u030E',  # combining double vertical line above
-        '\u030F',  # combining double grave
-        '\u0310',  # combining candrabindu
-        '\u0311',  # combining inverted breve
-        '\u0312',  # combining turned comma above
-        '\u0313',  # combining comma above
-        '\u0314',  # combining reversed comma above
-        '\u031B',  # combining horn
-        '\u031C',  # combining left half ring below
-        '\u031D',  # combining up tack below
-        '\u031E',  # combining down tack below
-        '\u031F',  # combining plus sign below
-        '\u0320',  # combining minus sign below
-        '\u0321',  # combining palatalized hook below
-        '\u0322',  # combining retroflex hook below
-        '\u0326',  # combining comma below
-        '\u0327',  # combining cedilla
-        '\u0328',  # combining ogonek
-        '\u0329',  # combining vertical line below
-        '\u032A',  # combining bridge below
-        '\u032B',  # combining inverted arch below
-        '\u032C',  # combining caron below
-        '\u032D',  # combining circumflex accent below
-        '\u032E',  # combining breve below
-        '\u032F',  # combining inverted breve below
-    ]
-    for mark in unwanted_marks:
-        text = text.replace(mark, '')
-    
-    # Preserve paragraph breaks and spacing
-    # Only normalize multiple spaces within a line, but preserve newlines and double newlines
+    ('s\u0307', 'ś'),
+]
+
+# Remove ONLY unwanted combining diacritics that aren't part of standard IAST:
+# breve (U+0306, already converted to macrons), grave, acute, circumflex,
+# tilde, etc. Keep: macron (U+0304), dot above (U+0307), dot below (U+0323)
+_UNWANTED_MARKS = str.maketrans('', '', ''.join(
+    ['\u0300', '\u0301', '\u0302', '\u0303', '\u0305', '\u0306']
+    + [chr(c) for c in range(0x0308, 0x0315)]
+    + [chr(c) for c in range(0x031B, 0x0323)]
+    + [chr(c) for c in range(0x0326, 0x0330)]
+))
+
+_SPACES_TABS_RE = re.compile(r'[ \t]+')
+_SINGLE_NEWLINE_RE = re.compile(r'(?<!\n)\n(?!\n)')
+_MULTIPLE_SPACES_RE = re.compile(r' +')
+
+
+def _clean_iast_marks(text: str) -> str:
+    """clean_iast's diacritic normalization (everything but the spacing)"""
+    for old, new in _IAST_REPLACEMENTS:
+        text = text.replace(old, new)
+    text = _CAPITAL_ANUSVARA_RE.sub('ṁ', text)
+    for old, new in _IAST_LATE_REPLACEMENTS:
+        text = text.replace(old, new)
+    return text.translate(_UNWANTED_MARKS)
+
+
+def _normalize_spacing(text: str) -> str:
+    """Preserve paragraph breaks; collapse other newlines and runs of spaces"""
     # First, replace double newlines with a marker
     text = text.replace('\n\n', '\u0001PARAGRAPH\u0001')
     # Normalize multiple spaces within lines (but not newlines)
-    text = re.sub(r'[ \t]+', ' ', text)  # Multiple spaces/tabs -> single space
+    text = _SPACES_TABS_RE.sub(' ', text)
     # Restore paragraph breaks
     text = text.replace('\u0001PARAGRAPH\u0001', '\n\n')
     # Normalize single newlines (but keep double newlines)
-    text = re.sub(r'(?<!\n)\n(?!\n)', ' ', text)  # Single newline -> space
+    text = _SINGLE_NEWLINE_RE.sub(' ', text)
     # Clean up any remaining extra spaces
-    text = re.sub(r' +', ' ', text)  # Multiple spaces -> single space
-    text = text.strip()
-    
-    return text
+    text = _MULTIPLE_SPACES_RE.sub(' ', text)
+    return text.strip()
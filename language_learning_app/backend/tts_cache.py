@@ -0,0 +1,198 @@
+"""
+Content-addressed cache of synthesized TTS audio.
+
+Audio is keyed on a hash of (model, voice, style_instruction, text), so the
+same paragraph read with the same voice and delivery is only synthesized once.
+The WAV itself lives in the audio store (audio_store.py), which every
+synthesized clip is saved to anyway: a tts_cache row only maps the key to the
+clip's audio_id (the sha256 of its bytes), with its size, last access time
+and hit count. A hit hands back that audio_id, so the bytes are neither
+re-read nor written a second time.
+
+Clips an activity references stay in the audio store for good, so keeping
+their cache entries costs nothing. The rest (intro audio, clips of
+/listening/{language}/audio, ...) are only alive because of the cache:
+TTS_CACHE_MAX_BYTES bounds those, and evict() drops the least recently used
+of them, deleting their blobs.
+
+Lookups and stores never raise: a broken cache just means a fresh synthesis.
+They do blocking SQLite I/O, so coroutines call them through
+asyncio.to_thread. A hit only reads: its access time and hit count are
+queued and written with the next store (or every HIT_FLUSH_THRESHOLD hits,
+or by flush_hits()).
+"""
+import hashlib
+import json
+import threading
+from typing import Optional, Tuple
+
+from . import audio_store
+from . import config
+from .db_pool import get_connection
+
+
+HIT_FLUSH_THRESHOLD = 64
+
+# Bytes of cached audio activities referenced at the last evict(); put() only
+# evicts once the cache exceeds this plus TTS_CACHE_MAX_BYTES, so it doesn't
+# rescan activity history on every store when referenced clips fill the cache
+_referenced_bytes = 0
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'bytes_saved': 0}
+# cache_key -> hits not yet written to tts_cache
+_pending_hits = {}
+
+
+def cache_key(model: str, voice: str, style_instruction: Optional[str], text: str) -> str:
+    """sha256 of the inputs that determine the synthesized audio"""
+    payload = json.dumps([model, voice, style_instruction or '', text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _count(field: str, amount: int = 1):
+    with _stats_lock:
+        _stats[field] += amount
+
+
+def get(key: str) -> Optional[Tuple[str, int]]:
+    """(audio_id, size_bytes) of the cached audio for `key`, or None on a miss"""
+    if not config.TTS_CACHE_ENABLED:
+        return None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT audio_id, size_bytes FROM tts_cache WHERE cache_key = ?', (key,))
+        row = cursor.fetchone()
+        cached = None
+        if row:
+            if row[0] and audio_store.get_blob(row[0]):
+                cached = (row[0], row[1])
+            else:
+                # Blob was removed behind our back
+                cursor.execute('DELETE FROM tts_cache WHERE cache_key = ?', (key,))
+                conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"[TTSCache] Error reading cache entry {key[:12]}: {str(e)}")
+        cached = None
+
+    if cached is None:
+        _count('misses')
+    else:
+        _count('hits')
+        _count('bytes_saved', cached[1])
+        with _stats_lock:
+            _pending_hits[key] = _pending_hits.get(key, 0) + 1
+            flush = len(_pending_hits) >= HIT_FLUSH_THRESHOLD
+        if flush:
+            flush_hits()
+    return cached
+
+
+def flush_hits():
+    """Write the queued hits (access time and hit count) to tts_cache in one transaction"""
+    with _stats_lock:
+        hits = list(_pending_hits.items())
+        _pending_hits.clear()
+    if not hits:
+        return
+    try:
+        conn = get_connection()
+        conn.executemany('''
+            UPDATE tts_cache
+            SET last_accessed_at = CURRENT_TIMESTAMP, hit_count = hit_count + ?
+            WHERE cache_key = ?
+        ''', [(count, key) for key, count in hits])
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"[TTSCache] Error recording {len(hits)} cache hits: {str(e)}")
+
+
+def evict(max_bytes: int = None) -> int:
+    """Drop least recently used entries, and their blobs, whose audio no activity references
+
+    Evicts until the audio only the cache keeps is within max_bytes (default
+    config.TTS_CACHE_MAX_BYTES). Entries used within the last
+    AUDIO_STORE_ORPHAN_MIN_AGE_S are kept, as an activity being generated
+    may be about to reference them. Returns the number of entries evicted.
+    """
+    global _referenced_bytes
+    if max_bytes is None:
+        max_bytes = config.TTS_CACHE_MAX_BYTES
+    flush_hits()
+    evicted = 0
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT cache_key, audio_id, size_bytes, last_accessed_at < datetime('now', ?)
+            FROM tts_cache ORDER BY last_accessed_at ASC
+        ''', (f'-{int(config.AUDIO_STORE_ORPHAN_MIN_AGE_S)} seconds',))
+        rows = cursor.fetchall()
+        referenced = audio_store.referenced_ids(cursor)
+        # Several keys can share one clip; it is freed with the last of them
+        keys_per_clip = {}
+        for key, audio_id, _, _ in rows:
+            keys_per_clip.setdefault(audio_id, []).append(key)
+        sizes = {audio_id: size or 0 for _, audio_id, size, _ in rows}
+        _referenced_bytes = sum(size for audio_id, size in sizes.items() if audio_id in referenced)
+        total = sum(size for audio_id, size in sizes.items() if audio_id not in referenced)
+        for key, audio_id, size, evictable in rows:
+            if total <= max_bytes:
+                break
+            if audio_id in referenced or not evictable:
+                continue
+            cursor.execute('DELETE FROM tts_cache WHERE cache_key = ?', (key,))
+            evicted += 1
+            keys_per_clip[audio_id].remove(key)
+            if not keys_per_clip[audio_id]:
+                if audio_id:
+                    audio_store.delete(audio_id, cursor)
+                total -= sizes[audio_id]
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"[TTSCache] Error evicting cache entries: {str(e)}")
+        return evicted
+    if evicted:
+        print(f"[TTSCache] Evicted {evicted} entries; {total} bytes of unreferenced audio cached")
+    return evicted
+
+
+def put(key: str, audio_id: str, size_bytes: int, model: str, voice: str, style_instruction: Optional[str] = None):
+    """Record that `key` synthesizes to the audio store blob `audio_id`"""
+    if not config.TTS_CACHE_ENABLED or not audio_id:
+        return
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO tts_cache (cache_key, model, voice, style_instruction, size_bytes, audio_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                audio_id = excluded.audio_id,
+                size_bytes = excluded.size_bytes,
+                last_accessed_at = CURRENT_TIMESTAMP
+        ''', (key, model, voice, style_instruction, size_bytes, audio_id))
+        cursor.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM tts_cache')
+        total = cursor.fetchone()[0]
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"[TTSCache] Error storing cache entry {key[:12]}: {str(e)}")
+        return
+    if total > _referenced_bytes + config.TTS_CACHE_MAX_BYTES:
+        evict()
+    else:
+        flush_hits()
+
+
+def stats() -> dict:
+    """Hits, misses, hit rate and bytes served from the cache since startup"""
+    with _stats_lock:
+        result = dict(_stats)
+    lookups = result['hits'] + result['misses']
+    result['hit_rate'] = round(result['hits'] / lookups, 3) if lookups else 0.0
+    return result
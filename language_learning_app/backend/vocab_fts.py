@@ -0,0 +1,382 @@
+"""
+SQLite FTS5 vocabulary search engine
+
+An alternative to the in-memory index in vocab_search.py, selected with
+config.VOCAB_SEARCH_ENGINE = 'fts5'. Matching, ranking, pagination and the
+total count all happen in a single SQL query, so nothing has to be built or
+kept in memory per language.
+
+vocabulary_fts is a trigram FTS5 table (substring MATCH) holding one row per
+vocabulary row, with rowid = vocabulary.id. Each search key stores the
+"/"-separated variants of a field wrapped in slashes ("/var1/var2/"), so exact
+and prefix matches on a single variant can be found with instr():
+
+    english_key        lowercased english_word
+    translation_key    translation
+    translit_key       lowercased transliteration
+    translit_norm_key  transliteration passed through normalize_iast_diacritics
+
+Triggers on vocabulary keep the table in sync, so rows written by
+insert_vocabulary_entry(), load_vocabulary_from_csv(), the CSV sync or any
+script are searchable as soon as they are committed. The table and triggers
+are created by migration 004 (see migrations.py).
+
+Ranking follows calculate_similarity_score: exact (1.0) > prefix (0.9-1.0) >
+query starts with word (0.8-0.9) > contains (0.6-0.8) > query contains word
+(0.5-0.6), plus an edit-distance score for typo matches on queries of
+VOCAB_SEARCH_FUZZY_MIN_LENGTH or more characters. Contains-scores are computed
+over the whole field rather than the best variant, so the order is close to,
+but not identical to, the Python engines (see scripts/check_search_parity.py).
+"""
+import json
+import sqlite3
+from typing import Optional
+
+from .db_pool import get_connection
+
+
+FTS_TABLE = 'vocabulary_fts'
+
+_FTS_COLUMNS = ('english_key', 'translation_key', 'translit_key', 'translit_norm_key')
+
+_fts_ready: Optional[bool] = None
+
+
+# ============================================================================
+# Schema (used by migrations.py)
+# ============================================================================
+
+def fts5_available(cursor) -> bool:
+    """Check that this SQLite build has FTS5 with the trigram tokenizer (>= 3.34)"""
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        return False
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='trigram')")
+        cursor.execute('DROP TABLE temp._fts5_probe')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _variants_sql(expr: str) -> str:
+    """SQL that turns "a / b" into "/a/b/" (NULL becomes "//")"""
+    return f"'/' || REPLACE(REPLACE(TRIM(COALESCE({expr}, '')), ' /', '/'), '/ ', '/') || '/'"
+
+
+def _normalized_sql(expr: str) -> str:
+    """SQL equivalent of normalize_iast_diacritics() for a lowercased expression
+
+    Built from the same maps as the Python function, so the two can't drift.
+    """
+    from .db import IAST_DIACRITIC_MAP, ROMANIZATION_DIGRAPHS
+    sql = expr
+    for source, target in list(IAST_DIACRITIC_MAP.items()) + list(ROMANIZATION_DIGRAPHS.items()):
+        sql = f"REPLACE({sql}, '{source}', '{target}')"
+    return sql
+
+
+def _key_values_sql(row: str) -> str:
+    """VALUES list for one vocabulary_fts row built from a vocabulary row alias"""
+    return ', '.join([
+        f'{row}.id',
+        f'{row}.language',
+        _variants_sql(f'LOWER({row}.english_word)'),
+        _variants_sql(f'{row}.translation'),
+        _variants_sql(f'LOWER({row}.transliteration)'),
+        _normalized_sql(_variants_sql(f'LOWER({row}.transliteration)')),
+    ])
+
+
+def create_fts_schema(cursor) -> bool:
+    """Create vocabulary_fts, its sync triggers, and index existing rows
+
+    Returns:
+        False if FTS5 isn't available (the fts5 engine then falls back)
+    """
+    if not fts5_available(cursor):
+        print("[VocabFTS] SQLite has no FTS5 trigram tokenizer; fts5 search engine unavailable")
+        return False
+
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            language UNINDEXED,
+            {', '.join(_FTS_COLUMNS)},
+            tokenize = 'trigram'
+        )
+    ''')
+
+    columns = 'rowid, language, ' + ', '.join(_FTS_COLUMNS)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_vocabulary_fts_insert
+        AFTER INSERT ON vocabulary
+        BEGIN
+            INSERT INTO {FTS_TABLE} ({columns}) VALUES ({_key_values_sql('NEW')});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_vocabulary_fts_delete
+        AFTER DELETE ON vocabulary
+        BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_vocabulary_fts_update
+        AFTER UPDATE OF language, english_word, translation, transliteration ON vocabulary
+        BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+            INSERT INTO {FTS_TABLE} ({columns}) VALUES ({_key_values_sql('NEW')});
+        END
+    ''')
+
+    rebuild_fts(cursor)
+    return True
+
+
+def rebuild_fts(cursor):
+    """Re-index every vocabulary row (e.g. after changing the key expressions)"""
+    columns = 'rowid, language, ' + ', '.join(_FTS_COLUMNS)
+    cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    cursor.execute(f'INSERT INTO {FTS_TABLE} ({columns}) SELECT {_key_values_sql("v")} FROM vocabulary v')
+
+
+def is_ready() -> bool:
+    """Whether vocabulary_fts exists in the current database"""
+    global _fts_ready
+    if _fts_ready is None:
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+            )
+            _fts_ready = cursor.fetchone() is not None
+        finally:
+            conn.close()
+    return _fts_ready
+
+
+# ============================================================================
+# Search
+# ============================================================================
+
+def _score_sql(key: str, query: str) -> str:
+    """Similarity of a query against one slash-wrapped key, as a SQL expression
+
+    Mirrors the exact / prefix / contains tiers of calculate_similarity_score.
+    query is a column of the params CTE; LENGTH(key) - 2 is the field length
+    without the wrapping slashes.
+    """
+    prefix_at = f"INSTR({key}, '/' || {query})"
+    # Length of the variant the prefix match starts in
+    prefix_variant_len = f"(INSTR(SUBSTR({key}, {prefix_at} + 1), '/') - 1)"
+    field_len = f'(LENGTH({key}) - 2)'
+    return f'''CASE
+        WHEN INSTR({key}, '/' || {query} || '/') > 0 THEN 1.0
+        WHEN {prefix_at} > 0 THEN 0.9 + 0.1 * LENGTH({query}) * 1.0 / {prefix_variant_len}
+        WHEN INSTR({key}, {query}) > 0 THEN
+            0.6 + 0.2 * (1.0 - (INSTR({key}, {query}) - 2) * 1.0 / {field_len})
+                      * (LENGTH({query}) * 1.0 / {field_len})
+        ELSE 0.0
+    END'''
+
+
+def _edit_similarity(query: str, key: str, max_dist: int) -> float:
+    """Best 1 - distance/length over the variants of a key within max_dist edits
+
+    Registered on the search connection as vocab_edit_similarity().
+    """
+    from .db import levenshtein_within
+    if not query or not key or max_dist <= 0:
+        return 0.0
+    best = 0.0
+    for variant in key.split('/'):
+        if not variant:
+            continue
+        dist = levenshtein_within(query, variant, max_dist)
+        if dist <= max_dist:
+            best = max(best, 1.0 - dist / max(len(query), len(variant)))
+    return best
+
+
+def _contained_terms(text: str, columns: str) -> str:
+    """JSON map of MATCH terms for every proper substring of text as a whole variant
+
+    Each term finds the rows where that substring is one of the variants of
+    the given columns; its value is the "query contains word" score
+    calculate_similarity_score would give that variant (0.8+ if the query
+    starts with it, else 0.5+).
+    """
+    terms = {}
+    for start in range(len(text)):
+        for end in range(start + 1, len(text) + 1):
+            sub = text[start:end]
+            if sub == text or '/' in sub or sub.strip() != sub:
+                continue
+            ratio = len(sub) / len(text)
+            score = 0.8 + 0.1 * ratio if start == 0 else 0.5 + 0.1 * ratio
+            term = f"{columns} : {_phrase(f'/{sub}/')}"
+            terms[term] = max(terms.get(term, 0.0), score)
+    return json.dumps(terms, ensure_ascii=False)
+
+
+def _phrase(text: str) -> str:
+    """Quote text as an FTS5 phrase (a substring match with the trigram tokenizer)"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _match_expression(search_lower: str, normalized: str, max_dist: int) -> str:
+    """FTS5 MATCH expression selecting every candidate row"""
+    terms = [
+        '{english_key translation_key translit_key} : ' + _phrase(search_lower),
+        'translit_norm_key : ' + _phrase(normalized),
+    ]
+    if max_dist > 0:
+        # Typo candidates: anything sharing a trigram with the query
+        trigrams = {normalized[i:i + 3] for i in range(len(normalized) - 2)}
+        trigrams |= {search_lower[i:i + 3] for i in range(len(search_lower) - 2)}
+        terms.append(
+            '{english_key translit_norm_key} : (' + ' OR '.join(_phrase(t) for t in sorted(trigrams)) + ')'
+        )
+    return ' OR '.join(terms)
+
+
+def search_vocabulary(
+    language: str,
+    search: str,
+    mastery_filter: str = '',
+    word_class_filter: str = '',
+    level_filter: str = '',
+    limit: int = 50,
+    offset: int = 0
+) -> Optional[tuple]:
+    """get_vocabulary search path backed by vocabulary_fts
+
+    Returns:
+        (words, total_count) like get_vocabulary, or None if vocabulary_fts
+        doesn't exist in this database
+    """
+    from .db import normalize_iast_diacritics, _vocabulary_filter_clause
+    from .vocab_search import max_edit_distance
+
+    if not is_ready():
+        return None
+
+    search_lower = search.strip().lower()
+    if not search_lower:
+        return None
+    normalized = normalize_iast_diacritics(search_lower)
+    max_dist = max_edit_distance(normalized)
+
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    conn.create_function('vocab_edit_similarity', 3, _edit_similarity, deterministic=True)
+    cursor = conn.cursor()
+
+    params = [
+        search_lower, normalized, max_dist, language,
+        _contained_terms(search_lower, '{english_key translation_key translit_key}'),
+        _contained_terms(normalized, 'translit_norm_key'),
+    ]
+    if len(search_lower) >= 3 and len(normalized) >= 3:
+        candidate_source = f'{FTS_TABLE} f'
+        candidate_filter = f'f.{FTS_TABLE} MATCH ? AND f.language = p.language'
+        params.append(_match_expression(search_lower, normalized, max_dist))
+    else:
+        # Trigram MATCH can't find strings shorter than 3 characters, so (like
+        # the in-memory index) one- and two-letter queries only match variant
+        # prefixes, found by walking this language's rows via its index
+        candidate_source = f'vocabulary lv JOIN {FTS_TABLE} f ON f.rowid = lv.id'
+        candidate_filter = 'lv.language = p.language AND (' + ' OR '.join([
+            "INSTR(f.english_key, '/' || p.q) > 0",
+            "INSTR(f.translation_key, '/' || p.q) > 0",
+            "INSTR(f.translit_key, '/' || p.q) > 0",
+            "INSTR(f.translit_norm_key, '/' || p.qn) > 0",
+        ]) + ')'
+
+    filter_clause, filter_params = _vocabulary_filter_clause(mastery_filter, word_class_filter, level_filter)
+    params.extend(filter_params)
+    params.extend([limit, offset])
+
+    substring_score = 'MAX({}, {}, {}, {})'.format(
+        _score_sql('f.english_key', 'p.q'),
+        _score_sql('f.translation_key', 'p.q'),
+        _score_sql('f.translit_key', 'p.q'),
+        _score_sql('f.translit_norm_key', 'p.qn'),
+    )
+    # A normalized transliteration that is a whole substring of the query
+    # ("rasa" for "rasayana") makes a word a result; contained English or
+    # translation variants only add to the score of words matched otherwise,
+    # the same rules get_vocabulary applies
+    query = f'''
+        WITH p AS (SELECT ? AS q, ? AS qn, ? AS max_dist, ? AS language, ? AS other_terms, ? AS norm_terms),
+        contained_norm AS MATERIALIZED (
+            SELECT f.rowid AS id, MAX(j.value) AS score
+            FROM p, json_each(p.norm_terms) j, {FTS_TABLE} f
+            WHERE f.{FTS_TABLE} MATCH j.key AND f.language = p.language
+            GROUP BY f.rowid
+        ),
+        contained_other AS MATERIALIZED (
+            SELECT f.rowid AS id, MAX(j.value) AS score
+            FROM p, json_each(p.other_terms) j, {FTS_TABLE} f
+            WHERE f.{FTS_TABLE} MATCH j.key AND f.language = p.language
+            GROUP BY f.rowid
+        ),
+        candidates AS (
+            SELECT f.rowid AS id, f.english_key, f.translit_norm_key, p.q, p.qn, p.max_dist,
+                   {substring_score} AS substring_score
+            FROM p, {candidate_source}
+            WHERE {candidate_filter}
+            UNION
+            SELECT f.rowid, f.english_key, f.translit_norm_key, p.q, p.qn, p.max_dist,
+                   {substring_score}
+            FROM p, contained_norm cn JOIN {FTS_TABLE} f ON f.rowid = cn.id
+        ),
+        best AS MATERIALIZED (
+            SELECT c.id, c.substring_score + COALESCE(cn.score, 0) > 0 AS matched,
+                   MAX(c.substring_score, COALESCE(cn.score, 0), COALESCE(co.score, 0)) AS best_score,
+                   c.english_key, c.translit_norm_key, c.q, c.qn, c.max_dist
+            FROM candidates c
+            LEFT JOIN contained_norm cn ON cn.id = c.id
+            LEFT JOIN contained_other co ON co.id = c.id
+        ),
+        scored AS MATERIALIZED (
+            SELECT id, MAX(best_score, edit_score) AS score
+            FROM (
+                SELECT id, matched, best_score,
+                       CASE WHEN best_score >= 0.9 THEN 0.0
+                            ELSE MAX(vocab_edit_similarity(q, english_key, max_dist),
+                                     vocab_edit_similarity(qn, translit_norm_key, max_dist))
+                       END AS edit_score
+                FROM best
+            )
+            WHERE matched OR edit_score > 0
+        )
+        SELECT v.*, COALESCE(ws.mastery_level, 'new') as mastery_level,
+               COALESCE(ws.next_review_date, '') as next_review_date,
+               s.score AS _similarity_score,
+               COUNT(*) OVER () AS _total_count
+        FROM scored s
+        JOIN vocabulary v ON v.id = s.id
+        LEFT JOIN word_states ws ON v.id = ws.word_id AND ws.user_id = 1
+        WHERE 1 = 1{filter_clause}
+        ORDER BY s.score DESC, LOWER(v.english_word)
+        LIMIT ? OFFSET ?
+    '''
+
+    try:
+        cursor.execute(query, params)
+        words = [dict(row) for row in cursor.fetchall()]
+        total_count = words[0]['_total_count'] if words else 0
+        if not words and offset > 0:
+            # Paged past the end: the window count came back with no rows
+            cursor.execute(f'SELECT COUNT(*) FROM ({query})', params[:-2] + [-1, 0])
+            total_count = cursor.fetchone()[0]
+        for word in words:
+            del word['_total_count']
+        return words, total_count
+    except sqlite3.OperationalError as e:
+        print(f"[VocabFTS] Search error for '{search}': {str(e)}")
+        return None
+    finally:
+        conn.close()
@@ -0,0 +1,450 @@
+"""
+Vocabulary import from free text (POST /api/vocab/import-text)
+
+The import used to run inside the request, strictly in sequence: one
+blocking Gemini call per 10 words to lemmatize, one query per lemma, one call
+per 10 words to translate, then a transliteration and an insert per word
+(and a lookup and insert per cross-language translation). An article of a
+few hundred words took minutes and could outlive the request.
+
+An import is now an ImportJob run in the background, in stages:
+
+    tokenize       words that are exactly a vocabulary form are resolved
+                   without the LLM (lemma_index.form_ids)
+    lemmatize      the rest, inflected forms of known words included,
+                   VOCAB_IMPORT_BATCH_SIZE words per call and up to
+                   VOCAB_IMPORT_CONCURRENCY calls in flight
+    lookup         every lemma in one query (db.find_words_by_translations)
+    translate      the new lemmas, batched and bounded like lemmatize
+    transliterate  one transliterate_many call per language
+    insert         the new words and their cross-language translations: one
+                   existence query per language, then one transaction
+                   (db.insert_vocabulary_entries)
+
+Stage progress and the result are pushed to SSE clients
+(GET /api/vocab/import-text/progress/{job_id}). The LLM output of an import
+(lemmas and translations) is cached per text, so importing the same text
+again makes no LLM calls and only reruns the lookups and inserts.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from . import api_client
+from . import config
+from . import db
+from . import lemma_index
+from . import transliteration
+from .prompting.vocab_import_prompts import get_lemmatization_prompt, get_translation_prompt
+
+
+class ImportJobError(Exception):
+    """An import that can't complete, with the HTTP status to report"""
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ImportJob:
+    """State of one text import, broadcast to its SSE clients"""
+    def __init__(self, job_id: str, text: str, language: str, target_languages: List[str]):
+        self.job_id = job_id
+        self.text = text
+        self.language = language
+        self.target_languages = target_languages
+        self.status = 'running'  # running | complete | error
+        self.stage = 'queued'
+        self.done = 0
+        self.total = 0
+        self.cached = False  # LLM results came from the per-text cache
+        self.result = None
+        self.error = None
+        self.error_status = 500
+        self.queues = []  # List of asyncio queues for SSE clients
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def _broadcast(self, data: dict):
+        for queue in self.queues:
+            try:
+                queue.put_nowait(data)
+            except:
+                pass
+
+    def _progress(self) -> dict:
+        return {'stage': self.stage, 'done': self.done, 'total': self.total, 'cached': self.cached}
+
+    def set_stage(self, stage: str, total: int = 0):
+        """Start a stage of `total` steps (LLM batches; 0 for single-step stages)"""
+        self.stage = stage
+        self.done = 0
+        self.total = total
+        self._broadcast({'type': 'stage', **self._progress()})
+
+    def advance(self):
+        """One step of the current stage finished"""
+        self.done += 1
+        self._broadcast({'type': 'progress', **self._progress()})
+
+    def finish(self, result: dict):
+        self.status = 'complete'
+        self.result = result
+        self.finished_at = time.time()
+        self._broadcast(self._final_event())
+
+    def fail(self, status_code: int, detail: str):
+        self.status = 'error'
+        self.error_status = status_code
+        self.error = detail
+        self.finished_at = time.time()
+        self._broadcast(self._final_event())
+
+    def _final_event(self) -> Optional[dict]:
+        if self.status == 'complete':
+            return {'type': 'complete', 'result': self.result, 'cached': self.cached}
+        if self.status == 'error':
+            return {'type': 'error', 'status': self.error_status, 'detail': self.error}
+        return None
+
+    def add_client(self, queue):
+        """Add a new SSE client queue"""
+        self.queues.append(queue)
+        # Send current progress immediately (and the outcome, if the job
+        # finished before the client connected)
+        queue.put_nowait({'type': 'init', 'status': self.status, **self._progress()})
+        final = self._final_event()
+        if final:
+            queue.put_nowait(final)
+
+    def remove_client(self, queue):
+        """Remove an SSE client queue"""
+        if queue in self.queues:
+            self.queues.remove(queue)
+
+
+# ============================================================================
+# Jobs and the per-text cache
+# ============================================================================
+
+_jobs: Dict[str, ImportJob] = {}
+_jobs_lock = threading.Lock()
+
+_cache: 'OrderedDict[str, dict]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def create_job(text: str, language: str, target_languages: Optional[List[str]] = None) -> ImportJob:
+    """Register a new import job (finished jobs past VOCAB_IMPORT_JOB_TTL_S are dropped)"""
+    job = ImportJob(str(uuid.uuid4()), text, language, list(target_languages or []))
+    now = time.time()
+    with _jobs_lock:
+        for job_id in [job_id for job_id, old in _jobs.items()
+                       if old.finished_at and now - old.finished_at > config.VOCAB_IMPORT_JOB_TTL_S]:
+            del _jobs[job_id]
+        _jobs[job.job_id] = job
+    return job
+
+
+def get_job(job_id: str) -> Optional[ImportJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def _cache_key(text: str, language: str, target_languages: List[str]) -> str:
+    source = '\0'.join([language, ','.join(sorted(target_languages)), lemma_index.normalize(text).strip()])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[dict]:
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    return None
+
+
+def _cache_put(key: str, entry: dict):
+    with _cache_lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > config.VOCAB_IMPORT_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear_cache():
+    """Forget the LLM results of every imported text"""
+    with _cache_lock:
+        _cache.clear()
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+def _batches(items: list) -> List[list]:
+    size = config.VOCAB_IMPORT_BATCH_SIZE
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def _run_llm_batches(job: ImportJob, stage: str, batches: List[list], make_prompt) -> List[Optional[list]]:
+    """Run one LLM call per batch, VOCAB_IMPORT_CONCURRENCY at a time
+
+    Returns each batch's parsed JSON list in batch order, None for a batch
+    whose call failed or returned something unparseable.
+    """
+    job.set_stage(stage, len(batches))
+    semaphore = asyncio.Semaphore(max(1, config.VOCAB_IMPORT_CONCURRENCY))
+
+    async def run(index: int, batch: list) -> Optional[list]:
+        parsed = None
+        async with semaphore:
+            try:
+                response_text, *_ = await api_client.generate_text_with_gemini_async(
+                    make_prompt(batch), model_name=api_client.GEMINI_MODEL
+                )
+                parsed = json.loads(response_text.strip().replace('```json', '').replace('```', ''))
+                if not isinstance(parsed, list):
+                    parsed = None
+            except json.JSONDecodeError as e:
+                print(f"[VocabImport] {stage} batch {index + 1} parse error: {e}")
+            except Exception as e:
+                print(f"[VocabImport] {stage} batch {index + 1} failed: {e}")
+        job.advance()
+        return parsed
+
+    return await asyncio.gather(*(run(i, batch) for i, batch in enumerate(batches)))
+
+
+def _resolve(language: str, words: List[str]):
+    """Split words into vocabulary rows they are exactly a form of and the rest
+
+    Suffix-stripped lemma index matches are not trusted here (a short stem
+    plus a vowel sign often hits an unrelated word); those words go to the
+    LLM lemmatizer like any other.
+    """
+    resolved_ids = []
+    unresolved = []
+    for word in words:
+        word_ids = lemma_index.form_ids(language, word)
+        if word_ids:
+            resolved_ids.append(word_ids[0])
+        else:
+            unresolved.append(word)
+    return db.get_words_by_ids(list(dict.fromkeys(resolved_ids))), unresolved
+
+
+def _lookup(language: str, lemmas: List[str]) -> Dict[str, Dict]:
+    """lemma -> existing vocabulary row, by translation key and then by exact form"""
+    found = db.find_words_by_translations(lemmas, language)
+    # The LLM lemma may still be one of the variants of a "a / b" translation
+    fallback = {}
+    for lemma in lemmas:
+        if lemma not in found:
+            word_ids = lemma_index.form_ids(language, lemma)
+            if word_ids:
+                fallback[lemma] = word_ids[0]
+    if fallback:
+        rows = {row['id']: row for row in db.get_words_by_ids(list(dict.fromkeys(fallback.values())))}
+        found.update((lemma, rows[word_id]) for lemma, word_id in fallback.items() if word_id in rows)
+    return found
+
+
+def _transliterate(texts_by_language: Dict[str, List[str]]) -> Dict[str, Dict[str, str]]:
+    """language -> {text: IAST transliteration}, one transliterate_many call per language"""
+    result = {}
+    for language, texts in texts_by_language.items():
+        texts = list(dict.fromkeys(texts))
+        result[language] = dict(zip(texts, transliteration.transliterate_many(texts, language, 'IAST')))
+    return result
+
+
+def _insert(language: str, new_entries: List[Dict], cross_entries: List[Dict]) -> List[Dict]:
+    """Insert the words (and cross-language translations) no vocabulary row has yet
+
+    Returns the inserted entries of `language`.
+    """
+    by_language = {language: new_entries}
+    for entry in cross_entries:
+        by_language.setdefault(entry['language'], []).append(entry)
+
+    to_insert = []
+    for lang, entries in by_language.items():
+        found = db.find_words_by_translations([e['translation'] for e in entries], lang)
+        seen = set()
+        for entry in entries:
+            key = db.search_key('translation', entry['translation'])
+            if entry['translation'] in found or key in seen:
+                continue
+            seen.add(key)
+            to_insert.append(entry)
+
+    if to_insert and not db.insert_vocabulary_entries(to_insert):
+        raise ImportJobError(500, "Failed to insert vocabulary entries")
+    return [entry for entry in to_insert if entry['language'] == language]
+
+
+def _entry(word: str, row: Dict, translits: Dict[str, str]) -> Dict:
+    return {
+        'word': word,
+        'transliteration': row.get('transliteration') or translits.get(row.get('translation') or '', ''),
+        'english_word': row.get('english_word', ''),
+        'word_class': row.get('word_class', ''),
+    }
+
+
+async def _import(job: ImportJob) -> dict:
+    language = job.language
+    target_languages = job.target_languages
+    cache_key = _cache_key(job.text, language, target_languages)
+    cached = _cache_get(cache_key)
+    job.cached = cached is not None
+
+    # Tokenize; resolve words the lemma index knows
+    job.set_stage('tokenize')
+    tokens = lemma_index.tokenize(lemma_index.normalize(job.text))
+    words = list(dict.fromkeys(word for _, word in tokens))  # dedupe, preserve order
+    if not words:
+        return {
+            "success": True,
+            "message": "No words found in text",
+            "new_words": 0, "existing_words": 0,
+            "added": [], "existing": []
+        }
+    resolved_rows, unresolved = await asyncio.to_thread(_resolve, language, words)
+
+    # Lemmatize the rest
+    complete = True
+    if cached:
+        lemmatized = cached['lemmatized']
+    else:
+        results = await _run_llm_batches(
+            job, 'lemmatize', _batches(unresolved), lambda batch: get_lemmatization_prompt(language, batch)
+        )
+        complete = None not in results
+        lemmatized = [wd for parsed in results if parsed for wd in parsed if isinstance(wd, dict)]
+    if unresolved and not lemmatized and not resolved_rows:
+        raise ImportJobError(400, "Failed to lemmatize words")
+
+    # Look up every lemma at once
+    job.set_stage('lookup')
+    lemmas = {}
+    for wd in lemmatized:
+        word = str(wd.get('word') or '').strip()
+        if word and word not in lemmas:
+            lemmas[word] = {**wd, 'word': word}
+    found = await asyncio.to_thread(_lookup, language, list(lemmas))
+    existing = [(row['translation'], row) for row in resolved_rows]
+    existing_ids = {row['id'] for row in resolved_rows}
+    for word, row in found.items():
+        if row['id'] not in existing_ids:
+            existing_ids.add(row['id'])
+            existing.append((word, row))
+    new_words = [wd for word, wd in lemmas.items() if word not in found]
+
+    # Translate the new lemmas (cached translations are reused)
+    translations = dict(cached['translations']) if cached else {}
+    to_translate = [wd for wd in new_words if wd['word'] not in translations]
+    if to_translate:
+        batches = _batches(to_translate)
+        results = await _run_llm_batches(
+            job, 'translate', batches,
+            lambda batch: get_translation_prompt(language, batch, target_languages)
+        )
+        complete = complete and None not in results
+        for batch, parsed in zip(batches, results):
+            for td in parsed or []:
+                word = str(td.get('word') or '').strip() if isinstance(td, dict) else ''
+                if not word:
+                    continue
+                word_class = next(
+                    (w.get('word_class') for w in batch if w['word'] == word), None
+                ) or td.get('word_class', 'noun')
+                translations[word] = {
+                    'english': td.get('english', ''),
+                    'word_class': word_class,
+                    'translations': td.get('translations') or {},
+                }
+    if complete:
+        _cache_put(cache_key, {'lemmatized': lemmatized, 'translations': translations})
+
+    # Words to insert: this run's new lemmas, plus any other word a
+    # translation batch returned (the LLM may normalize the lemma)
+    new_translations = {wd['word']: translations[wd['word']] for wd in new_words if wd['word'] in translations}
+    if to_translate:
+        new_translations.update((word, td) for word, td in translations.items()
+                                if word not in found and word not in new_translations)
+    cross = [
+        (lang, text, td)
+        for td in new_translations.values()
+        for lang, text in (td['translations'] or {}).items()
+        if lang in target_languages and text
+    ]
+
+    # Transliterate, one call per language
+    job.set_stage('transliterate')
+    texts_by_language = {language: list(new_translations) + [
+        row['translation'] for _, row in existing if not row.get('transliteration') and row.get('translation')
+    ]}
+    for lang, text, _ in cross:
+        texts_by_language.setdefault(lang, []).append(text)
+    translits = await asyncio.to_thread(_transliterate, texts_by_language)
+
+    # Insert
+    job.set_stage('insert')
+    new_entries = [{
+        'language': language,
+        'english_word': td['english'],
+        'translation': word,
+        'transliteration': translits[language][word],
+        'word_class': td['word_class'],
+        'level': None,
+        'origin': 'user',
+    } for word, td in new_translations.items()]
+    cross_entries = [{
+        'language': lang,
+        'english_word': td['english'],
+        'translation': text,
+        'transliteration': translits[lang][text],
+        'word_class': td['word_class'],
+        'level': None,
+        'origin': 'user',
+    } for lang, text, td in cross]
+    inserted = await asyncio.to_thread(_insert, language, new_entries, cross_entries)
+
+    added_words = [{
+        'word': entry['translation'],
+        'transliteration': entry['transliteration'],
+        'english_word': entry['english_word'],
+        'word_class': entry['word_class'],
+    } for entry in inserted]
+    existing_words = [_entry(word, row, translits[language]) for word, row in existing]
+    return {
+        "success": True,
+        "message": f"Added {len(added_words)} new words, {len(existing_words)} already exist",
+        "new_words": len(added_words),
+        "existing_words": len(existing_words),
+        "added": added_words,
+        "existing": existing_words,
+    }
+
+
+async def run_job(job: ImportJob):
+    """Run an import to completion; the outcome is on the job (and sent to its clients)"""
+    start = time.perf_counter()
+    try:
+        result = await _import(job)
+        job.finish(result)
+        print(f"[VocabImport] Job {job.job_id}: {result['new_words']} new, {result['existing_words']} existing "
+              f"in {(time.perf_counter() - start) * 1000:.0f}ms{' (cached)' if job.cached else ''}")
+    except ImportJobError as e:
+        job.fail(e.status_code, e.detail)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        job.fail(500, str(e))
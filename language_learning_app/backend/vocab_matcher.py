@@ -0,0 +1,219 @@
+"""
+Vocabulary matcher for "words used" extraction
+
+Activity generators used to find the vocabulary in generated text by pulling
+Kannada-only regex tokens out of it and comparing each token against every
+word bank entry with substring tests (tokens x words x variants), and the
+writing activity ran a full fuzzy get_vocabulary search per required word and
+per token. Other scripts never matched at all.
+
+This module compiles one Aho-Corasick automaton per language over the surface
+forms of every vocabulary word (the " /"-separated translation variants,
+normalized as in lemma_index), so all the words in a text are found in one
+pass over it, whatever the script. match_word_ids() combines it with the
+language's lemma index: the automaton finds whole-word and multi-word forms
+(the last word of a phrase may carry a suffix), the lemma index single words
+carrying case, plural or verb suffixes. Without whole_words the automaton also
+accepts single-word forms that start a word and end inside it.
+
+Matchers are built on first use, rebuilt after a vocabulary sync and dropped
+when a word is inserted (an automaton can't take new patterns in place).
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, List, Optional, Tuple
+
+from . import db
+from . import lemma_index
+from .db_pool import get_connection
+from .lemma_index import is_word_char, normalize
+
+
+def surface_forms(translation: str) -> List[str]:
+    """Normalized variants of a translation ("a / b" -> ["a", "b"])"""
+    if not translation:
+        return []
+    forms = []
+    for variant in translation.split(' /'):
+        variant = normalize(variant.strip())
+        if variant and variant not in forms:
+            forms.append(variant)
+    return forms
+
+
+class VocabMatcher:
+    """Aho-Corasick automaton over one language's vocabulary surface forms"""
+
+    def __init__(self, language: str):
+        self.language = language
+        self.built_at = None
+        self.pattern_count = 0
+        # Trie transitions, failure links and, per state, the (length, word ids,
+        # is a phrase) of every pattern ending there (its own and its suffixes')
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Tuple[int, ...], bool]]] = [[]]
+
+    def __len__(self):
+        return self.pattern_count
+
+    def build(self, rows):
+        """Compile the automaton from (id, translation) vocabulary rows"""
+        patterns: Dict[str, List[int]] = defaultdict(list)
+        for word_id, translation in rows:
+            for form in surface_forms(translation):
+                patterns[form].append(word_id)
+
+        goto, out = [{}], [[]]
+        for pattern, word_ids in patterns.items():
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    out.append([])
+                state = next_state
+            is_phrase = any(not is_word_char(char) for char in pattern)
+            out[state].append((len(pattern), tuple(word_ids), is_phrase))
+
+        # Breadth-first, so a state's failure target is final before its children
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                queue.append(child)
+                target = fail[state]
+                while target and char not in goto[target]:
+                    target = fail[target]
+                fail[child] = goto[target].get(char, 0)
+                if out[fail[child]]:
+                    out[child] = out[child] + out[fail[child]]
+
+        self._goto, self._fail, self._out = goto, fail, out
+        self.pattern_count = len(patterns)
+        self.built_at = time.time()
+
+    def find(self, text: str, whole_words: bool = False) -> List[Tuple[int, int]]:
+        """(position, word id) of every vocabulary form in normalized `text`"""
+        goto, fail, out = self._goto, self._fail, self._out
+        word_chars = [is_word_char(char) for char in text]
+        found = []
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            ends_word = i + 1 == len(text) or not word_chars[i + 1]
+            for length, word_ids, is_phrase in out[state]:
+                start = i - length + 1
+                if not word_chars[start] or (start and word_chars[start - 1]):
+                    continue
+                if not ends_word and not is_phrase and (whole_words or length == 1):
+                    continue
+                found += [(start, word_id) for word_id in word_ids]
+        return found
+
+    def match(self, text: str, whole_words: bool = False) -> List[int]:
+        """Ids of the vocabulary words found in `text`, in order of first occurrence"""
+        if not text:
+            return []
+        return list(dict.fromkeys(word_id for _, word_id in self.find(normalize(text), whole_words)))
+
+
+# ============================================================================
+# Per-language registry
+# ============================================================================
+
+_matchers: Dict[str, VocabMatcher] = {}
+_registry_lock = threading.Lock()
+# One build at a time per language, so concurrent first uses share a build
+_build_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+
+def _load_rows(language: str):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT id, translation FROM vocabulary WHERE language = ?', (language,))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def build_matcher(language: str) -> Optional[VocabMatcher]:
+    """Build (or rebuild) the matcher for one language"""
+    try:
+        start = time.perf_counter()
+        matcher = VocabMatcher(language)
+        matcher.build(_load_rows(language))
+        with _registry_lock:
+            _matchers[language] = matcher
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"[VocabMatcher] Compiled {len(matcher)} {language} forms in {elapsed_ms:.0f}ms")
+        return matcher
+    except Exception as e:
+        print(f"[VocabMatcher] Error building matcher for {language}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def get_matcher(language: str) -> Optional[VocabMatcher]:
+    """Get the matcher for a language, building it on first use"""
+    matcher = _matchers.get(language)
+    if matcher is None:
+        with _registry_lock:
+            build_lock = _build_locks[language]
+        with build_lock:
+            matcher = _matchers.get(language)
+            if matcher is None:
+                matcher = build_matcher(language)
+    return matcher
+
+
+def invalidate(language: str):
+    """Drop a language's matcher; it is rebuilt on next use"""
+    with _registry_lock:
+        _matchers.pop(language, None)
+
+
+def refresh(language: str):
+    """Rebuild a language's matcher after its vocabulary was reloaded
+
+    Languages whose matcher was never built are left alone.
+    """
+    if language in _matchers:
+        with _registry_lock:
+            build_lock = _build_locks[language]
+        with build_lock:
+            build_matcher(language)
+
+
+def match_word_ids(language: str, text: str) -> List[int]:
+    """Ids of the `language` vocabulary words found in `text`, in order of first occurrence
+
+    Whole-word and multi-word forms come from the matcher, inflected single
+    words from the lemma index.
+    """
+    if not text:
+        return []
+    text = normalize(text)
+    found = []
+    matcher = get_matcher(language)
+    if matcher:
+        found += matcher.find(text, whole_words=True)
+    index = lemma_index.get_index(language)
+    if index:
+        found += index.find(text)
+    found.sort(key=lambda match: match[0])
+    return list(dict.fromkeys(word_id for _, word_id in found))
+
+
+def extract_words(language: str, text: str, user_id: int = 1) -> List[Dict]:
+    """Vocabulary rows (with mastery_level) of the words found in `text`, in order of occurrence"""
+    return db.get_words_by_ids(match_word_ids(language, text), user_id)
@@ -0,0 +1,407 @@
+"""
+In-memory vocabulary search index
+
+get_vocabulary() used to turn every search into a large OR of LIKE clauses,
+pull up to 1000 candidate rows and score each of them in Python, so every
+keystroke on the vocab screen cost a scan of ~10k rows and totals were capped
+by the candidate limit.
+
+This module keeps one VocabSearchIndex per language instead. Each index holds
+the search keys of every word (lowercased English terms, translation variants,
+lowercased and diacritic-normalized transliteration variants) with trigram
+postings and a sorted key list for prefix lookups. A search only touches the
+postings of the query's trigrams plus the words they point at, and ranking
+reuses calculate_similarity_score so the order matches the old behaviour:
+exact > prefix > contains > contained > edit distance.
+
+Indexes are built at startup and after a vocabulary sync, and updated in place
+when a single word is inserted.
+"""
+import bisect
+import json
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import config
+from . import db
+from .db_pool import get_connection
+
+
+def _split_variants(text: str, separator: str = '/') -> List[str]:
+    """Split a "/"-separated field into its non-empty, stripped variants"""
+    if not text:
+        return []
+    return [part.strip() for part in text.split(separator) if part.strip()]
+
+
+def _trigrams(text: str) -> Set[str]:
+    if len(text) < 3:
+        return set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def max_edit_distance(query: str) -> int:
+    """Typo budget for fuzzy matches, by query length"""
+    if len(query) < config.VOCAB_SEARCH_FUZZY_MIN_LENGTH:
+        return 0
+    return 1 if len(query) < 8 else 2
+
+
+class _Entry:
+    """Search keys and static filter fields for one vocabulary row"""
+    __slots__ = (
+        'id', 'english_word', 'english_lower', 'word_class', 'level',
+        'translation', 'translation_variants', 'translit', 'translit_variants',
+        'translit_norm_variants',
+    )
+
+    def __init__(self, row):
+        self.id = row['id']
+        self.english_word = row['english_word'] or ''
+        self.english_lower = self.english_word.lower()
+        self.word_class = (row['word_class'] or '').lower()
+        self.level = row['level'] or ''
+        self.translation = row['translation'] or ''
+        # get_vocabulary has always split translations/transliterations on " /"
+        self.translation_variants = _split_variants(self.translation, ' /')
+        self.translit = row['transliteration'] or ''
+        self.translit_variants = [v.lower() for v in _split_variants(self.translit, ' /')]
+        self.translit_norm_variants = [
+            db.normalize_iast_diacritics(v) for v in self.translit_variants
+        ]
+
+    def keys(self) -> Iterable[str]:
+        """All strings a query can match against"""
+        yield self.english_lower
+        for term in _split_variants(self.english_lower):
+            yield term
+        yield from self.translation_variants
+        yield from self.translit_variants
+        yield from self.translit_norm_variants
+
+
+class VocabSearchIndex:
+    """Trigram + prefix index over one language's vocabulary"""
+
+    def __init__(self, language: str):
+        self.language = language
+        self.built_at = None
+        self._lock = threading.Lock()
+        self._entries: Dict[int, _Entry] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._exact: Dict[str, Set[int]] = defaultdict(set)
+        self._sorted_keys: List[Tuple[str, int]] = []
+        self._pending_keys: List[Tuple[str, int]] = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _add(self, entry: _Entry, pending: bool = False):
+        self._entries[entry.id] = entry
+        keys = {key for key in entry.keys() if key}
+        grams = set()
+        for key in keys:
+            self._exact[key].add(entry.id)
+            grams |= _trigrams(key)
+            if pending:
+                self._pending_keys.append((key, entry.id))
+            else:
+                self._sorted_keys.append((key, entry.id))
+        # Postings are plain lists (one append per word per trigram); they are
+        # only ever intersected into or counted, never searched for membership
+        for gram in grams:
+            self._postings[gram].append(entry.id)
+
+    def build(self, rows):
+        """(Re)build the index from vocabulary rows"""
+        with self._lock:
+            self._entries = {}
+            self._postings = defaultdict(list)
+            self._exact = defaultdict(set)
+            self._sorted_keys = []
+            self._pending_keys = []
+            for row in rows:
+                self._add(_Entry(row))
+            self._sorted_keys.sort()
+            self.built_at = time.time()
+
+    def add_row(self, row):
+        """Add a single newly inserted vocabulary row"""
+        with self._lock:
+            self._add(_Entry(row), pending=True)
+
+    def _sorted(self) -> List[Tuple[str, int]]:
+        if self._pending_keys:
+            with self._lock:
+                if self._pending_keys:
+                    self._sorted_keys = sorted(self._sorted_keys + self._pending_keys)
+                    self._pending_keys = []
+        return self._sorted_keys
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def prefix_ids(self, prefix: str) -> Set[int]:
+        """Ids of words with any search key starting with prefix"""
+        keys = self._sorted()
+        ids = set()
+        i = bisect.bisect_left(keys, (prefix,))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            ids.add(keys[i][1])
+            i += 1
+        return ids
+
+    def _containing_ids(self, text: str) -> Set[int]:
+        """Candidate ids that have a key containing text (verified later)"""
+        grams = _trigrams(text)
+        if not grams:
+            # 1-2 character queries can't use trigrams, and "contains" would
+            # match most of the vocabulary; treat them as prefix searches
+            return self.prefix_ids(text)
+        postings = sorted((self._postings.get(g, ()) for g in grams), key=len)
+        ids = set(postings[0])
+        for posting in postings[1:]:
+            if not ids:
+                break
+            ids.intersection_update(posting)
+        return ids
+
+    def _contained_ids(self, text: str) -> Set[int]:
+        """Ids that have a key which is a substring of text"""
+        ids = set()
+        for start in range(len(text)):
+            for end in range(start + 1, len(text) + 1):
+                ids.update(self._exact.get(text[start:end], ()))
+        return ids
+
+    def _fuzzy_ids(self, text: str, max_dist: int) -> Set[int]:
+        """Ids with an English term or normalized transliteration within max_dist edits"""
+        grams = _trigrams(text)
+        if not grams or max_dist <= 0:
+            return set()
+        # q-gram lemma: each edit destroys at most 3 trigrams
+        min_shared = max(1, len(grams) - 3 * max_dist)
+        counts: Dict[int, int] = {}
+        for gram in grams:
+            for word_id in self._postings.get(gram, ()):
+                counts[word_id] = counts.get(word_id, 0) + 1
+
+        ids = set()
+        for word_id, shared in counts.items():
+            if shared < min_shared:
+                continue
+            entry = self._entries[word_id]
+            for key in _split_variants(entry.english_lower) + entry.translit_norm_variants:
+                if db.levenshtein_within(text, key, max_dist) <= max_dist:
+                    ids.add(word_id)
+                    break
+        return ids
+
+    @staticmethod
+    def _matches(entry: _Entry, search: str, search_lower: str, normalized: str) -> bool:
+        """Same match rules get_vocabulary applied to its SQL candidates"""
+        if search_lower in entry.english_lower:
+            return True
+        if any(search in variant for variant in entry.translation_variants):
+            return True
+        if any(search_lower in variant for variant in entry.translit_variants):
+            return True
+        for variant in entry.translit_norm_variants:
+            if normalized in variant or variant in normalized:
+                return True
+        return False
+
+    @staticmethod
+    def score(entry: _Entry, search_lower: str, normalized: str) -> float:
+        """Best similarity of the query against any field of the word"""
+        scores = []
+        if entry.english_lower:
+            scores.append(db.calculate_similarity_score(search_lower, entry.english_lower, 'english'))
+        if entry.translation:
+            scores.append(db.calculate_similarity_score(search_lower, entry.translation, 'kannada'))
+        if entry.translit:
+            scores.append(db.calculate_similarity_score(
+                normalized, db.normalize_iast_diacritics(entry.translit), 'transliteration'
+            ))
+            scores.append(db.calculate_similarity_score(search_lower, entry.translit, 'transliteration'))
+        return max(scores) if scores else 0.0
+
+    def search(
+        self,
+        search: str,
+        word_class_values: Optional[List[str]] = None,
+        level_values: Optional[List[str]] = None,
+    ) -> List[Tuple[int, float]]:
+        """Find and rank words matching a search query
+
+        Args:
+            search: Raw search text
+            word_class_values: Optional lowercased word classes to keep
+            level_values: Optional lowercased levels to keep
+
+        Returns:
+            List of (word_id, similarity_score), best match first
+        """
+        search = search.strip()
+        search_lower = search.lower()
+        if not search_lower:
+            return []
+        normalized = db.normalize_iast_diacritics(search_lower)
+
+        candidates = self._containing_ids(search_lower)
+        if normalized != search_lower:
+            candidates |= self._containing_ids(normalized)
+        if search != search_lower:
+            candidates |= self._containing_ids(search)
+        candidates |= self._contained_ids(normalized)
+
+        matched = {
+            word_id for word_id in candidates
+            if self._matches(self._entries[word_id], search, search_lower, normalized)
+        }
+        matched |= self._fuzzy_ids(normalized, max_edit_distance(normalized))
+
+        results = []
+        for word_id in matched:
+            entry = self._entries[word_id]
+            if word_class_values and entry.word_class not in word_class_values:
+                continue
+            if level_values and entry.level not in level_values:
+                continue
+            results.append((word_id, self.score(entry, search_lower, normalized), entry.english_lower))
+
+        # Similarity first, then alphabetical by English word (same as before)
+        results.sort(key=lambda r: (-r[1], r[2]))
+        return [(word_id, score) for word_id, score, _ in results]
+
+
+# ============================================================================
+# Per-language registry
+# ============================================================================
+
+_indexes: Dict[str, VocabSearchIndex] = {}
+_registry_lock = threading.Lock()
+# One build at a time per language, so a search racing the startup build
+# waits for it instead of building a second copy
+_build_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+
+def _load_rows(language: str):
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id, english_word, translation, transliteration, word_class, level
+        FROM vocabulary
+        WHERE language = ?
+    ''', (language,))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def build_index(language: str) -> Optional[VocabSearchIndex]:
+    """Build (or rebuild) the search index for one language"""
+    try:
+        start = time.perf_counter()
+        index = VocabSearchIndex(language)
+        index.build(_load_rows(language))
+        with _registry_lock:
+            _indexes[language] = index
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"[VocabSearch] Indexed {len(index)} {language} words in {elapsed_ms:.0f}ms")
+        return index
+    except Exception as e:
+        print(f"[VocabSearch] Error building index for {language}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def build_all_indexes(languages: Optional[List[str]] = None) -> Dict[str, int]:
+    """Build indexes for every language with vocabulary (or the given ones)
+
+    Returns:
+        Dict of language -> indexed word count
+    """
+    if languages is None:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT DISTINCT language FROM vocabulary')
+        languages = [row[0] for row in cursor.fetchall()]
+        conn.close()
+
+    summary = {}
+    for language in languages:
+        with _registry_lock:
+            build_lock = _build_locks[language]
+        with build_lock:
+            index = build_index(language)
+        summary[language] = len(index) if index else 0
+    return summary
+
+
+def get_index(language: str) -> Optional[VocabSearchIndex]:
+    """Get the index for a language, building it on first use"""
+    if config.VOCAB_SEARCH_ENGINE != 'memory':
+        return None
+    index = _indexes.get(language)
+    if index is None:
+        with _registry_lock:
+            build_lock = _build_locks[language]
+        with build_lock:
+            index = _indexes.get(language)
+            if index is None:
+                index = build_index(language)
+    return index
+
+
+def invalidate(language: str):
+    """Drop a language's index; it is rebuilt on next use"""
+    with _registry_lock:
+        _indexes.pop(language, None)
+
+
+def refresh(language: str):
+    """Rebuild a language's index after its vocabulary was reloaded
+
+    Languages whose index was never built are left alone; they are built
+    lazily on first search (or by build_all_indexes at startup).
+    """
+    if language in _indexes:
+        with _registry_lock:
+            build_lock = _build_locks[language]
+        with build_lock:
+            build_index(language)
+
+
+def add_word(language: str, word_id: int):
+    """Add a newly inserted vocabulary row to an already built index"""
+    add_words(language, [word_id])
+
+
+def add_words(language: str, word_ids: List[int]):
+    """Add newly inserted vocabulary rows to an already built index (one query)"""
+    index = _indexes.get(language)
+    if index is None or not word_ids:
+        return
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id, english_word, translation, transliteration, word_class, level
+        FROM vocabulary
+        WHERE id IN (SELECT value FROM json_each(?))
+    ''', (json.dumps(list(word_ids)),))
+    rows = cursor.fetchall()
+    conn.close()
+    for row in rows:
+        index.add_row(row)
@@ -1,18 +1,35 @@
 """
 WebSocket Server for Gemini Live Conversations
 Handles real-time bidirectional audio streaming between frontend and Gemini Live API
+
+Audio goes both ways as binary frames (header + raw PCM, see live_frames.py);
+JSON text frames carry control messages only. Each completed AI turn is stored
+once in the audio store, and the transcript references it by audio_id.
+
+Each session relays through bounded buffers drained by their own tasks (see
+live_relay.py), so a slow client can't stall the Gemini receive loop and a
+burst of microphone audio can't stall the socket reader.
+
+Gemini Live sessions come pre-connected from live_pool.py when one is warm for
+the session's language and voice.
 """
 
 import asyncio
 import base64
 import json
+import time
 import uuid
 from typing import Dict, Optional, Set
 from fastapi import WebSocket, WebSocketDisconnect
 from datetime import datetime
 
 from .gemini_live_client import GeminiLiveClient
+from .fake_gemini_live import FakeGeminiLiveClient
 from . import db
+from . import audio_store
+from . import live_frames
+from . import live_relay
+from . import live_pool
 from . import config as app_config
 
 
@@ -27,6 +44,27 @@ class ConversationSession:
         self.language: str = "kannada"
         self.is_active: bool = False
         self.messages: list = []
+        self.audio_out_seq: int = 0
+        # Bytes sent/received during the current turn (reset on response_complete)
+        self.turn_bytes: Dict[str, int] = self._empty_turn_bytes()
+        
+        # Relay buffers, drained by _mic_sender / _client_sender
+        self.mic_buffer = live_relay.MicAudioBuffer(
+            app_config.LIVE_MIC_QUEUE_CHUNKS,
+            app_config.LIVE_MIC_MAX_AGE_MS,
+            app_config.LIVE_MIC_OVERFLOW_POLICY,
+            app_config.LIVE_MIC_COALESCE_MAX_BYTES,
+        )
+        self.client_queue = live_relay.ClientSendQueue(app_config.LIVE_CLIENT_QUEUE_FRAMES)
+        self.mic_to_gemini = live_relay.LatencyHistogram()
+        self.gemini_to_client = live_relay.LatencyHistogram()
+        self._client_sender_task: Optional[asyncio.Task] = None
+        self._mic_sender_task: Optional[asyncio.Task] = None
+        self._client_gone: bool = False
+
+    @staticmethod
+    def _empty_turn_bytes() -> Dict[str, int]:
+        return {"audio_in": 0, "audio_out": 0, "control_out": 0}
         
     async def start_gemini_session(self, config: Dict):
         """
@@ -40,18 +78,26 @@ class ConversationSession:
             conversation_context = config.get("context", {})
             voice_name = config.get("voice", "Kore")
             
-            # Initialize Gemini Live client
-            self.gemini_client = GeminiLiveClient()
-            
-            # Start session
-            success = await self.gemini_client.start_session(
-                language=self.language,
-                conversation_context=conversation_context,
-                voice_name=voice_name
-            )
+            # Take a pre-connected session from the pool, or connect now
+            setup_start = time.perf_counter()
+            warm = False
+            if app_config.LIVE_POOL_ENABLED:
+                self.gemini_client, warm, _ = await live_pool.get_pool().checkout(
+                    self.language, voice_name, conversation_context
+                )
+                success = True
+            else:
+                self.gemini_client = FakeGeminiLiveClient() if app_config.LIVE_FAKE_GEMINI else GeminiLiveClient()
+                success = await self.gemini_client.start_session(
+                    language=self.language,
+                    conversation_context=conversation_context,
+                    voice_name=voice_name
+                )
+            setup_ms = round((time.perf_counter() - setup_start) * 1000, 1)
             
             if success:
                 self.is_active = True
+                self._mic_sender_task = asyncio.create_task(self._mic_sender())
                 
                 # Load conversation from database if conversation_id provided
                 if config.get("conversation_id"):
@@ -62,7 +108,11 @@ class ConversationSession:
                 await self.send_message({
                     "type": "setup_complete",
                     "session_id": self.session_id,
-                    "message": "Gemini Live session started"
+                    "message": "Gemini Live session started",
+                    "audio_format": live_frames.AUDIO_FORMATS,
+                    "frame_header_bytes": live_frames.HEADER.size,
+                    "setup_ms": setup_ms,
+                    "warm": warm,
                 })
                 
                 return True
@@ -86,9 +136,9 @@ class ConversationSession:
         try:
             # Get activity data from database
             import sqlite3
-            from . import config
+            from .db_pool import get_connection
             
-            conn = sqlite3.connect(config.DB_PATH)
+            conn = get_connection()
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -103,6 +153,8 @@ class ConversationSession:
             if row and row['activity_data']:
                 activity_data = json.loads(row['activity_data'])
                 self.messages = activity_data.get('messages', [])
+                # Older sessions kept base64 audio on the messages
+                await asyncio.to_thread(audio_store.externalize_live_messages, self.messages)
                 
                 # Send conversation history to frontend
                 await self.send_message({
@@ -128,16 +180,41 @@ class ConversationSession:
             })
             return
         
-        try:
-            # Send audio to Gemini Live
-            await self.gemini_client.send_audio(audio_data)
-            
-        except Exception as e:
-            print(f"[WebSocket] Error handling audio chunk: {e}")
-            await self.send_message({
-                "type": "error",
-                "message": f"Error processing audio: {str(e)}"
-            })
+        # Queue for _mic_sender; never wait on Gemini here
+        self.turn_bytes["audio_in"] += len(audio_data)
+        self.mic_buffer.put(audio_data)
+    
+    async def _mic_sender(self):
+        """Forward queued microphone audio to Gemini Live (coalesced, stale audio dropped)"""
+        while True:
+            audio_data, received_at = await self.mic_buffer.get()
+            try:
+                await self.gemini_client.send_audio(audio_data)
+            except Exception as e:
+                print(f"[WebSocket] Error handling audio chunk: {e}")
+                await self.send_message({
+                    "type": "error",
+                    "message": f"Error processing audio: {str(e)}"
+                })
+                continue
+            sent_at = time.perf_counter()
+            for stamp in received_at:
+                self.mic_to_gemini.observe((sent_at - stamp) * 1000)
+    
+    async def _client_sender(self):
+        """Write queued frames and control messages to the client WebSocket"""
+        while True:
+            is_audio, payload, queued_at = await self.client_queue.get()
+            try:
+                if is_audio:
+                    await self.websocket.send_bytes(payload)
+                    self.gemini_to_client.observe((time.perf_counter() - queued_at) * 1000)
+                else:
+                    await self.websocket.send_text(payload)
+            except Exception as e:
+                print(f"[WebSocket] Error sending to client, stopping sender: {e}")
+                self._client_gone = True
+                return
     
     async def handle_text_message(self, text: str):
         """
@@ -184,41 +261,25 @@ class ConversationSession:
             text_buffer = []
             
             async for response in self.gemini_client.receive_responses():
+                received_at = time.perf_counter()
                 response_type = response.get("type")
                 
                 if response_type == "response":
-                    # Collect audio chunks
-                    if response.get("audio_chunks"):
-                        audio_buffer.extend(response["audio_chunks"])
+                    audio_chunks = response.get("audio_chunks", [])
+                    is_final = response.get("is_final", False)
+                    audio_buffer.extend(audio_chunks)
                     
                     # Collect text chunks
                     if response.get("text_chunks"):
                         text_buffer.extend(response["text_chunks"])
                     
-                    # Send audio chunks to frontend
-                    for audio_chunk in response.get("audio_chunks", []):
-                        await self.send_message({
-                            "type": "audio_chunk",
-                            "data": base64.b64encode(audio_chunk).decode('utf-8'),
-                            "is_final": response.get("is_final", False)
-                        })
+                    # Send audio chunks to frontend as binary frames (raw PCM)
+                    for i, audio_chunk in enumerate(audio_chunks):
+                        await self.send_audio_frame(audio_chunk, final=is_final and i == len(audio_chunks) - 1, received_at=received_at)
                     
                     # If response is final, send complete message
-                    if response.get("is_final"):
-                        full_text = " ".join(text_buffer)
-                        full_audio = b"".join(audio_buffer)
-                        
-                        # Update last message with AI response
-                        if self.messages and self.messages[-1]["ai_response"] is None:
-                            self.messages[-1]["ai_response"] = full_text
-                            self.messages[-1]["audio_data"] = base64.b64encode(full_audio).decode('utf-8')
-                        
-                        # Send completion message
-                        await self.send_message({
-                            "type": "response_complete",
-                            "text": full_text,
-                            "audio": base64.b64encode(full_audio).decode('utf-8')
-                        })
+                    if is_final:
+                        await self._complete_turn(text_buffer, audio_buffer)
                         
                         # Clear buffers
                         audio_buffer = []
@@ -246,17 +307,91 @@ class ConversationSession:
                 "message": f"Error receiving responses: {str(e)}"
             })
     
+    async def _complete_turn(self, text_buffer: list, audio_buffer: list):
+        """Store the turn's audio once and send response_complete with a reference to it"""
+        full_text = " ".join(text_buffer)
+        full_audio = b"".join(audio_buffer)
+        
+        audio_id = None
+        if full_audio:
+            try:
+                wav_data = audio_store.pcm_to_wav(full_audio, live_frames.AUDIO_FORMATS['output']['sample_rate'])
+                audio_id = await asyncio.to_thread(audio_store.save, wav_data, 'audio/wav')
+            except Exception as e:
+                print(f"[WebSocket] Error storing turn audio: {e}")
+        
+        # Update last message with AI response (turns started by voice have no pending message)
+        if not self.messages or self.messages[-1].get("ai_response") is not None:
+            self.messages.append({
+                "user_message": None,
+                "ai_response": None,
+                "timestamp": app_config.get_current_time().isoformat()
+            })
+        self.messages[-1]["ai_response"] = full_text
+        if audio_id:
+            self.messages[-1]["audio_id"] = audio_id
+            self.messages[-1]["audio_url"] = audio_store.audio_url(audio_id)
+        
+        turn_bytes = self.turn_bytes
+        self.turn_bytes = self._empty_turn_bytes()
+        # Send completion message
+        await self.send_message({
+            "type": "response_complete",
+            "text": full_text,
+            "audio_id": audio_id,
+            "audio_url": audio_store.audio_url(audio_id) if audio_id else None,
+            "audio_bytes": len(full_audio),
+            "turn_bytes": turn_bytes,
+        })
+    
+    async def send_audio_frame(self, audio_chunk: bytes, final: bool = False, received_at: Optional[float] = None):
+        """
+        Queue a chunk of model speech for the frontend as a binary frame
+        
+        Args:
+            audio_chunk: Raw PCM audio data
+            final: Last chunk of the turn
+            received_at: When the chunk arrived from Gemini (for gemini-to-client latency)
+        """
+        if self._client_gone:
+            return
+        frame = live_frames.encode_frame(live_frames.KIND_AUDIO_OUT, audio_chunk, self.audio_out_seq, final)
+        self.audio_out_seq = (self.audio_out_seq + 1) & 0xFFFFFFFF
+        self.client_queue.put_audio(frame, received_at)
+        self.turn_bytes["audio_out"] += len(frame)
+    
     async def send_message(self, message: Dict):
         """
-        Send message to frontend via WebSocket
+        Queue a message for the frontend (sent in order with audio frames)
         
         Args:
             message: Message dict to send
         """
+        if self._client_gone:
+            return
         try:
-            await self.websocket.send_json(message)
-        except Exception as e:
-            print(f"[WebSocket] Error sending message: {e}")
+            text = json.dumps(message)
+        except (TypeError, ValueError) as e:
+            print(f"[WebSocket] Error encoding message: {e}")
+            return
+        self.client_queue.put_control(text)
+        self.turn_bytes["control_out"] += len(text.encode('utf-8'))
+    
+    def start_relay(self):
+        """Start the client sender (the mic sender starts with the Gemini session)"""
+        if self._client_sender_task is None:
+            self._client_sender_task = asyncio.create_task(self._client_sender())
+    
+    def stats(self) -> Dict:
+        """Relay queue counters and latency histograms for this session"""
+        return {
+            "session_id": self.session_id,
+            "is_active": self.is_active,
+            "mic": self.mic_buffer.stats(),
+            "client": self.client_queue.stats(),
+            "mic_to_gemini": self.mic_to_gemini.stats(),
+            "gemini_to_client": self.gemini_to_client.stats(),
+        }
     
     async def save_conversation(self):
         """Save conversation to database"""
@@ -264,13 +399,6 @@ class ConversationSession:
             return
         
         try:
-            # Prepare activity data
-            activity_data = {
-                "messages": self.messages,
-                "session_id": self.session_id,
-                "language": self.language
-            }
-            
             # Update database
             db.update_conversation_messages(
                 self.conversation_id,
@@ -289,11 +417,23 @@ class ConversationSession:
         # Save conversation before closing
         await self.save_conversation()
         
+        # Stop relaying: let already queued messages reach the client first
+        if self._client_sender_task and not self._client_gone:
+            await self.client_queue.drain(timeout=2.0)
+        for task in (self._mic_sender_task, self._client_sender_task):
+            if task and not task.done():
+                task.cancel()
+        
         # Close Gemini Live session
         if self.gemini_client:
             await self.gemini_client.close_session()
         
-        print(f"[WebSocket] Session {self.session_id} closed")
+        stats = self.stats()
+        print(f"[WebSocket] Session {self.session_id} closed "
+              f"(mic->gemini p95 {stats['mic_to_gemini']['p95_ms']}ms, "
+              f"gemini->client p95 {stats['gemini_to_client']['p95_ms']}ms, "
+              f"mic dropped {stats['mic']['dropped_overflow'] + stats['mic']['dropped_stale']}, "
+              f"audio frames dropped {stats['client']['dropped_audio']})")
 
 
 class ConnectionManager:
@@ -312,6 +452,7 @@ class ConnectionManager:
         """
         await websocket.accept()
         session = ConversationSession(websocket, session_id)
+        session.start_relay()
         self.active_sessions[session_id] = session
         print(f"[WebSocket] Session {session_id} connected")
         return session
@@ -330,6 +471,20 @@ class ConnectionManager:
     def get_session(self, session_id: str) -> Optional[ConversationSession]:
         """Get session by ID"""
         return self.active_sessions.get(session_id)
+    
+    def stats(self) -> Dict:
+        """Relay stats of every active session, plus latency histograms merged across them"""
+        mic_to_gemini = live_relay.LatencyHistogram()
+        gemini_to_client = live_relay.LatencyHistogram()
+        for session in self.active_sessions.values():
+            mic_to_gemini.merge(session.mic_to_gemini)
+            gemini_to_client.merge(session.gemini_to_client)
+        return {
+            "active_sessions": len(self.active_sessions),
+            "mic_to_gemini": mic_to_gemini.stats(),
+            "gemini_to_client": gemini_to_client.stats(),
+            "sessions": [session.stats() for session in self.active_sessions.values()],
+        }
 
 
 # Global connection manager
@@ -351,8 +506,22 @@ async def handle_websocket_conversation(websocket: WebSocket):
     
     try:
         while True:
-            # Receive message from frontend
-            data = await websocket.receive_json()
+            # Receive message from frontend: binary audio frames or JSON control messages
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            
+            if message.get("bytes") is not None:
+                try:
+                    frame = live_frames.decode_frame(message["bytes"])
+                except live_frames.FrameError as e:
+                    await session.send_message({"type": "error", "message": f"Invalid audio frame: {str(e)}"})
+                    continue
+                if frame.kind == live_frames.KIND_AUDIO_IN and frame.payload:
+                    await session.handle_audio_chunk(frame.payload)
+                continue
+            
+            data = json.loads(message.get("text") or "{}")
             message_type = data.get("type")
             
             if message_type == "start_session":
@@ -367,7 +536,7 @@ async def handle_websocket_conversation(websocket: WebSocket):
                     )
             
             elif message_type == "audio_chunk":
-                # Handle audio chunk
+                # Legacy base64 audio chunk (current clients send binary frames)
                 audio_b64 = data.get("data")
                 if audio_b64:
                     audio_data = base64.b64decode(audio_b64)
@@ -384,7 +553,8 @@ async def handle_websocket_conversation(websocket: WebSocket):
                 await session.save_conversation()
                 await session.send_message({
                     "type": "session_ended",
-                    "message": "Session ended successfully"
+                    "message": "Session ended successfully",
+                    "stats": session.stats()
                 })
                 break
             
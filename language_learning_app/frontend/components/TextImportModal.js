@@ -16,6 +16,63 @@ import { LanguageContext, LANGUAGES } from '../contexts/LanguageContext';
 
 const API_BASE_URL = __DEV__ ? 'http://localhost:8080' : 'http://localhost:8080';
 
+const STAGE_LABELS = {
+  queued: 'Starting import...',
+  tokenize: 'Extracting words...',
+  lemmatize: 'Lemmatizing words',
+  lookup: 'Checking your vocabulary...',
+  translate: 'Translating new words',
+  transliterate: 'Transliterating...',
+  insert: 'Adding words...',
+};
+
+const stageStatus = ({ stage, done, total }) => {
+  const label = STAGE_LABELS[stage] || 'Importing...';
+  return total ? `${label} (${done}/${total} batches)` : label;
+};
+
+// Follow an import job until it finishes: progress over SSE where
+// EventSource exists (web), otherwise by polling the result endpoint
+const waitForImport = (jobId, onProgress) => new Promise((resolve, reject) => {
+  if (typeof EventSource !== 'undefined') {
+    const eventSource = new EventSource(`${API_BASE_URL}/api/vocab/import-text/progress/${jobId}`);
+    eventSource.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.type === 'complete') {
+        eventSource.close();
+        resolve(data.result);
+      } else if (data.type === 'error') {
+        eventSource.close();
+        reject(new Error(data.detail || 'Failed to import text'));
+      } else {
+        onProgress(data);
+      }
+    };
+    eventSource.onerror = () => {
+      eventSource.close();
+      reject(new Error('Lost connection to the import'));
+    };
+    return;
+  }
+  const poll = async () => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/vocab/import-text/result/${jobId}`);
+      const data = await response.json();
+      if (!response.ok) {
+        reject(new Error(data.detail || `Server error: ${response.status}`));
+      } else if (data.status === 'running') {
+        onProgress(data);
+        setTimeout(poll, 1000);
+      } else {
+        resolve(data);
+      }
+    } catch (err) {
+      reject(err);
+    }
+  };
+  poll();
+});
+
 export default function TextImportModal({ visible, onClose, language, onImportComplete }) {
   const { userSelectedLanguages } = useContext(LanguageContext);
   const [text, setText] = useState('');
@@ -81,7 +138,7 @@ export default function TextImportModal({ visible, onClose, language, onImportCo
     }
     setProcessing(true);
     setResults(null);
-    setStatus('Extracting and lemmatizing words...');
+    setStatus(STAGE_LABELS.queued);
     try {
       const response = await fetch(`${API_BASE_URL}/api/vocab/import-text`, {
         method: 'POST',
@@ -96,7 +153,8 @@ export default function TextImportModal({ visible, onClose, language, onImportCo
         const errData = await response.json().catch(() => ({}));
         throw new Error(errData.detail || `Server error: ${response.status}`);
       }
-      const data = await response.json();
+      const { job_id } = await response.json();
+      const data = await waitForImport(job_id, (progress) => setStatus(stageStatus(progress)));
       setResults(data);
       setStatus('');
       if (data.new_words > 0 && onImportComplete) {
@@ -291,12 +291,14 @@ export default function ActivityHistoryScreen({ route, navigation }) {
       const audioDataList = activityData._audio_data || [];
       const audioData = audioDataList[paragraphIndex];
       
-      if (audioData && audioData.audio_base64 && audioData.format !== 'text_only') {
+      if (audioData && (audioData.audio_url || audioData.audio_base64) && audioData.format !== 'text_only') {
         try {
-          // Convert base64 to data URI
+          // Stored audio is streamed by URL; older activities embed base64
           const audioFormat = audioData.format || 'wav';
           const mimeType = audioFormat === 'wav' ? 'audio/wav' : 'audio/mpeg';
-          const dataUri = `data:${mimeType};base64,${audioData.audio_base64}`;
+          const dataUri = audioData.audio_url
+            ? `${API_BASE_URL}${audioData.audio_url}`
+            : `data:${mimeType};base64,${audioData.audio_base64}`;
           
           if (Platform.OS === 'web') {
             // Use HTML5 Audio API for web
@@ -496,7 +498,7 @@ export default function ActivityHistoryScreen({ route, navigation }) {
                 const soundKey = `${selectedActivity}-${paraIndex}`;
                 const isPlaying = playingParagraph === soundKey;
                 const hasAudio = audioDataList[paraIndex] && 
-                                 audioDataList[paraIndex].audio_base64 && 
+                                 (audioDataList[paraIndex].audio_url || audioDataList[paraIndex].audio_base64) && 
                                  audioDataList[paraIndex].format !== 'text_only';
                 
                 return (
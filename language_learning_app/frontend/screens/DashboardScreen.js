@@ -126,18 +126,24 @@ export default function DashboardScreen({ navigation }) {
   useEffect(() => {
     if (selectedLanguage) {
       loadDashboard();
-      loadAllTodayGoals();
+    }
+  }, [selectedLanguage, availableLanguages.length]);
+
+  // The current week comes with /api/home; older weeks are fetched as the user pages back
+  useEffect(() => {
+    if (selectedLanguage) {
       loadWeeklyStats(weekOffset);
     }
-  }, [selectedLanguage, weekOffset, availableLanguages.length]);
+  }, [selectedLanguage, weekOffset]);
 
   // Reload data when screen comes into focus (e.g., returning from ProfileScreen)
   useFocusEffect(
     React.useCallback(() => {
       if (selectedLanguage) {
         loadDashboard();
-        loadAllTodayGoals();
-        loadWeeklyStats(weekOffset);
+        if (weekOffset > 0) {
+          loadWeeklyStats(weekOffset);
+        }
       }
       
       // Check if we need to sync SRS quotas (once per day)
@@ -164,36 +170,6 @@ export default function DashboardScreen({ navigation }) {
     }
   };
 
-  const loadAllTodayGoals = async () => {
-    try {
-      const response = await fetch(`${API_BASE_URL}/api/today-goals-all`);
-      if (response.ok) {
-        const data = await response.json();
-        setAllTodayGoals(data.goals || {});
-        // Load progress for each language with goals
-        await loadProgressForLanguages(Object.keys(data.goals || {}));
-      }
-    } catch (error) {
-      console.error('Error loading today goals:', error);
-    }
-  };
-
-  const loadProgressForLanguages = async (languages) => {
-    try {
-      const progressData = {};
-      for (const lang of languages) {
-        const response = await fetch(`${API_BASE_URL}/api/dashboard/${lang}`);
-        if (response.ok) {
-          const data = await response.json();
-          progressData[lang] = data.progress || {};
-        }
-      }
-      setAllTodayProgress(progressData);
-    } catch (error) {
-      console.error('Error loading progress:', error);
-    }
-  };
-
   const toggleLanguage = (langCode) => {
     setExpandedLanguages(prev => ({
       ...prev,
@@ -206,6 +182,10 @@ export default function DashboardScreen({ navigation }) {
     if (weeklyStatsCache.current[offset]) {
       setWeeklyStats(weeklyStatsCache.current[offset]);
     }
+    if (offset === 0) {
+      // Filled in by loadDashboard from the /api/home response
+      return;
+    }
     
     try {
       const response = await fetch(`${API_BASE_URL}/api/weekly-stats?days=7&offset=${offset * 7}`);
@@ -218,7 +198,7 @@ export default function DashboardScreen({ navigation }) {
         setWeeklyStats(stats);
         
         // Preload adjacent weeks for seamless navigation
-        if (offset === 0 || !weeklyStatsCache.current[offset + 1]) {
+        if (!weeklyStatsCache.current[offset + 1]) {
           // Preload previous week (older)
           fetch(`${API_BASE_URL}/api/weekly-stats?days=7&offset=${(offset + 1) * 7}`)
             .then(res => res.json())
@@ -228,7 +208,7 @@ export default function DashboardScreen({ navigation }) {
             .catch(() => {});
         }
         
-        if (offset > 0 && !weeklyStatsCache.current[offset - 1]) {
+        if (offset > 1 && !weeklyStatsCache.current[offset - 1]) {
           // Preload next week (newer)
           fetch(`${API_BASE_URL}/api/weekly-stats?days=7&offset=${(offset - 1) * 7}`)
             .then(res => res.json())
@@ -293,7 +273,9 @@ export default function DashboardScreen({ navigation }) {
     setLoading(true);
     try {
       console.log(`Loading dashboard for ${selectedLanguage}...`);
-      const response = await fetch(`${API_BASE_URL}/api/dashboard/${selectedLanguage}`);
+      // One request for the dashboard, streak, today's goals/progress in every
+      // language and the past week's activity; unchanged data comes back as a 304 (ETag) and is served from cache
+      const response = await fetch(`${API_BASE_URL}/api/home?language=${selectedLanguage}`);
       
       if (!response.ok) {
         const errorText = await response.text();
@@ -305,25 +287,20 @@ export default function DashboardScreen({ navigation }) {
       
       const data = await response.json();
       console.log('Dashboard data loaded:', data);
+      const dashboard = data.dashboard || {};
       
-      // Load goal-based streak from dedicated endpoint
-      try {
-        const streakResponse = await fetch(`${API_BASE_URL}/api/streak`);
-        if (streakResponse.ok) {
-          const streakData = await streakResponse.json();
-          setStreak(streakData.current_streak || 0);
-        } else {
-          // Fallback to old streak from profile if goal-based fails
-          setStreak(data.streak || 0);
-        }
-      } catch (streakError) {
-        console.warn('Failed to load goal-based streak, using profile streak:', streakError);
-        setStreak(data.streak || 0);
+      // Goal-based streak, falling back to the old streak from the profile
+      setStreak(data.streak?.current_streak ?? dashboard.streak ?? 0);
+      setLevel(dashboard.level || { level: 'A1', progress: 0 });
+      setProgress(dashboard.progress || {});
+      setGoals(dashboard.goals || {});
+      setAllTodayGoals(data.today_goals_all?.goals || {});
+      setAllTodayProgress(data.today_progress || {});
+      // Past 7 days of activity, as /api/weekly-stats would return them
+      weeklyStatsCache.current[0] = data.weekly_stats || [];
+      if (weekOffset === 0) {
+        setWeeklyStats(weeklyStatsCache.current[0]);
       }
-      
-      setLevel(data.level || { level: 'A1', progress: 0 });
-      setProgress(data.progress || {});
-      setGoals(data.goals || {});
     } catch (error) {
       console.error('Error loading dashboard:', error);
       Alert.alert('Error', `Failed to load dashboard: ${error.message || 'Unknown error'}`);
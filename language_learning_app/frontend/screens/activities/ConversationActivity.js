@@ -174,7 +174,7 @@ export default function ConversationActivity({ route, navigation }) {
   useEffect(() => {
     conversation.conversationMessages.forEach((msg, index) => {
       if (msg.audio_data && !msg._loading) {
-        audio.loadAudio(index, msg.audio_data);
+        audio.loadAudio(index, msg.audio_data.audio_url || msg.audio_data);
       }
     });
   }, [conversation.conversationMessages]);
@@ -182,6 +182,14 @@ export default function ListeningActivity({ route, navigation }) {
     }
   }, []);
 
+  // Load each paragraph's audio as soon as the SSE stream reports it (loadAudio
+  // skips paragraphs that are already loaded, so the final activity reuses them)
+  useEffect(() => {
+    Object.entries(ttsProgress.paragraphAudio).forEach(([index, audioUrl]) => {
+      audio.loadAudio(Number(index), audioUrl);
+    });
+  }, [ttsProgress.paragraphAudio]);
+
   // Load audio when activity is loaded (only when component is mounted and has valid data)
   useEffect(() => {
     if (!activityData.activity || !activityData.activity._audio_data) {
@@ -199,7 +207,10 @@ export default function ListeningActivity({ route, navigation }) {
     console.log('[Audio] Loading audio data:', audioDataList.length, 'paragraphs');
     
     audioDataList.forEach((audioData, index) => {
-      if (audioData && audioData.audio_base64) {
+      if (audioData && audioData.audio_url) {
+        // Stored audio, streamed from /api/audio/{audio_id}
+        audio.loadAudio(index, audioData.audio_url);
+      } else if (audioData && audioData.audio_base64) {
         // Validate base64 data exists and has reasonable length
         if (typeof audioData.audio_base64 === 'string' && audioData.audio_base64.length > 1000) {
           console.log(`[Audio] Loading paragraph ${index}, base64 length:`, audioData.audio_base64.length);
@@ -638,6 +649,40 @@ export default function ListeningActivity({ route, navigation }) {
             ) : null;
           })()
         )}
+
+        {/* Paragraphs stream in with their audio: start listening while the rest synthesizes */}
+        {ttsProgress.paragraphs.length > 0 && (
+          <ScrollView style={styles.previewList} contentContainerStyle={styles.previewListContent}>
+            {ttsProgress.paragraphs.map((para, index) => (
+              <View key={index} style={styles.previewParagraph}>
+                <SafeText style={styles.previewText}>{normalizeText(para)}</SafeText>
+                {ttsProgress.paragraphAudio[index] ? (
+                  <AudioPlayer
+                    isPlaying={audio.playingParagraph === index}
+                    currentTime={(audio.audioPosition[index] || 0) / 1000}
+                    duration={(audio.audioDuration[index] || 0) / 1000}
+                    onPlayPause={() => {
+                      if (audio.playingParagraph === index) {
+                        audio.pauseAudio(index);
+                      } else {
+                        audio.playAudio(index);
+                      }
+                    }}
+                    onSeek={(time) => audio.seekAudio(index, time)}
+                    onReplay={() => audio.seekAudio(index, 0)}
+                    volume={1.0}
+                    onVolumeChange={() => {}}
+                    primaryColor={colors.primary}
+                    showVolumeControl={false}
+                    showSpeedControl={false}
+                  />
+                ) : (
+                  <ActivityIndicator size="small" color={colors.primary} />
+                )}
+              </View>
+            ))}
+          </ScrollView>
+        )}
       </View>
     );
   }
@@ -1439,6 +1484,26 @@ const styles = StyleSheet.create({
     fontSize: 16,
     color: '#666',
   },
+  previewList: {
+    marginTop: 20,
+    width: '90%',
+    maxWidth: 500,
+    flexGrow: 0,
+  },
+  previewListContent: {
+    paddingBottom: 20,
+  },
+  previewParagraph: {
+    marginBottom: 12,
+    padding: 12,
+    borderRadius: 8,
+    backgroundColor: '#F5F5F5',
+  },
+  previewText: {
+    fontSize: 15,
+    color: '#333',
+    marginBottom: 8,
+  },
   header: {
     flexDirection: 'row',
     alignItems: 'center',
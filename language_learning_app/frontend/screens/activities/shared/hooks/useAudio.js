@@ -6,6 +6,18 @@ import { useState, useRef, useEffect } from 'react';
 import { Audio } from 'expo-av';
 import { Platform } from 'react-native';
 
+const API_BASE_URL = __DEV__ ? 'http://localhost:8080' : 'http://localhost:8080';
+
+// Stored audio is referenced by URL (/api/audio/{audio_id}); older activities embed base64 WAV
+const isAudioUrl = (audioData) => audioData.startsWith('/api/') || audioData.startsWith('http');
+
+const audioSource = (audioData) => {
+  if (isAudioUrl(audioData)) {
+    return audioData.startsWith('http') ? audioData : `${API_BASE_URL}${audioData}`;
+  }
+  return `data:audio/wav;base64,${audioData}`;
+};
+
 export function useAudio() {
   const [audioSounds, setAudioSounds] = useState({});
   const [audioStatus, setAudioStatus] = useState({});
@@ -17,7 +29,7 @@ export function useAudio() {
   const positionUpdateIntervalRef = useRef({});
   const isCleaningUpRef = useRef(false);
 
-  // Load audio for a paragraph
+  // Load audio for a paragraph (audioData: audio URL or base64 WAV string)
   const loadAudio = async (paragraphIndex, audioData) => {
     // Validate audioData
     if (!audioData || typeof audioData !== 'string' || audioData.length === 0) {
@@ -30,7 +42,7 @@ export function useAudio() {
     }
 
     // Validate it's actual base64 data (should be at least a few KB for audio)
-    if (audioData.length < 1000) {
+    if (!isAudioUrl(audioData) && audioData.length < 1000) {
       console.warn(`[Audio] Audio data too short for paragraph ${paragraphIndex}: ${audioData.length} chars`);
       return;
     }
@@ -79,16 +91,16 @@ export function useAudio() {
         });
         
         // Double-check audioData before setting src
-        if (!audioData || audioData.length < 1000) {
+        if (!audioData || (!isAudioUrl(audioData) && audioData.length < 1000)) {
           console.error(`[Audio] Cannot set audio src - invalid data at assignment time`);
           return;
         }
         
-        // Set the source - ensure proper base64 data URI
-        audio.src = `data:audio/wav;base64,${audioData}`;
+        // Set the source - audio URL or base64 data URI
+        audio.src = audioSource(audioData);
         
         // Verify src was set correctly
-        if (!audio.src || audio.src === 'http://localhost:8082/' || audio.src.length < 100) {
+        if (!audio.src || audio.src === 'http://localhost:8082/' || (!isAudioUrl(audioData) && audio.src.length < 100)) {
           console.error(`[Audio] Audio src was not set correctly for paragraph ${paragraphIndex}:`, audio.src);
           return;
         }
@@ -101,7 +113,7 @@ export function useAudio() {
       } else {
         // Native mobile - use expo-av
         const { sound } = await Audio.Sound.createAsync(
-          { uri: `data:audio/wav;base64,${audioData}` },
+          { uri: audioSource(audioData) },
           { shouldPlay: false },
           (status) => onPlaybackStatusUpdate(paragraphIndex, status)
         );
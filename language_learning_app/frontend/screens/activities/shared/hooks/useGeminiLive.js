@@ -2,9 +2,66 @@ import { useState, useRef, useCallback, useEffect } from 'react';
 import { Platform } from 'react-native';
 import { API_BASE_URL } from '../constants';
 
+// Binary audio frames (see backend/live_frames.py): 8-byte big-endian header
+// (version, kind, flags, seq) followed by raw 16-bit little-endian mono PCM
+const FRAME_VERSION = 1;
+const FRAME_HEADER_BYTES = 8;
+const KIND_AUDIO_IN = 1;
+const KIND_AUDIO_OUT = 2;
+const FLAG_FINAL = 0x0001;
+const DEFAULT_AUDIO_FORMAT = {
+  input: { sample_rate: 16000 },
+  output: { sample_rate: 24000 },
+};
+
+const encodeAudioFrame = (pcm, seq, final = false) => {
+  const frame = new Uint8Array(FRAME_HEADER_BYTES + pcm.byteLength);
+  const header = new DataView(frame.buffer);
+  header.setUint8(0, FRAME_VERSION);
+  header.setUint8(1, KIND_AUDIO_IN);
+  header.setUint16(2, final ? FLAG_FINAL : 0);
+  header.setUint32(4, seq >>> 0);
+  frame.set(new Uint8Array(pcm.buffer, pcm.byteOffset, pcm.byteLength), FRAME_HEADER_BYTES);
+  return frame.buffer;
+};
+
+const decodeFrame = (buffer) => {
+  if (buffer.byteLength < FRAME_HEADER_BYTES) {
+    return null;
+  }
+  const header = new DataView(buffer);
+  if (header.getUint8(0) !== FRAME_VERSION) {
+    return null;
+  }
+  return {
+    kind: header.getUint8(1),
+    final: (header.getUint16(2) & FLAG_FINAL) !== 0,
+    seq: header.getUint32(4),
+    payload: buffer.slice(FRAME_HEADER_BYTES),
+  };
+};
+
+const floatToPcm16 = (samples) => {
+  const pcm = new Int16Array(samples.length);
+  for (let i = 0; i < samples.length; i++) {
+    const s = Math.max(-1, Math.min(1, samples[i]));
+    pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+  }
+  return pcm;
+};
+
+const pcm16ToFloat = (buffer) => {
+  const view = new DataView(buffer);
+  const samples = new Float32Array(buffer.byteLength >> 1);
+  for (let i = 0; i < samples.length; i++) {
+    samples[i] = view.getInt16(i * 2, true) / 0x8000;
+  }
+  return samples;
+};
+
 /**
  * Custom hook for managing Gemini 2.5 Live WebSocket connection
- * Handles bidirectional audio streaming in real-time
+ * Handles bidirectional audio streaming in real-time as binary PCM frames
  * Uses Web Audio API for web platform, will use expo-av for mobile
  */
 export const useGeminiLive = () => {
@@ -14,14 +71,17 @@ export const useGeminiLive = () => {
   const [connectionStatus, setConnectionStatus] = useState('disconnected');
   const [aiStatus, setAiStatus] = useState('idle');
   const [error, setError] = useState(null);
+  const [lastResponse, setLastResponse] = useState(null);
   
   const wsRef = useRef(null);
-  const mediaRecorderRef = useRef(null);
-  const audioContextRef = useRef(null);
+  const audioFormatRef = useRef(DEFAULT_AUDIO_FORMAT);
+  const captureContextRef = useRef(null);
+  const captureSourceRef = useRef(null);
+  const captureProcessorRef = useRef(null);
   const audioStreamRef = useRef(null);
-  const audioQueueRef = useRef([]);
-  const isPlayingRef = useRef(false);
-  const audioChunksRef = useRef([]);
+  const sendSeqRef = useRef(0);
+  const audioContextRef = useRef(null);  // Playback
+  const playbackTimeRef = useRef(0);
   
   /**
    * Connect to WebSocket server
@@ -39,6 +99,7 @@ export const useGeminiLive = () => {
       
       // Create WebSocket connection
       const ws = new WebSocket(fullWsUrl);
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
       
       // Setup WebSocket event handlers
@@ -56,12 +117,22 @@ export const useGeminiLive = () => {
       
       ws.onmessage = async (event) => {
         try {
+          if (typeof event.data !== 'string') {
+            // Binary frame: model speech as raw PCM
+            const frame = decodeFrame(event.data);
+            if (frame && frame.kind === KIND_AUDIO_OUT && frame.payload.byteLength > 0) {
+              playPcmChunk(frame.payload);
+            }
+            return;
+          }
+          
           const message = JSON.parse(event.data);
           console.log('WebSocket message:', message.type);
           
           switch (message.type) {
             case 'setup_complete':
               console.log('Session setup complete');
+              audioFormatRef.current = message.audio_format || DEFAULT_AUDIO_FORMAT;
               setAiStatus('listening');
               break;
               
@@ -70,16 +141,10 @@ export const useGeminiLive = () => {
               setAiStatus(message.status);
               break;
               
-            case 'audio_chunk':
-              // Queue audio chunk for playback
-              if (message.data) {
-                audioQueueRef.current.push(message.data);
-                playNextAudioChunk();
-              }
-              break;
-              
             case 'response_complete':
-              console.log('Response complete:', message.text);
+              // Audio already streamed as binary frames; this only references the stored copy
+              console.log('Response complete:', message.text, message.turn_bytes);
+              setLastResponse({ text: message.text, audioUrl: message.audio_url });
               setAiStatus('listening');
               break;
               
@@ -142,51 +207,35 @@ export const useGeminiLive = () => {
           throw new Error('MediaDevices API not supported in this browser');
         }
 
+        const inputRate = audioFormatRef.current.input.sample_rate;
+
         // Get microphone access
         const stream = await navigator.mediaDevices.getUserMedia({ 
           audio: {
             channelCount: 1,
-            sampleRate: 16000,
+            sampleRate: inputRate,
           } 
         });
         audioStreamRef.current = stream;
 
-        // Create MediaRecorder for capturing audio
-        const mediaRecorder = new MediaRecorder(stream, {
-          mimeType: 'audio/webm;codecs=opus',
-        });
+        // Capture raw PCM at the rate Gemini Live expects (the context resamples the mic)
+        const context = new (window.AudioContext || window.webkitAudioContext)({ sampleRate: inputRate });
+        const source = context.createMediaStreamSource(stream);
+        const processor = context.createScriptProcessor(4096, 1, 1);
         
-        mediaRecorderRef.current = mediaRecorder;
-        audioChunksRef.current = [];
-
-        // Handle data available event (fires periodically)
-        mediaRecorder.ondataavailable = async (event) => {
-          if (event.data.size > 0) {
-            audioChunksRef.current.push(event.data);
-            
-            // Convert blob to base64 and send
-            const reader = new FileReader();
-            reader.onloadend = () => {
-              const base64Audio = reader.result.split(',')[1]; // Remove data URL prefix
-              
-              if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
-                wsRef.current.send(JSON.stringify({
-                  type: 'audio_chunk',
-                  data: base64Audio,
-                }));
-              }
-            };
-            reader.readAsDataURL(event.data);
+        processor.onaudioprocess = (event) => {
+          if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+            const pcm = floatToPcm16(event.inputBuffer.getChannelData(0));
+            wsRef.current.send(encodeAudioFrame(pcm, sendSeqRef.current++));
           }
         };
-
-        mediaRecorder.onerror = (event) => {
-          console.error('MediaRecorder error:', event);
-          setError('Recording error occurred');
-        };
-
-        // Start recording with timeslice for real-time chunks
-        mediaRecorder.start(1000); // Get data every 1 second
+        
+        source.connect(processor);
+        processor.connect(context.destination);  // Required for onaudioprocess to fire; outputs silence
+        
+        captureContextRef.current = context;
+        captureSourceRef.current = source;
+        captureProcessorRef.current = processor;
         
         setIsRecording(true);
         setIsStreaming(true);
@@ -211,38 +260,13 @@ export const useGeminiLive = () => {
       console.log('Stopping recording...');
       
       if (Platform.OS === 'web') {
-        // Stop MediaRecorder
-        if (mediaRecorderRef.current && mediaRecorderRef.current.state !== 'inactive') {
-          mediaRecorderRef.current.stop();
-          
-          // Wait for final data
-          await new Promise(resolve => setTimeout(resolve, 100));
-          
-          // Send final chunk if any
-          if (audioChunksRef.current.length > 0 && wsRef.current?.readyState === WebSocket.OPEN) {
-            const finalBlob = new Blob(audioChunksRef.current, { type: 'audio/webm' });
-            const reader = new FileReader();
-            reader.onloadend = () => {
-              const base64Audio = reader.result.split(',')[1];
-              wsRef.current.send(JSON.stringify({
-                type: 'audio_chunk',
-                data: base64Audio,
-                is_final: true,
-              }));
-            };
-            reader.readAsDataURL(finalBlob);
-          }
-        }
+        stopCapture();
         
-        // Stop audio stream
-        if (audioStreamRef.current) {
-          audioStreamRef.current.getTracks().forEach(track => track.stop());
-          audioStreamRef.current = null;
+        // Mark the end of this utterance
+        if (wsRef.current?.readyState === WebSocket.OPEN) {
+          wsRef.current.send(encodeAudioFrame(new Int16Array(0), sendSeqRef.current++, true));
         }
         
-        audioChunksRef.current = [];
-        mediaRecorderRef.current = null;
-        
       } else {
         // Mobile implementation - future
         throw new Error('Mobile recording not yet implemented');
@@ -258,6 +282,36 @@ export const useGeminiLive = () => {
     }
   }, []);
   
+  /**
+   * Stop microphone capture (Web Audio graph and media tracks)
+   */
+  const stopCapture = () => {
+    if (captureProcessorRef.current) {
+      captureProcessorRef.current.onaudioprocess = null;
+      try {
+        captureProcessorRef.current.disconnect();
+        captureSourceRef.current?.disconnect();
+      } catch (err) {
+        console.error('Error disconnecting capture graph:', err);
+      }
+    }
+    if (captureContextRef.current) {
+      captureContextRef.current.close().catch(() => {});
+    }
+    captureContextRef.current = null;
+    captureSourceRef.current = null;
+    captureProcessorRef.current = null;
+    
+    if (audioStreamRef.current) {
+      try {
+        audioStreamRef.current.getTracks().forEach(track => track.stop());
+      } catch (err) {
+        console.error('Error stopping audio stream:', err);
+      }
+      audioStreamRef.current = null;
+    }
+  };
+  
   /**
    * Send text message to server
    */
@@ -272,87 +326,53 @@ export const useGeminiLive = () => {
   }, []);
   
   /**
-   * Play next audio chunk from queue
+   * Schedule a chunk of model speech (raw PCM) right after the previous one
    */
-  const playNextAudioChunk = useCallback(async () => {
-    if (isPlayingRef.current || audioQueueRef.current.length === 0) {
+  const playPcmChunk = (pcmBuffer) => {
+    if (Platform.OS !== 'web') {
+      // Mobile playback - future implementation
+      console.log('Mobile audio playback not yet implemented');
       return;
     }
     
     try {
-      isPlayingRef.current = true;
-      const base64Audio = audioQueueRef.current.shift();
-      
-      if (Platform.OS === 'web') {
-        // Web Audio API playback
-        // Convert base64 to ArrayBuffer
-        const binaryString = atob(base64Audio);
-        const bytes = new Uint8Array(binaryString.length);
-        for (let i = 0; i < binaryString.length; i++) {
-          bytes[i] = binaryString.charCodeAt(i);
-        }
-        
-        // Create audio element for playback
-        const blob = new Blob([bytes], { type: 'audio/wav' });
-        const audioUrl = URL.createObjectURL(blob);
-        const audio = new Audio(audioUrl);
-        
-        audio.onended = () => {
-          isPlayingRef.current = false;
-          URL.revokeObjectURL(audioUrl);
-          // Play next chunk
-          playNextAudioChunk();
-        };
-        
-        audio.onerror = (e) => {
-          console.error('Error playing audio:', e);
-          isPlayingRef.current = false;
-          URL.revokeObjectURL(audioUrl);
-        };
-        
-        await audio.play();
-        
-      } else {
-        // Mobile playback - future implementation
-        console.log('Mobile audio playback not yet implemented');
-        isPlayingRef.current = false;
+      const outputRate = audioFormatRef.current.output.sample_rate;
+      if (!audioContextRef.current) {
+        audioContextRef.current = new (window.AudioContext || window.webkitAudioContext)();
+        playbackTimeRef.current = 0;
       }
+      const context = audioContextRef.current;
+      
+      const samples = pcm16ToFloat(pcmBuffer);
+      const buffer = context.createBuffer(1, samples.length, outputRate);
+      buffer.copyToChannel(samples, 0);
       
+      const source = context.createBufferSource();
+      source.buffer = buffer;
+      source.connect(context.destination);
+      
+      const startAt = Math.max(context.currentTime, playbackTimeRef.current);
+      source.start(startAt);
+      playbackTimeRef.current = startAt + buffer.duration;
     } catch (err) {
       console.error('Error playing audio chunk:', err);
-      isPlayingRef.current = false;
     }
-  }, []);
+  };
   
   /**
    * Cleanup resources
    */
   const cleanup = useCallback(async () => {
     // Stop recording
-    if (mediaRecorderRef.current && mediaRecorderRef.current.state !== 'inactive') {
-      try {
-        mediaRecorderRef.current.stop();
-      } catch (err) {
-        console.error('Error stopping media recorder:', err);
-      }
-    }
+    stopCapture();
     
-    if (audioStreamRef.current) {
-      try {
-        audioStreamRef.current.getTracks().forEach(track => track.stop());
-      } catch (err) {
-        console.error('Error stopping audio stream:', err);
-      }
-      audioStreamRef.current = null;
+    // Stop playback
+    if (audioContextRef.current) {
+      audioContextRef.current.close().catch(() => {});
+      audioContextRef.current = null;
     }
-    
-    // Clear refs
-    mediaRecorderRef.current = null;
-    audioChunksRef.current = [];
-    
-    // Clear audio queue
-    audioQueueRef.current = [];
-    isPlayingRef.current = false;
+    playbackTimeRef.current = 0;
+    sendSeqRef.current = 0;
     
     setIsRecording(false);
     setIsStreaming(false);
@@ -373,6 +393,7 @@ export const useGeminiLive = () => {
     
     // AI state
     aiStatus,
+    lastResponse,
     isRecording,
     isStreaming,
     
@@ -1,5 +1,7 @@
 /**
  * Hook for tracking TTS generation progress via Server-Sent Events (SSE)
+ * Paragraph texts arrive before any audio, then each paragraph's audio URL as
+ * soon as it is synthesized, so playback can start before the activity is ready
  */
 import { useState, useEffect, useRef } from 'react';
 import { API_BASE_URL } from '../constants';
@@ -8,6 +10,9 @@ export function useTTSProgress(sessionId) {
   const [progress, setProgress] = useState({});
   const [paragraphCount, setParagraphCount] = useState(0);
   const [isComplete, setIsComplete] = useState(false);
+  const [paragraphs, setParagraphs] = useState([]);
+  const [paragraphAudio, setParagraphAudio] = useState({});  // paragraph index -> audio URL
+  const [timeToFirstAudioMs, setTimeToFirstAudioMs] = useState(null);
   const eventSourceRef = useRef(null);
 
   console.log('[TTS Progress Hook] Render - sessionId:', sessionId, 'type:', typeof sessionId);
@@ -56,6 +61,19 @@ export function useTTSProgress(sessionId) {
           });
           setProgress(data.progress || {});
           setParagraphCount(data.total_paragraphs || 0);
+          // Reconnecting clients get whatever text and audio is already available
+          setParagraphs(data.paragraphs || []);
+          const readyAudio = {};
+          Object.entries(data.audio || {}).forEach(([index, audioRef]) => {
+            readyAudio[index] = audioRef.audio_url;
+          });
+          setParagraphAudio(readyAudio);
+          setTimeToFirstAudioMs(data.time_to_first_audio_ms ?? null);
+        } else if (data.type === 'paragraphs') {
+          // Passage text is ready (audio follows per paragraph)
+          console.log('[TTS Progress] 📝 PARAGRAPHS - Received', data.paragraphs?.length, 'paragraphs');
+          setParagraphs(data.paragraphs || []);
+          setParagraphCount(data.total_paragraphs || 0);
         } else if (data.type === 'update_count') {
           // Paragraph count updated (actual vs initial estimate)
           console.log('[TTS Progress] 🔢 UPDATE_COUNT - Updating paragraph count to:', data.total_paragraphs);
@@ -70,6 +88,12 @@ export function useTTSProgress(sessionId) {
           // Progress update for a specific paragraph
           console.log('[TTS Progress] 🔄 UPDATE - Paragraph', data.paragraph_index, 'status:', data.status);
           setProgress(data.progress || {});
+          if (data.audio_url) {
+            setParagraphAudio(prev => ({ ...prev, [data.paragraph_index]: data.audio_url }));
+          }
+          if (data.time_to_first_audio_ms != null) {
+            setTimeToFirstAudioMs(data.time_to_first_audio_ms);
+          }
         }
       } catch (error) {
         console.error('[TTS Progress] ❌ Parse error:', error, 'Raw data:', event.data);
@@ -96,5 +120,8 @@ export function useTTSProgress(sessionId) {
     progress,
     paragraphCount,
     isComplete,
+    paragraphs,
+    paragraphAudio,
+    timeToFirstAudioMs,
   };
 }
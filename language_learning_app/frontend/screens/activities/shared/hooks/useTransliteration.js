@@ -3,7 +3,7 @@
  * Used by all activity components
  */
 import { useState, useEffect } from 'react';
-import { transliterateText, coerceTranslitMapToStrings } from '../utils/textProcessing';
+import { transliterateText, transliterateTexts, coerceTranslitMapToStrings } from '../utils/textProcessing';
 
 const API_BASE_URL = __DEV__ ? 'http://localhost:8080' : 'http://localhost:8080';
 
@@ -98,14 +98,10 @@ export function useTransliteration(language, activity) {
 
     try {
       const newTrans = {};
-      for (const item of toFetch) {
-        try {
-          const t = await transliterateText(item.text, language, 'IAST');
-          if (t) newTrans[item.key] = t;
-        } catch (err) {
-          console.error('Error transliterating', item.key, err);
-        }
-      }
+      const results = await transliterateTexts(toFetch.map(item => item.text), language, 'IAST');
+      toFetch.forEach((item, i) => {
+        if (results[i]) newTrans[item.key] = results[i];
+      });
       if (Object.keys(newTrans).length > 0) {
         setTransliterations(prev => ({ ...prev, ...coerceTranslitMapToStrings(newTrans) }));
       }
@@ -166,3 +166,40 @@ export const transliterateText = async (text, language, toScript = 'IAST') => {
     return '';
   }
 };
+
+/**
+ * Transliterate several texts of one language in one backend call
+ * Returns transliterations in the order of `texts` ('' for empty or failed ones)
+ */
+export const transliterateTexts = async (texts, language, toScript = 'IAST') => {
+  const normalized = (texts || []).map(t => {
+    const text = normalizeText(t);
+    return typeof text === 'string' ? text.trim() : '';
+  });
+  if (!normalized.some(Boolean)) return normalized.map(() => '');
+  if (!language || typeof language !== 'string') {
+    console.warn('Transliteration skipped: invalid language', language);
+    return normalized.map(() => '');
+  }
+
+  try {
+    // The backend detects the source script per text
+    const response = await fetch(`${API_BASE_URL}/api/transliterate/batch`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ texts: normalized, language, to_script: toScript }),
+    });
+
+    if (!response.ok) {
+      const errorText = await response.text();
+      console.error(`Batch transliteration failed (${response.status}):`, errorText);
+      return normalized.map(() => '');
+    }
+
+    const data = await response.json();
+    return normalized.map((text, i) => (text && data.transliterations?.[i]) || '');
+  } catch (error) {
+    console.error('Batch transliteration error:', error);
+    return normalized.map(() => '');
+  }
+};